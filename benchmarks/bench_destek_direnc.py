@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Destek/direnç motoru benchmark'ı — tüm tarama evreni için her döngüde seviye hesabının
+maliyeti. Mumlar süreç içinde sentetik üretilir (ağ yok), saat sahte ilerletilir:
+  soğuk   : ilk geçiş (tüm dilimler tohumlanır ve hesaplanır)
+  sıcak   : yeni mum kapanmadan tekrar (yalnızca önbellek + kümeleme)
+  15m     : 15 dakika sonra (yalnızca 15m taban mumu çekilir, üst dilimler yerelde türetilir)
+  4h      : 4 saat sonra (yine tek taban isteği; 15m, 1h, 4h adayları yeniden hesaplanır)
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_destek_direnc --sembol 300 --tekrar 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from borsa_modules.destek_direnc import SeviyeMotoru  # noqa: E402
+from borsa_modules.metrikler import yuzdelik  # noqa: E402
+from borsa_modules.yeniden_ornekleme import ARALIK_MS, MumDeposu  # noqa: E402
+
+
+class SentetikPiyasa:
+    """Sembol başına tohumlu rastgele yürüyüş; klines_fonk arayüzüyle mum döndürür."""
+
+    def __init__(self, simdi_ms):
+        self.simdi_ms = simdi_ms
+        self.cagri = 0
+
+    def saat(self):
+        return self.simdi_ms / 1000.0
+
+    def klines(self, sembol, aralik, limit, baslangic_ms):
+        self.cagri += 1
+        adim = ARALIK_MS[aralik]
+        son = self.simdi_ms // adim * adim
+        ilk = -(-baslangic_ms // adim) * adim if baslangic_ms is not None else son - (limit - 1) * adim
+        acilis = np.arange(ilk, son + 1, adim, dtype=np.int64)[:limit]
+        if len(acilis) == 0:
+            return []
+        taban = 1.0 + zlib.crc32(sembol.encode()) % 1000
+        # Zamanın deterministik fonksiyonu: aynı mum her çağrıda aynı değeri alır
+        saat = acilis / 3_600_000.0
+        gurultu = np.sin(acilis * 1e-7 + zlib.crc32(sembol.encode()) % 97) * 0.003
+        acik = taban * (1 + 0.05 * np.sin(saat / 27.0) + 0.015 * np.sin(saat / 3.1) + gurultu)
+        kapanis = taban * (1 + 0.05 * np.sin((saat + adim / 3_600_000.0) / 27.0) + 0.015 * np.sin((saat + adim / 3_600_000.0) / 3.1) + gurultu)
+        yuksek = np.maximum(acik, kapanis) * 1.002
+        dusuk = np.minimum(acik, kapanis) * 0.998
+        hacim = 1e4 * (1.5 + np.cos(saat / 5.0))
+        return np.column_stack([acilis, acik, yuksek, dusuk, kapanis, hacim, acilis + adim - 1]).tolist()
+
+
+def _gecis(depo, motor, semboller, fiyatlar):
+    sureler = []
+    for s in semboller:
+        t0 = time.perf_counter()
+        depo.guncelle(s)
+        motor.seviyeler(s, fiyatlar[s])
+        sureler.append(time.perf_counter() - t0)
+    return sureler
+
+
+def calistir(sembol_sayisi=300, tekrar=5):
+    piyasa = SentetikPiyasa(simdi_ms=1_760_000_000_000)
+    depo = MumDeposu(piyasa.klines, saat=piyasa.saat)
+    motor = SeviyeMotoru(depo)
+    semboller = [f"S{i:04d}USDT" for i in range(sembol_sayisi)]
+    fiyatlar = {s: 1.0 + zlib.crc32(s.encode()) % 1000 for s in semboller}
+    sonuc = {}
+
+    def olc(ad, ilerlet_ms=0, n=1):
+        toplam, sureler, cagri, yenilenen = [], [], piyasa.cagri, motor.yenilenen
+        for _ in range(n):
+            piyasa.simdi_ms += ilerlet_ms
+            t0 = time.perf_counter()
+            sureler += _gecis(depo, motor, semboller, fiyatlar)
+            toplam.append(time.perf_counter() - t0)
+        sonuc[ad] = {
+            "gecis_ms": round(sum(toplam) / len(toplam) * 1000, 2),
+            "sembol_p50_ms": round(yuzdelik(sureler, 50) * 1000, 3),
+            "sembol_p99_ms": round(yuzdelik(sureler, 99) * 1000, 3),
+            "klines_cagri": (piyasa.cagri - cagri) // n,
+            "yeniden_hesap": (motor.yenilenen - yenilenen) // n,
+        }
+
+    olc("soguk")
+    olc("sicak", 0, tekrar)
+    olc("15m", ARALIK_MS["15m"], tekrar)
+    olc("4h", ARALIK_MS["4h"], 1)
+    return {"sembol": sembol_sayisi, "gecisler": sonuc}
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"Evren: {sonuc['sembol']} sembol × 4 dilim\n")
+    out.write(f"{'geçiş':<8}{'toplam':>10}{'p50/sembol':>12}{'p99/sembol':>12}{'klines':>9}{'hesap':>8}  (ms)\n")
+    for ad, o in sonuc["gecisler"].items():
+        out.write(f"{ad:<8}{o['gecis_ms']:>10.2f}{o['sembol_p50_ms']:>12.3f}{o['sembol_p99_ms']:>12.3f}"
+                  f"{o['klines_cagri']:>9}{o['yeniden_hesap']:>8}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Destek/direnç motoru benchmark")
+    ap.add_argument("--sembol", type=int, default=300, help="Evrendeki sembol sayısı")
+    ap.add_argument("--tekrar", type=int, default=5, help="Sıcak/15m geçiş tekrarı")
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    sonuc = calistir(args.sembol, args.tekrar)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
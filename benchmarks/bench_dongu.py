@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Ana döngü benchmark'ı — `_bot_ana_dongu` adımlarını yerel stand-in sunuculara karşı
+headless çalıştırır, aşama bazında ve döngü bazında gecikme dağılımı raporlar.
+Aşama süreleri borsa.METRIKLER enstrümantasyonundan okunur.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_dongu --dongu 20 --binance-ms 20 --ai-ms 400
+    python -m benchmarks.bench_dongu --dongu 50 --json bench_output.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import borsa  # noqa: E402
+from borsa_modules.emir_motoru import FiltreIndeksi  # noqa: E402
+from borsa_modules.stand_in import StandInSunucu, tradingview_yonlendir  # noqa: E402
+
+def calistir(dongu=10, gecikmeler=None, tohum=42, max_pozisyon=3):
+    """Stand-in sunucuyu başlat, headless botu `dongu` kez çalıştır, ölçümleri döndür."""
+    eski = (borsa.BINANCE_BASE, borsa.OPENROUTER_URL, borsa.DB_PATH, borsa.EMIR_MOTORU.indeks)
+    tmp = tempfile.TemporaryDirectory()
+    with StandInSunucu(gecikmeler=gecikmeler, tohum=tohum) as sunucu:
+        base = sunucu.base_url
+        borsa.BINANCE_BASE = base
+        borsa.OPENROUTER_URL = f"{base}/openrouter/chat/completions"
+        borsa.DB_PATH = os.path.join(tmp.name, "bench.db")
+        tv_aktif = tradingview_yonlendir(base)
+        # Stand-in exchangeInfo gerçek disk önbelleğine yazılmasın
+        borsa.EMIR_MOTORU.indeks = FiltreIndeksi(borsa.binance_exchange_info)
+        borsa.METRIKLER.sifirla()
+        try:
+            cfg = borsa.load_config()
+            cfg.update({
+                "binance_api_key": "bench", "binance_api_secret": "bench",
+                "openrouter_api_key": "bench", "max_pozisyon": max_pozisyon,
+                "discord_webhook": f"{base}/webhook",
+                "telegram_bot_token": "", "telegram_chat_id": "",
+                "metrik_port": 0,
+            })
+            bot = borsa.BorsaAlSatBot(config=cfg, headless=True)
+            bot.bot_aktif = True
+            for _ in range(dongu):
+                with borsa.METRIKLER.zamanla("dongu"):
+                    bot._bot_dongu_adim()
+            bot.bot_aktif = False
+        finally:
+            borsa.BINANCE_BASE, borsa.OPENROUTER_URL, borsa.DB_PATH, borsa.EMIR_MOTORU.indeks = eski
+        istekler = dict(sunucu.istek_sayilari)
+    tmp.cleanup()
+    asamalar = borsa.METRIKLER.ozet()
+    return {
+        "dongu": asamalar.pop("dongu"),
+        "asamalar": asamalar,
+        "istekler": istekler,
+        "tradingview": tv_aktif,
+        "acik_pozisyon": len(bot.acik_pozisyonlar),
+    }
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"{'aşama':<12}{'n':>6}{'hata':>6}{'ort':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)\n")
+    satirlar = [("DÖNGÜ", sonuc["dongu"])] + list(sonuc["asamalar"].items())
+    for ad, o in satirlar:
+        out.write(f"{ad:<12}{o['n']:>6}{o['hata']:>6}{o['ort_ms']:>10.2f}{o['p50_ms']:>10.2f}{o['p90_ms']:>10.2f}{o['p99_ms']:>10.2f}{o['max_ms']:>10.2f}\n")
+    out.write("\nİstek sayıları:\n")
+    for yol, n in sorted(sonuc["istekler"].items()):
+        out.write(f"  {yol:<40}{n:>6}\n")
+    if not sonuc["tradingview"]:
+        out.write("\n(tradingview_ta kurulu değil — yedek TradingView yolu devre dışı; göstergeler yerel mumlardan)\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ana döngü offline benchmark")
+    ap.add_argument("--dongu", type=int, default=10, help="Çalıştırılacak döngü sayısı")
+    ap.add_argument("--binance-ms", type=float, default=0, help="Binance stand-in gecikmesi (ms)")
+    ap.add_argument("--tv-ms", type=float, default=0, help="TradingView stand-in gecikmesi (ms)")
+    ap.add_argument("--ai-ms", type=float, default=0, help="OpenRouter stand-in gecikmesi (ms)")
+    ap.add_argument("--webhook-ms", type=float, default=0, help="Webhook stand-in gecikmesi (ms)")
+    ap.add_argument("--tohum", type=int, default=42)
+    ap.add_argument("--max-pozisyon", type=int, default=3)
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz (regresyon takibi)")
+    args = ap.parse_args(argv)
+    gecikmeler = {
+        "binance": args.binance_ms / 1000.0,
+        "tradingview": args.tv_ms / 1000.0,
+        "openrouter": args.ai_ms / 1000.0,
+        "webhook": args.webhook_ms / 1000.0,
+    }
+    sonuc = calistir(args.dongu, gecikmeler, args.tohum, args.max_pozisyon)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
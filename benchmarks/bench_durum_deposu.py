@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Durum deposu stres testi — eşzamanlı yazıcılar (pozisyon aç/kapat/azalt, fiyat tick'i) ve
+okuyucular (dashboard benzeri: pozisyonlar × fiyatlar → portföy değeri). Her yazma toplamı
+yeniden hesaplar; okuyucu, okuduğu görünümde toplam == bakiye + Σ miktar·fiyat olmasını ve
+sürümün geri gitmemesini denetler. Üç yöntem karşılaştırılır:
+  goruntu  : DurumDeposu — değişmez görüntü, referans takası; okuyucu kilitsiz, kopyasız
+  kilitli  : tek kilit; okuyucu kilit altında savunma kopyası alır
+  yerinde  : kilitsiz yerinde değiştirme (eski durum) — tutarsızlık / iterasyon hatası beklenir
+Thread geçiş aralığı (sys.setswitchinterval) araya girmeleri sıklaştırmak için küçültülür.
+Çıkış kodu: goruntu yönteminde tek bir tutarsızlık ya da hata varsa 1.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_durum_deposu --yazici 2 --okuyucu 4 --sure 2
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from borsa_modules.durum_deposu import DurumDeposu  # noqa: E402
+from borsa_modules.metrikler import yuzdelik  # noqa: E402
+
+SEMBOLLER = [f"S{i:02d}USDT" for i in range(20)]
+BAKIYE = 1000.0
+MAX_POZISYON = 8
+ORNEK_ARALIGI = 16  # her N okumada/yazmada bir süre ölçülür
+
+
+def _deger(bakiye, pozisyonlar, fiyatlar):
+    return bakiye + sum(p["miktar"] * fiyatlar.get(p["sembol"], 0.0) for p in pozisyonlar)
+
+
+def _islem_sec(rng, kimlikler):
+    """(tur, argüman) — fiyat tick'i ağırlıklı rastgele işlem."""
+    x = rng.random()
+    if x < 0.7:
+        return "fiyat", (rng.choice(SEMBOLLER), rng.uniform(50, 150))
+    if x < 0.8:
+        return "ekle", {"sembol": rng.choice(SEMBOLLER), "miktar": rng.uniform(0.1, 2.0), "kimlik": next(kimlikler)}
+    if x < 0.9:
+        return "kapat", rng.randrange(1 << 30)
+    return "azalt", (rng.randrange(1 << 30), rng.uniform(0.05, 0.5))
+
+
+class _Goruntu:
+    def __init__(self):
+        self.depo = DurumDeposu()
+        self.depo.guncelle(bakiye_usdt=BAKIYE, toplam=BAKIYE)
+
+    def yaz(self, islem):
+        tur, a = islem
+
+        def fn(g):
+            pozlar, fiyatlar = g.pozisyonlar, g.fiyatlar
+            if tur == "fiyat":
+                fiyatlar = fiyatlar.copy()
+                fiyatlar[a[0]] = a[1]
+            elif tur == "ekle":
+                if len(pozlar) >= MAX_POZISYON:
+                    return None
+                pozlar = pozlar + (a,)
+            elif not pozlar:
+                return None
+            elif tur == "kapat":
+                i = a % len(pozlar)
+                pozlar = pozlar[:i] + pozlar[i + 1:]
+            else:
+                i = a[0] % len(pozlar)
+                yeni = pozlar[i].copy()
+                yeni["miktar"] = a[1]
+                pozlar = pozlar[:i] + (yeni,) + pozlar[i + 1:]
+            return {"pozisyonlar": pozlar, "fiyatlar": fiyatlar, "toplam": _deger(g.bakiye_usdt, pozlar, fiyatlar)}
+        self.depo.degistir(fn)
+
+    def oku(self):
+        g = self.depo.goruntu
+        return g.surum, g.bakiye_usdt, g.pozisyonlar, g.fiyatlar, g.toplam
+
+
+class _Yerinde:
+    """Tek paylaşılan sözlük, yerinde değiştirilir. kilitli=True: yazma ve kopyalı okuma kilit altında."""
+
+    def __init__(self, kilitli):
+        self.d = {"surum": 1, "bakiye": BAKIYE, "pozisyonlar": [], "fiyatlar": {}, "toplam": BAKIYE}
+        self.kilit = threading.Lock() if kilitli else None
+
+    def _uygula(self, islem):
+        tur, a = islem
+        d = self.d
+        pozlar = d["pozisyonlar"]
+        if tur == "fiyat":
+            d["fiyatlar"][a[0]] = a[1]
+        elif tur == "ekle":
+            if len(pozlar) >= MAX_POZISYON:
+                return
+            pozlar.append(dict(a))
+        elif not pozlar:
+            return
+        elif tur == "kapat":
+            pozlar.pop(a % len(pozlar))
+        else:
+            pozlar[a[0] % len(pozlar)]["miktar"] = a[1]
+        d["toplam"] = _deger(d["bakiye"], pozlar, d["fiyatlar"])
+        d["surum"] += 1
+
+    def yaz(self, islem):
+        if self.kilit is None:
+            self._uygula(islem)
+        else:
+            with self.kilit:
+                self._uygula(islem)
+
+    def oku(self):
+        d = self.d
+        if self.kilit is None:
+            return d["surum"], d["bakiye"], d["pozisyonlar"], d["fiyatlar"], d["toplam"]
+        with self.kilit:
+            return d["surum"], d["bakiye"], [dict(p) for p in d["pozisyonlar"]], dict(d["fiyatlar"]), d["toplam"]
+
+
+YONTEMLER = {"goruntu": _Goruntu, "kilitli": lambda: _Yerinde(True), "yerinde": lambda: _Yerinde(False)}
+
+
+def _olc(yontem, yazici, okuyucu, sure, tohum):
+    durum = YONTEMLER[yontem]()
+    dur = threading.Event()
+    kimlikler = itertools.count(1)
+    sayac = {"yazma": 0, "okuma": 0, "tutarsiz": 0, "hata": 0, "surum_geri": 0}
+    yazma_sure, okuma_sure = [], []
+    kilit = threading.Lock()  # yalnızca sayaç birleştirme için (ölçüm döngüsü dışında)
+
+    def yazar(no):
+        rng = random.Random(tohum + no)
+        n, hata, sureler = 0, 0, []
+        while not dur.is_set():
+            islem = _islem_sec(rng, kimlikler)
+            t0 = time.perf_counter()
+            try:
+                durum.yaz(islem)
+            except (RuntimeError, IndexError):
+                hata += 1
+            if n % ORNEK_ARALIGI == 0:
+                sureler.append(time.perf_counter() - t0)
+            n += 1
+        with kilit:
+            sayac["yazma"] += n
+            sayac["hata"] += hata
+            yazma_sure.extend(sureler)
+
+    def okur():
+        n, tutarsiz, hata, geri, son, sureler = 0, 0, 0, 0, 0, []
+        while not dur.is_set():
+            t0 = time.perf_counter()
+            try:
+                surum, bakiye, pozlar, fiyatlar, toplam = durum.oku()
+                deger = _deger(bakiye, pozlar, fiyatlar)
+                if abs(deger - toplam) > 1e-9 * max(1.0, abs(toplam)):
+                    tutarsiz += 1
+                if surum < son:
+                    geri += 1
+                son = surum
+            except (RuntimeError, IndexError):
+                hata += 1  # ör. "dictionary changed size during iteration"
+            if n % ORNEK_ARALIGI == 0:
+                sureler.append(time.perf_counter() - t0)
+            n += 1
+        with kilit:
+            sayac["okuma"] += n
+            sayac["tutarsiz"] += tutarsiz
+            sayac["hata"] += hata
+            sayac["surum_geri"] += geri
+            okuma_sure.extend(sureler)
+
+    threadler = [threading.Thread(target=yazar, args=(i,)) for i in range(yazici)]
+    threadler += [threading.Thread(target=okur) for _ in range(okuyucu)]
+    t0 = time.perf_counter()
+    for t in threadler:
+        t.start()
+    time.sleep(sure)
+    dur.set()
+    for t in threadler:
+        t.join()
+    gecen = time.perf_counter() - t0
+    sonuc = {
+        "yazma_sn": round(sayac["yazma"] / gecen),
+        "okuma_sn": round(sayac["okuma"] / gecen),
+        "yazma_p99_us": round(yuzdelik(yazma_sure, 99) * 1e6, 2) if yazma_sure else None,
+        "okuma_p50_us": round(yuzdelik(okuma_sure, 50) * 1e6, 2) if okuma_sure else None,
+        "okuma_p99_us": round(yuzdelik(okuma_sure, 99) * 1e6, 2) if okuma_sure else None,
+        "tutarsiz": sayac["tutarsiz"],
+        "hata": sayac["hata"],
+        "surum_geri": sayac["surum_geri"],
+    }
+    if yontem == "goruntu":
+        # Yayınlanan pozisyonlar değiştirilemez olmalı
+        durum.depo.pozisyon_ekle({"sembol": SEMBOLLER[0], "miktar": 1.0})
+        try:
+            durum.depo.goruntu.pozisyonlar[-1]["miktar"] = 0.0
+            sonuc["degistirilebilir"] = True
+        except TypeError:
+            sonuc["degistirilebilir"] = False
+    return sonuc
+
+
+def calistir(yazici=2, okuyucu=4, sure=2.0, gecis_us=50, tohum=11, yontemler=tuple(YONTEMLER)):
+    eski = sys.getswitchinterval()
+    sys.setswitchinterval(gecis_us / 1e6)
+    try:
+        return {
+            "yazici": yazici,
+            "okuyucu": okuyucu,
+            "sure_sn": sure,
+            "gecis_us": gecis_us,
+            "yontemler": {y: _olc(y, yazici, okuyucu, sure, tohum) for y in yontemler},
+        }
+    finally:
+        sys.setswitchinterval(eski)
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"{sonuc['yazici']} yazıcı + {sonuc['okuyucu']} okuyucu, {sonuc['sure_sn']:g} sn/yöntem, "
+              f"thread geçişi {sonuc['gecis_us']} µs\n")
+    out.write(f"  {'yöntem':<9}{'yazma/sn':>10}{'okuma/sn':>11}{'yazma p99':>11}{'okuma p50':>11}{'okuma p99':>11}"
+              f"{'tutarsız':>10}{'hata':>7}{'geri':>6}\n")
+    for ad, r in sonuc["yontemler"].items():
+        out.write(f"  {ad:<9}{r['yazma_sn']:>10}{r['okuma_sn']:>11}{r['yazma_p99_us']:>9.1f}µs{r['okuma_p50_us']:>9.1f}µs"
+                  f"{r['okuma_p99_us']:>9.1f}µs{r['tutarsiz']:>10}{r['hata']:>7}{r['surum_geri']:>6}\n")
+    g = sonuc["yontemler"].get("goruntu")
+    if g is not None:
+        out.write(f"  görüntü pozisyonu değiştirilebilir mi: {'EVET (HATA)' if g['degistirilebilir'] else 'hayır'}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Durum deposu eşzamanlılık stres testi")
+    ap.add_argument("--yazici", type=int, default=2, help="Yazıcı thread sayısı")
+    ap.add_argument("--okuyucu", type=int, default=4, help="Okuyucu thread sayısı")
+    ap.add_argument("--sure", type=float, default=2.0, help="Yöntem başına süre (sn)")
+    ap.add_argument("--gecis-us", type=int, default=50, help="sys.setswitchinterval (µs)")
+    ap.add_argument("--yontem", action="append", choices=list(YONTEMLER), help="Yalnızca bu yöntem(ler)")
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    sonuc = calistir(args.yazici, args.okuyucu, args.sure, args.gecis_us, yontemler=tuple(args.yontem or YONTEMLER))
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+    g = sonuc["yontemler"].get("goruntu")
+    if g is not None and (g["tutarsiz"] or g["hata"] or g["surum_geri"] or g["degistirilebilir"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
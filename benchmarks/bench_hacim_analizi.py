@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Hacim profili benchmark'ı — tüm USDT evreni (varsayılan 400 sembol) için dakikalık mumlar.
+Sentetik hacim: sembol başına taban seviye × gün içi mevsimsellik (Asya / Avrupa / ABD seans
+artışları, gece çukuru) × log-normal gürültü; rastgele barlara 6–15× patlama eklenir.
+Ölçülenler:
+  - bar_ekle: bir dakikalık barın tüm evren için işlenme süresi (p50/p99) ve dakikanın CPU payı
+  - mum_ekle: skaler yol (analiz hattındaki sembol başına besleme) mum başına süre
+  - tespit: ısınmadan sonra eklenen patlamaları yakalama (duyarlılık) ve patlama olmayan barlarda
+    yanlış alarm oranı — gün içi profil ile düz (tek tabanlı) EWMA z-skoru karşılaştırılır
+Ağ yok; üretim deterministiktir (tohum).
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_hacim_analizi --sembol 400 --gun 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from borsa_modules.hacim_analizi import GUN_MS, HacimProfili  # noqa: E402
+from borsa_modules.metrikler import yuzdelik  # noqa: E402
+
+BAR_MS = 60_000
+BASLANGIC_MS = 1_760_000_000_000 // GUN_MS * GUN_MS  # gün başına hizalı
+
+
+def mevsimsellik(dilim_sayisi):
+    """Gün içi hacim çarpanı (UTC): Asya açılışı, Avrupa açılışı ve ABD seansında artış, gece çukuru."""
+    saat = np.arange(dilim_sayisi) * 24.0 / dilim_sayisi
+    profil = 0.6 + 0.5 * np.exp(-((saat - 1.0) ** 2) / 2) + 0.6 * np.exp(-((saat - 8.0) ** 2) / 1.5)
+    profil += 1.6 * np.exp(-((saat - 14.5) ** 2) / 1.0) + 0.8 * np.exp(-((saat - 16.5) ** 2) / 3.0)
+    return profil
+
+
+class _DuzEWMA:
+    """Karşılaştırma: gün içi ayrım yapmayan tek tabanlı EWMA z-skoru (vektörel)."""
+
+    def __init__(self, n, yarilanma_bar, min_gozlem, min_std):
+        self.a = 1 - 0.5 ** (1 / yarilanma_bar)
+        self.ort, self.var, self.say = np.zeros(n), np.zeros(n), 0
+        self.min_gozlem, self.min_std = min_gozlem, min_std
+
+    def bar_ekle(self, hacimler):
+        x = np.log1p(hacimler)
+        z = (x - self.ort) / np.maximum(np.sqrt(self.var), self.min_std) if self.say >= self.min_gozlem else np.full(len(x), np.nan)
+        a = max(self.a, 1.0 / (self.say + 1))
+        d = x - self.ort
+        self.ort, self.var = self.ort + a * d, (1 - a) * (self.var + a * d * d)
+        self.say += 1
+        return z
+
+
+def _tespit_ozet(z, patlama, esik):
+    """(duyarlılık, yanlış alarm oranı) — NaN z'ler (taban hazır değil) dışarıda."""
+    gecerli = ~np.isnan(z)
+    alarm = gecerli & (z >= esik)
+    p = patlama & gecerli
+    duyarlilik = float(alarm[p].mean()) if p.any() else None
+    yanlis = float(alarm[gecerli & ~patlama].mean()) if (gecerli & ~patlama).any() else None
+    return duyarlilik, yanlis
+
+
+def calistir(sembol=400, gun=10, isinma_gun=5, patlama_olasilik=0.0005, skaler_bar=120, tohum=5, esik_z=3.0):
+    rng = np.random.default_rng(tohum)
+    dilim = GUN_MS // BAR_MS
+    semboller = [f"S{i:03d}USDT" for i in range(sembol)]
+    seviye = np.exp(rng.normal(8.0, 1.5, sembol))          # sembol başına tipik dakikalık hacim
+    # Her sembolün seans ağırlığı biraz farklı (ör. Asya ağırlıklı coinler)
+    profil = mevsimsellik(dilim)[None, :] ** rng.uniform(0.6, 1.4, (sembol, 1))
+    profil_motoru = HacimProfili(semboller, bar_ms=BAR_MS, esik_z=esik_z)
+    duz = _DuzEWMA(sembol, dilim, profil_motoru.min_gozlem, profil_motoru.min_std)
+
+    sureler, z_profil, z_duz, patlamalar = [], [], [], []
+    bar_sayisi = gun * dilim
+    for b in range(bar_sayisi):
+        d = b % dilim
+        hacim = seviye * profil[:, d] * np.exp(rng.normal(0.0, 0.35, sembol))
+        patlama = rng.random(sembol) < patlama_olasilik
+        hacim[patlama] *= rng.uniform(6, 15, int(patlama.sum()))
+        t0 = time.perf_counter()
+        z = profil_motoru.bar_ekle(BASLANGIC_MS + b * BAR_MS, hacim)
+        sureler.append(time.perf_counter() - t0)
+        zd = duz.bar_ekle(hacim)
+        if b >= isinma_gun * dilim:
+            z_profil.append(z)
+            z_duz.append(zd)
+            patlamalar.append(patlama)
+
+    # Skaler yol: analiz hattı gibi sembol sembol, mum mum (yeni bir günün ilk barları)
+    skaler_sureler = []
+    for b in range(bar_sayisi, bar_sayisi + skaler_bar):
+        hacim = (seviye * profil[:, b % dilim] * np.exp(rng.normal(0.0, 0.35, sembol))).tolist()
+        acilis = BASLANGIC_MS + b * BAR_MS
+        for s, h in zip(semboller, hacim):
+            t0 = time.perf_counter()
+            profil_motoru.mum_ekle(s, acilis, h)
+            skaler_sureler.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for s in semboller:
+        profil_motoru.degerlendir(s)
+    degerlendir_us = (time.perf_counter() - t0) / sembol * 1e6
+
+    z_profil, z_duz, patlamalar = np.array(z_profil), np.array(z_duz), np.array(patlamalar)
+    ort_bar = sum(sureler) / len(sureler)
+    sonuc = {
+        "sembol": sembol, "gun": gun, "isinma_gun": isinma_gun, "bar_ms": BAR_MS, "dilim": dilim, "esik_z": esik_z,
+        "bar_ekle_p50_us": round(yuzdelik(sureler, 50) * 1e6, 1),
+        "bar_ekle_p99_us": round(yuzdelik(sureler, 99) * 1e6, 1),
+        "bar_ekle_sembol_ns": round(ort_bar / sembol * 1e9, 1),
+        "cpu_payi_pct": round(ort_bar / (BAR_MS / 1000) * 100, 5),
+        "mum_ekle_p50_us": round(yuzdelik(skaler_sureler, 50) * 1e6, 2),
+        "mum_ekle_p99_us": round(yuzdelik(skaler_sureler, 99) * 1e6, 2),
+        "degerlendir_us": round(degerlendir_us, 1),
+        "bellek_mb": round(sum(getattr(profil_motoru, a).nbytes for a in ("_ort", "_say")) / 1e6, 1),
+        "patlama": int(patlamalar.sum()),
+        "olcum_bar": int(patlamalar.size),
+    }
+    for ad, z in (("profil", z_profil), ("duz", z_duz)):
+        duyarlilik, yanlis = _tespit_ozet(z, patlamalar, esik_z)
+        sonuc[ad] = {"duyarlilik": round(duyarlilik, 4) if duyarlilik is not None else None,
+                     "yanlis_alarm_pct": round(yanlis * 100, 4) if yanlis is not None else None,
+                     "yanlis_alarm_gun": round(yanlis * dilim, 2) if yanlis is not None else None}
+    return sonuc
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"{sonuc['sembol']} sembol × {sonuc['gun']} gün × {sonuc['dilim']} dakikalık bar "
+              f"(ilk {sonuc['isinma_gun']} gün ısınma), eşik z ≥ {sonuc['esik_z']:g}\n")
+    out.write(f"  bar_ekle (tüm evren): p50 {sonuc['bar_ekle_p50_us']:.1f} µs, p99 {sonuc['bar_ekle_p99_us']:.1f} µs "
+              f"({sonuc['bar_ekle_sembol_ns']:.0f} ns/sembol) — dakikanın %{sonuc['cpu_payi_pct']:.4f}'ü\n")
+    out.write(f"  mum_ekle (skaler)   : p50 {sonuc['mum_ekle_p50_us']:.2f} µs, p99 {sonuc['mum_ekle_p99_us']:.2f} µs; "
+              f"degerlendir {sonuc['degerlendir_us']:.1f} µs; profil belleği {sonuc['bellek_mb']} MB\n")
+    out.write(f"  tespit ({sonuc['patlama']} patlama / {sonuc['olcum_bar']} sembol-bar):\n")
+    out.write(f"    {'taban':<8}{'duyarlılık':>12}{'yanlış alarm':>15}{'alarm/gün/sembol':>19}\n")
+    for ad in ("profil", "duz"):
+        r = sonuc[ad]
+        duy = f"{r['duyarlilik'] * 100:.1f}%" if r["duyarlilik"] is not None else "—"
+        out.write(f"    {ad:<8}{duy:>12}{r['yanlis_alarm_pct']:>14.3f}%{r['yanlis_alarm_gun']:>19.2f}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Hacim profili (gün içi z-skoru) benchmark")
+    ap.add_argument("--sembol", type=int, default=400, help="Evren büyüklüğü")
+    ap.add_argument("--gun", type=int, default=10, help="Simüle edilen gün sayısı")
+    ap.add_argument("--isinma-gun", type=int, default=5, help="Tespit ölçümüne alınmayan ilk günler")
+    ap.add_argument("--esik-z", type=float, default=3.0)
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    if args.isinma_gun >= args.gun:
+        ap.error("--isinma-gun, --gun'den küçük olmalı")
+    sonuc = calistir(args.sembol, args.gun, args.isinma_gun, esik_z=args.esik_z)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Kağıt işlem borsası benchmark'ı — rastgele yürüyen fiyatlara karşı karışık emir akışı
+(MARKET / dayanan LIMIT / iptal) gönderir, saniyedeki emir sayısını ve emir gecikmesini ölçer:
+  ham   : KagitBorsa.istek() doğrudan (eşleştirme motorunun kendi maliyeti)
+  motor : botun yolu — binance_spot_emir → EmirMotoru (yerel filtre, clientOrderId, dolum
+          ayrıştırma, metrikler) → binance_imzali_istek → KagitBorsa
+Hesap olaylarıyla beslenen BakiyeDefteri sonunda /api/v3/account ile mutabakata sokulur;
+sapma, negatif bakiye ya da açık emirlerle uyuşmayan kilitli bakiye varsa çıkış kodu 1.
+Filtreler stand-in exchangeInfo'dan bir kez alınır; sonrası anahtarsız ve ağsızdır.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_kagit_borsa --emir 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import borsa  # noqa: E402
+from borsa_modules.defter import BakiyeDefteri  # noqa: E402
+from borsa_modules.emir_motoru import FiltreIndeksi, fiyat_normallestir, miktar_normallestir  # noqa: E402
+from borsa_modules.kagit_borsa import KagitBorsa  # noqa: E402
+from borsa_modules.metrikler import yuzdelik  # noqa: E402
+from borsa_modules.stand_in import TABAN_FIYATLAR, StandInSunucu  # noqa: E402
+
+BASLANGIC_USDT = 1_000_000.0
+BASLANGIC_VARLIK_USDT = 50_000.0  # her base varlıktan bu değerde (satışlar da yapılabilsin)
+
+
+def _kagit_borsa(indeks, komisyon_bps, kayma_bps):
+    bakiyeler = {"USDT": BASLANGIC_USDT}
+    for s, f in TABAN_FIYATLAR.items():
+        bakiyeler[s[:-4]] = BASLANGIC_VARLIK_USDT / f
+    kb = KagitBorsa(None, indeks, bakiyeler, komisyon_bps=komisyon_bps, kayma_bps=kayma_bps)
+    for s, f in TABAN_FIYATLAR.items():
+        kb.fiyat_guncelle(s, f)
+    return kb
+
+
+def _ham_gonder(kb, indeks):
+    def gonder(sembol, side, tip, miktar, fiyat):
+        filtre = indeks.get(sembol)
+        q, _ = miktar_normallestir(filtre, miktar, fiyat, tip)
+        if q is None:
+            return None
+        params = {"symbol": sembol, "side": side, "type": tip, "quantity": q, "newOrderRespType": "FULL"}
+        if tip == "LIMIT":
+            params["price"] = fiyat_normallestir(filtre, fiyat)
+            params["timeInForce"] = "GTC"
+        kod, govde = kb.istek("POST", "/api/v3/order", params)
+        return govde if kod == 200 else None
+    return gonder
+
+
+def _motor_gonder(sembol, side, tip, miktar, fiyat):
+    ok, sonuc = borsa.binance_spot_emir("", "", sembol, side, miktar, order_type=tip, fiyat=fiyat)
+    return sonuc["ham"] if ok else None
+
+
+def _akis(kb, gonder, emir, tohum, tick_her, limit_orani, iptal_orani):
+    """Emir akışını çalıştır; emir başına gecikmeler ve duvar süresi."""
+    rng = random.Random(tohum)
+    semboller = list(TABAN_FIYATLAR)
+    fiyatlar = dict(TABAN_FIYATLAR)
+    dayanan, sureler = [], []
+    t0 = time.perf_counter()
+    for i in range(emir):
+        if i % tick_her == 0:
+            s = rng.choice(semboller)
+            fiyatlar[s] *= 1 + rng.gauss(0, 0.0008)
+            kb.fiyat_guncelle(s, fiyatlar[s])
+        if dayanan and rng.random() < iptal_orani:
+            s, oid = dayanan.pop(rng.randrange(len(dayanan)))
+            kb.istek("DELETE", "/api/v3/order", {"symbol": s, "orderId": oid})
+        s = rng.choice(semboller)
+        side = "BUY" if rng.random() < 0.5 else "SELL"
+        tutar = rng.uniform(20, 500)
+        tip = "LIMIT" if rng.random() < limit_orani else "MARKET"
+        fiyat = fiyatlar[s]
+        if tip == "LIMIT":
+            # Pasif taraf: fiyat yürüdükçe bir kısmı dolar, kalanı dayanır / iptal edilir
+            fiyat *= 1 - rng.uniform(0, 0.003) if side == "BUY" else 1 + rng.uniform(0, 0.003)
+        t1 = time.perf_counter()
+        cevap = gonder(s, side, tip, tutar / fiyat, fiyat)
+        sureler.append(time.perf_counter() - t1)
+        if cevap is not None and cevap.get("status") == "NEW":
+            dayanan.append((s, cevap["orderId"]))
+            del dayanan[:-500]
+    return sureler, time.perf_counter() - t0
+
+
+def _denetle(kb, defter):
+    """Defter ↔ hesap mutabakatı, negatif bakiye ve kilitli bakiye ↔ açık emir tutarlılığı."""
+    _, hesap = kb.istek("GET", "/api/v3/account")
+    sapmalar = defter.mutabakat(hesap["balances"])
+    bakiyeler = kb.bakiyeler()
+    negatif = [a for a, (f, l) in bakiyeler.items() if f < -1e-9 or l < -1e-9]
+    _, acik = kb.istek("GET", "/api/v3/openOrders")
+    beklenen = {}
+    for e in acik:
+        varlik, miktar = ("USDT", float(e["origQty"]) * float(e["price"])) if e["side"] == "BUY" else (e["symbol"][:-4], float(e["origQty"]))
+        beklenen[varlik] = beklenen.get(varlik, 0.0) + miktar
+    kilit_hata = [a for a, (_, l) in bakiyeler.items() if abs(l - beklenen.get(a, 0.0)) > 1e-6 * max(1.0, l)]
+    return {"sapma": len(sapmalar), "negatif": len(negatif), "kilit_hata": len(kilit_hata), "acik": len(acik)}
+
+
+def _olc(yol, indeks, emir, tohum, komisyon_bps, kayma_bps, tick_her, limit_orani, iptal_orani):
+    kb = _kagit_borsa(indeks, komisyon_bps, kayma_bps)
+    defter = BakiyeDefteri()
+    _, hesap = kb.istek("GET", "/api/v3/account")
+    defter.rest_yukle(hesap["balances"])
+    kb.abone_ol(defter.akis_olayi)
+    if yol == "ham":
+        gonder = _ham_gonder(kb, indeks)
+    else:
+        gonder = _motor_gonder
+        borsa.KAGIT_BORSA = kb
+    sureler, gecen = _akis(kb, gonder, emir, tohum, tick_her, limit_orani, iptal_orani)
+    d = kb.durum()
+    sonuc = {
+        "emir_sn": round(emir / gecen),
+        "sure_sn": round(gecen, 3),
+        "emir_p50_us": round(yuzdelik(sureler, 50) * 1e6, 1),
+        "emir_p99_us": round(yuzdelik(sureler, 99) * 1e6, 1),
+        "kabul": d["emir"],
+        "dolum": d["dolum"],
+        "dayanan_dolum": d["dayanan_dolum"],
+        "iptal": d["iptal"],
+        "red": d["red"],
+        "komisyon_usdt": round(d["komisyon"].get("USDT", 0.0), 2),
+    }
+    sonuc.update(_denetle(kb, defter))
+    return sonuc
+
+
+def calistir(emir=20000, tohum=7, komisyon_bps=10.0, kayma_bps=2.0, tick_her=4, limit_orani=0.3, iptal_orani=0.05):
+    eski_base, eski_kagit, eski_indeks = borsa.BINANCE_BASE, borsa.KAGIT_BORSA, borsa.EMIR_MOTORU.indeks
+    sonuc = {"emir": emir, "komisyon_bps": komisyon_bps, "kayma_bps": kayma_bps, "limit_orani": limit_orani}
+    try:
+        with StandInSunucu() as sunucu:
+            borsa.BINANCE_BASE = sunucu.base_url
+            indeks = FiltreIndeksi(borsa.binance_exchange_info)  # disk önbelleği yok: gerçek önbelleğe dokunma
+            indeks.yenile()
+        borsa.EMIR_MOTORU.indeks = indeks
+        sonuc["yollar"] = {y: _olc(y, indeks, emir, tohum, komisyon_bps, kayma_bps, tick_her, limit_orani, iptal_orani)
+                           for y in ("ham", "motor")}
+    finally:
+        borsa.BINANCE_BASE, borsa.KAGIT_BORSA, borsa.EMIR_MOTORU.indeks = eski_base, eski_kagit, eski_indeks
+    return sonuc
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"{sonuc['emir']} emir, %{sonuc['limit_orani'] * 100:.0f} LIMIT, komisyon {sonuc['komisyon_bps']:g} bps, "
+              f"kayma {sonuc['kayma_bps']:g} bps\n")
+    out.write(f"  {'yol':<7}{'emir/sn':>9}{'p50':>10}{'p99':>10}{'kabul':>8}{'dolum':>8}{'dayanan':>9}{'iptal':>7}{'red':>6}"
+              f"{'sapma':>7}{'negatif':>9}{'kilit':>7}\n")
+    for ad, r in sonuc["yollar"].items():
+        out.write(f"  {ad:<7}{r['emir_sn']:>9}{r['emir_p50_us']:>8.1f}µs{r['emir_p99_us']:>8.1f}µs{r['kabul']:>8}{r['dolum']:>8}"
+                  f"{r['dayanan_dolum']:>9}{r['iptal']:>7}{r['red']:>6}{r['sapma']:>7}{r['negatif']:>9}{r['kilit_hata']:>7}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Kağıt işlem borsası benchmark")
+    ap.add_argument("--emir", type=int, default=20000, help="Yol başına emir sayısı")
+    ap.add_argument("--komisyon-bps", type=float, default=10.0)
+    ap.add_argument("--kayma-bps", type=float, default=2.0)
+    ap.add_argument("--limit-orani", type=float, default=0.3, help="LIMIT emir oranı (gerisi MARKET)")
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    sonuc = calistir(args.emir, komisyon_bps=args.komisyon_bps, kayma_bps=args.kayma_bps, limit_orani=args.limit_orani)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+    if any(r["sapma"] or r["negatif"] or r["kilit_hata"] for r in sonuc["yollar"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Kovaryans motoru benchmark'ı — evren büyüklüğüne göre bar başına güncelleme ve alım öncesi
+portföy riski kontrolünün maliyeti. Getiriler sentetik (ortak faktör + sektör + gürültü):
+  artimli : yeni bar → giren/çıkan getirinin dış çarpımları (O(n²))
+  tam     : aynı barda tampondan baştan hesap (O(pencere·n²)) + türetme — karşılaştırma için
+  türetme : toplamlardan kovaryans/korelasyon matrisi (bar başına bir kez, ilk okumada)
+  kontrol : önbellekli matris üzerinde aday korelasyonu + w'Σw (açık pozisyon sayısı kadar)
+Artımlı sonuç her ölçümde tam hesapla karşılaştırılır (maks. mutlak korelasyon farkı).
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_korelasyon --sembol 300 --pencere 168 --bar 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from borsa_modules.korelasyon import KovaryansMotoru  # noqa: E402
+from borsa_modules.metrikler import yuzdelik  # noqa: E402
+
+BAR_MS = 3_600_000
+
+
+def sentetik_fiyatlar(sembol_sayisi, bar_sayisi, tohum=7):
+    rng = np.random.default_rng(tohum)
+    sektor = rng.integers(0, 8, sembol_sayisi)
+    getiri = (rng.normal(0, 0.006, (bar_sayisi, 1))
+              + rng.normal(0, 0.004, (bar_sayisi, 8))[:, sektor]
+              + rng.normal(0, 0.008, (bar_sayisi, sembol_sayisi)))
+    fiyat = 100 * np.exp(np.cumsum(getiri, axis=0))
+    fiyat[rng.random(fiyat.shape) < 0.01] = np.nan  # ara sıra eksik mum
+    return fiyat
+
+
+def calistir(sembol_sayisi=300, pencere=168, bar_sayisi=500, pozisyon=3, kontrol_tekrar=20000):
+    semboller = [f"S{i:04d}USDT" for i in range(sembol_sayisi)]
+    fiyat = sentetik_fiyatlar(sembol_sayisi, pencere + bar_sayisi + 1)
+    motor = KovaryansMotoru(semboller, pencere=pencere, bar_ms=BAR_MS)
+    t0 = time.perf_counter()
+    for t in range(pencere + 1):
+        motor.bar_ekle(t * BAR_MS, fiyat[t])
+    isinma = time.perf_counter() - t0
+
+    artimli, turetme, tam, farklar = [], [], [], []
+    for t in range(pencere + 1, pencere + 1 + bar_sayisi):
+        t0 = time.perf_counter()
+        motor.bar_ekle(t * BAR_MS, fiyat[t])
+        t1 = time.perf_counter()
+        motor.korelasyon()
+        artimli.append(t1 - t0)
+        turetme.append(time.perf_counter() - t1)
+        if t % 50 == 0:
+            kor = motor.korelasyon().copy()
+            t0 = time.perf_counter()
+            motor._tam_hesap()
+            motor._onbellek = None
+            tam_kor = motor.korelasyon()
+            tam.append(time.perf_counter() - t0)
+            farklar.append(float(np.nanmax(np.abs(kor - tam_kor))))
+
+    pozisyonlar = {semboller[i]: 250.0 for i in range(pozisyon)}
+    sureler = []
+    for k in range(kontrol_tekrar):
+        aday = semboller[pozisyon + k % (sembol_sayisi - pozisyon)]
+        t0 = time.perf_counter()
+        motor.kontrol(aday, 200.0, pozisyonlar, ozkaynak=2000.0, max_korelasyon=0.8, max_vol_pct=3.0)
+        sureler.append(time.perf_counter() - t0)
+    return {
+        "sembol": sembol_sayisi,
+        "pencere": pencere,
+        "bar": bar_sayisi,
+        "pozisyon": pozisyon,
+        "isinma_ms": round(isinma * 1000, 2),
+        "artimli_p50_ms": round(yuzdelik(artimli, 50) * 1000, 3),
+        "artimli_p99_ms": round(yuzdelik(artimli, 99) * 1000, 3),
+        "turetme_p50_ms": round(yuzdelik(turetme, 50) * 1000, 3),
+        "tam_ort_ms": round(sum(tam) / len(tam) * 1000, 3) if tam else None,
+        "maks_fark": max(farklar) if farklar else None,
+        "kontrol_p50_us": round(yuzdelik(sureler, 50) * 1e6, 2),
+        "kontrol_p99_us": round(yuzdelik(sureler, 99) * 1e6, 2),
+    }
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"Evren: {sonuc['sembol']} sembol, pencere {sonuc['pencere']} bar, {sonuc['bar']} bar ölçüldü\n")
+    out.write(f"  ısınma (pencere+1 bar)      : {sonuc['isinma_ms']:>10.2f} ms\n")
+    out.write(f"  artımlı güncelleme p50 / p99: {sonuc['artimli_p50_ms']:>10.3f} / {sonuc['artimli_p99_ms']:.3f} ms\n")
+    out.write(f"  matris türetme p50          : {sonuc['turetme_p50_ms']:>10.3f} ms\n")
+    if sonuc["tam_ort_ms"] is not None:
+        out.write(f"  tam hesap + türetme (ort.)  : {sonuc['tam_ort_ms']:>10.3f} ms\n")
+        out.write(f"  artımlı − tam maks. fark    : {sonuc['maks_fark']:>10.2e}\n")
+    out.write(f"  kontrol ({sonuc['pozisyon']} pozisyon) p50 / p99: {sonuc['kontrol_p50_us']:>6.2f} / {sonuc['kontrol_p99_us']:.2f} µs\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Kovaryans motoru benchmark")
+    ap.add_argument("--sembol", type=int, default=300, help="Evrendeki sembol sayısı")
+    ap.add_argument("--pencere", type=int, default=168, help="Kayan pencere (bar)")
+    ap.add_argument("--bar", type=int, default=500, help="Ölçülen bar sayısı")
+    ap.add_argument("--pozisyon", type=int, default=3, help="Kontrolde açık pozisyon sayısı")
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    sonuc = calistir(args.sembol, args.pencere, args.bar, args.pozisyon)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Log deposu benchmark'ı — aylarca bot geçmişine karşılık gelen sentetik `log` tablosunda
+filtreli/tam metin arama gecikmesi, log görünümünün derin sayfaları (keyset `once_id` ile
+OFFSET karşılaştırması) ve saklama temizliğinin dosya boyutuna etkisi.
+Veritabanı geçici dizinde borsa.init_db ile (indeksler + FTS5) kurulur.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_log_arama --satir 1000000 --gun 180 --saklama 90
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import borsa  # noqa: E402
+from borsa_modules import log_deposu  # noqa: E402
+from borsa_modules.metrikler import yuzdelik  # noqa: E402
+
+_MESAJLAR = [
+    ("bot", "AlSat AL {s} @ {f}"), ("bot", "AlSat SAT {s} TP %{p}"), ("bot", "AlSat SAT {s} SL"),
+    ("bot", "Emir reddedildi BUY {s}: Filter failure: NOTIONAL"), ("bot", "Bot hata: Read timed out"),
+    ("sistem", "Uygulama başlatıldı."), ("genel", "Dışa aktarım: log → rapor.xlsx"),
+]
+
+
+def doldur(db, satir, gun, tohum=1):
+    rnd = random.Random(tohum)
+    bas = datetime.now() - timedelta(days=gun)
+    adim = gun * 86400 / satir
+    conn = sqlite3.connect(db)
+
+    def uret():
+        for i in range(satir):
+            tip, sablon = _MESAJLAR[rnd.randrange(len(_MESAJLAR))]
+            s = borsa.SEMBOL_LISTESI[rnd.randrange(len(borsa.SEMBOL_LISTESI))]
+            yield ((bas + timedelta(seconds=i * adim)).strftime("%Y-%m-%d %H:%M:%S"), tip,
+                   sablon.format(s=s, f=round(rnd.uniform(0.1, 70000), 2), p=round(rnd.uniform(0.5, 5), 1)))
+
+    conn.executemany("INSERT INTO log (tarih_saat, tip, mesaj) VALUES (?,?,?)", uret())
+    conn.commit()
+    conn.close()
+
+
+def _olc(fn, tekrar):
+    sureler = []
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        n = len(fn())
+        sureler.append(time.perf_counter() - t0)
+    return {"p50_ms": round(yuzdelik(sureler, 50) * 1000, 2), "max_ms": round(max(sureler) * 1000, 2), "satir": n}
+
+
+def calistir(satir=1_000_000, gun=180, saklama=90, tekrar=20):
+    eski_db = borsa.DB_PATH
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        db = borsa.DB_PATH = os.path.join(tmp.name, "bench.db")
+        borsa.init_db()
+        t0 = time.perf_counter()
+        doldur(db, satir, gun)
+        sonuc = {"satir": satir, "gun": gun, "doldurma_sn": round(time.perf_counter() - t0, 2),
+                 "boyut_mb": round(os.path.getsize(db) / 1e6, 1)}
+        conn = sqlite3.connect(db)
+        hafta = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+        sorgular = {
+            "son_200": lambda: log_deposu.log_ara(conn),
+            "tip": lambda: log_deposu.log_ara(conn, tip="sistem"),
+            "son_7_gun": lambda: log_deposu.log_ara(conn, baslangic=hafta),
+            "metin": lambda: log_deposu.log_ara(conn, metin="reddedildi NOTIONAL"),
+            "metin_nadir": lambda: log_deposu.log_ara(conn, metin="DOTUSDT SL"),
+            "metin+tip+7g": lambda: log_deposu.log_ara(conn, metin="timed", tip="bot", baslangic=hafta),
+            # Görünüm ortadaki bir sayfaya kaydırılmış: keyset her derinlikte sabit, OFFSET atlanan satır kadar
+            "sayfa_orta": lambda: log_deposu.log_ara(conn, once_id=satir // 2),
+            "sayfa_orta_geri": lambda: log_deposu.log_ara(conn, sonra_id=satir // 2),
+            "metin_orta": lambda: log_deposu.log_ara(conn, metin="reddedildi", once_id=satir // 2),
+            "offset_orta": lambda: conn.execute(
+                "SELECT id, tarih_saat, tip, mesaj FROM log ORDER BY id DESC LIMIT 200 OFFSET ?", (satir // 2,)).fetchall(),
+        }
+        sonuc["arama"] = {ad: _olc(fn, tekrar) for ad, fn in sorgular.items()}
+        t0 = time.perf_counter()
+        silinen, sayfa = log_deposu.log_temizle(conn, saklama)
+        sonuc["temizlik"] = {"saklama_gun": saklama, "silinen": silinen, "iade_sayfa": sayfa,
+                             "sure_sn": round(time.perf_counter() - t0, 2), "boyut_mb": round(os.path.getsize(db) / 1e6, 1)}
+        conn.close()
+    finally:
+        borsa.DB_PATH = eski_db
+        tmp.cleanup()
+    return sonuc
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"Log: {sonuc['satir']:,} satır / {sonuc['gun']} gün, {sonuc['boyut_mb']} MB (doldurma {sonuc['doldurma_sn']} sn)\n")
+    out.write(f"{'sorgu':<16}{'p50':>9}{'max':>9}{'satır':>8}  (ms)\n")
+    for ad, o in sonuc["arama"].items():
+        out.write(f"{ad:<16}{o['p50_ms']:>9.2f}{o['max_ms']:>9.2f}{o['satir']:>8}\n")
+    t = sonuc["temizlik"]
+    out.write(f"Temizlik ({t['saklama_gun']} gün): {t['silinen']:,} satır silindi, {t['iade_sayfa']:,} sayfa iade, "
+              f"{t['sure_sn']} sn → {t['boyut_mb']} MB\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Log arama / saklama benchmark")
+    ap.add_argument("--satir", type=int, default=1_000_000)
+    ap.add_argument("--gun", type=int, default=180, help="Satırların yayıldığı gün sayısı")
+    ap.add_argument("--saklama", type=int, default=90, help="Saklama süresi (gün)")
+    ap.add_argument("--tekrar", type=int, default=20)
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    sonuc = calistir(args.satir, args.gun, args.saklama, args.tekrar)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
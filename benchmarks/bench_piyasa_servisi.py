@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Ortak piyasa verisi servisi benchmark'ı — aynı makinede N bot örneği (ayrı süreçler) tarama
+iş yükünü (fiyat listesi + her sembol için gelişmiş analiz: fiyat, 24s ticker, kline) stand-in
+Binance'e karşı çalıştırır:
+  dogrudan : her süreç kendi çeker (bugünkü durum)
+  servis   : çekimleri tek PiyasaSunucusu yapar; süreçler Unix soketi / paylaşımlı tablodan okur
+Üst kaynağa giden istek sayısı ve ağırlık stand-in sayaçlarından, istemci tarafı fiyat
+okuma gecikmesi süreçlerin içinden ölçülür.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_piyasa_servisi --ornek 4 --tur 2
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import borsa  # noqa: E402
+from borsa_modules.metrikler import yuzdelik  # noqa: E402
+from borsa_modules.piyasa_servisi import PiyasaSunucusu  # noqa: E402
+from borsa_modules.stand_in import StandInSunucu  # noqa: E402
+
+
+def _ornek(base_url, soket, servis, tur, kuyruk):
+    """Tek bot örneği (alt süreç): tarama iş yükü + fiyat okuma gecikmesi."""
+    borsa.BINANCE_BASE = base_url
+    borsa.PIYASA.soket_yolu = soket
+    borsa.PIYASA.etkin = servis
+    sureler = []
+    t0 = time.perf_counter()
+    for _ in range(tur):
+        borsa.binance_fiyatlar(borsa.SEMBOL_LISTESI)
+        for sembol in borsa.SEMBOL_LISTESI:
+            borsa.binance_gelismis_analiz(sembol)
+        for sembol in borsa.SEMBOL_LISTESI * 20:
+            t1 = time.perf_counter()
+            borsa.binance_fiyat(sembol)
+            sureler.append(time.perf_counter() - t1)
+    kuyruk.put({"sure": time.perf_counter() - t0, "fiyat_sureler": sureler, "piyasa": dict(borsa.PIYASA.sayac)})
+
+
+def _olc(sunucu, ornek, tur, servis, soket):
+    istek0, agirlik0 = sum(sunucu.istek_sayilari.values()), sunucu.toplam_agirlik
+    ctx = mp.get_context("spawn")
+    kuyruk = ctx.Queue()
+    surecler = [ctx.Process(target=_ornek, args=(sunucu.base_url, soket, servis, tur, kuyruk)) for _ in range(ornek)]
+    t0 = time.perf_counter()
+    for p in surecler:
+        p.start()
+    sonuclar = [kuyruk.get(timeout=600) for _ in surecler]
+    for p in surecler:
+        p.join()
+    sureler = [s for r in sonuclar for s in r["fiyat_sureler"]]
+    return {
+        "ust_istek": sum(sunucu.istek_sayilari.values()) - istek0,
+        "ust_agirlik": sunucu.toplam_agirlik - agirlik0,
+        "duvar_sn": round(time.perf_counter() - t0, 2),
+        "ornek_sure_ort_sn": round(sum(r["sure"] for r in sonuclar) / len(sonuclar), 2),
+        "fiyat_p50_us": round(yuzdelik(sureler, 50) * 1e6, 1),
+        "fiyat_p99_us": round(yuzdelik(sureler, 99) * 1e6, 1),
+        "tablo_okuma": sum(r["piyasa"]["tablo"] for r in sonuclar),
+        "soket_istegi": sum(r["piyasa"]["soket"] for r in sonuclar),
+    }
+
+
+def calistir(ornek=4, tur=2):
+    eski = borsa.BINANCE_BASE
+    tmp = tempfile.TemporaryDirectory()
+    soket = os.path.join(tmp.name, "piyasa.sock")
+    sonuc = {"ornek": ornek, "tur": tur, "sembol": len(borsa.SEMBOL_LISTESI)}
+    try:
+        # Her yol ayrı stand-in'e karşı: dakikalık ağırlık başlığı öbür yolun isteklerini taşımasın
+        with StandInSunucu() as sunucu:
+            sonuc["dogrudan"] = _olc(sunucu, ornek, tur, False, soket)
+        with StandInSunucu() as sunucu:
+            borsa.BINANCE_BASE = sunucu.base_url
+            borsa.PIYASA.etkin = False  # bu süreç servisin kendisi
+            with PiyasaSunucusu({"fiyatlar": borsa.binance_fiyatlar, "ticker": borsa.binance_24h_ticker,
+                                 "klines": borsa.binance_klines, "tv": lambda s, f: None},
+                                soket, semboller=borsa.SEMBOL_LISTESI, fiyat_aralik_sn=1.0) as servis:
+                sonuc["servis"] = _olc(sunucu, ornek, tur, True, soket)
+                sonuc["servis"]["sunucu"] = servis.durum()
+    finally:
+        borsa.BINANCE_BASE = eski
+        tmp.cleanup()
+    return sonuc
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    out.write(f"{sonuc['ornek']} bot örneği × {sonuc['tur']} tur × {sonuc['sembol']} sembol\n")
+    out.write(f"  {'yol':<10}{'üst istek':>10}{'üst ağırlık':>13}{'duvar':>9}{'fiyat p50':>12}{'fiyat p99':>12}{'tablo':>8}{'soket':>8}\n")
+    for ad in ("dogrudan", "servis"):
+        r = sonuc[ad]
+        out.write(f"  {ad:<10}{r['ust_istek']:>10}{r['ust_agirlik']:>13}{r['duvar_sn']:>8.2f}s{r['fiyat_p50_us']:>10.1f}µs"
+                  f"{r['fiyat_p99_us']:>10.1f}µs{r['tablo_okuma']:>8}{r['soket_istegi']:>8}\n")
+    s = sonuc["servis"]["sunucu"]
+    out.write(f"  servis: {s['ust_kaynak']} üst çağrı, {s['onbellek_isabet']} önbellek isabeti, {s['birlesen']} birleşen istek, "
+              f"{s['baglanti']} bağlantı\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ortak piyasa verisi servisi benchmark")
+    ap.add_argument("--ornek", type=int, default=4, help="Bot örneği (süreç) sayısı")
+    ap.add_argument("--tur", type=int, default=2, help="Örnek başına tarama turu")
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    sonuc = calistir(args.ornek, args.tur)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Ham tick kaydı / yeniden oynatma benchmark'ı — kayıtlı segmentleri (ya da süreç içinde
+üretilen sentetik bir oturumu) headless botun akış tüketicisine geri verir ve
+tick → karar (SL/TP tetikleme) gecikmesini ölçer. Ağ yok; oynatma deterministiktir.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.bench_tick_oynatma                         # sentetik 200k tick, azami hız
+    python -m benchmarks.bench_tick_oynatma --dizin tickler --hiz 10
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import borsa  # noqa: E402
+from borsa_modules.bist_live_stream import (  # noqa: E402
+    BISTLiveStream, LiveTick, TickKaydedici, TickOynatici, segment_oku, segmentler,
+)
+from borsa_modules.zamanlayici import Zamanlayici  # noqa: E402
+
+
+def sentetik_kayit(dizin, tick_sayisi=200_000, sembol_sayisi=10, aralik_sn=0.05):
+    """Salınan fiyatlarla sentetik oturum kaydet; (kayıt süresi sn, segment sayısı) döndür."""
+    kaydedici = TickKaydedici(dizin, segment_bayt=4 * 1024 * 1024)
+    semboller = borsa.SEMBOL_LISTESI[:sembol_sayisi]
+    t0 = time.perf_counter()
+    for i in range(tick_sayisi):
+        s = semboller[i % len(semboller)]
+        # ±%4 salınım: SL/TP sınırları periyodik olarak geçilir
+        fiyat = 100.0 * (1 + 0.04 * math.sin(i / (len(semboller) * 500.0) + len(s)))
+        kaydedici(LiveTick(s, fiyat, 1_760_000_000.0 + i * aralik_sn, 1000.0, 0.0))
+    kaydedici.kapat()
+    return time.perf_counter() - t0, len(segmentler(dizin))
+
+
+def calistir(dizin=None, hiz=None, tick_sayisi=200_000):
+    eski_db = borsa.DB_PATH
+    tmp = tempfile.TemporaryDirectory()
+    sonuc = {}
+    try:
+        borsa.DB_PATH = os.path.join(tmp.name, "bench.db")
+        if dizin is None:
+            dizin = os.path.join(tmp.name, "tickler")
+            sure, n = sentetik_kayit(dizin, tick_sayisi)
+            sonuc["kayit"] = {"tick": tick_sayisi, "sure_sn": round(sure, 3), "segment": n,
+                              "tick_sn": round(tick_sayisi / sure, 1) if sure else None}
+        dosyalar = segmentler(dizin)
+        # Pozisyonlar her sembolün ilk fiyatından açılmış sayılır
+        ilk = {}
+        for yol in dosyalar:
+            for tick in segment_oku(yol):
+                ilk.setdefault(tick.sembol, tick.fiyat)
+            break
+        bot = borsa.BorsaAlSatBot(config=borsa.load_config(), headless=True)
+        bot.zamanlayici = Zamanlayici()  # yalnızca tetikle() için; çalıştırılmaz
+        for s, f in ilk.items():
+            bot.durum.pozisyon_ekle({"sembol": s, "miktar": 1.0, "giris_fiyat": f, "sl": None, "tp": None,
+                                     "acilis_zamani": "oynatma"})
+        akis = BISTLiveStream()
+        akis.abone_ol(bot._tick_al)
+        sonuc["oynatma"] = TickOynatici(dosyalar).oynat(akis, hiz=hiz)
+        sonuc["oynatma"]["sl_tp_tetik"] = bot.sl_tp_tetik
+        sonuc["oynatma"]["tuketici_hata"] = akis.hata
+    finally:
+        borsa.DB_PATH = eski_db
+        tmp.cleanup()
+    return sonuc
+
+
+def rapor_yaz(sonuc, out=sys.stdout):
+    if "kayit" in sonuc:
+        k = sonuc["kayit"]
+        out.write(f"Kayıt   : {k['tick']} tick, {k['segment']} segment, {k['sure_sn']} sn ({k['tick_sn']} tick/sn)\n")
+    o = sonuc["oynatma"]
+    out.write(f"Oynatma : {o['tick']} tick, {o['sure_sn']} sn ({o['tick_sn']} tick/sn), geride kalma p99 {o['gec_kalma_p99_ms']} ms\n")
+    out.write(f"Tick → karar: p50 {o['gecikme_p50_us']} µs | p99 {o['gecikme_p99_us']} µs | max {o['gecikme_max_us']} µs"
+              f" | SL/TP tetik {o['sl_tp_tetik']} | tüketici hata {o['tuketici_hata']}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Tick kaydı / yeniden oynatma benchmark")
+    ap.add_argument("--dizin", help="Kayıtlı segment dizini (yoksa sentetik oturum üretilir)")
+    ap.add_argument("--hiz", type=float, default=0, help="Oynatma hızı çarpanı (0 = azami hız)")
+    ap.add_argument("--tick", type=int, default=200_000, help="Sentetik oturumdaki tick sayısı")
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+    sonuc = calistir(args.dizin, args.hiz or None, args.tick)
+    rapor_yaz(sonuc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,43 @@ AI destekli Binance kripto alım-satım botu. Dashboard: durum, bakiye, grafik,
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox, scrolledtext
 import sqlite3
 import json
 import os
 import re
 import threading
 import time
-from datetime import datetime, timedelta
+import cProfile
+import io
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from borsa_modules.metrikler import Metrikler, MetrikSunucusu
+from borsa_modules.agirlik import SERIT_ANALIZ, SERIT_EMIR, SERIT_HESAP, SERIT_PIYASA, AgirlikKovasi, istek_agirligi
+from borsa_modules.ozkaynak import OzkaynakGecmisi
+from borsa_modules.ai_kapisi import AIKapisi
+from borsa_modules.bist_live_stream import BISTLiveStream, TickKaydedici
+from borsa_modules.defter import BakiyeDefteri, KullaniciAkisi
+from borsa_modules.emir_defteri import DerinlikDeposu, dolum_tahmini, emir_plani
+from borsa_modules.durum_deposu import DurumDeposu
+from borsa_modules.disa_aktar import BICIMLER, TABLOLAR, DisaAktarmaIsi, bicim_hazir_mi
+from borsa_modules.destek_direnc import SeviyeMotoru
+from borsa_modules.haberler import HaberHatti
+from borsa_modules.hacim_analizi import HacimProfili
+from borsa_modules.kagit_borsa import KagitBorsa
+from borsa_modules.korelasyon import KovaryansMotoru
+from borsa_modules.piyasa_servisi import VARSAYILAN_SOKET, PiyasaIstemcisi, PiyasaSunucusu, ServisYok
+from borsa_modules import ai_arsivi
+from borsa_modules import ai_toplulugu
+from borsa_modules import log_deposu
+from borsa_modules import on_siralama
+from borsa_modules import gostergeler
+from borsa_modules.yeniden_ornekleme import ACILIS, ARALIK_MS, DUSUK, HACIM, KAPANIS, YUKSEK, MumDeposu
+from borsa_modules.emir_motoru import EmirMotoru, FiltreIndeksi, niyet_anahtari
+from borsa_modules.pozisyon_boyutu import YONTEMLER, islemleri_oku, pozisyon_tutari
+from borsa_modules.zamanlayici import Zamanlayici, uyku, ONCELIK_EMIR, ONCELIK_DEGERLEME, ONCELIK_ANALIZ, ONCELIK_UI
 
 # Matplotlib
 try:
@@ -39,9 +68,27 @@ except ImportError:
 # ==================== Config & DB ====================
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "borsa_ayarlar.json")
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "borsa.db")
+EXCHANGE_INFO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exchange_info_cache.json")
 
-BINANCE_BASE = "https://api.binance.com"
+BINANCE_BASE = os.getenv("BINANCE_BASE", "https://api.binance.com")
+BINANCE_WS_BASE = os.getenv("BINANCE_WS_BASE", "wss://stream.binance.com:9443")
+OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
 ZAMAN_DILIMLERI = ["15m", "1h", "4h"]
+METRIKLER = Metrikler()
+# Botun gördüğü her fiyat güncellemesi buradan yayınlanır (karar mantığı + isteğe bağlı ham tick kaydı)
+CANLI_AKIS = BISTLiveStream()
+# Tüm Binance REST istekleri dakikalık ağırlık kovasından geçer (emir şeridi her zaman önde)
+AGIRLIK = AgirlikKovasi(metrikler=METRIKLER)
+# Aynı makinedeki botların ortak piyasa verisi servisi (python borsa.py --piyasa-servisi);
+# çalışmıyorsa fiyat/ticker/kline/TradingView istekleri doğrudan gider
+PIYASA = PiyasaIstemcisi(os.getenv("BORSA_PIYASA_SOKET", VARSAYILAN_SOKET))
+# Kağıt işlem modunda imzalı/anahtarlı istekler bu bellek içi borsaya gider (anahtar ve emir ağı yok)
+KAGIT_BORSA = None
+# Log görünümünde Treeview'da aynı anda tutulan en fazla sayfa (gerisi kaydırdıkça yüklenir / atılır)
+LOG_PENCERE_SAYFA = 5
+# Grafik aralık seçimi -> gün
+GRAFIK_ARALIKLARI = {"24 Saat": 1, "7 Gün": 7, "30 Gün": 30, "1 Yıl": 365}
+
 SEMBOL_LISTESI = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "SOLUSDT", "ADAUSDT", "DOGEUSDT", "AVAXUSDT", "LINKUSDT", "DOTUSDT"]
 
 
@@ -51,8 +98,16 @@ def load_config():
         "binance_api_secret": "",
         "openrouter_api_key": "",
         "ai_model": "anthropic/claude-3.5-sonnet",
+        "ai_kuorum": 0,
+        "ai_topluluk_modeller": list(ai_toplulugu.VARSAYILAN_MODELLER),
+        "ai_model_zaman_asimi_sn": 30,
+        "ai_arsivi": True,
         "risk_pct": 2,
         "max_pozisyon": 3,
+        "pozisyon_yontemi": "sabit_oran",
+        "atr_carpani": 2.0,
+        "kelly_kesri": 0.5,
+        "max_pozisyon_pct": 25,
         "tarama_araligi_sn": 120,
         "min_ai_guven": 7,
         "take_profit_pct": 3,
@@ -60,6 +115,49 @@ def load_config():
         "discord_webhook": "",
         "telegram_bot_token": "",
         "telegram_chat_id": "",
+        "degerleme_araligi_sn": 5,
+        "pozisyon_araligi_sn": 60,
+        "dashboard_araligi_sn": 5,
+        "kullanici_akisi": True,
+        "grafik_nokta": 600,
+        "ozkaynak_kayit_sn": 300,
+        "mutabakat_araligi_sn": 600,
+        "haberler": True,
+        "haber_kaynaklari": [],
+        "haber_araligi_sn": 300,
+        "tick_kayit": False,
+        "tick_kayit_dizini": "",
+        "tick_segment_mb": 64,
+        "ai_kapisi": True,
+        "ai_kapisi_max_yas_sn": 1800,
+        "ai_kapisi_atr_carpani": 1.0,
+        "ai_kapisi_bant_pct": 1.0,
+        "log_saklama_gun": 90,
+        "log_temizlik_araligi_sn": 3600,
+        "on_siralama": True,
+        "on_siralama_top_k": 2,
+        "on_siralama_min_olasilik": 0.0,
+        "on_siralama_ufuk_dk": 240,
+        "binance_agirlik_limiti": 6000,
+        "derinlik_kontrolu": True,
+        "derinlik_akisi": True,
+        "derinlik_limit": 100,
+        "max_kayma_bps": 30,
+        "max_emir_parca": 3,
+        "emir_parca_araligi_sn": 2,
+        "korelasyon_kontrolu": True,
+        "korelasyon_pencere_saat": 168,
+        "max_korelasyon": 0.85,
+        "max_portfoy_vol_pct": 3.0,
+        "metrik_port": 0,
+        "metrik_sqlite": False,
+        "metrik_rollup_sn": 60,
+        "piyasa_servisi": True,
+        "kagit_mod": False,
+        "kagit_baslangic_usdt": 10000.0,
+        "kagit_komisyon_bps": 10.0,
+        "kagit_kayma_bps": 2.0,
+        "kagit_gecikme_ms": 0,
     }
     if os.path.exists(CONFIG_PATH):
         try:
@@ -124,12 +222,63 @@ def init_db():
             detay TEXT
         )
     """)
+    log_deposu.sema_kur(conn)
+    on_siralama.sema_kur(conn)
+    ai_toplulugu.sema_kur(conn)
+    ai_arsivi.sema_kur(conn)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS islemler (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sembol TEXT NOT NULL,
+            giris_tarih TEXT,
+            giris_fiyat REAL,
+            cikis_tarih TEXT,
+            cikis_fiyat REAL,
+            miktar REAL,
+            stop_loss REAL,
+            take_profit REAL,
+            kar_zarar REAL,
+            notlar TEXT
+        )
+    """)
     conn.commit()
+    # Log temizliği boş sayfaları artımlı iade eder; mod geçişi (tam VACUUM) bot çalışmadan, burada
+    log_deposu.artimli_vacuum_kur(conn)
     conn.close()
 
 
 # ==================== Binance API ====================
-def binance_imzali_istek(api_key, api_secret, method, endpoint, params=None):
+def _piyasa(islem, *args):
+    """
+    Piyasa servisi çalışıyorsa isteği ona devret: (True, sonuç). Servis yoksa ya da
+    ulaşılamadıysa (False, None) — çağıran doğrudan çeker.
+    """
+    if not PIYASA.hazir():
+        return False, None
+    try:
+        return True, getattr(PIYASA, islem)(*args)
+    except ServisYok:
+        METRIKLER.say("piyasa_servisi", sonuc="ulasilamadi")
+        return False, None
+
+
+def binance_istek(method, endpoint, serit, params=None, headers=None, timeout=10):
+    """
+    Ağırlık kovasından geçen REST isteği; cevap başlıklarındaki kullanım/Retry-After kovaya
+    işlenir. Kova isteği düşürürse (pay dolu / IP yasağı) istek gönderilmez, None döner.
+    """
+    if not AGIRLIK.al(istek_agirligi(method, endpoint, params), serit):
+        return None
+    r = requests.request(method, f"{BINANCE_BASE}{endpoint}", params=params, headers=headers, timeout=timeout)
+    AGIRLIK.guncelle(r.status_code, r.headers)
+    return r
+
+
+def binance_imzali_istek(api_key, api_secret, method, endpoint, params=None, hata_dondur=False):
+    """İmzalı REST isteği. hata_dondur=True ise 200 dışı cevaplarda Binance'in {code, msg} gövdesi döner."""
+    if KAGIT_BORSA is not None:
+        kod, govde = KAGIT_BORSA.istek(method, endpoint, params)
+        return govde if kod == 200 or hata_dondur else None
     if not api_key or not api_secret:
         return None
     try:
@@ -141,20 +290,25 @@ def binance_imzali_istek(api_key, api_secret, method, endpoint, params=None):
         query = urllib.parse.urlencode(params)
         imza = hmac.new(api_secret.encode("utf-8"), query.encode("utf-8"), hashlib.sha256).hexdigest()
         params["signature"] = imza
-        url = f"{BINANCE_BASE}{endpoint}"
-        if method == "GET":
-            r = requests.get(url, params=params, headers={"X-MBX-APIKEY": api_key}, timeout=15)
-        else:
-            r = requests.post(url, params=params, headers={"X-MBX-APIKEY": api_key}, timeout=15)
+        serit = SERIT_EMIR if endpoint == "/api/v3/order" else SERIT_HESAP
+        r = binance_istek(method, endpoint, serit, params=params, headers={"X-MBX-APIKEY": api_key}, timeout=15)
+        if r is None:
+            return {"code": -1003, "msg": "İstemci ağırlık sınırı: istek gönderilmedi"} if hata_dondur else None
         if r.status_code == 200:
             return r.json()
+        if hata_dondur:
+            try:
+                return r.json()
+            except ValueError:
+                return {"code": r.status_code, "msg": r.text[:200]}
     except Exception:
         pass
     return None
 
 
+@METRIKLER.olc("bakiye", hata=lambda r: r[0] is None)
 def binance_bakiye(api_key, api_secret):
-    if not HAS_REQUESTS:
+    if not HAS_REQUESTS and KAGIT_BORSA is None:
         return None, []
     data = binance_imzali_istek(api_key, api_secret, "GET", "/api/v3/account")
     if not data or "balances" not in data:
@@ -167,27 +321,92 @@ def binance_bakiye(api_key, api_secret):
     return usdt, data.get("balances", [])
 
 
+@METRIKLER.olc("fiyat", hata=lambda r: r is None)
 def binance_fiyat(sembol):
+    devredildi, fiyatlar = _piyasa("fiyatlar", [sembol])
+    if devredildi:
+        fiyat = (fiyatlar or {}).get(sembol)
+        if fiyat:
+            CANLI_AKIS.fiyat(sembol, fiyat)
+        return fiyat
     if not HAS_REQUESTS:
         return None
     try:
-        r = requests.get(f"{BINANCE_BASE}/api/v3/ticker/price", params={"symbol": sembol}, timeout=5)
-        if r.status_code == 200:
-            return float(r.json().get("price", 0))
+        r = binance_istek("GET", "/api/v3/ticker/price", SERIT_PIYASA, params={"symbol": sembol}, timeout=5)
+        if r is not None and r.status_code == 200:
+            fiyat = float(r.json().get("price", 0))
+            CANLI_AKIS.fiyat(sembol, fiyat)
+            return fiyat
+    except Exception:
+        pass
+    return None
+
+
+@METRIKLER.olc("fiyat", hata=lambda r: r is None)
+def binance_fiyatlar(semboller):
+    """Birden çok sembolün fiyatı tek istekte: {"BTCUSDT": 65000.0, ...}; hata → None."""
+    if not semboller:
+        return {}
+    devredildi, fiyatlar = _piyasa("fiyatlar", semboller)
+    if devredildi:
+        for sembol, fiyat in (fiyatlar or {}).items():
+            CANLI_AKIS.fiyat(sembol, fiyat)
+        return fiyatlar
+    if not HAS_REQUESTS:
+        return None
+    try:
+        liste = json.dumps(sorted(set(semboller)), separators=(",", ":"))
+        r = binance_istek("GET", "/api/v3/ticker/price", SERIT_PIYASA, params={"symbols": liste}, timeout=5)
+        if r is not None and r.status_code == 200:
+            fiyatlar = {d["symbol"]: float(d.get("price", 0)) for d in r.json()}
+            for sembol, fiyat in fiyatlar.items():
+                CANLI_AKIS.fiyat(sembol, fiyat)
+            return fiyatlar
     except Exception:
         pass
     return None
 
 
+def binance_anahtarli_istek(api_key, method, endpoint, params=None):
+    """Yalnızca X-MBX-APIKEY isteyen (imzasız) uçlar — ör. userDataStream."""
+    if KAGIT_BORSA is not None:
+        kod, govde = KAGIT_BORSA.istek(method, endpoint, params)
+        return govde if kod == 200 else None
+    if not HAS_REQUESTS or not api_key:
+        return None
+    try:
+        r = binance_istek(method, endpoint, SERIT_HESAP, params=params, headers={"X-MBX-APIKEY": api_key}, timeout=10)
+        if r is not None and r.status_code == 200:
+            return r.json()
+    except Exception:
+        pass
+    return None
+
+
+def binance_listen_key(api_key):
+    data = binance_anahtarli_istek(api_key, "POST", "/api/v3/userDataStream")
+    return (data or {}).get("listenKey")
+
+
+def binance_listen_key_yenile(api_key, listen_key):
+    return binance_anahtarli_istek(api_key, "PUT", "/api/v3/userDataStream", {"listenKey": listen_key}) is not None
+
+
 def binance_24h_ticker(sembol):
+    devredildi, t = _piyasa("ticker", sembol)
+    if devredildi:
+        if t:
+            CANLI_AKIS.fiyat(sembol, t["lastPrice"], t["volume"], t["priceChangePercent"], kaynak="24hr")
+        return t
     if not HAS_REQUESTS:
         return None
     try:
-        r = requests.get(f"{BINANCE_BASE}/api/v3/ticker/24hr", params={"symbol": sembol}, timeout=5)
-        if r.status_code == 200:
+        r = binance_istek("GET", "/api/v3/ticker/24hr", SERIT_ANALIZ, params={"symbol": sembol}, timeout=5)
+        if r is not None and r.status_code == 200:
             d = r.json()
             high = float(d.get("highPrice", 0) or 0)
             low = float(d.get("lowPrice", 0) or 0)
+            CANLI_AKIS.fiyat(sembol, float(d.get("lastPrice", 0) or 0), d.get("volume"), d.get("priceChangePercent"), kaynak="24hr")
             return {
                 "priceChangePercent": float(d.get("priceChangePercent", 0) or 0),
                 "volume": float(d.get("volume", 0) or 0),
@@ -201,8 +420,55 @@ def binance_24h_ticker(sembol):
     return None
 
 
+@METRIKLER.olc("klines", hata=lambda r: r is None)
+def binance_klines(sembol, aralik, limit=500, baslangic_ms=None):
+    """Mum geçmişi (/api/v3/klines). baslangic_ms verilirse o andan itibaren."""
+    devredildi, mumlar = _piyasa("klines", sembol, aralik, limit, baslangic_ms)
+    if devredildi:
+        return mumlar
+    if not HAS_REQUESTS:
+        return None
+    params = {"symbol": sembol, "interval": aralik, "limit": limit}
+    if baslangic_ms is not None:
+        params["startTime"] = int(baslangic_ms)
+    try:
+        r = binance_istek("GET", "/api/v3/klines", SERIT_ANALIZ, params=params, timeout=10)
+        if r is not None and r.status_code == 200:
+            return r.json()
+    except Exception:
+        pass
+    return None
+
+
+def binance_derinlik(sembol, limit=100):
+    """Emir defteri görüntüsü (/api/v3/depth): {lastUpdateId, bids, asks}; hata → None."""
+    if not HAS_REQUESTS:
+        return None
+    try:
+        r = binance_istek("GET", "/api/v3/depth", SERIT_PIYASA, params={"symbol": sembol, "limit": limit}, timeout=5)
+        if r is not None and r.status_code == 200:
+            return r.json()
+    except Exception:
+        pass
+    return None
+
+
+# Tek taban aralık (15m) çekilir; 1h/4h/1d yerelde türetilir
+MUM_DEPOSU = MumDeposu(binance_klines)
+# Sembol × zaman dilimi önbellekli destek/direnç motoru (yalnızca yeni mum kapanınca yeniden hesaplar)
+DESTEK_DIRENC = SeviyeMotoru(MUM_DEPOSU)
+# Günün saatine göre hacim tabanı (taban 15m mumlarla artımlı) — hacim z-skoru ve anomali
+HACIM_PROFILI = HacimProfili(SEMBOL_LISTESI, bar_ms=ARALIK_MS[MUM_DEPOSU.taban])
+
+
+def fiyat_yuvarla(fiyat, olcek=None):
+    """Fiyat büyüklüğüne (ya da `olcek` fiyatına) göre yuvarla — ucuz coinlerde 2 hane yetmez."""
+    olcek = abs(fiyat if olcek is None else olcek)
+    return round(fiyat, 2 if olcek >= 10 else 4 if olcek >= 0.1 else 8)
+
+
 def fibonacci_seviyeleri(high, low):
-    """24h high/low ile Fibonacci düzeltme seviyeleri."""
+    """Salınım (ya da 24h) high/low ile Fibonacci düzeltme seviyeleri."""
     if not high or not low or high <= low:
         return {}
     diff = high - low
@@ -217,16 +483,186 @@ def fibonacci_seviyeleri(high, low):
     }
 
 
-def binance_spot_emir(api_key, api_secret, sembol, side, quantity, order_type="MARKET"):
-    if not api_key or not api_secret:
-        return False, "API yok"
-    params = {"symbol": sembol, "side": side, "type": order_type, "quantity": quantity}
-    data = binance_imzali_istek(api_key, api_secret, "POST", "/api/v3/order", params)
-    if data and "orderId" in data:
-        return True, data
-    return False, data or "Emir hatası"
+def binance_exchange_info():
+    """Sembol filtreleri (LOT_SIZE, PRICE_FILTER, NOTIONAL ...). Emir motoru diskte önbellekler."""
+    if not HAS_REQUESTS:
+        return None
+    try:
+        r = binance_istek("GET", "/api/v3/exchangeInfo", SERIT_HESAP, timeout=15)
+        if r is not None and r.status_code == 200:
+            return r.json()
+    except Exception:
+        pass
+    return None
+
+
+FILTRE_INDEKSI = FiltreIndeksi(lambda: binance_exchange_info(), cache_yolu=EXCHANGE_INFO_CACHE)
+EMIR_MOTORU = EmirMotoru(
+    lambda k, s, m, e, p: binance_imzali_istek(k, s, m, e, p, hata_dondur=True),
+    FILTRE_INDEKSI,
+)
+
+
+@METRIKLER.olc("emir", hata=lambda r: not r[0])
+def binance_spot_emir(api_key, api_secret, sembol, side, quantity, order_type="MARKET", fiyat=None, niyet=None):
+    """
+    Miktar LOT_SIZE/NOTIONAL filtrelerine göre yerelde normalize edilir.
+    (True, dolum_ozeti) ya da (False, {code, msg}) döndürür. fiyat: notional kontrolü / LIMIT fiyatı.
+    niyet: aynı karar tekrar gönderilirse aynı newClientOrderId kullanılır.
+    """
+    if KAGIT_BORSA is None and (not api_key or not api_secret):
+        return False, {"code": None, "msg": "API yok"}
+    return EMIR_MOTORU.emir(api_key, api_secret, sembol, side, quantity, fiyat=fiyat, order_type=order_type, niyet=niyet)
 
 
+def kagit_borsa_kur(config, derinlik_fonk=None):
+    """
+    Kağıt işlem modunu aç: emir/hesap istekleri bellek içi KagitBorsa'ya yönlenir, dolumlar
+    botun gördüğü fiyat akışına (canlı ya da oynatılan tick) karşı yapılır. Bot her başladığında
+    çağrılır: borsa zaten kuruluysa simüle bakiyeler korunur, komisyon/kayma/gecikme ayarları
+    yenilenir (başlangıç bakiyesi yalnızca ilk kurulumda kullanılır).
+    """
+    global KAGIT_BORSA
+    if KAGIT_BORSA is None:
+        KAGIT_BORSA = KagitBorsa(
+            binance_fiyat, FILTRE_INDEKSI, {"USDT": float(config.get("kagit_baslangic_usdt", 10000.0))},
+        )
+        CANLI_AKIS.abone_ol(KAGIT_BORSA.tick_al)
+    KAGIT_BORSA.komisyon_bps = float(config.get("kagit_komisyon_bps", 10.0))
+    KAGIT_BORSA.kayma_bps = float(config.get("kagit_kayma_bps", 2.0))
+    KAGIT_BORSA.gecikme_ms = float(config.get("kagit_gecikme_ms", 0))
+    KAGIT_BORSA.derinlik_fonk = derinlik_fonk
+    return KAGIT_BORSA
+
+
+def kagit_borsa_kapat():
+    """Kağıt işlem modunu kapat: istekler yeniden gerçek API'ye gider, simüle bakiyeler atılır."""
+    global KAGIT_BORSA
+    if KAGIT_BORSA is not None:
+        CANLI_AKIS.abonelikten_cik(KAGIT_BORSA.tick_al)
+        KAGIT_BORSA = None
+
+
+def _tradingview_gostergeleri(sembol, fiyat, sonuc):
+    """Yedek yol: her dilim için ayrı TradingView isteği (yerel mum verisi yoksa)."""
+    devredildi, d = _piyasa("tv_gostergeleri", sembol, fiyat)
+    if devredildi:
+        sonuc.update(d or {})
+        sonuc["mum_kaynagi"] = "tradingview"
+        return
+    for iv in ["15m", "1h", "4h", "1d"]:
+        try:
+            tv = TA_Handler(symbol=sembol, screener="crypto", exchange="BINANCE", interval=iv)
+            a = tv.get_analysis()
+            if not a:
+                continue
+            if a.summary:
+                rec = a.summary.get("RECOMMENDATION", "NEUTRAL")
+                sinyal = "AL" if rec in ["STRONG_BUY", "BUY"] else "SAT" if rec in ["STRONG_SELL", "SELL"] else "BEKLE"
+                sonuc[f"sinyal_{iv}"] = sinyal
+            if getattr(a, "indicators", None) and a.indicators:
+                ind = a.indicators
+                if "RSI" in ind and ind["RSI"]:
+                    val = round(float(ind["RSI"]), 1)
+                    sonuc[f"rsi_{iv}"] = val
+                    if iv == "1h":
+                        sonuc["rsi"] = val
+                        if val > 70:
+                            sonuc["overbought"] = True
+                        elif val < 30:
+                            sonuc["oversold"] = True
+                if "MACD.macd" in ind and ind["MACD.macd"]:
+                    sonuc[f"macd_{iv}"] = round(float(ind["MACD.macd"]), 4)
+                    if iv == "1h":
+                        sonuc["macd"] = sonuc[f"macd_{iv}"]
+                if "MACD.signal" in ind and ind["MACD.signal"]:
+                    sig = float(ind["MACD.signal"])
+                    if sonuc.get(f"macd_{iv}") is not None:
+                        sonuc[f"macd_hist_{iv}"] = round(sonuc[f"macd_{iv}"] - sig, 4)
+                        if iv == "1h":
+                            sonuc["macd_hist"] = sonuc[f"macd_hist_{iv}"]
+                if "Stoch.K" in ind and ind["Stoch.K"]:
+                    sonuc[f"stoch_{iv}"] = round(float(ind["Stoch.K"]), 1)
+                if iv == "1h":
+                    if "BB.upper" in ind and "BB.lower" in ind and ind["BB.upper"] and ind["BB.lower"]:
+                        bb_u, bb_l = float(ind["BB.upper"]), float(ind["BB.lower"])
+                        if bb_u > bb_l:
+                            sonuc["bb_position"] = round((fiyat - bb_l) / (bb_u - bb_l), 2)
+                    if "ATR" in ind and ind["ATR"]:
+                        sonuc["atr"] = round(float(ind["ATR"]), 2)
+                    if "ADX" in ind and ind["ADX"]:
+                        sonuc["adx"] = round(float(ind["ADX"]), 1)
+                    for tv_key, out_key in [("EMA9", "ema_9"), ("EMA21", "ema_21"), ("EMA50", "ema_50"), ("EMA200", "ema_200"), ("SMA50", "sma_50"), ("SMA200", "sma_200")]:
+                        if tv_key in ind and ind[tv_key]:
+                            try:
+                                sonuc[out_key] = round(float(ind[tv_key]), 2)
+                            except (TypeError, ValueError):
+                                pass
+                    if sonuc.get("ema_50") and sonuc.get("ema_200"):
+                        sonuc["golden_cross"] = sonuc["ema_50"] > sonuc["ema_200"]
+                        sonuc["death_cross"] = sonuc["ema_50"] < sonuc["ema_200"]
+        except Exception:
+            continue
+    sonuc["mum_kaynagi"] = "tradingview"
+
+
+def _hacim_profili(sembol, sonuc):
+    """Yeni kapanmış taban mumları hacim profiline işle; son (ve oluşmakta olan) mumun z-skorunu yaz."""
+    m = MUM_DEPOSU.mumlar(sembol, MUM_DEPOSU.taban, kismi=True)
+    if m is None or not len(m):
+        return
+    kismi = m[-1] if MUM_DEPOSU.kismi_mu(sembol, MUM_DEPOSU.taban) else None
+    kapali = m[:-1] if kismi is not None else m
+    HACIM_PROFILI.seriden_guncelle(sembol, kapali[:, ACILIS], kapali[:, HACIM])
+    d = HACIM_PROFILI.degerlendir(sembol, kismi=(int(kismi[ACILIS]), float(kismi[HACIM])) if kismi is not None else None)
+    if d:
+        sonuc.update(d)
+
+
+def _yerel_gostergeler(sembol, fiyat, sonuc):
+    """Yerelde yeniden örneklenmiş mumlardan tüm dilimlerin göstergeleri. Veri yoksa False."""
+    dilim_sayisi = 0
+    for iv in ["15m", "1h", "4h", "1d"]:
+        m = MUM_DEPOSU.mumlar(sembol, iv, kismi=True, fiyat=fiyat)
+        if m is None or len(m) < 2:
+            continue
+        g = gostergeler.hesapla(m[:, YUKSEK], m[:, DUSUK], m[:, KAPANIS], m[:, HACIM])
+        dilim_sayisi += 1
+        sonuc[f"sinyal_{iv}"] = gostergeler.sinyal(g)
+        if g["rsi"] is not None:
+            sonuc[f"rsi_{iv}"] = round(g["rsi"], 1)
+        if g["macd"] is not None:
+            sonuc[f"macd_{iv}"] = fiyat_yuvarla(g["macd"], fiyat / 100)
+            sonuc[f"macd_hist_{iv}"] = fiyat_yuvarla(g["macd_hist"], fiyat / 100)
+        if g["stoch"] is not None:
+            sonuc[f"stoch_{iv}"] = round(g["stoch"], 1)
+        if iv == "15m" and len(m) > 16:
+            sonuc["fiyat_1h_degisim"] = round((fiyat / float(m[-5, KAPANIS]) - 1) * 100, 2)
+            sonuc["fiyat_4h_degisim"] = round((fiyat / float(m[-17, KAPANIS]) - 1) * 100, 2)
+        if iv != "1h":
+            continue
+        sonuc["rsi"], sonuc["macd"], sonuc["macd_hist"] = sonuc.get("rsi_1h"), sonuc.get("macd_1h"), sonuc.get("macd_hist_1h")
+        if sonuc["rsi"] is not None:
+            sonuc["overbought"], sonuc["oversold"] = sonuc["rsi"] > 70, sonuc["rsi"] < 30
+        if g["bb_ust"] is not None and g["bb_ust"] > g["bb_alt"]:
+            sonuc["bb_position"] = round((fiyat - g["bb_alt"]) / (g["bb_ust"] - g["bb_alt"]), 2)
+        if g["atr"] is not None:
+            sonuc["atr"] = fiyat_yuvarla(g["atr"], fiyat)
+        if g["adx"] is not None:
+            sonuc["adx"] = round(g["adx"], 1)
+        for k in ("ema_9", "ema_21", "ema_50", "ema_200", "sma_50", "sma_200"):
+            if g[k] is not None:
+                sonuc[k] = fiyat_yuvarla(g[k], fiyat)
+        if sonuc.get("ema_50") and sonuc.get("ema_200"):
+            sonuc["golden_cross"] = sonuc["ema_50"] > sonuc["ema_200"]
+            sonuc["death_cross"] = sonuc["ema_50"] < sonuc["ema_200"]
+        sonuc["obv_trend"] = g["obv_trend"]
+    if dilim_sayisi:
+        sonuc["mum_kaynagi"] = "yerel"
+    return dilim_sayisi > 0
+
+
+@METRIKLER.olc("analiz", hata=lambda r: r.get("fiyat") is None)
 def binance_gelismis_analiz(sembol):
     """
     Profesyonel seviye teknik analiz:
@@ -255,10 +691,10 @@ def binance_gelismis_analiz(sembol):
         "sinyal_15m": "—", "sinyal_1h": "—", "sinyal_4h": "—", "sinyal_1d": "—",
         "trend_genel": "nötr", "momentum": "nötr",
         "fiyat_1h_degisim": 0, "fiyat_4h_degisim": 0,
-        "hacim_anomali": False, "overbought": False, "oversold": False,
+        "hacim_anomali": False, "hacim_z": None, "hacim_z_kismi": None, "overbought": False, "oversold": False,
         "rsi": None, "macd": None, "macd_hist": None, "hacim": "normal", "trend": "—",
         "fib_0": None, "fib_236": None, "fib_382": None, "fib_50": None, "fib_618": None, "fib_786": None, "fib_100": None,
-        "pivot": None,
+        "fib_kaynak": None, "pivot": None, "mum_kaynagi": None,
     }
     fiyat = binance_fiyat(sembol)
     if fiyat:
@@ -273,63 +709,33 @@ def binance_gelismis_analiz(sembol):
         if high and low:
             fib = fibonacci_seviyeleri(high, low)
             sonuc.update(fib)
+            if fib:
+                sonuc["fib_kaynak"] = "24h"
             sonuc["pivot"] = round((high + low + fiyat) / 3, 2) if fiyat else round((high + low) / 2, 2)
-    if not HAS_TA or not fiyat:
+    if fiyat:
+        MUM_DEPOSU.guncelle(sembol)
+        _hacim_profili(sembol, sonuc)
+        sr = DESTEK_DIRENC.seviyeler(sembol, fiyat)
+        for k in ("support_1", "support_2", "resistance_1", "resistance_2"):
+            if sr.get(k):
+                sonuc[k] = fiyat_yuvarla(sr[k])
+                sonuc[f"{k}_guc"] = sr.get(f"{k}_guc")
+        if sonuc["resistance_1"]:
+            sonuc["distance_to_resistance"] = round((sonuc["resistance_1"] - fiyat) / fiyat * 100, 2)
+        if sonuc["support_1"]:
+            sonuc["distance_to_support"] = round((fiyat - sonuc["support_1"]) / fiyat * 100, 2)
+        if sr.get("salinim_yuksek") and sr.get("salinim_dusuk"):
+            fib = fibonacci_seviyeleri(sr["salinim_yuksek"], sr["salinim_dusuk"])
+            sonuc.update(fib)
+            if fib:
+                sonuc["fib_kaynak"] = "salınım"
+    if not fiyat:
         return sonuc
     try:
-        for iv in ["15m", "1h", "4h", "1d"]:
-            try:
-                tv = TA_Handler(symbol=sembol, screener="crypto", exchange="BINANCE", interval=iv)
-                a = tv.get_analysis()
-                if not a:
-                    continue
-                if a.summary:
-                    rec = a.summary.get("RECOMMENDATION", "NEUTRAL")
-                    sinyal = "AL" if rec in ["STRONG_BUY", "BUY"] else "SAT" if rec in ["STRONG_SELL", "SELL"] else "BEKLE"
-                    sonuc[f"sinyal_{iv}"] = sinyal
-                if getattr(a, "indicators", None) and a.indicators:
-                    ind = a.indicators
-                    if "RSI" in ind and ind["RSI"]:
-                        val = round(float(ind["RSI"]), 1)
-                        sonuc[f"rsi_{iv}"] = val
-                        if iv == "1h":
-                            sonuc["rsi"] = val
-                            if val > 70:
-                                sonuc["overbought"] = True
-                            elif val < 30:
-                                sonuc["oversold"] = True
-                    if "MACD.macd" in ind and ind["MACD.macd"]:
-                        sonuc[f"macd_{iv}"] = round(float(ind["MACD.macd"]), 4)
-                        if iv == "1h":
-                            sonuc["macd"] = sonuc[f"macd_{iv}"]
-                    if "MACD.signal" in ind and ind["MACD.signal"]:
-                        sig = float(ind["MACD.signal"])
-                        if sonuc.get(f"macd_{iv}") is not None:
-                            sonuc[f"macd_hist_{iv}"] = round(sonuc[f"macd_{iv}"] - sig, 4)
-                            if iv == "1h":
-                                sonuc["macd_hist"] = sonuc[f"macd_hist_{iv}"]
-                    if "Stoch.K" in ind and ind["Stoch.K"]:
-                        sonuc[f"stoch_{iv}"] = round(float(ind["Stoch.K"]), 1)
-                    if iv == "1h":
-                        if "BB.upper" in ind and "BB.lower" in ind and ind["BB.upper"] and ind["BB.lower"]:
-                            bb_u, bb_l = float(ind["BB.upper"]), float(ind["BB.lower"])
-                            if bb_u > bb_l:
-                                sonuc["bb_position"] = round((fiyat - bb_l) / (bb_u - bb_l), 2)
-                        if "ATR" in ind and ind["ATR"]:
-                            sonuc["atr"] = round(float(ind["ATR"]), 2)
-                        if "ADX" in ind and ind["ADX"]:
-                            sonuc["adx"] = round(float(ind["ADX"]), 1)
-                        for tv_key, out_key in [("EMA9", "ema_9"), ("EMA21", "ema_21"), ("EMA50", "ema_50"), ("EMA200", "ema_200"), ("SMA50", "sma_50"), ("SMA200", "sma_200")]:
-                            if tv_key in ind and ind[tv_key]:
-                                try:
-                                    sonuc[out_key] = round(float(ind[tv_key]), 2)
-                                except (TypeError, ValueError):
-                                    pass
-                        if sonuc.get("ema_50") and sonuc.get("ema_200"):
-                            sonuc["golden_cross"] = sonuc["ema_50"] > sonuc["ema_200"]
-                            sonuc["death_cross"] = sonuc["ema_50"] < sonuc["ema_200"]
-            except Exception:
-                continue
+        if not _yerel_gostergeler(sembol, fiyat, sonuc):
+            if not HAS_TA and not PIYASA.hazir():
+                return sonuc
+            _tradingview_gostergeleri(sembol, fiyat, sonuc)
         al_say = sum(1 for k in ["sinyal_15m", "sinyal_1h", "sinyal_4h", "sinyal_1d"] if sonuc.get(k) == "AL")
         sat_say = sum(1 for k in ["sinyal_15m", "sinyal_1h", "sinyal_4h", "sinyal_1d"] if sonuc.get(k) == "SAT")
         if al_say >= 3:
@@ -347,15 +753,6 @@ def binance_gelismis_analiz(sembol):
                 sonuc["momentum"] = "güçlü_düşüş"
             elif rsi_1h < 50 and macd_hist_1h < 0:
                 sonuc["momentum"] = "düşüş"
-        if fiyat:
-            sonuc["support_1"] = round(fiyat * 0.98, 2)
-            sonuc["support_2"] = round(fiyat * 0.95, 2)
-            sonuc["resistance_1"] = round(fiyat * 1.02, 2)
-            sonuc["resistance_2"] = round(fiyat * 1.05, 2)
-            sonuc["distance_to_resistance"] = round((sonuc["resistance_1"] - fiyat) / fiyat * 100, 2)
-            sonuc["distance_to_support"] = round((fiyat - sonuc["support_1"]) / fiyat * 100, 2)
-        if sonuc.get("hacim_24h"):
-            sonuc["hacim_ortalama"] = sonuc["hacim_24h"]
         if sonuc.get("atr") and fiyat:
             atr_pct = sonuc["atr"] / fiyat * 100
             if atr_pct > 3:
@@ -369,52 +766,59 @@ def binance_gelismis_analiz(sembol):
     return sonuc
 
 
+def tarama_skoru(analiz):
+    """Gelişmiş scoring (100 üzerinden) — tek sembolün analizinden alım skoru."""
+    skor = 0
+    al_say = sum(1 for k in ["sinyal_15m", "sinyal_1h", "sinyal_4h", "sinyal_1d"] if analiz.get(k) == "AL")
+    skor += al_say * 10
+    rsi_1h = analiz.get("rsi_1h")
+    if rsi_1h is not None:
+        if 40 < rsi_1h < 60:
+            skor += 20
+        elif 30 < rsi_1h < 70:
+            skor += 10
+        elif rsi_1h < 30:
+            skor += 15
+    if analiz.get("macd_hist_1h") and analiz["macd_hist_1h"] > 0:
+        skor += 10
+    if analiz.get("golden_cross"):
+        skor += 10
+    if analiz.get("adx") and analiz["adx"] > 25:
+        skor += 10
+    if analiz.get("momentum") in ["yükseliş", "güçlü_yükseliş"]:
+        skor += 10
+    if analiz.get("volatilite") == "yüksek":
+        skor -= 5
+    elif analiz.get("volatilite") == "düşük":
+        skor += 5
+    return skor
+
+
+@METRIKLER.olc("tarama")
 def binance_gelismis_tarama(semboller):
     """Gelişmiş scoring (100 üzerinden) ile en iyi alım adaylarını bul."""
     sonuclar = []
     for sembol in semboller:
         analiz = binance_gelismis_analiz(sembol)
-        skor = 0
-        al_say = sum(1 for k in ["sinyal_15m", "sinyal_1h", "sinyal_4h", "sinyal_1d"] if analiz.get(k) == "AL")
-        skor += al_say * 10
-        rsi_1h = analiz.get("rsi_1h")
-        if rsi_1h is not None:
-            if 40 < rsi_1h < 60:
-                skor += 20
-            elif 30 < rsi_1h < 70:
-                skor += 10
-            elif rsi_1h < 30:
-                skor += 15
-        if analiz.get("macd_hist_1h") and analiz["macd_hist_1h"] > 0:
-            skor += 10
-        if analiz.get("golden_cross"):
-            skor += 10
-        if analiz.get("adx") and analiz["adx"] > 25:
-            skor += 10
-        if analiz.get("momentum") in ["yükseliş", "güçlü_yükseliş"]:
-            skor += 10
-        if analiz.get("volatilite") == "yüksek":
-            skor -= 5
-        elif analiz.get("volatilite") == "düşük":
-            skor += 5
-        sonuclar.append((sembol, skor, analiz))
+        sonuclar.append((sembol, tarama_skoru(analiz), analiz))
     sonuclar.sort(key=lambda x: -x[1])
     return sonuclar
 
 
 # ==================== OpenRouter AI ====================
-def openrouter_ask(api_key, model, prompt):
+@METRIKLER.olc("ai", hata=lambda r: not r)
+def openrouter_ask(api_key, model, prompt, timeout=60):
     if not HAS_REQUESTS or not api_key:
         return ""
     try:
-        url = "https://openrouter.ai/api/v1/chat/completions"
+        url = OPENROUTER_URL
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
         body = {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": 800,
         }
-        r = requests.post(url, json=body, headers=headers, timeout=60)
+        r = requests.post(url, json=body, headers=headers, timeout=timeout)
         if r.status_code == 200:
             data = r.json()
             if data.get("choices"):
@@ -510,25 +914,68 @@ def parse_ai_satim_cevap(text):
 
 # ==================== Ana Uygulama ====================
 class BorsaAlSatBot:
-    def __init__(self):
+    def __init__(self, config=None, headless=False):
+        """headless=True: Tk penceresi kurulmaz (benchmark / arka plan çalıştırma)."""
         init_db()
-        self.config = load_config()
-        self.root = tk.Tk()
-        self.root.title("Borsa AlSat Bot — AI Otomatik Kripto")
-        self.root.geometry("1200x750")
-        self.root.minsize(900, 600)
-        self.root.configure(bg="#0d1117")
+        self.config = config if config is not None else load_config()
+        PIYASA.etkin = bool(self.config.get("piyasa_servisi", True))
+        self.headless = headless
+        self.root = None
+        if not headless:
+            self.root = tk.Tk()
+            self.root.title("Borsa AlSat Bot — AI Otomatik Kripto")
+            self.root.geometry("1200x750")
+            self.root.minsize(900, 600)
+            self.root.configure(bg="#0d1117")
 
         self.bot_aktif = False
         self.bot_thread = None
-        self.acik_pozisyonlar = []
-        self.bakiye_gecmisi = []
-        self.chart_events = []
-        self.son_islem_zamani = None
+        # Analiz ve AI çağrıları burada çalışır; zamanlayıcı beklerken değerleme (SL/TP) sürer
+        self._isci = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analiz")
+        # Pozisyonlar, fiyat önbelleği, bakiye/toplam: sürümlü değişmez görüntüler (okuma kilitsiz)
+        self.durum = DurumDeposu()
+        # Sabit bellekli, çok çözünürlüklü portföy değeri geçmişi (+ alım/satım olayları), diskte kalıcı
+        self.ozkaynak = OzkaynakGecmisi()
+        self.ozkaynak.yukle(self._ozkaynak_yolu())
         self.baslangic_bakiye = None
         self.gunluk_kar = 0.0
+        self.metrik_sunucusu = None
+        self.zamanlayici = None
+        self._son_grafik_imza = None
+        self.defter = BakiyeDefteri()
+        self.kullanici_akisi = None
+        self._islem_getirileri = None  # Kelly için kapanmış işlem getirileri (önbellek)
+        self.tick_kaydedici = None
+        self.disa_isi = None
+        # Alım öncesi kayma kontrolü için yerel emir defterleri (akış yoksa REST görüntüsü)
+        self.derinlik = DerinlikDeposu(
+            lambda s: binance_derinlik(s, int(self.config.get("derinlik_limit", 100))), BINANCE_WS_BASE,
+            log=lambda m: self._bot_log(m, "info"),
+        )
+        # Evren genelinde 1h getiri kovaryansı (tarama mumlarıyla artımlı güncellenir) — portföy riski
+        self.korelasyon = KovaryansMotoru(SEMBOL_LISTESI, pencere=int(self.config.get("korelasyon_pencere_saat", 168)))
+        # Tarama adaylarının yerel ön sıralayıcısı (modeller/ altında sürümlü; yoksa el yazımı skor)
+        self.on_siralayici = on_siralama.OnSiralayici(os.path.join(os.path.dirname(DB_PATH), "modeller"))
+        # RSS haber/duyarlılık önbelleği — arka planda dolar, prompt yalnızca okur
+        self.haberler = HaberHatti(SEMBOL_LISTESI, self.config.get("haber_kaynaklari") or None, log=lambda m: self._bot_log(m, "info"))
+        self._sl_tp_isaretli = set()  # akıştan SL/TP için tetiklenmiş semboller (tekrar tetikleme yok)
+        self.sl_tp_tetik = 0
+        self.ai_kapisi = AIKapisi(
+            atr_carpani=self.config.get("ai_kapisi_atr_carpani", 1.0),
+            fiyat_bandi_pct=self.config.get("ai_kapisi_bant_pct", 1.0),
+            max_yas_sn=self.config.get("ai_kapisi_max_yas_sn", 1800),
+        )
+        self._son_metrik_rollup = time.time()
+
+        if self.config.get("metrik_port"):
+            try:
+                self.metrik_sunucusu = MetrikSunucusu(METRIKLER, port=int(self.config["metrik_port"]))
+                self.metrik_sunucusu.baslat()
+            except OSError:
+                self.metrik_sunucusu = None
 
-        self._build_ui()
+        if not headless:
+            self._build_ui()
         self._log_db("Uygulama başlatıldı.", "sistem")
         self._bot_log("Bot hazır. Ayarları yapıp 'Bot Başlat' ile çalıştırın.", "info")
 
@@ -551,15 +998,26 @@ class BorsaAlSatBot:
         main.columnconfigure(0, weight=1)
         main.rowconfigure(1, weight=1)
 
+        # Sekmeler ilk gösterildiklerinde kurulur (açılışta yalnızca Dashboard)
         nb = ttk.Notebook(main)
         nb.pack(fill=tk.BOTH, expand=True)
-        self._tab_dashboard(nb)
-        self._tab_ayarlar(nb)
-        self._tab_log(nb)
-
-    def _tab_dashboard(self, nb):
-        f = ttk.Frame(nb, padding=10)
-        nb.add(f, text="Dashboard")
+        self._kurulmamis_sekmeler = {}
+        for baslik, kurucu in (("Dashboard", self._tab_dashboard), ("Ayarlar", self._tab_ayarlar), ("Log", self._tab_log)):
+            f = ttk.Frame(nb)
+            nb.add(f, text=baslik)
+            self._kurulmamis_sekmeler[str(f)] = kurucu
+        nb.bind("<<NotebookTabChanged>>", lambda e: self._sekme_kur(nb, nb.select()))
+        self._sekme_kur(nb, nb.tabs()[0])
+
+    def _sekme_kur(self, nb, sekme):
+        kurucu = self._kurulmamis_sekmeler.pop(str(sekme), None)
+        if kurucu is not None:
+            t0 = time.perf_counter()
+            kurucu(nb.nametowidget(sekme))
+            METRIKLER.gozlem("ui_sekme", time.perf_counter() - t0)
+
+    def _tab_dashboard(self, f):
+        f.configure(padding=10)
         f.columnconfigure(0, weight=1)
         f.rowconfigure(2, weight=1)
 
@@ -571,6 +1029,7 @@ class BorsaAlSatBot:
         btn_frame.grid(row=0, column=0, sticky=tk.W, padx=(0, 15))
         ttk.Button(btn_frame, text="Bot Başlat", command=self._bot_baslat).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(btn_frame, text="Bot Durdur", command=self._bot_durdur).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Profil (1 döngü)", command=self._profil_iste).pack(side=tk.LEFT, padx=5)
 
         kartlar = ttk.Frame(f)
         kartlar.grid(row=1, column=0, sticky=tk.EW, pady=(0, 10))
@@ -584,7 +1043,9 @@ class BorsaAlSatBot:
         self.lbl_bot_durum = tk.Label(self.kart_bot, text="● Kapalı", font=("Segoe UI", 12, "bold"), bg="#21262d", fg="#f85149")
         self.lbl_bot_durum.pack(anchor=tk.W, padx=10, pady=2)
         self.lbl_son_islem = tk.Label(self.kart_bot, text="Son işlem: —", font=("Segoe UI", 9), bg="#21262d", fg="#8b949e")
-        self.lbl_son_islem.pack(anchor=tk.W, padx=10, pady=(0, 10))
+        self.lbl_son_islem.pack(anchor=tk.W, padx=10, pady=(0, 2))
+        self.lbl_api_agirlik = tk.Label(self.kart_bot, text="API ağırlığı: —", font=("Segoe UI", 9), bg="#21262d", fg="#8b949e")
+        self.lbl_api_agirlik.pack(anchor=tk.W, padx=10, pady=(0, 10))
 
         self.kart_bakiye = tk.Frame(kartlar, bg="#21262d", relief=tk.RIDGE, bd=2)
         self.kart_bakiye.grid(row=0, column=1, sticky=tk.NSEW, padx=5, pady=5)
@@ -613,6 +1074,13 @@ class BorsaAlSatBot:
             self.chart_ax.set_facecolor("#21262d")
             self.chart_ax.tick_params(colors="#8b949e")
             self.chart_ax.set_title("Portföy Değeri (Son 24 Saat)", color="#c9d1d9", fontsize=10)
+            aralik_cubugu = ttk.Frame(chart_frame)
+            aralik_cubugu.pack(fill=tk.X)
+            self.grafik_araligi = ttk.Combobox(aralik_cubugu, width=8, values=list(GRAFIK_ARALIKLARI), state="readonly")
+            self.grafik_araligi.set("24 Saat")
+            self.grafik_araligi.bind("<<ComboboxSelected>>", lambda e: self._grafik_ciz())
+            self.grafik_araligi.pack(side=tk.RIGHT)
+            ttk.Label(aralik_cubugu, text="Aralık:").pack(side=tk.RIGHT, padx=(0, 4))
             self.chart_canvas = FigureCanvasTkAgg(self.chart_fig, master=chart_frame)
             self.chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
             self._grafik_ciz()
@@ -635,9 +1103,9 @@ class BorsaAlSatBot:
         self.bot_log_text.tag_config("hata", foreground="#f85149")
         f.rowconfigure(3, weight=1)
 
-    def _tab_ayarlar(self, nb):
-        f = ttk.LabelFrame(nb, text="API ve Bot Parametreleri", padding=15)
-        nb.add(f, text="Ayarlar")
+    def _tab_ayarlar(self, sekme):
+        f = ttk.LabelFrame(sekme, text="API ve Bot Parametreleri", padding=15)
+        f.pack(fill=tk.BOTH, expand=True)
         f.columnconfigure(1, weight=1)
 
         row = 0
@@ -660,6 +1128,13 @@ class BorsaAlSatBot:
         self.ayar_ai_model = ttk.Combobox(f, width=42, values=["anthropic/claude-3.5-sonnet", "openai/gpt-4-turbo", "meta-llama/llama-3.1-70b-instruct"], state="readonly")
         self.ayar_ai_model.set(self.config.get("ai_model", "anthropic/claude-3.5-sonnet"))
         self.ayar_ai_model.grid(row=row, column=1, sticky=tk.W, padx=5, pady=4)
+        row += 1
+        tk.Label(f, text="AI Kuorumu:", bg="#161b22", fg="#c9d1d9").grid(row=row, column=0, sticky=tk.W, pady=4)
+        self.ayar_ai_kuorum = ttk.Entry(f, width=10)
+        self.ayar_ai_kuorum.insert(0, str(self.config.get("ai_kuorum", 0)))
+        self.ayar_ai_kuorum.grid(row=row, column=1, sticky=tk.W, padx=5, pady=4)
+        row += 1
+        tk.Label(f, text="(0 = yalnız seçili model; N > 0 = modeller paralel sorulur, N tanesi uzlaşınca karar)", bg="#161b22", fg="#8b949e", font=("Segoe UI", 8)).grid(row=row, column=1, sticky=tk.W, padx=5, pady=0)
         row += 2
         tk.Label(f, text="Discord Webhook URL:", bg="#161b22", fg="#c9d1d9").grid(row=row, column=0, sticky=tk.W, pady=4)
         self.ayar_discord_webhook = ttk.Entry(f, width=45)
@@ -685,6 +1160,13 @@ class BorsaAlSatBot:
         self.ayar_risk.insert(0, str(self.config.get("risk_pct", 2)))
         self.ayar_risk.grid(row=row, column=1, sticky=tk.W, padx=5, pady=4)
         row += 1
+        tk.Label(f, text="Pozisyon boyutu yöntemi:", bg="#161b22", fg="#c9d1d9").grid(row=row, column=0, sticky=tk.W, pady=4)
+        self.ayar_poz_yontem = ttk.Combobox(f, values=list(YONTEMLER), width=12, state="readonly")
+        self.ayar_poz_yontem.set(self.config.get("pozisyon_yontemi", "sabit_oran"))
+        self.ayar_poz_yontem.grid(row=row, column=1, sticky=tk.W, padx=5, pady=4)
+        row += 1
+        tk.Label(f, text="(sabit_oran: özkaynak × risk % | atr: risk / (ATR × çarpan) | kelly: geçmiş işlemlerden)", bg="#161b22", fg="#8b949e", font=("Segoe UI", 8)).grid(row=row, column=1, sticky=tk.W, padx=5, pady=0)
+        row += 1
         tk.Label(f, text="Maks. eş zamanlı pozisyon:", bg="#161b22", fg="#c9d1d9").grid(row=row, column=0, sticky=tk.W, pady=4)
         self.ayar_max_poz = ttk.Entry(f, width=10)
         self.ayar_max_poz.insert(0, str(self.config.get("max_pozisyon", 3)))
@@ -714,23 +1196,66 @@ class BorsaAlSatBot:
         btn_f.grid(row=row, column=0, columnspan=2, sticky=tk.W, pady=10)
         ttk.Button(btn_f, text="Kaydet", command=self._ayarlari_kaydet).pack(side=tk.LEFT, padx=5)
 
-    def _tab_log(self, nb):
-        f = ttk.Frame(nb, padding=10)
-        nb.add(f, text="Log")
+    def _tab_log(self, f):
+        f.configure(padding=10)
         f.columnconfigure(0, weight=1)
-        f.rowconfigure(1, weight=1)
-        ttk.Button(f, text="Logu Yenile", command=self._log_doldur).grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+        f.rowconfigure(2, weight=1)
+        ust = ttk.Frame(f)
+        ust.grid(row=0, column=0, columnspan=2, sticky=tk.EW, pady=(0, 5))
+        ttk.Button(ust, text="Logu Yenile", command=self._log_doldur).pack(side=tk.LEFT)
+        ttk.Label(ust, text="   Dışa aktar:").pack(side=tk.LEFT)
+        self.disa_tablo = ttk.Combobox(ust, values=list(TABLOLAR), width=9, state="readonly")
+        self.disa_tablo.set("log")
+        self.disa_tablo.pack(side=tk.LEFT, padx=3)
+        self.disa_bicim = ttk.Combobox(ust, values=list(BICIMLER), width=6, state="readonly")
+        self.disa_bicim.set("xlsx")
+        self.disa_bicim.pack(side=tk.LEFT, padx=3)
+        self.btn_disa_aktar = ttk.Button(ust, text="Dışa Aktar", command=self._disa_aktar_baslat)
+        self.btn_disa_aktar.pack(side=tk.LEFT, padx=3)
+        self.btn_disa_iptal = ttk.Button(ust, text="İptal", command=self._disa_aktar_iptal, state=tk.DISABLED)
+        self.btn_disa_iptal.pack(side=tk.LEFT, padx=3)
+        self.disa_ilerleme = ttk.Progressbar(ust, length=180, mode="determinate")
+        self.disa_ilerleme.pack(side=tk.LEFT, padx=6)
+        self.lbl_disa_durum = ttk.Label(ust, text="")
+        self.lbl_disa_durum.pack(side=tk.LEFT)
+        filtre = ttk.Frame(f)
+        filtre.grid(row=1, column=0, columnspan=2, sticky=tk.EW, pady=(0, 5))
+        ttk.Label(filtre, text="Ara:").pack(side=tk.LEFT)
+        self.log_arama = ttk.Entry(filtre, width=30)
+        self.log_arama.pack(side=tk.LEFT, padx=3)
+        self.log_arama.bind("<Return>", lambda e: self._log_doldur())
+        ttk.Label(filtre, text="  Tip:").pack(side=tk.LEFT)
+        self.log_tip = ttk.Combobox(filtre, values=["Tümü"], width=10, state="readonly")
+        self.log_tip.set("Tümü")
+        self.log_tip.pack(side=tk.LEFT, padx=3)
+        self.log_tip.bind("<<ComboboxSelected>>", lambda e: self._log_doldur())
+        ttk.Label(filtre, text="  Süre:").pack(side=tk.LEFT)
+        self.log_sure = ttk.Combobox(filtre, values=["Tümü"] + list(GRAFIK_ARALIKLARI), width=8, state="readonly")
+        self.log_sure.set("Tümü")
+        self.log_sure.pack(side=tk.LEFT, padx=3)
+        self.log_sure.bind("<<ComboboxSelected>>", lambda e: self._log_doldur())
+        ttk.Button(filtre, text="Ara", command=self._log_doldur).pack(side=tk.LEFT, padx=3)
+        self.lbl_log_sonuc = ttk.Label(filtre, text="")
+        self.lbl_log_sonuc.pack(side=tk.LEFT, padx=6)
         self.log_tree = ttk.Treeview(f, columns=("Tarih", "Tip", "Mesaj"), show="headings", height=20)
         self.log_tree.column("Tarih", width=180)
         self.log_tree.column("Tip", width=80)
         self.log_tree.column("Mesaj", width=500)
-        self.log_tree.grid(row=1, column=0, sticky=tk.NSEW)
+        self.log_tree.grid(row=2, column=0, sticky=tk.NSEW)
         sb = ttk.Scrollbar(f, orient=tk.VERTICAL, command=self.log_tree.yview)
-        sb.grid(row=1, column=1, sticky=tk.NS)
-        self.log_tree.configure(yscrollcommand=sb.set)
+        sb.grid(row=2, column=1, sticky=tk.NS)
+
+        def kaydir(ust, alt):
+            sb.set(ust, alt)
+            self._log_yukle()
+        self.log_tree.configure(yscrollcommand=kaydir)
+        self.log_sayfalayici = log_deposu.LogSayfalayici(DB_PATH, hazir=lambda: self._ui_after(self._log_yukle))
         self._log_doldur()
 
     def _ayarlari_kaydet(self):
+        if getattr(self, "ayar_binance_key", None) is None:
+            save_config(self.config)  # Ayarlar sekmesi hiç açılmadı: config zaten güncel
+            return
         self.config["binance_api_key"] = self.ayar_binance_key.get().strip()
         self.config["binance_api_secret"] = self.ayar_binance_secret.get().strip()
         self.config["openrouter_api_key"] = self.ayar_openrouter.get().strip()
@@ -738,6 +1263,7 @@ class BorsaAlSatBot:
         self.config["discord_webhook"] = self.ayar_discord_webhook.get().strip()
         self.config["telegram_bot_token"] = self.ayar_telegram_token.get().strip()
         self.config["telegram_chat_id"] = self.ayar_telegram_chat.get().strip()
+        self.config["pozisyon_yontemi"] = self.ayar_poz_yontem.get() or "sabit_oran"
         for key, w, default in [
             ("risk_pct", self.ayar_risk, 2),
             ("max_pozisyon", self.ayar_max_poz, 3),
@@ -745,6 +1271,7 @@ class BorsaAlSatBot:
             ("min_ai_guven", self.ayar_min_guven, 7),
             ("take_profit_pct", self.ayar_tp, 3),
             ("stop_loss_pct", self.ayar_sl, -2),
+            ("ai_kuorum", self.ayar_ai_kuorum, 0),
         ]:
             try:
                 val = w.get().strip().replace(",", ".")
@@ -764,8 +1291,14 @@ class BorsaAlSatBot:
                 lines = self.bot_log_text.get("1.0", tk.END).split("\n")
                 if len(lines) > 51:
                     self.bot_log_text.delete("1.0", "2.0")
+        self._ui_after(upd)
+
+    def _ui_after(self, fn):
+        """Tk thread'ine iş gönder; headless modda yok sayılır."""
+        if self.root is None:
+            return
         try:
-            self.root.after(0, upd)
+            self.root.after(0, fn)
         except Exception:
             pass
 
@@ -790,23 +1323,137 @@ class BorsaAlSatBot:
             metin = f"<b>{baslik}</b>\n\n{mesaj}"
             telegram_gonder(token, chat_id, metin)
 
+    @METRIKLER.olc("bildirim")
     def _bildirim_gonder(self, baslik, mesaj, discord_renk=3447003):
         """Hem Discord hem Telegram'a bildirim gönder."""
         self._discord_bildirim(baslik, mesaj, discord_renk)
         self._telegram_bildirim(baslik, mesaj)
 
     def _log_doldur(self):
-        for i in self.log_tree.get_children():
-            self.log_tree.delete(i)
-        conn = get_db()
-        c = conn.cursor()
-        c.execute("SELECT tarih_saat, tip, mesaj FROM log ORDER BY id DESC LIMIT 200")
-        for row in c.fetchall():
-            self.log_tree.insert("", tk.END, values=(row["tarih_saat"] or "", row["tip"] or "", (row["mesaj"] or "")[:120]))
-        conn.close()
+        """Filtreleri uygula: görünüm boşaltılır, en yeni sayfa arka planda çekilip gelince çizilir."""
+        tip = self.log_tip.get()
+        gun = GRAFIK_ARALIKLARI.get(self.log_sure.get())
+        baslangic = datetime.fromtimestamp(time.time() - gun * 86400).strftime("%Y-%m-%d %H:%M:%S") if gun else None
+        self.log_sayfalayici.filtre(metin=self.log_arama.get(), tip=None if tip == "Tümü" else tip, baslangic=baslangic)
+        self.log_tree.delete(*self.log_tree.get_children())
+        self._log_en_yeni = True   # pencerenin üstü en yeni kayıt mı
+        self._log_en_eski = False  # pencerenin altı en eski kayıt mı
+        self.lbl_log_sonuc.config(text="Aranıyor…")
+
+    def _log_yukle(self):
+        """
+        Sanal kaydırma: Treeview'da yalnızca LOG_PENCERE_SAYFA kadar sayfa tutulur. Görünüm bir uca
+        yaklaşınca o yöndeki sayfa (önceden çekilmişse hemen) eklenir, karşı uçtan fazlası atılır.
+        Sayfa hazır değilse sayfalayıcı gelince yeniden çağırır.
+        """
+        s = self.log_sayfalayici
+        cocuklar = self.log_tree.get_children()
+        if not cocuklar:
+            if self._log_en_eski:
+                return
+            satirlar = s.sayfa(None)
+            if satirlar is not None:
+                self._log_en_eski = len(satirlar) < s.sayfa_boyutu
+                self._log_ekle(satirlar, sona=True)
+                self._log_durum()
+            return
+        ust, alt = self.log_tree.yview()
+        if alt >= 0.9 and not self._log_en_eski:
+            satirlar = s.sayfa(("once", int(cocuklar[-1])))
+            if satirlar is not None:
+                self._log_en_eski = len(satirlar) < s.sayfa_boyutu
+                self._log_ekle(satirlar, sona=True)
+        elif ust <= 0.1 and not self._log_en_yeni:
+            satirlar = s.sayfa(("sonra", int(cocuklar[0])))
+            if satirlar is not None:
+                self._log_en_yeni = len(satirlar) < s.sayfa_boyutu
+                self._log_ekle(satirlar, sona=False)
+        self._log_durum()
+
+    def _log_ekle(self, satirlar, sona):
+        """Sayfayı pencerenin altına (daha eski) ya da üstüne (daha yeni) ekle, görünür satırı yerinde tut."""
+        tree = self.log_tree
+        onceki = len(tree.get_children())
+        ilk_gorunen = tree.yview()[0] * onceki
+        sira = satirlar if sona else reversed(satirlar)
+        for id_, tarih, tip, mesaj in sira:
+            if not tree.exists(str(id_)):
+                tree.insert("", tk.END if sona else 0, iid=str(id_), values=(tarih or "", tip or "", (mesaj or "")[:120]))
+        cocuklar = tree.get_children()
+        fazla = len(cocuklar) - LOG_PENCERE_SAYFA * self.log_sayfalayici.sayfa_boyutu
+        if fazla > 0:
+            if sona:
+                tree.delete(*cocuklar[:fazla])
+                self._log_en_yeni = False
+                ilk_gorunen -= fazla
+            else:
+                tree.delete(*cocuklar[-fazla:])
+                self._log_en_eski = False
+        if not sona:
+            ilk_gorunen += len(satirlar)
+        if onceki:
+            tree.yview_moveto(max(0.0, ilk_gorunen) / max(1, len(tree.get_children())))
+
+    def _log_durum(self):
+        s = self.log_sayfalayici
+        if s.hata:
+            self.lbl_log_sonuc.config(text=f"Arama hatası: {s.hata}")
+            return
+        if list(self.log_tip.cget("values"))[1:] != s.tipler:
+            self.log_tip.configure(values=["Tümü"] + s.tipler)
+        cocuklar = self.log_tree.get_children()
+        if not cocuklar:
+            self.lbl_log_sonuc.config(text="Kayıt yok" if self._log_en_eski else "Aranıyor…")
+            return
+        uc = "" if self._log_en_eski else " (kaydırdıkça yüklenir)"
+        self.lbl_log_sonuc.config(text=f"{len(cocuklar)} satır gösteriliyor — #{cocuklar[-1]}…#{cocuklar[0]}{uc} — {s.son_sure_ms:.1f} ms")
+
+    def _disa_aktar_baslat(self):
+        """Seçili tabloyu arka planda dışa aktar; ilerleme Tk thread'ine after ile taşınır."""
+        if self.disa_isi is not None and self.disa_isi.calisiyor:
+            return
+        tablo, bicim = self.disa_tablo.get(), self.disa_bicim.get()
+        if not bicim_hazir_mi(bicim):
+            paket = {"xlsx": "openpyxl", "pdf": "reportlab"}.get(bicim, bicim)
+            messagebox.showwarning("Uyarı", f"{bicim.upper()} için '{paket}' kurulu değil (pip install {paket}).")
+            return
+        yol = filedialog.asksaveasfilename(
+            defaultextension=f".{bicim}", filetypes=[(bicim.upper(), f"*.{bicim}")],
+            initialfile=f"{tablo}_{datetime.now().strftime('%Y%m%d_%H%M')}.{bicim}",
+        )
+        if not yol:
+            return
+
+        def ilerleme(n, toplam):
+            def upd():
+                self.disa_ilerleme.configure(maximum=max(toplam, 1), value=n)
+                self.lbl_disa_durum.config(text=f"{n:,} / {toplam:,}")
+            self._ui_after(upd)
+
+        def bitti(n, hata):
+            def upd():
+                self.btn_disa_aktar.config(state=tk.NORMAL)
+                self.btn_disa_iptal.config(state=tk.DISABLED)
+                if hata:
+                    self.lbl_disa_durum.config(text=f"Hata: {hata}")
+                else:
+                    self.lbl_disa_durum.config(text=f"{n:,} satır → {os.path.basename(yol)}")
+                    self._log_db(f"Dışa aktarım: {tablo} → {yol} ({n} satır)", "genel")
+            self._ui_after(upd)
+
+        self.btn_disa_aktar.config(state=tk.DISABLED)
+        self.btn_disa_iptal.config(state=tk.NORMAL)
+        self.disa_ilerleme.configure(value=0)
+        self.lbl_disa_durum.config(text="Başlıyor…")
+        self.disa_isi = DisaAktarmaIsi(DB_PATH, tablo, bicim, yol, ilerleme=ilerleme, bitti=bitti)
+        self.disa_isi.baslat()
+
+    def _disa_aktar_iptal(self):
+        if self.disa_isi is not None:
+            self.disa_isi.iptal()
 
     def _bot_baslat(self):
-        if not self.config.get("binance_api_key") or not self.config.get("binance_api_secret"):
+        if not self.config.get("kagit_mod") and (not self.config.get("binance_api_key") or not self.config.get("binance_api_secret")):
             messagebox.showwarning("Uyarı", "Binance API Key ve Secret girin.")
             return
         if not self.config.get("openrouter_api_key"):
@@ -832,7 +1479,40 @@ class BorsaAlSatBot:
         self._log_db("Bot durduruldu", "bot")
         self._bildirim_gonder("⏹️ Bot Durduruldu", "AlSat botu durduruldu.", 15158332)
 
-    def _dashboard_guncelle(self, bakiye_usdt, pozisyonlar, toplam_deger):
+    # Okuma kısayolları — son yayınlanan görüntüden; yazma yalnızca self.durum üzerinden.
+    # Birden çok alanı birlikte okuyan yer tek görüntü almalı (g = self.durum.goruntu).
+    @property
+    def acik_pozisyonlar(self):
+        return self.durum.goruntu.pozisyonlar
+
+    @property
+    def son_fiyatlar(self):
+        return self.durum.goruntu.fiyatlar
+
+    @property
+    def son_bakiye_usdt(self):
+        return self.durum.goruntu.bakiye_usdt
+
+    @property
+    def son_toplam(self):
+        return self.durum.goruntu.toplam
+
+    @property
+    def son_islem_zamani(self):
+        return self.durum.goruntu.son_islem_zamani
+
+    def _dashboard_guncelle(self, g):
+        """g: durum görüntüsü — kartlar tek sürümden çizilir (pozisyon, fiyat ve toplam birbiriyle tutarlı)."""
+        # Fiyatlar worker thread'de toplanan önbellekten okunur; Tk thread'i ağ çağrısı yapmaz
+        pozisyonlar, toplam_deger = g.pozisyonlar, g.toplam
+        en_kar = None
+        for p in pozisyonlar:
+            fiyat = g.fiyatlar.get(p["sembol"])
+            if fiyat and p.get("giris_fiyat"):
+                k = (fiyat - p["giris_fiyat"]) / p["giris_fiyat"] * 100
+                if en_kar is None or k > en_kar[1]:
+                    en_kar = (p["sembol"].replace("USDT", ""), k)
+
         def upd():
             if not hasattr(self, "lbl_bakiye") or not self.lbl_bakiye.winfo_exists():
                 return
@@ -841,61 +1521,74 @@ class BorsaAlSatBot:
             if self.baslangic_bakiye is not None and toplam_deger is not None:
                 self.gunluk_kar = toplam_deger - self.baslangic_bakiye
                 self.lbl_gunluk_kar.config(text=f"Bugün: {self.gunluk_kar:+,.2f}$", fg="#3fb950" if self.gunluk_kar >= 0 else "#f85149")
-            if self.son_islem_zamani:
-                self.lbl_son_islem.config(text=f"Son işlem: {self.son_islem_zamani}")
-            en_kar = None
-            for p in pozisyonlar:
-                fiyat = binance_fiyat(p["sembol"])
-                if fiyat and p.get("giris_fiyat"):
-                    k = (fiyat - p["giris_fiyat"]) / p["giris_fiyat"] * 100
-                    if en_kar is None or k > en_kar[1]:
-                        en_kar = (p["sembol"].replace("USDT", ""), k)
+            if g.son_islem_zamani:
+                self.lbl_son_islem.config(text=f"Son işlem: {g.son_islem_zamani}")
+            a = AGIRLIK.durum()
+            metin = f"API ağırlığı: {a['kullanilan']}/{a['limit']}"
+            if a["yasak_kalan_sn"]:
+                metin += f" — yasak {a['yasak_kalan_sn']:.0f} sn"
+            elif a["dusuruldu"]:
+                metin += f" — {a['dusuruldu']} düşürüldü"
+            self.lbl_api_agirlik.config(text=metin, fg="#f85149" if a["yasak_kalan_sn"] or a["oran"] >= 0.8 else "#8b949e")
             if en_kar:
                 self.lbl_en_karli.config(text=f"En karlı: %{en_kar[1]:+.1f} ({en_kar[0]})", fg="#3fb950" if en_kar[1] >= 0 else "#f85149")
             else:
                 self.lbl_en_karli.config(text="En karlı: —")
-        try:
-            self.root.after(0, upd)
-        except Exception:
-            pass
+        self._ui_after(upd)
 
     def _grafik_ciz(self):
         if not HAS_MATPLOTLIB or not hasattr(self, "chart_ax"):
             return
+        secim = self.grafik_araligi.get() if hasattr(self, "grafik_araligi") else "24 Saat"
+        gun = GRAFIK_ARALIKLARI.get(secim, 1)
+        baslik = f"Portföy Değeri (Son {secim})"
         self.chart_ax.clear()
         self.chart_ax.set_facecolor("#21262d")
         self.chart_ax.tick_params(colors="#8b949e")
-        if len(self.bakiye_gecmisi) < 2:
-            self.chart_ax.set_title("Portföy Değeri (Son 24 Saat) — Veri bekleniyor", color="#c9d1d9", fontsize=10)
+        baslangic = time.time() - gun * 86400
+        xs, ys = self.ozkaynak.grafik(baslangic, self.config.get("grafik_nokta", 600))
+        if len(xs) < 2:
+            self.chart_ax.set_title(f"{baslik} — Veri bekleniyor", color="#c9d1d9", fontsize=10)
             self.chart_fig.tight_layout()
             self.chart_canvas.draw()
             return
-        # Son 24 saat
-        cutoff = datetime.now() - timedelta(hours=24)
-        pts = [(t, v) for t, v in self.bakiye_gecmisi if t >= cutoff]
-        if not pts:
-            pts = self.bakiye_gecmisi[-50:]
-        if pts:
-            times = [p[0] for p in pts]
-            values = [p[1] for p in pts]
-            self.chart_ax.plot(times, values, color="#3fb950", linewidth=2, label="Portföy")
-            try:
-                import matplotlib.dates as mdates
-                self.chart_ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M"))
-                self.chart_ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-            except Exception:
-                pass
-            # Alım/satım noktaları
-            for ev in self.chart_events[-30:]:
-                if len(ev) >= 3:
-                    t, v, tip = ev[0], ev[1], ev[2]
-                    if not pts or t >= (cutoff if pts else times[0]):
-                        self.chart_ax.scatter([t], [v], color="#f85149" if tip == "satim" else "#58a6ff", s=40, zorder=5, marker="o")
-        self.chart_ax.set_title("Portföy Değeri (Son 24 Saat)", color="#c9d1d9", fontsize=10)
+        times = [datetime.fromtimestamp(t) for t in xs]
+        self.chart_ax.plot(times, ys, color="#3fb950", linewidth=2, label="Portföy")
+        try:
+            import matplotlib.dates as mdates
+            self.chart_ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M" if gun <= 1 else "%d.%m"))
+            self.chart_ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        except Exception:
+            pass
+        # Alım/satım noktaları
+        for t, v, tip in self.ozkaynak.olaylar_aralik(xs[0]):
+            self.chart_ax.scatter([datetime.fromtimestamp(t)], [v], color="#f85149" if tip == "satim" else "#58a6ff", s=40, zorder=5, marker="o")
+        self.chart_ax.set_title(baslik, color="#c9d1d9", fontsize=10)
         self.chart_ax.legend(loc="upper right", facecolor="#21262d", labelcolor="#c9d1d9")
         self.chart_fig.tight_layout()
         self.chart_canvas.draw()
 
+    def _ozkaynak_yolu(self):
+        return os.path.join(os.path.dirname(DB_PATH), "ozkaynak_gecmisi.bin")
+
+    def _ozkaynak_kaydet(self):
+        try:
+            self.ozkaynak.kaydet(self._ozkaynak_yolu())
+        except OSError as e:
+            self._bot_log(f"Özkaynak geçmişi kaydedilemedi: {e}", "hata")
+
+    def _haber_bolumu(self, sembol):
+        """Prompt için haber özeti — yalnızca önbellekten okunur (işlem yolunda ağ yok)."""
+        satirlar = []
+        for ad, o in ((sembol, self.haberler.ozet(sembol)), ("Genel piyasa", self.haberler.piyasa())):
+            if not o:
+                satirlar.append(f"- {ad}: son saatlerde haber yok")
+                continue
+            yon = "olumlu" if o["skor"] > 0.1 else "olumsuz" if o["skor"] < -0.1 else "nötr"
+            satirlar.append(f"- {ad}: {o['haber']} haber | duyarlılık {o['skor']:+.2f} ({yon}) | +{o['olumlu']} / -{o['olumsuz']}")
+            satirlar.extend(f"    • {b[:120]}" for b in o["basliklar"])
+        return "\n".join(satirlar)
+
     def _ai_alim_prompt(self, sembol, analiz, bakiye_usdt=0, acik_pozisyon_sayisi=0, max_pozisyon=3, risk_pct=2):
         """Gelişmiş BIST-tarzı birleşik prompt: Teknik + Hacim/Likidite + Destek/Direnç+Fib + Risk Yönetimi."""
         fiyat = analiz.get("fiyat") or 0
@@ -911,6 +1604,7 @@ class BorsaAlSatBot:
         risk_tutar = bos_nakit * (risk_pct / 100) if bos_nakit else 0
         fib = {k: analiz.get(k) for k in ["fib_0", "fib_236", "fib_382", "fib_50", "fib_618", "fib_786", "fib_100"]}
         pivot = analiz.get("pivot") or "—"
+        haber = self._haber_bolumu(sembol)
         return f"""Sen 15 yıllık deneyimli kripto ve teknik analiz uzmanısın. Tüm verileri birleştirip TEK FİNAL karar vereceksin.
 
 ═══════════════════════════════════════════════════════════
@@ -940,19 +1634,27 @@ Hareketli Ortalamalar: EMA9 {analiz.get('ema_9') or '—'} | EMA21 {analiz.get('
 - 24h hacim (base): {analiz.get('hacim_24h', 0):,.0f}
 - 24h işlem hacmi (USDT): ${analiz.get('quote_volume_24h', 0):,.0f}
 - Fiyat–hacim: 24h fiyat değişimi %{analiz.get('degisim_24h', 0):.2f}
+- Günün saatine göre beklenen 24h hacim (base): {analiz.get('hacim_ortalama') or 0:,.0f}
+- Son 15m mum hacim z-skoru (aynı saat dilimine göre): {analiz.get('hacim_z') if analiz.get('hacim_z') is not None else '—'} | oluşan mum: {analiz.get('hacim_z_kismi') if analiz.get('hacim_z_kismi') is not None else '—'}
 - Hacim anomali: {"Evet — olağandışı hacim" if analiz.get('hacim_anomali') else "Hayır"}
 GÖREV: Hacim sağlıklı mı? Yükseliş hacim destekli mi yoksa havai mi? Likidite riski var mı?
 
 ═══════════════════════════════════════════════════════════
            DESTEK/DİRENÇ VE FİBONACCİ SEVİYELERİ
 ═══════════════════════════════════════════════════════════
-Fibonacci (24h high/low): %0: ${fib.get('fib_0') or '—'} | %23.6: ${fib.get('fib_236') or '—'} | %38.2: ${fib.get('fib_382') or '—'} | %50: ${fib.get('fib_50') or '—'} | %61.8: ${fib.get('fib_618') or '—'} | %78.6: ${fib.get('fib_786') or '—'} | %100: ${fib.get('fib_100') or '—'}
+Fibonacci ({analiz.get('fib_kaynak') or 'salınım'} high/low): %0: ${fib.get('fib_0') or '—'} | %23.6: ${fib.get('fib_236') or '—'} | %38.2: ${fib.get('fib_382') or '—'} | %50: ${fib.get('fib_50') or '—'} | %61.8: ${fib.get('fib_618') or '—'} | %78.6: ${fib.get('fib_786') or '—'} | %100: ${fib.get('fib_100') or '—'}
 Pivot: ${pivot}
 
 Destek: S1 ${analiz.get('support_1') or '—'} ({dist_s}% aşağıda) | S2 ${analiz.get('support_2') or '—'}
 Direnç: R1 ${analiz.get('resistance_1') or '—'} ({dist_r}% yukarıda) | R2 ${analiz.get('resistance_2') or '—'}
 GÖREV: Fiyat hangi Fib seviyesine yakın? Güçlü destek/direnç neresi? Giriş/çıkış noktası öner.
 
+═══════════════════════════════════════════════════════════
+              HABER AKIŞI VE DUYARLILIK
+═══════════════════════════════════════════════════════════
+{haber}
+GÖREV: Haber akışı teknik tabloyu destekliyor mu, yoksa haber kaynaklı ani risk var mı?
+
 ═══════════════════════════════════════════════════════════
                    RİSK YÖNETİMİ
 ═══════════════════════════════════════════════════════════
@@ -1048,167 +1750,665 @@ ALTERNATİF_PLAN: [Fiyat beklenmedik düşerse ne yapmalı?]
     def _bot_ana_dongu(self):
         api_key = self.config.get("binance_api_key", "")
         api_secret = self.config.get("binance_api_secret", "")
-        openrouter_key = self.config.get("openrouter_api_key", "")
-        model = self.config.get("ai_model", "anthropic/claude-3.5-sonnet")
-        risk_pct = self.config.get("risk_pct", 2) / 100.0
-        max_poz = self.config.get("max_pozisyon", 3)
-        aralik = max(60, self.config.get("tarama_araligi_sn", 120))
-        min_guven = self.config.get("min_ai_guven", 7)
+        AGIRLIK.limit = int(self.config.get("binance_agirlik_limiti", 6000))
+        if self.config.get("derinlik_kontrolu", True) and self.config.get("derinlik_akisi", True):
+            self.derinlik.baslat(SEMBOL_LISTESI)
+        # Kağıt modu her başlatmada ayardan okunur; kapatıldıysa simüle borsa kaldırılır
+        if self.config.get("kagit_mod"):
+            # Simüle MARKET dolumları da aynı defterlerden yürünür (derinlik kontrolü kapalıysa sabit kayma)
+            kagit_borsa_kur(self.config, self.derinlik.defter if self.config.get("derinlik_kontrolu", True) else None)
+        else:
+            kagit_borsa_kapat()
+
+        b, balances = binance_bakiye(api_key, api_secret)
+        if b is not None:
+            self.defter.rest_yukle(balances)
+            self.durum.guncelle(bakiye_usdt=b)
+            if self.baslangic_bakiye is None:
+                self.baslangic_bakiye = b
+        kagit = KAGIT_BORSA is not None
+        if kagit:
+            # Simüle hesap olayları doğrudan deftere (websocket yok)
+            KAGIT_BORSA.abone_ol(self.defter.akis_olayi)
+            self._bot_log("📝 Kağıt işlem modu: emirler bellek içi borsada simüle ediliyor, gerçek emir gönderilmez", "info")
+        elif self.config.get("kullanici_akisi", True):
+            self.kullanici_akisi = KullaniciAkisi(
+                BINANCE_WS_BASE,
+                lambda: binance_listen_key(api_key),
+                lambda key: binance_listen_key_yenile(api_key, key),
+                self.defter.akis_olayi,
+                log=lambda m: self._bot_log(m, "info"),
+            )
+            self.kullanici_akisi.baslat()
+        if self.config.get("haberler", True):
+            self.haberler.baslat(max(60, self.config.get("haber_araligi_sn", 300)))
+
+        # Fiyat akışı: SL/TP sınırını geçen tick değerlemeyi beklemeden tetikler; istenirse ham kayıt
+        CANLI_AKIS.abone_ol(self._tick_al)
+        if self.config.get("tick_kayit"):
+            dizin = self.config.get("tick_kayit_dizini") or os.path.join(os.path.dirname(DB_PATH), "tickler")
+            self.tick_kaydedici = CANLI_AKIS.abone_ol(TickKaydedici(dizin, segment_bayt=int(self.config.get("tick_segment_mb", 64)) * 1024 * 1024))
+            self._bot_log(f"Ham tick kaydı: {dizin}", "info")
+
+        # Her görev tipi kendi periyodunda; emir kritik değerleme analizden önce gelir
+        z = Zamanlayici(kacirma_bildir=self._gorev_kacirdi, metrikler=METRIKLER)
+        z.ekle("degerleme", self._gorev_degerleme, max(1, self.config.get("degerleme_araligi_sn", 5)), ONCELIK_EMIR)
+        z.ekle("pozisyon", self._gorev_pozisyon_inceleme, max(30, self.config.get("pozisyon_araligi_sn", 60)), ONCELIK_ANALIZ)
+        z.ekle("tarama", self._gorev_tarama, max(60, self.config.get("tarama_araligi_sn", 120)), ONCELIK_ANALIZ)
+        z.ekle("mutabakat", self._gorev_mutabakat, max(60, self.config.get("mutabakat_araligi_sn", 600)), ONCELIK_DEGERLEME, hemen=False)
+        z.ekle("dashboard", self._gorev_dashboard, max(1, self.config.get("dashboard_araligi_sn", 5)), ONCELIK_UI)
+        z.ekle("profil", self._gorev_profil, 1, ONCELIK_UI, son_tarih=60)
+        z.ekle("metrik", self._metrik_rollup, 10, ONCELIK_UI, son_tarih=60)
+        z.ekle("etiketleme", self._gorev_etiketleme, 3600, ONCELIK_UI, son_tarih=600, hemen=False)
+        z.ekle("log_temizlik", self._gorev_log_temizlik, max(300, self.config.get("log_temizlik_araligi_sn", 3600)), ONCELIK_UI, son_tarih=600)
+        z.ekle("ozkaynak", self._ozkaynak_kaydet, max(30, self.config.get("ozkaynak_kayit_sn", 300)), ONCELIK_UI, hemen=False)
+        self.zamanlayici = z
+        z.calistir(lambda: self.bot_aktif and (kagit or (api_key and api_secret)), hata=self._bot_hata)
+        self.zamanlayici = None
+        CANLI_AKIS.abonelikten_cik(self._tick_al)
+        if self.tick_kaydedici is not None:
+            CANLI_AKIS.abonelikten_cik(self.tick_kaydedici)
+            self.tick_kaydedici.kapat()
+            self.tick_kaydedici = None
+        self._ozkaynak_kaydet()
+        if self.kullanici_akisi is not None:
+            self.kullanici_akisi.durdur()
+            self.kullanici_akisi = None
+        if kagit:
+            KAGIT_BORSA.abonelikten_cik(self.defter.akis_olayi)
+        self.haberler.durdur()
+        self.derinlik.durdur()
+
+        self.bot_aktif = False
+        self._ui_after(lambda: self.lbl_bot_durum.config(text="● Kapalı", fg="#f85149"))
+
+    def _bot_hata(self, e):
+        self._bot_log(f"Hata: {e}", "hata")
+        self._log_db(f"Bot hata: {e}", "bot")
+        self._bildirim_gonder("⚠️ Bot Hata", str(e)[:500], 15158332)
+
+    def _gorev_kacirdi(self, gorev, gecikme):
+        self._bot_log(f"⏱️ Son tarih kaçırıldı: {gorev.ad} ({gecikme:.1f} sn gecikme)", "bekle")
+
+    def _profil_iste(self):
+        METRIKLER.profil_iste()
+        self._bot_log("Profil istendi — sonraki döngü cProfile ile çalışacak.", "info")
+
+    def _gorev_etiketleme(self):
+        """Ufku dolmuş özellik görüntülerine ileri getiri yaz (ön sıralayıcı eğitim verisi)."""
+        conn = get_db()
+        try:
+            n = on_siralama.etiketle(conn, self.config.get("on_siralama_ufuk_dk", 240) * 60)
+        finally:
+            conn.close()
+        if n:
+            self._bot_log(f"🏷️ Ön sıralayıcı: {n} görüntü etiketlendi", "info")
+
+    def _gorev_log_temizlik(self):
+        """Saklama süresini aşan log kayıtlarını sil, boşalan sayfaları diske iade et."""
+        conn = get_db()
+        try:
+            silinen, sayfa = log_deposu.log_temizle(conn, self.config.get("log_saklama_gun", 90), bekleme_sn=0.01)
+        finally:
+            conn.close()
+        if silinen:
+            self._bot_log(f"🧹 Log temizliği: {silinen} eski kayıt silindi, {sayfa} sayfa iade edildi", "info")
+
+    def _gorev_profil(self):
+        if METRIKLER.profil_al():
+            self._profilli_adim()
+
+    def _profilli_adim(self):
+        """Tek döngüyü cProfile altında çalıştır; .prof dosyası yaz, en pahalı 10 fonksiyonu logla."""
+        prof = cProfile.Profile()
+        try:
+            prof.runcall(self._bot_dongu_adim)
+        finally:
+            yol = os.path.join(os.path.dirname(DB_PATH), f"profil_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+            prof.dump_stats(yol)
+            out = io.StringIO()
+            pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(10)
+            self._bot_log(f"Profil kaydedildi: {yol}", "info")
+            for satir in out.getvalue().splitlines():
+                if satir.strip() and satir.strip()[0].isdigit():
+                    self._bot_log(satir.strip()[:160], "info")
+
+    def _metrik_rollup(self):
+        if not self.config.get("metrik_sqlite"):
+            return
+        if time.time() - self._son_metrik_rollup < self.config.get("metrik_rollup_sn", 60):
+            return
+        self._son_metrik_rollup = time.time()
+        conn = get_db()
+        try:
+            METRIKLER.sqlite_rollup(conn)
+        finally:
+            conn.close()
+
+    def _bot_dongu_adim(self):
+        """Tek tam döngü (benchmark/profil): tüm görevleri sırayla bir kez çalıştır."""
+        self._gorev_degerleme()
+        for gorev in (self._gorev_pozisyon_inceleme(), self._gorev_tarama()):
+            for beklenen in gorev:
+                if beklenen is not None:
+                    beklenen.result()  # askıya alan Future (işçi işi, uyku) burada beklenir
+        self._gorev_dashboard()
+
+    def _emir(self, sembol, side, miktar, fiyat=None, niyet=None):
+        """Emir gönder; borsa ya da yerel filtre reddini logla. (ok, dolum | hata)"""
+        api_key = self.config.get("binance_api_key", "")
+        api_secret = self.config.get("binance_api_secret", "")
+        ok, sonuc = binance_spot_emir(api_key, api_secret, sembol, side, miktar, fiyat=fiyat, niyet=niyet)
+        if ok:
+            base, quote = (sembol[:-4], "USDT") if sembol.endswith("USDT") else (sembol, "USDT")
+            self.defter.dolum_uygula(sonuc, base, quote)
+        else:
+            hata = sonuc.get("msg") if isinstance(sonuc, dict) else sonuc
+            self._bot_log(f"⛔ Emir reddedildi: {side} {sembol} {miktar:.8g} — {hata}", "hata")
+            self._log_db(f"Emir reddedildi {side} {sembol}: {hata}", "bot")
+        return ok, sonuc
+
+    @staticmethod
+    def _niyet(poz, tur):
+        """Pozisyon emrinin niyeti: pozisyonun emir anahtarı (eski kayıtlarda açılış zamanı) + emir türü."""
+        return f"{poz.get('emir_anahtari') or poz['acilis_zamani']}|{tur}"
+
+    def _derinlikli_alim(self, sembol, tutar, fiyat, niyet):
+        """
+        Defter derinliğine göre MARKET alım (generator; `yield from` ile). Tahmini kayma
+        max_kayma_bps içindeyse tek emir; değilse parçalara bölünür, parçalar arasında defter
+        yenilenip yeniden kontrol edilir; en küçük parça bile eşiği aşıyorsa emir gönderilmez.
+        (ok, birleşik dolum | hata) döner.
+        """
+        defter = self.derinlik.defter(sembol) if self.config.get("derinlik_kontrolu", True) else None
+        if defter is None:
+            return self._emir(sembol, "BUY", tutar / fiyat, fiyat, niyet=niyet)
+        esik = float(self.config.get("max_kayma_bps", 30))
+        parcalar, tahmin, neden = emir_plani(defter, "BUY", tutar, esik, int(self.config.get("max_emir_parca", 3)))
+        METRIKLER.gosterge("tahmini_kayma_bps", round(tahmin["kayma_bps"], 2), sembol=sembol)
+        if not parcalar:
+            self._bot_log(f"⛔ {sembol}: ${tutar:,.2f} alım gönderilmedi — tahmini kayma {tahmin['kayma_bps']:.1f} bps ({neden})", "bekle")
+            return False, {"code": None, "msg": neden}
+        if len(parcalar) > 1:
+            self._bot_log(f"✂️ {sembol}: tahmini kayma {tahmin['kayma_bps']:.1f} bps — {neden}", "info")
+        birlesik = {"executedQty": 0.0, "cummulativeQuoteQty": 0.0, "komisyon": {}, "ortalama_fiyat": 0.0, "parcalar": []}
+        for k, parca in enumerate(parcalar):
+            if k:
+                # Defterin dolması için askıda bekle (bu sürede diğer görevler çalışır), sonra yeniden ölç
+                yield uyku(float(self.config.get("emir_parca_araligi_sn", 2)))
+                if not self.bot_aktif:
+                    break
+                defter = self.derinlik.defter(sembol)
+                kayma = float(dolum_tahmini(defter, "BUY", parca)["kayma_bps"][0]) if defter else float("nan")
+                if not kayma <= esik:
+                    self._bot_log(f"⏹️ {sembol}: {k + 1}. parça iptal — kayma {kayma:.1f} bps", "bekle")
+                    break
+            ort = float(dolum_tahmini(defter, "BUY", parca)["ort_fiyat"][0]) if defter else fiyat
+            ok, dolum = self._emir(sembol, "BUY", parca / (ort or fiyat), fiyat, niyet=niyet if len(parcalar) == 1 else f"{niyet}|{k}")
+            if not ok:
+                if k == 0:
+                    return False, dolum
+                break
+            birlesik["executedQty"] += dolum["executedQty"]
+            birlesik["cummulativeQuoteQty"] += dolum["cummulativeQuoteQty"]
+            for varlik, kom in dolum["komisyon"].items():
+                birlesik["komisyon"][varlik] = birlesik["komisyon"].get(varlik, 0.0) + kom
+            birlesik["parcalar"].append(dolum)
+        if birlesik["executedQty"]:
+            birlesik["ortalama_fiyat"] = birlesik["cummulativeQuoteQty"] / birlesik["executedQty"]
+            gercek = (birlesik["ortalama_fiyat"] / tahmin["orta"] - 1) * 1e4 if tahmin["orta"] else 0.0
+            METRIKLER.gosterge("gerceklesen_kayma_bps", round(gercek, 2), sembol=sembol)
+        return True, birlesik
+
+    def _gorev_degerleme(self):
+        """Hızlı görev: bakiye, portföy değerleme ve otomatik SL/TP kontrolü (emir kritik)."""
+        api_key = self.config.get("binance_api_key", "")
+        api_secret = self.config.get("binance_api_secret", "")
         tp_pct = self.config.get("take_profit_pct", 3) / 100.0
         sl_pct = self.config.get("stop_loss_pct", -2) / 100.0
 
-        if self.baslangic_bakiye is None:
-            b, _ = binance_bakiye(api_key, api_secret)
+        # Bakiye defterden (dolumlar + kullanıcı akışı); defter henüz kurulmadıysa tek seferlik REST
+        if not self.defter.hazir:
+            b, balances = binance_bakiye(api_key, api_secret)
             if b is not None:
-                self.baslangic_bakiye = b
-
-        while self.bot_aktif and api_key and api_secret:
+                self.defter.rest_yukle(balances)
+        bakiye = self.defter.bakiye("USDT") if self.defter.hazir else self.son_bakiye_usdt
+        # Tüm pozisyon fiyatları tek istekte
+        yeni_fiyatlar = binance_fiyatlar([p["sembol"] for p in self.acik_pozisyonlar]) or {}
+
+        def degerle(g):
+            # Yazıcı kilidi altında: toplam, yayınlanan görüntüdeki pozisyon ve fiyatlarla hesaplanır
+            fiyatlar = g.fiyatlar.copy()
+            fiyatlar.update(yeni_fiyatlar)
+            toplam = (bakiye or 0) + sum(p["miktar"] * fiyatlar[p["sembol"]] for p in g.pozisyonlar if fiyatlar.get(p["sembol"]))
+            return {"fiyatlar": fiyatlar, "bakiye_usdt": bakiye, "toplam": toplam}
+        g = self.durum.degistir(degerle)
+        toplam = g.toplam
+        # Grafik geçmişi dakikada bir örneklenir (değerleme birkaç saniyede bir çalışır)
+        self.ozkaynak.ekle(time.time(), toplam)
+
+        # Otomatik SL/TP kontrolü
+        for poz in g.pozisyonlar:
+            sembol = poz["sembol"]
+            fiyat = g.fiyatlar.get(sembol)
+            if not fiyat:
+                continue
+            kar_pct = (fiyat - poz["giris_fiyat"]) / poz["giris_fiyat"]
+            # Yüzde stop ya da pozisyonun stop fiyatı (boyutlandırma riski bu fiyata göre hesapladı)
+            if kar_pct <= sl_pct or fiyat <= (poz.get("sl") or 0):
+                ok, _ = self._emir(sembol, "SELL", poz["miktar"], fiyat, niyet=self._niyet(poz, "SL"))
+                if ok:
+                    self.durum.pozisyon_kapat(poz["kimlik"], son_islem_zamani=f"{datetime.now().strftime('%H:%M')} (SL)")
+                    self.ozkaynak.olay(time.time(), toplam, "satim")
+                    self._islem_kaydet(poz, fiyat, poz["miktar"], "SL")
+                    self._bot_log(f"💸 SATIM (SL): {sembol} @ ${fiyat:,.2f} — Kar: %{kar_pct*100:.2f}", "satim")
+                    self._log_db(f"AlSat SAT {sembol} SL", "bot")
+                    self._bildirim_gonder("🔴 SATIM (Stop Loss)", f"{sembol} @ ${fiyat:,.2f}\nKar/Zarar: %{kar_pct*100:.2f}", 15158332)
+            elif kar_pct >= tp_pct:
+                ok, _ = self._emir(sembol, "SELL", poz["miktar"], fiyat, niyet=self._niyet(poz, "TP"))
+                if ok:
+                    self.durum.pozisyon_kapat(poz["kimlik"], son_islem_zamani=f"{datetime.now().strftime('%H:%M')} (TP)")
+                    self.ozkaynak.olay(time.time(), toplam, "satim")
+                    self._islem_kaydet(poz, fiyat, poz["miktar"], "TP")
+                    self._bot_log(f"💸 SATIM (TP): {sembol} @ ${fiyat:,.2f} — Kar: +%{kar_pct*100:.2f}", "satim")
+                    self._log_db(f"AlSat SAT {sembol} TP %{kar_pct*100:.1f}", "bot")
+                    self._bildirim_gonder("🟢 SATIM (Take Profit)", f"{sembol} @ ${fiyat:,.2f}\nKar: +%{kar_pct*100:.2f}", 3066993)
+
+    def _islem_kaydet(self, poz, cikis_fiyat, miktar, neden):
+        """Kapanan (ya da kısmen kapanan) pozisyonu islemler tablosuna yaz — Kelly/Monte Carlo girdisi."""
+        try:
+            conn = get_db()
             try:
-                bakiye_usdt, balances = binance_bakiye(api_key, api_secret)
-                toplam = bakiye_usdt or 0
-                for p in self.acik_pozisyonlar:
-                    fiyat = binance_fiyat(p["sembol"])
-                    if fiyat:
-                        toplam += p["miktar"] * fiyat
-                now = datetime.now()
-                self.bakiye_gecmisi.append((now, toplam))
-                if len(self.bakiye_gecmisi) > 500:
-                    self.bakiye_gecmisi = self.bakiye_gecmisi[-400:]
-                self._dashboard_guncelle(bakiye_usdt, self.acik_pozisyonlar, toplam)
-                self.root.after(0, self._grafik_ciz)
-
-                # 1) Açık pozisyonlar — SATIM kontrolü
-                for poz in list(self.acik_pozisyonlar):
-                    if not self.bot_aktif:
-                        break
-                    sembol = poz["sembol"]
-                    guncel = binance_gelismis_analiz(sembol)
-                    fiyat = guncel.get("fiyat") or binance_fiyat(sembol)
-                    if not fiyat:
-                        continue
-                    kar_pct = (fiyat - poz["giris_fiyat"]) / poz["giris_fiyat"]
-                    # Otomatik SL/TP kontrolü
-                    if kar_pct <= sl_pct:
-                        ok, _ = binance_spot_emir(api_key, api_secret, sembol, "SELL", poz["miktar"])
-                        if ok:
-                            self.son_islem_zamani = f"{datetime.now().strftime('%H:%M')} (SL)"
-                            self.chart_events.append((now, toplam, "satim"))
-                            self._bot_log(f"💸 SATIM (SL): {sembol} @ ${fiyat:,.2f} — Kar: %{kar_pct*100:.2f}", "satim")
-                            self._log_db(f"AlSat SAT {sembol} SL", "bot")
-                            self._bildirim_gonder("🔴 SATIM (Stop Loss)", f"{sembol} @ ${fiyat:,.2f}\nKar/Zarar: %{kar_pct*100:.2f}", 15158332)
-                            self.acik_pozisyonlar.remove(poz)
-                        continue
-                    if kar_pct >= tp_pct:
-                        ok, _ = binance_spot_emir(api_key, api_secret, sembol, "SELL", poz["miktar"])
-                        if ok:
-                            self.son_islem_zamani = f"{datetime.now().strftime('%H:%M')} (TP)"
-                            self.chart_events.append((now, toplam, "satim"))
-                            self._bot_log(f"💸 SATIM (TP): {sembol} @ ${fiyat:,.2f} — Kar: +%{kar_pct*100:.2f}", "satim")
-                            self._log_db(f"AlSat SAT {sembol} TP %{kar_pct*100:.1f}", "bot")
-                            self._bildirim_gonder("🟢 SATIM (Take Profit)", f"{sembol} @ ${fiyat:,.2f}\nKar: +%{kar_pct*100:.2f}", 3066993)
-                            self.acik_pozisyonlar.remove(poz)
-                        continue
-                    # AI danış
-                    self._bot_log(f"🤖 AI Sorgusu: {sembol} pozisyonu SAT kontrolü (kar %{kar_pct*100:.2f})", "soru")
-                    prompt = self._ai_satim_prompt(sembol, poz, guncel)
-                    cevap_text = openrouter_ask(openrouter_key, model, prompt)
-                    cevap = parse_ai_satim_cevap(cevap_text)
-                    self._bot_log(f"✅ AI Cevap: {cevap['KARAR']} (Güven: {cevap['GÜVEN']}) — {cevap['GEREKÇE'][:80]}", "cevap")
-                    if cevap["KARAR"] == "SAT" and cevap["GÜVEN"] >= min_guven:
-                        ok, _ = binance_spot_emir(api_key, api_secret, sembol, "SELL", poz["miktar"])
-                        if ok:
-                            self.son_islem_zamani = datetime.now().strftime("%H:%M")
-                            self.chart_events.append((now, toplam, "satim"))
-                            self._bot_log(f"💸 SATIM: {sembol} @ ${fiyat:,.2f} — Kar: %{kar_pct*100:.2f}", "satim")
-                            self._log_db(f"AlSat SAT {sembol} AI", "bot")
-                            self._bildirim_gonder("📤 SATIM (AI Önerisi)", f"{sembol} @ ${fiyat:,.2f}\nKar: %{kar_pct*100:.2f}", 16776960)
-                            self.acik_pozisyonlar.remove(poz)
-                    elif cevap["KARAR"] == "SL_GÜNCELLE" and cevap.get("YENİ_SL"):
-                        poz["sl"] = cevap["YENİ_SL"]
-                        if cevap.get("YENİ_TP"):
-                            poz["tp"] = cevap["YENİ_TP"]
-                        self._bot_log(f"⏸️ SL/TP güncellendi: {sembol} → SL ${poz['sl']}", "bekle")
-                        self._bildirim_gonder("📌 SL/TP Güncellendi", f"{sembol}\nYeni SL: ${poz['sl']}", 3447003)
-                    elif cevap["KARAR"] == "KISMİ_SAT" and cevap.get("KISMİ_ORAN") and 0 < cevap["KISMİ_ORAN"] < 100:
-                        # Kısmi satış: pozisyonun yüzdesini sat
-                        sat_miktar = round(poz["miktar"] * cevap["KISMİ_ORAN"] / 100, 5)
-                        if sat_miktar > 0:
-                            ok, _ = binance_spot_emir(api_key, api_secret, sembol, "SELL", sat_miktar)
-                            if ok:
-                                poz["miktar"] -= sat_miktar
-                                self.son_islem_zamani = datetime.now().strftime("%H:%M")
-                                self.chart_events.append((now, toplam, "satim"))
-                                self._bot_log(f"💸 KISMİ SATIM: {sembol} %{cevap['KISMİ_ORAN']} @ ${fiyat:,.2f}", "satim")
-                                self._bildirim_gonder("📊 Kısmi Satım", f"{sembol} %{cevap['KISMİ_ORAN']} @ ${fiyat:,.2f}", 16776960)
-                                if poz["miktar"] <= 0:
-                                    self.acik_pozisyonlar.remove(poz)
-                    time.sleep(1)
-
-                # 2) Yeni alım — slot varsa
-                if len(self.acik_pozisyonlar) < max_poz and bakiye_usdt and bakiye_usdt > 15:
-                    adaylar = binance_gelismis_tarama(SEMBOL_LISTESI)
-                    for sembol, skor, analiz in adaylar[:5]:
-                        if not self.bot_aktif or len(self.acik_pozisyonlar) >= max_poz:
-                            break
-                        if any(p["sembol"] == sembol for p in self.acik_pozisyonlar):
-                            continue
-                        self._bot_log(f"🤖 AI Sorgusu: {sembol} için AL önerisi (skor {skor})", "soru")
-                        prompt = self._ai_alim_prompt(sembol, analiz, bakiye_usdt=bakiye_usdt, acik_pozisyon_sayisi=len(self.acik_pozisyonlar), max_pozisyon=max_poz, risk_pct=risk_pct * 100)
-                        cevap_text = openrouter_ask(openrouter_key, model, prompt)
-                        cevap = parse_ai_alim_cevap(cevap_text)
-                        self._bot_log(f"✅ AI Cevap: {cevap['KARAR']} (Güven: {cevap['GÜVEN']}) — SL: {cevap['STOP_LOSS']} TP: {cevap['TAKE_PROFIT']}", "cevap")
-                        if cevap["KARAR"] == "AL" and cevap["GÜVEN"] >= min_guven:
-                            fiyat = analiz.get("fiyat") or binance_fiyat(sembol)
-                            if not fiyat or fiyat <= 0:
-                                continue
-                            harcanacak = (bakiye_usdt or 0) * risk_pct
-                            if harcanacak < 11:
-                                continue
-                            miktar = harcanacak / fiyat
-                            if "BTC" in sembol:
-                                miktar = round(miktar, 5)
-                            elif "ETH" in sembol:
-                                miktar = round(miktar, 4)
-                            else:
-                                miktar = round(miktar, 3)
-                            if miktar <= 0:
-                                continue
-                            ok, _ = binance_spot_emir(api_key, api_secret, sembol, "BUY", miktar)
-                            if ok:
-                                sl = cevap.get("STOP_LOSS") or fiyat * (1 + sl_pct)
-                                tp = cevap.get("TAKE_PROFIT") or fiyat * (1 + tp_pct)
-                                self.acik_pozisyonlar.append({
-                                    "sembol": sembol,
-                                    "miktar": miktar,
-                                    "giris_fiyat": fiyat,
-                                    "sl": sl,
-                                    "tp": tp,
-                                    "acilis_zamani": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                                })
-                                self.son_islem_zamani = datetime.now().strftime("%H:%M")
-                                self.chart_events.append((now, toplam, "alim"))
-                                self._bot_log(f"💰 ALIM: {sembol} @ ${fiyat:,.2f} — Miktar: {miktar}", "alim")
-                                self._log_db(f"AlSat AL {sembol} @ {fiyat}", "bot")
-                                self._bildirim_gonder("💰 ALIM", f"{sembol} @ ${fiyat:,.2f}\nMiktar: {miktar}\nSL: ${sl:,.2f} | TP: ${tp:,.2f}", 3066993)
-                                break
-                        time.sleep(1)
-
-            except Exception as e:
-                self._bot_log(f"Hata: {e}", "hata")
-                self._log_db(f"Bot hata: {e}", "bot")
-                self._bildirim_gonder("⚠️ Bot Hata", str(e)[:500], 15158332)
-            time.sleep(aralik)
+                conn.execute(
+                    "INSERT INTO islemler (sembol, giris_tarih, giris_fiyat, cikis_tarih, cikis_fiyat, miktar, stop_loss, take_profit, kar_zarar, notlar) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                    (poz["sembol"], poz.get("acilis_zamani"), poz["giris_fiyat"], datetime.now().strftime("%Y-%m-%d %H:%M"),
+                     cikis_fiyat, miktar, poz.get("sl"), poz.get("tp"), (cikis_fiyat - poz["giris_fiyat"]) * miktar, neden),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._bot_log(f"İşlem kaydı yazılamadı: {e}", "hata")
+        self._islem_getirileri = None
+
+    def _pozisyon_tutari(self, fiyat, analiz, stop=None):
+        """Alım tutarı (USDT) — ayarlardaki pozisyon_yontemi ile; risk mesafesi verilen stop fiyatından."""
+        yontem = self.config.get("pozisyon_yontemi", "sabit_oran")
+        getiriler = None
+        if yontem == "kelly":
+            if self._islem_getirileri is None:
+                self._islem_getirileri, _ = islemleri_oku(DB_PATH, limit=500)
+            getiriler = self._islem_getirileri
+        g = self.durum.goruntu
+        nakit = g.bakiye_usdt or 0
+        return pozisyon_tutari(
+            yontem, max(g.toplam or 0, nakit), nakit, fiyat,
+            risk_pct=self.config.get("risk_pct", 2),
+            atr=analiz.get("atr"),
+            atr_carpani=self.config.get("atr_carpani", 2.0),
+            getiriler=getiriler,
+            kelly_kesri=self.config.get("kelly_kesri", 0.5),
+            max_pozisyon_pct=self.config.get("max_pozisyon_pct", 25),
+            stop=stop,
+        )
 
-        self.bot_aktif = False
+    def _tick_al(self, tick):
+        """Akış tüketicisi: açık pozisyonun fiyatı SL/TP sınırını geçtiyse değerlemeyi hemen sıraya al."""
+        for poz in self.acik_pozisyonlar:
+            if poz["sembol"] != tick.sembol:
+                continue
+            self.durum.guncelle(fiyatlar={tick.sembol: tick.fiyat})
+            kar_pct = (tick.fiyat - poz["giris_fiyat"]) / poz["giris_fiyat"]
+            if (kar_pct <= self.config.get("stop_loss_pct", -2) / 100.0 or tick.fiyat <= (poz.get("sl") or 0)
+                    or kar_pct >= self.config.get("take_profit_pct", 3) / 100.0):
+                # Emir reddedilirse her tick'te yeniden tetikleyip döngüye girme
+                if tick.sembol not in self._sl_tp_isaretli:
+                    self._sl_tp_isaretli.add(tick.sembol)
+                    self.sl_tp_tetik += 1
+                    if self.zamanlayici is not None:
+                        self.zamanlayici.tetikle("degerleme")
+            else:
+                self._sl_tp_isaretli.discard(tick.sembol)
+
+    def _gorev_mutabakat(self):
+        """Periyodik REST mutabakatı: defter ile /api/v3/account arasındaki sapmayı yakala ve düzelt."""
+        b, balances = binance_bakiye(self.config.get("binance_api_key", ""), self.config.get("binance_api_secret", ""))
+        if b is None:
+            return
+        sapmalar = self.defter.mutabakat(balances)
+        METRIKLER.say("mutabakat_sapma", len(sapmalar))
+        for varlik, defter, borsa in sapmalar:
+            self._bot_log(f"⚖️ Mutabakat sapması: {varlik} defter {defter:.8g} / borsa {borsa:.8g} — düzeltildi", "bekle")
+
+    def _arka_planda(self, fn, *args):
+        """
+        fn(*args)'ı işçi thread'inde çalıştır (`yield from` ile). Future zamanlayıcıya verilir;
+        görev sonuç gelene kadar askıda kalır, emir kritik görevler bu sırada çalışmaya devam eder.
+        """
+        fut = self._isci.submit(fn, *args)
+        yield fut
+        return fut.result()
+
+    def _ai_sor(self, tur, sembol, prompt, ayristir):
+        """
+        Tek model ya da (ai_kuorum > 0) çok modelli kuorum kararı. Topluluk modunda oylar
+        `ai_oylar` tablosuna yazılır; her prompt/cevap çifti AI arşivine girer.
+        (cevap metni, ayrıştırılmış cevap) döner.
+        """
+        openrouter_key = self.config.get("openrouter_api_key", "")
+        kuorum = int(self.config.get("ai_kuorum", 0) or 0)
+        if kuorum <= 0:
+            model = self.config.get("ai_model", "anthropic/claude-3.5-sonnet")
+            t0 = time.perf_counter()
+            metin = openrouter_ask(openrouter_key, model, prompt)
+            cevap = ayristir(metin)
+            self._ai_arsivle(tur, sembol, prompt, [{
+                "model": model, "metin": metin, "sure_ms": (time.perf_counter() - t0) * 1000,
+                "karar": cevap["KARAR"] if metin else None, "guven": cevap["GÜVEN"] if metin else None,
+            }])
+            return metin, cevap
+        topluluk = ai_toplulugu.AITopluluk(
+            lambda k, m, p, sn: openrouter_ask(k, m, p, timeout=sn),
+            self.config.get("ai_topluluk_modeller") or None, kuorum,
+            zaman_asimi=self.config.get("ai_model_zaman_asimi_sn", 30), metrikler=METRIKLER,
+        )
+        metin, cevap, oylar = topluluk.karar_ver(openrouter_key, prompt, ayristir)
+        self._bot_log("🗳️ Oylar: " + ", ".join(
+            f"{o['model'].split('/')[-1]} {o['karar'] or o['durum']} ({o['sure_ms'] / 1000:.1f} sn)" for o in oylar
+        ), "info")
+        conn = get_db()
         try:
-            self.root.after(0, lambda: self.lbl_bot_durum.config(text="● Kapalı", fg="#f85149"))
-        except Exception:
-            pass
+            ai_toplulugu.oylari_kaydet(conn, tur, sembol, oylar, cevap["KARAR"])
+        finally:
+            conn.close()
+        self._ai_arsivle(tur, sembol, prompt, [o for o in oylar if o["durum"] not in ("iptal", "zaman_asimi")])
+        return metin, cevap
+
+    def _ai_arsivle(self, tur, sembol, prompt, cagrilar):
+        """Prompt ve ham cevapları sıkıştırılmış AI arşivine yaz (ayar kapalıysa hiçbir şey yapmaz)."""
+        if not self.config.get("ai_arsivi", True) or not cagrilar:
+            return
+        try:
+            conn = get_db()
+            try:
+                for c in cagrilar:
+                    ai_arsivi.kaydet(conn, tur, sembol, c["model"], prompt, c.get("metin"), c["sure_ms"], c["karar"], c["guven"])
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._bot_log(f"AI arşivi yazılamadı: {e}", "hata")
+
+    def _gorev_pozisyon_inceleme(self):
+        """Açık pozisyonlar için teknik analiz + AI satım danışması. Her pozisyon arasında yield."""
+        min_guven = self.config.get("min_ai_guven", 7)
+        tp_pct = self.config.get("take_profit_pct", 3) / 100.0
+        sl_pct = self.config.get("stop_loss_pct", -2) / 100.0
+        kapi_aktif = self.config.get("ai_kapisi", True)
+        self.ai_kapisi.temizle({p["kimlik"] for p in self.acik_pozisyonlar})
+
+        for poz in self.acik_pozisyonlar:
+            yield
+            if not self.bot_aktif:
+                break
+            poz = self.durum.goruntu.pozisyon(poz["kimlik"])
+            if poz is None:
+                continue  # Arada SL/TP ile kapanmış olabilir
+            sembol = poz["sembol"]
+            guncel = yield from self._arka_planda(binance_gelismis_analiz, sembol)
+            fiyat = guncel.get("fiyat") or binance_fiyat(sembol)
+            if not fiyat:
+                continue
+            self.durum.guncelle(fiyatlar={sembol: fiyat})
+            kar_pct = (fiyat - poz["giris_fiyat"]) / poz["giris_fiyat"]
+            if kar_pct <= sl_pct or fiyat <= (poz.get("sl") or 0) or kar_pct >= tp_pct:
+                # SL/TP değerleme görevinde işlenir — AI'a sormadan hemen tetikle
+                if self.zamanlayici is not None:
+                    self.zamanlayici.tetikle("degerleme")
+                continue
+            toplam = self.son_toplam
+            # Değişim kapısı: anlamlı değişim yoksa AI'a tekrar sorma
+            if kapi_aktif:
+                sor, neden = self.ai_kapisi.degerlendir(poz["kimlik"], guncel)
+                METRIKLER.say("ai_kapisi", karar="sor" if sor else "atla")
+                if not sor:
+                    self._bot_log(f"⏭️ AI atlandı: {sembol} — {neden}", "info")
+                    continue
+                self._bot_log(f"🔔 AI tetiklendi: {sembol} — {neden}", "info")
+            # AI danış
+            self._bot_log(f"🤖 AI Sorgusu: {sembol} pozisyonu SAT kontrolü (kar %{kar_pct*100:.2f})", "soru")
+            prompt = self._ai_satim_prompt(sembol, poz, guncel)
+            cevap_text, cevap = yield from self._arka_planda(self._ai_sor, "satim", sembol, prompt, parse_ai_satim_cevap)
+            if cevap_text:
+                self.ai_kapisi.kaydet(poz["kimlik"], guncel)
+            self._bot_log(f"✅ AI Cevap: {cevap['KARAR']} (Güven: {cevap['GÜVEN']}) — {cevap['GEREKÇE'][:80]}", "cevap")
+            poz = self.durum.goruntu.pozisyon(poz["kimlik"])
+            if poz is None:
+                continue
+            if cevap["KARAR"] == "SAT" and cevap["GÜVEN"] >= min_guven:
+                ok, _ = self._emir(sembol, "SELL", poz["miktar"], fiyat, niyet=self._niyet(poz, "SAT"))
+                if ok:
+                    self.durum.pozisyon_kapat(poz["kimlik"], son_islem_zamani=datetime.now().strftime("%H:%M"))
+                    self.ozkaynak.olay(time.time(), toplam, "satim")
+                    self._islem_kaydet(poz, fiyat, poz["miktar"], "AI")
+                    self._bot_log(f"💸 SATIM: {sembol} @ ${fiyat:,.2f} — Kar: %{kar_pct*100:.2f}", "satim")
+                    self._log_db(f"AlSat SAT {sembol} AI", "bot")
+                    self._bildirim_gonder("📤 SATIM (AI Önerisi)", f"{sembol} @ ${fiyat:,.2f}\nKar: %{kar_pct*100:.2f}", 16776960)
+            elif cevap["KARAR"] == "SL_GÜNCELLE" and cevap.get("YENİ_SL"):
+                degisiklik = {"sl": cevap["YENİ_SL"]}
+                if cevap.get("YENİ_TP"):
+                    degisiklik["tp"] = cevap["YENİ_TP"]
+                poz = self.durum.pozisyon_guncelle(poz["kimlik"], degisiklik)
+                if poz is None:
+                    continue
+                self._bot_log(f"⏸️ SL/TP güncellendi: {sembol} → SL ${poz['sl']}", "bekle")
+                self._bildirim_gonder("📌 SL/TP Güncellendi", f"{sembol}\nYeni SL: ${poz['sl']}", 3447003)
+            elif cevap["KARAR"] == "KISMİ_SAT" and cevap.get("KISMİ_ORAN") and 0 < cevap["KISMİ_ORAN"] < 100:
+                # Kısmi satış: pozisyonun yüzdesini sat
+                sat_miktar = poz["miktar"] * cevap["KISMİ_ORAN"] / 100
+                if sat_miktar > 0:
+                    ok, dolum = self._emir(sembol, "SELL", sat_miktar, fiyat, niyet=self._niyet(poz, f"KISMI|{poz['miktar']}"))
+                    if ok:
+                        self._islem_kaydet(poz, dolum["ortalama_fiyat"] or fiyat, dolum["executedQty"], "KISMİ")
+                        kalan = poz["miktar"] - dolum["executedQty"]
+                        zaman = datetime.now().strftime("%H:%M")
+                        if kalan > 0:
+                            self.durum.pozisyon_guncelle(poz["kimlik"], {"miktar": kalan}, son_islem_zamani=zaman)
+                        else:
+                            self.durum.pozisyon_kapat(poz["kimlik"], son_islem_zamani=zaman)
+                        self.ozkaynak.olay(time.time(), toplam, "satim")
+                        self._bot_log(f"💸 KISMİ SATIM: {sembol} %{cevap['KISMİ_ORAN']} @ ${fiyat:,.2f}", "satim")
+                        self._bildirim_gonder("📊 Kısmi Satım", f"{sembol} %{cevap['KISMİ_ORAN']} @ ${fiyat:,.2f}", 16776960)
+
+    def _portfoy_tutarlari(self):
+        """Açık pozisyonlar → {sembol: güncel USDT değeri}."""
+        g = self.durum.goruntu
+        out = {}
+        for p in g.pozisyonlar:
+            fiyat = g.fiyatlar.get(p["sembol"]) or p["giris_fiyat"]
+            out[p["sembol"]] = out.get(p["sembol"], 0.0) + p["miktar"] * fiyat
+        return out
+
+    def _korelasyon_besle(self):
+        """Taramada güncellenen 1h mumlardan kovaryans motoruna yeni kapanmış barları aktar."""
+        seriler = {}
+        for sembol in SEMBOL_LISTESI:
+            m = MUM_DEPOSU.mumlar(sembol, "1h", kismi=False)
+            if m is not None and len(m):
+                seriler[sembol] = (m[:, ACILIS], m[:, KAPANIS])
+        t0 = time.perf_counter()
+        if self.korelasyon.seriden_guncelle(seriler):
+            METRIKLER.gozlem("korelasyon", time.perf_counter() - t0)
+
+    def _portfoy_riski(self, sembol, tutar=None):
+        """
+        Adayı açık pozisyonlarla korelasyon ve (tutar verilmişse) eklendikten sonraki günlük portföy
+        oynaklığına göre değerlendir — (ok, neden). Kontrol kapalıysa ya da veri yetersizse geçer.
+        """
+        if not self.config.get("korelasyon_kontrolu", True):
+            return True, ""
+        ok, neden, detay = self.korelasyon.kontrol(
+            sembol, tutar, self._portfoy_tutarlari(), ozkaynak=self.son_toplam or self.son_bakiye_usdt,
+            max_korelasyon=self.config.get("max_korelasyon", 0.85), max_vol_pct=self.config.get("max_portfoy_vol_pct", 3.0),
+        )
+        if detay["vol_sonra_pct"] is not None:
+            METRIKLER.gosterge("portfoy_vol_pct", round(detay["vol_sonra_pct"], 3))
+        return ok, neden
+
+    def _adaylari_sirala(self, adaylar):
+        """
+        Tarama sonucunu kaydet (özellik görüntüsü) ve AI'a sorulacak adayları seç: eğitilmiş
+        ön sıralayıcı varsa tek toplu çıkarımla en olası ilk K, yoksa el yazımı skorla ilk 5.
+        Açık pozisyonlarla fazla korele adaylar sıralamadan önce elenir (görüntü yine tümüyle kaydedilir).
+        """
+        if self.config.get("on_siralama", True):
+            conn = get_db()
+            try:
+                on_siralama.anlik_kaydet(conn, time.time(), [
+                    (s, a.get("fiyat"), sk, on_siralama.ozellik_vektoru(a, sk)) for s, sk, a in adaylar
+                ])
+            finally:
+                conn.close()
+        if self.acik_pozisyonlar:
+            uygun, elenen = [], []
+            for aday in adaylar:
+                ok, neden = self._portfoy_riski(aday[0])
+                if ok:
+                    uygun.append(aday)
+                else:
+                    elenen.append(f"{aday[0]} ({neden})")
+            if elenen:
+                self._bot_log("🔗 Korelasyon nedeniyle elendi: " + ", ".join(elenen), "bekle")
+            adaylar = uygun
+        if adaylar and self.config.get("on_siralama", True):
+            if self.on_siralayici.yukle():
+                t0 = time.perf_counter()
+                olasilik = self.on_siralayici.olasiliklar([a for _, _, a in adaylar], [sk for _, sk, _ in adaylar])
+                METRIKLER.gozlem("on_siralama", time.perf_counter() - t0)
+                min_olasilik = self.config.get("on_siralama_min_olasilik", 0.0)
+                sira = sorted(range(len(adaylar)), key=lambda i: -olasilik[i])
+                secilen = [adaylar[i] for i in sira[: max(1, int(self.config.get("on_siralama_top_k", 2)))] if olasilik[i] >= min_olasilik]
+                if secilen:
+                    self._bot_log("🧮 Ön sıralama: " + ", ".join(f"{adaylar[i][0]} p={olasilik[i]:.2f}" for i in sira[:len(secilen)]), "info")
+                return secilen
+        return sorted(adaylar, key=lambda x: -x[1])[:5]
+
+    def _gorev_tarama(self):
+        """Yeni alım — slot varsa evreni tara, en iyi adayları AI'a sor. Her sembol/aday arasında yield."""
+        risk_pct = self.config.get("risk_pct", 2) / 100.0
+        max_poz = self.config.get("max_pozisyon", 3)
+        min_guven = self.config.get("min_ai_guven", 7)
+        tp_pct = self.config.get("take_profit_pct", 3) / 100.0
+        sl_pct = self.config.get("stop_loss_pct", -2) / 100.0
+
+        if len(self.acik_pozisyonlar) >= max_poz or not self.son_bakiye_usdt or self.son_bakiye_usdt <= 15:
+            return
+        adaylar = []
+        for sembol in SEMBOL_LISTESI:
+            yield
+            if not self.bot_aktif:
+                return
+            analiz = yield from self._arka_planda(binance_gelismis_analiz, sembol)
+            adaylar.append((sembol, tarama_skoru(analiz), analiz))
+        self._korelasyon_besle()
+        secilenler = self._adaylari_sirala(adaylar)
+        for sembol, skor, analiz in secilenler:
+            yield
+            if not self.bot_aktif or len(self.acik_pozisyonlar) >= max_poz:
+                break
+            if self.durum.goruntu.sembolde_pozisyon(sembol):
+                continue
+            bakiye_usdt = self.son_bakiye_usdt
+            self._bot_log(f"🤖 AI Sorgusu: {sembol} için AL önerisi (skor {skor})", "soru")
+            prompt = self._ai_alim_prompt(sembol, analiz, bakiye_usdt=bakiye_usdt, acik_pozisyon_sayisi=len(self.acik_pozisyonlar), max_pozisyon=max_poz, risk_pct=risk_pct * 100)
+            _, cevap = yield from self._arka_planda(self._ai_sor, "alim", sembol, prompt, parse_ai_alim_cevap)
+            self._bot_log(f"✅ AI Cevap: {cevap['KARAR']} (Güven: {cevap['GÜVEN']}) — SL: {cevap['STOP_LOSS']} TP: {cevap['TAKE_PROFIT']}", "cevap")
+            if cevap["KARAR"] == "AL" and cevap["GÜVEN"] >= min_guven:
+                fiyat = analiz.get("fiyat") or binance_fiyat(sembol)
+                if not fiyat or fiyat <= 0:
+                    continue
+                # Stop önce belirlenir: AI'ın stopu, yüzde stoptan gevşekse yüzde stop (değerleme orada
+                # satar). Boyutlandırma riski bu stopa göre hesaplar; pozisyon aynı stopla açılır.
+                sl = fiyat * (1 + sl_pct)
+                if cevap.get("STOP_LOSS") and sl < cevap["STOP_LOSS"] < fiyat:
+                    sl = cevap["STOP_LOSS"]
+                harcanacak, boyut = self._pozisyon_tutari(fiyat, analiz, sl)
+                if harcanacak < 11:
+                    self._bot_log(f"⏭️ {sembol}: pozisyon tutarı ${harcanacak:,.2f} ({boyut}) minimumun altında", "bekle")
+                    continue
+                ok, neden = self._portfoy_riski(sembol, harcanacak)
+                if not ok:
+                    self._bot_log(f"⏭️ {sembol}: ${harcanacak:,.2f} alım portföy riski nedeniyle atlandı — {neden}", "bekle")
+                    continue
+                # Miktar LOT_SIZE/NOTIONAL'a göre emir motorunda normalize edilir
+                anahtar = niyet_anahtari()
+                ok, dolum = yield from self._derinlikli_alim(sembol, harcanacak, fiyat, niyet=f"AL|{anahtar}")
+                if ok:
+                    # Gerçekleşen dolum: ortalama fiyat, komisyon base varlıktan kesildiyse net miktar
+                    fiyat = dolum["ortalama_fiyat"] or fiyat
+                    base = sembol[:-4] if sembol.endswith("USDT") else sembol
+                    miktar = dolum["executedQty"] - dolum["komisyon"].get(base, 0.0)
+                    tp = cevap.get("TAKE_PROFIT") or fiyat * (1 + tp_pct)
+                    self.durum.pozisyon_ekle({
+                        "sembol": sembol,
+                        "miktar": miktar,
+                        "giris_fiyat": fiyat,
+                        "sl": sl,
+                        "tp": tp,
+                        "acilis_zamani": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                        "emir_anahtari": anahtar,
+                    }, fiyatlar={sembol: fiyat}, son_islem_zamani=datetime.now().strftime("%H:%M"))
+                    self.ozkaynak.olay(time.time(), self.son_toplam, "alim")
+                    self._bot_log(f"💰 ALIM: {sembol} @ ${fiyat:,.2f} — Miktar: {miktar} ({boyut})", "alim")
+                    self._log_db(f"AlSat AL {sembol} @ {fiyat}", "bot")
+                    self._bildirim_gonder("💰 ALIM", f"{sembol} @ ${fiyat:,.2f}\nMiktar: {miktar}\nSL: ${sl:,.2f} | TP: ${tp:,.2f}", 3066993)
+                    if self.zamanlayici is not None:
+                        self.zamanlayici.tetikle("dashboard")
+                    break
+
+    def _gorev_dashboard(self):
+        """Dashboard kartları + grafik; ağ çağrısı yapmaz, değerleme görevinin önbelleğini kullanır."""
+        g = self.durum.goruntu
+        METRIKLER.gosterge("durum_surumu", g.surum)
+        METRIKLER.gosterge("acik_pozisyon", len(g.pozisyonlar))
+        self._dashboard_guncelle(g)
+        imza = self.ozkaynak.surum
+        if imza != self._son_grafik_imza:
+            self._son_grafik_imza = imza
+            self._ui_after(self._grafik_ciz)
 
     def run(self):
         self.root.mainloop()
 
 
+def piyasa_servisi_calistir(soket_yolu=None):
+    """
+    Ortak piyasa verisi servisi: fiyat, 24s ticker, kline ve TradingView çekimlerini bu süreç
+    yapar (kendi ağırlık kovasıyla); aynı makinedeki bot örnekleri soket / paylaşımlı tablo ile okur.
+    """
+    PIYASA.etkin = False  # servisin kendi çekimleri kendine yönlenmesin
+    AGIRLIK.limit = int(load_config().get("binance_agirlik_limiti", 6000))
+
+    def tv(sembol, fiyat):
+        if not HAS_TA:
+            return None
+        d = {}
+        _tradingview_gostergeleri(sembol, fiyat, d)
+        return d
+
+    PiyasaSunucusu(
+        {"fiyatlar": binance_fiyatlar, "ticker": binance_24h_ticker, "klines": binance_klines, "tv": tv},
+        soket_yolu or PIYASA.soket_yolu, semboller=SEMBOL_LISTESI, log=print,
+    ).calistir()
+
+
 if __name__ == "__main__":
-    app = BorsaAlSatBot()
-    app.run()
+    import argparse
+    ap = argparse.ArgumentParser(description="Borsa AlSat Bot")
+    ap.add_argument("--piyasa-servisi", action="store_true", help="Arayüz yerine ortak piyasa verisi servisini çalıştır")
+    ap.add_argument("--soket", help="Piyasa servisi soket yolu (varsayılan: BORSA_PIYASA_SOKET, $XDG_RUNTIME_DIR ya da geçici dizinde kullanıcıya özel alt dizin)")
+    args = ap.parse_args()
+    if args.piyasa_servisi:
+        piyasa_servisi_calistir(args.soket)
+    else:
+        app = BorsaAlSatBot()
+        app.run()
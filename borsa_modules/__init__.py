@@ -0,0 +1 @@
+# borsa_modules package
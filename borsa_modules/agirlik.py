@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Binance REQUEST_WEIGHT için istemci tarafı ağırlık kovası.
+Binance IP başına dakikalık ağırlık sayar (dakika sınırında sıfırlanır) ve her cevapta
+`X-MBX-USED-WEIGHT-1M` ile o ana kadarki kullanımı bildirir; sınır aşılınca 429 +
+`Retry-After`, ısrar edilirse 418 (IP yasağı) döner. Yasak emirleri de durdurduğu için
+istekler öncelik şeritlerinden geçer: her şerit dakikalık sınırın yalnızca kendi payına
+kadar harcayabilir (analiz %60, piyasa verisi %80, hesap %90, emir %100), böylece tepede
+her zaman emir/iptal için yer kalır. Pay doluysa istek kısa süre bekler, pencere o süre
+içinde açılmıyorsa düşürülür (gönderilmez). Daha öncelikli şeritte bekleyen varsa
+alttakiler sıraya girer. Sunucunun bildirdiği kullanım yereldeki sayımdan büyükse
+esas alınır (aynı IP'yi paylaşan başka süreçler).
+"""
+
+import threading
+import time
+
+# Düşük sayı = yüksek öncelik
+SERIT_EMIR = 0
+SERIT_HESAP = 1
+SERIT_PIYASA = 2
+SERIT_ANALIZ = 3
+SERIT_ADLARI = {SERIT_EMIR: "emir", SERIT_HESAP: "hesap", SERIT_PIYASA: "piyasa", SERIT_ANALIZ: "analiz"}
+
+VARSAYILAN_LIMIT = 6000  # spot REQUEST_WEIGHT / dakika
+PAYLAR = {SERIT_EMIR: 1.0, SERIT_HESAP: 0.9, SERIT_PIYASA: 0.8, SERIT_ANALIZ: 0.6}
+# Pay doluyken en fazla bu kadar saniye beklenir; aşılırsa istek düşürülür
+BEKLEMELER = {SERIT_EMIR: 5.0, SERIT_HESAP: 5.0, SERIT_PIYASA: 1.0, SERIT_ANALIZ: 0.5}
+
+PENCERE_SN = 60
+YASAK_418_SN = 120  # Retry-After gelmezse
+KULLANIM_BASLIKLARI = ("X-MBX-USED-WEIGHT-1M", "X-MBX-USED-WEIGHT")
+
+# (method, uç) -> ağırlık; listede olmayan uçlar 1 sayılır
+_SABIT_AGIRLIKLAR = {
+    ("GET", "/api/v3/klines"): 2,
+    ("GET", "/api/v3/exchangeInfo"): 20,
+    ("GET", "/api/v3/account"): 20,
+    ("GET", "/api/v3/myTrades"): 20,
+    ("GET", "/api/v3/order"): 4,
+    ("POST", "/api/v3/order"): 1,
+    ("DELETE", "/api/v3/order"): 1,
+    ("POST", "/api/v3/userDataStream"): 2,
+    ("PUT", "/api/v3/userDataStream"): 2,
+    ("DELETE", "/api/v3/userDataStream"): 2,
+}
+
+
+def istek_agirligi(method, uc, params=None):
+    """Binance dokümanındaki ağırlık tablosuna göre isteğin tahmini ağırlığı."""
+    params = params or {}
+    if uc == "/api/v3/ticker/price":
+        return 2 if "symbol" in params else 4
+    if uc == "/api/v3/ticker/24hr":
+        if "symbol" in params:
+            return 2
+        n = params["symbols"].count(",") + 1 if "symbols" in params else None
+        return 80 if n is None or n > 100 else 40 if n > 20 else 2
+    if uc == "/api/v3/depth":
+        limit = int(params.get("limit", 100))
+        return 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+    if uc == "/api/v3/openOrders":
+        return 6 if "symbol" in params else 80
+    return _SABIT_AGIRLIKLAR.get((method.upper(), uc), 1)
+
+
+class AgirlikKovasi:
+    """
+      kova = AgirlikKovasi(limit=6000, metrikler=METRIKLER)
+      if kova.al(istek_agirligi("GET", uc, p), SERIT_ANALIZ):
+          r = requests.get(...); kova.guncelle(r.status_code, r.headers)
+    """
+
+    def __init__(self, limit=VARSAYILAN_LIMIT, paylar=None, beklemeler=None, saat=time.time, metrikler=None):
+        self.limit = int(limit)
+        self.paylar = dict(PAYLAR, **(paylar or {}))
+        self.beklemeler = dict(BEKLEMELER, **(beklemeler or {}))
+        self.saat = saat
+        self.metrikler = metrikler
+        self._kosul = threading.Condition()
+        self._pencere = None
+        self._kullanilan = 0
+        self._sunucu = 0
+        self._yasak_bitis = 0.0
+        self._bekleyen = {s: 0 for s in SERIT_ADLARI}
+        self.sayaclar = {"gecti": 0, "bekledi": 0, "dusuruldu": 0, "429": 0, "418": 0}
+
+    # ---------- iç ----------
+    def _pencere_yenile(self, simdi):
+        p = int(simdi // PENCERE_SN)
+        if p != self._pencere:
+            self._pencere, self._kullanilan, self._sunucu = p, 0, 0
+
+    def _engel(self, simdi, agirlik, serit):
+        """Şimdi geçemiyorsa en erken yeniden denenecek an; geçebiliyorsa None."""
+        if self._yasak_bitis > simdi:
+            return self._yasak_bitis
+        if any(self._bekleyen[s] for s in SERIT_ADLARI if s < serit):
+            return simdi + 0.05  # üst şerit çıkınca notify ile uyanılır
+        if self._kullanilan + agirlik > self.limit * self.paylar[serit]:
+            return (self._pencere + 1) * PENCERE_SN
+        return None
+
+    def _gosterge(self):
+        if self.metrikler is not None:
+            self.metrikler.gosterge("binance_agirlik_kullanilan", self._kullanilan)
+            self.metrikler.gosterge("binance_agirlik_limiti", self.limit)
+
+    # ---------- API ----------
+    def al(self, agirlik, serit=SERIT_ANALIZ, bekleme=None):
+        """Ağırlığı rezerve et. Pay/yasak bekleme süresi içinde açılmazsa False (istek gönderilmemeli)."""
+        bekleme = self.beklemeler[serit] if bekleme is None else bekleme
+        with self._kosul:
+            simdi = self.saat()
+            bitis = simdi + bekleme
+            bekledi = False
+            self._bekleyen[serit] += 1
+            try:
+                while True:
+                    self._pencere_yenile(simdi)
+                    engel = self._engel(simdi, agirlik, serit)
+                    if engel is None:
+                        self._kullanilan += agirlik
+                        self.sayaclar["bekledi" if bekledi else "gecti"] += 1
+                        self._gosterge()
+                        return True
+                    if engel > bitis:
+                        self.sayaclar["dusuruldu"] += 1
+                        if self.metrikler is not None:
+                            self.metrikler.say("binance_agirlik_dusen", serit=SERIT_ADLARI[serit])
+                        return False
+                    bekledi = True
+                    self._kosul.wait(max(0.001, engel - simdi))
+                    simdi = self.saat()
+            finally:
+                self._bekleyen[serit] -= 1
+                self._kosul.notify_all()
+
+    def guncelle(self, durum_kodu, basliklar):
+        """Cevap başlıklarından kullanımı ve 429/418 yasak süresini işle."""
+        with self._kosul:
+            simdi = self.saat()
+            self._pencere_yenile(simdi)
+            for ad in KULLANIM_BASLIKLARI:
+                deger = basliklar.get(ad) if basliklar is not None else None
+                if deger is not None:
+                    try:
+                        self._sunucu = int(deger)
+                    except ValueError:
+                        break
+                    self._kullanilan = max(self._kullanilan, self._sunucu)
+                    break
+            if durum_kodu in (429, 418):
+                self.sayaclar[str(durum_kodu)] += 1
+                try:
+                    sure = float((basliklar or {}).get("Retry-After"))
+                except (TypeError, ValueError):
+                    sure = YASAK_418_SN if durum_kodu == 418 else (self._pencere + 1) * PENCERE_SN - simdi
+                self._yasak_bitis = max(self._yasak_bitis, simdi + sure)
+                if self.metrikler is not None:
+                    self.metrikler.say("binance_agirlik_yasak", kod=durum_kodu)
+            self._gosterge()
+            self._kosul.notify_all()
+
+    def durum(self):
+        """İzleme için anlık görünüm."""
+        with self._kosul:
+            simdi = self.saat()
+            self._pencere_yenile(simdi)
+            return {
+                "kullanilan": self._kullanilan,
+                "sunucu": self._sunucu,
+                "limit": self.limit,
+                "oran": self._kullanilan / self.limit if self.limit else 0.0,
+                "yasak_kalan_sn": max(0.0, self._yasak_bitis - simdi),
+                "pencere_kalan_sn": (self._pencere + 1) * PENCERE_SN - simdi,
+                **self.sayaclar,
+            }
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+AI karar arşivi: her prompt / ham cevap çifti SQLite'ta saklanır. Metinler içerik
+özetine (BLAKE2b-128) göre tekilleştirilir ve zlib ile sıkıştırılır — aynı prompt ya da
+aynı cevap tekrar yazılmaz. `ai_karar` satırları sembol / zaman / model indeksli olup
+metinlere özetle bağlanır.
+
+Çevrimdışı yeniden oynatma (canlı API'ye gidilmez):
+    python -m borsa_modules.ai_arsivi istatistik
+    python -m borsa_modules.ai_arsivi ayristir [--sembol BTCUSDT] [--gun 30]
+        Arşivdeki cevapları güncel parse_ai_*_cevap ile yeniden ayrıştırır; kayıttaki
+        karar/güvenden farklılaşanları ve AL kararlarının gerçekleşen işlem sonucunu verir.
+    python -m borsa_modules.ai_arsivi calistir --model openai/gpt-4-turbo [--url URL]
+        Arşivdeki promptları başka bir modele sorar; URL verilmezse yerel stand-in.
+"""
+
+import hashlib
+import os
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+
+SIKISTIRMA_SEVIYESI = 6
+
+
+def sema_kur(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ai_metin (
+            ozet BLOB PRIMARY KEY,
+            boyut INTEGER NOT NULL,
+            veri BLOB NOT NULL
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ai_karar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tarih_saat TEXT NOT NULL,
+            tur TEXT NOT NULL,
+            sembol TEXT,
+            model TEXT,
+            prompt_ozet BLOB NOT NULL,
+            cevap_ozet BLOB,
+            sure_ms REAL,
+            karar TEXT,
+            guven INTEGER
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_karar_sembol ON ai_karar(sembol, tarih_saat)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_karar_model ON ai_karar(model, tarih_saat)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_karar_tarih ON ai_karar(tarih_saat)")
+
+
+def ozet(metin):
+    return hashlib.blake2b(metin.encode("utf-8"), digest_size=16).digest()
+
+
+def metin_yaz(conn, metin):
+    """Metni (yoksa) sıkıştırıp yaz; özetini döndür. Boş metin → None."""
+    if not metin:
+        return None
+    h = ozet(metin)
+    ham = metin.encode("utf-8")
+    conn.execute("INSERT OR IGNORE INTO ai_metin (ozet, boyut, veri) VALUES (?,?,?)",
+                 (h, len(ham), zlib.compress(ham, SIKISTIRMA_SEVIYESI)))
+    return h
+
+
+def metin_oku(conn, h):
+    if h is None:
+        return ""
+    satir = conn.execute("SELECT veri FROM ai_metin WHERE ozet = ?", (h,)).fetchone()
+    return zlib.decompress(satir[0]).decode("utf-8") if satir else ""
+
+
+def kaydet(conn, tur, sembol, model, prompt, cevap, sure_ms=None, karar=None, guven=None, tarih_saat=None):
+    """Bir AI çağrısını arşivle (tek işlem). tur: 'alim' / 'satim'."""
+    tarih_saat = tarih_saat or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute(
+        "INSERT INTO ai_karar (tarih_saat, tur, sembol, model, prompt_ozet, cevap_ozet, sure_ms, karar, guven) VALUES (?,?,?,?,?,?,?,?,?)",
+        (tarih_saat, tur, sembol, model, metin_yaz(conn, prompt), metin_yaz(conn, cevap),
+         None if sure_ms is None else round(sure_ms, 1), karar, guven),
+    )
+    conn.commit()
+
+
+def kararlar(conn, sembol=None, model=None, tur=None, baslangic=None, bitis=None, limit=None):
+    """Filtreli arşiv kayıtları (eskiden yeniye), prompt/cevap açılmış sözlükler olarak."""
+    kosullar, params = [], []
+    for sutun, deger in (("sembol", sembol), ("model", model), ("tur", tur)):
+        if deger:
+            kosullar.append(f"{sutun} = ?")
+            params.append(deger)
+    if baslangic:
+        kosullar.append("tarih_saat >= ?")
+        params.append(baslangic)
+    if bitis:
+        kosullar.append("tarih_saat <= ?")
+        params.append(bitis)
+    sql = "SELECT id, tarih_saat, tur, sembol, model, prompt_ozet, cevap_ozet, sure_ms, karar, guven FROM ai_karar"
+    if kosullar:
+        sql += " WHERE " + " AND ".join(kosullar)
+    sql += " ORDER BY id"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    for r in conn.execute(sql, params).fetchall():
+        yield {"id": r[0], "tarih_saat": r[1], "tur": r[2], "sembol": r[3], "model": r[4],
+               "prompt": metin_oku(conn, r[5]), "cevap": metin_oku(conn, r[6]),
+               "sure_ms": r[7], "karar": r[8], "guven": r[9]}
+
+
+def istatistik(conn):
+    kayit = conn.execute("SELECT COUNT(*) FROM ai_karar").fetchone()[0]
+    metin, ham, sikisik = conn.execute("SELECT COUNT(*), COALESCE(SUM(boyut),0), COALESCE(SUM(LENGTH(veri)),0) FROM ai_metin").fetchone()
+    # Tekilleştirme olmasaydı yazılacak ham bayt: her karar kendi prompt + cevabını taşırdı
+    mantiksal = conn.execute("""
+        SELECT COALESCE(SUM(p.boyut),0) + COALESCE(SUM(c.boyut),0) FROM ai_karar k
+        JOIN ai_metin p ON p.ozet = k.prompt_ozet LEFT JOIN ai_metin c ON c.ozet = k.cevap_ozet
+    """).fetchone()[0]
+    return {"karar": kayit, "tekil_metin": metin, "mantiksal_bayt": mantiksal, "ham_bayt": ham, "sikisik_bayt": sikisik,
+            "oran": round(mantiksal / sikisik, 1) if sikisik else None}
+
+
+def gerceklesen_islem(conn, sembol, tarih_saat, pencere_dk=10):
+    """AL kararından sonraki `pencere_dk` içinde açılmış (kapanmış) işlemin getirisi (%) — yoksa None."""
+    t = datetime.strptime(tarih_saat, "%Y-%m-%d %H:%M:%S")
+    r = conn.execute(
+        "SELECT giris_fiyat, SUM(cikis_fiyat * miktar) / SUM(miktar) FROM islemler "
+        "WHERE sembol = ? AND giris_tarih >= ? AND giris_tarih <= ? GROUP BY giris_tarih, giris_fiyat ORDER BY giris_tarih LIMIT 1",
+        (sembol, t.strftime("%Y-%m-%d %H:%M"), (t + timedelta(minutes=pencere_dk)).strftime("%Y-%m-%d %H:%M")),
+    ).fetchone()
+    if not r or not r[0] or r[1] is None:
+        return None
+    return (r[1] / r[0] - 1) * 100
+
+
+def yeniden_ayristir(conn, ayristiricilar, **filtre):
+    """
+    ayristiricilar: {'alim': parse_ai_alim_cevap, 'satim': parse_ai_satim_cevap}.
+    Her kayıt için (kayıt, yeni ayrıştırma, değişti mi, gerçekleşen getiri %) üretir.
+    """
+    for k in kararlar(conn, **filtre):
+        fonk = ayristiricilar.get(k["tur"])
+        if fonk is None:
+            continue
+        yeni = fonk(k["cevap"])
+        degisti = (yeni["KARAR"], yeni["GÜVEN"]) != (k["karar"], k["guven"])
+        getiri = gerceklesen_islem(conn, k["sembol"], k["tarih_saat"]) if k["tur"] == "alim" and k["karar"] == "AL" else None
+        yield k, yeni, degisti, getiri
+
+
+def yeniden_calistir(conn, sor_fonk, hedef_model, ayristiricilar, **filtre):
+    """Arşiv promptlarını `hedef_model` ile yeniden sor: (kayıt, yeni ayrıştırma) üretir. sor_fonk(model, prompt) -> metin."""
+    for k in kararlar(conn, **filtre):
+        fonk = ayristiricilar.get(k["tur"])
+        if fonk is None or not k["prompt"]:
+            continue
+        yield k, fonk(sor_fonk(hedef_model, k["prompt"]))
+
+
+def _komut(ap, args, conn, kok):
+    """main'in komut dağıtımı; bağlantıyı main kapatır."""
+    import sys
+    if args.komut == "istatistik":
+        for k, v in istatistik(conn).items():
+            print(f"{k:<16}{v}")
+        return
+    sys.path.insert(0, kok)
+    import borsa  # ayrıştırıcılar ve openrouter_ask
+    ayristiricilar = {"alim": borsa.parse_ai_alim_cevap, "satim": borsa.parse_ai_satim_cevap}
+    filtre = {"sembol": args.sembol, "model": args.kaynak_model, "tur": args.tur, "limit": args.limit,
+              "baslangic": (datetime.now() - timedelta(days=args.gun)).strftime("%Y-%m-%d %H:%M:%S")}
+    if args.komut == "ayristir":
+        n = degisen = 0
+        getiriler = []
+        for k, yeni, degisti, getiri in yeniden_ayristir(conn, ayristiricilar, **filtre):
+            n += 1
+            if degisti:
+                degisen += 1
+                print(f"#{k['id']} {k['tarih_saat']} {k['sembol']} {k['model']}: {k['karar']}/{k['guven']} → {yeni['KARAR']}/{yeni['GÜVEN']}")
+            if getiri is not None:
+                getiriler.append(getiri)
+        print(f"{n} karar yeniden ayrıştırıldı, {degisen} farklı")
+        if getiriler:
+            print(f"AL → işlem: {len(getiriler)}, ort. getiri %{sum(getiriler) / len(getiriler):+.2f}, "
+                  f"isabet %{sum(g > 0 for g in getiriler) / len(getiriler) * 100:.0f}")
+        return
+    if not args.model:
+        ap.error("calistir için --model gerekli")
+    sunucu = None
+    if args.url:
+        borsa.OPENROUTER_URL = args.url
+    else:
+        from borsa_modules.stand_in import StandInSunucu
+        sunucu = StandInSunucu()
+        borsa.OPENROUTER_URL = f"{sunucu.baslat()}/openrouter/chat/completions"
+    try:
+        matris = {}
+        for k, yeni in yeniden_calistir(conn, lambda m, p: borsa.openrouter_ask(args.api_key, m, p), args.model, ayristiricilar, **filtre):
+            anahtar = (k["karar"], yeni["KARAR"])
+            matris[anahtar] = matris.get(anahtar, 0) + 1
+        toplam = sum(matris.values())
+        ayni = sum(v for (a, b), v in matris.items() if a == b)
+        print(f"{toplam} prompt {args.model} ile yeniden soruldu; aynı karar: {ayni} (%{ayni / toplam * 100 if toplam else 0:.0f})")
+        for (a, b), v in sorted(matris.items(), key=lambda x: -x[1]):
+            print(f"  {a or '—':<6} → {b:<6} {v}")
+    finally:
+        if sunucu:
+            sunucu.durdur()
+
+
+def main(argv=None):
+    import argparse
+    kok = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description="AI karar arşivi — istatistik / çevrimdışı yeniden oynatma")
+    ap.add_argument("komut", choices=["istatistik", "ayristir", "calistir"])
+    ap.add_argument("--db", default=os.path.join(kok, "borsa.db"))
+    ap.add_argument("--sembol")
+    ap.add_argument("--kaynak-model", help="Yalnızca bu modelin arşiv kayıtları")
+    ap.add_argument("--tur", choices=["alim", "satim"])
+    ap.add_argument("--gun", type=int, default=30)
+    ap.add_argument("--limit", type=int)
+    ap.add_argument("--model", help="calistir: promptların sorulacağı model")
+    ap.add_argument("--url", help="calistir: OpenRouter uyumlu uç (verilmezse yerel stand-in)")
+    ap.add_argument("--api-key", default=os.getenv("OPENROUTER_API_KEY", "yeniden-oynatma"), help="calistir --url ile")
+    args = ap.parse_args(argv)
+    conn = sqlite3.connect(args.db)
+    try:
+        sema_kur(conn)
+        _komut(ap, args, conn, kok)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Açık pozisyonlar için AI yeniden değerlendirme kapısı (değişim tespiti).
+Her pozisyon (kimliğiyle; aynı sembolde yeniden açılan pozisyon eskisini devralmaz) için
+AI'ın son gördüğü özellik anlık görüntüsü saklanır; AI yalnızca
+anlamlı bir değişim olduğunda (sinyal dönüşü, RSI/MACD eşik geçişi, ATR ölçekli fiyat
+bandı aşımı) ya da görüntü çok eskidiğinde yeniden sorgulanır.
+"""
+
+import time
+
+SINYAL_ANAHTARLARI = ("sinyal_15m", "sinyal_1h", "sinyal_4h", "sinyal_1d")
+
+
+class AIKapisi:
+    def __init__(self, rsi_esikleri=(30, 50, 70), atr_carpani=1.0, fiyat_bandi_pct=1.0, max_yas_sn=1800):
+        self.rsi_esikleri = tuple(rsi_esikleri)
+        self.atr_carpani = atr_carpani
+        self.fiyat_bandi_pct = fiyat_bandi_pct
+        self.max_yas_sn = max_yas_sn
+        self._anlik = {}
+
+    @staticmethod
+    def _goruntu(analiz, simdi):
+        return {
+            "zaman": simdi,
+            "fiyat": analiz.get("fiyat"),
+            "atr": analiz.get("atr"),
+            "rsi_1h": analiz.get("rsi_1h"),
+            "macd_hist_1h": analiz.get("macd_hist_1h"),
+            "trend_genel": analiz.get("trend_genel"),
+            "momentum": analiz.get("momentum"),
+            **{k: analiz.get(k) for k in SINYAL_ANAHTARLARI},
+        }
+
+    def bant(self, goruntu):
+        """Yeniden sorgu için fiyat bandı (fiyat birimi): ATR * çarpan, ATR yoksa fiyatın yüzdesi."""
+        if goruntu.get("atr"):
+            return goruntu["atr"] * self.atr_carpani
+        return (goruntu.get("fiyat") or 0) * self.fiyat_bandi_pct / 100.0
+
+    def degerlendir(self, kimlik, analiz, simdi=None):
+        """(sor, neden) döndür. sor=False ise son AI kararı hâlâ geçerli sayılır."""
+        simdi = time.time() if simdi is None else simdi
+        eski = self._anlik.get(kimlik)
+        if eski is None:
+            return True, "ilk değerlendirme"
+        yas = simdi - eski["zaman"]
+        if yas >= self.max_yas_sn:
+            return True, f"azami yaş aşıldı ({int(yas)} sn)"
+        for k in SINYAL_ANAHTARLARI:
+            if analiz.get(k) != eski.get(k) and analiz.get(k) not in (None, "—"):
+                return True, f"{k} {eski.get(k)}→{analiz.get(k)}"
+        for k in ("trend_genel", "momentum"):
+            if analiz.get(k) != eski.get(k) and analiz.get(k) is not None and eski.get(k) is not None:
+                return True, f"{k} {eski.get(k)}→{analiz.get(k)}"
+        rsi_eski, rsi_yeni = eski.get("rsi_1h"), analiz.get("rsi_1h")
+        if rsi_eski is not None and rsi_yeni is not None:
+            for esik in self.rsi_esikleri:
+                if (rsi_eski - esik) * (rsi_yeni - esik) < 0:
+                    return True, f"RSI 1h {esik} eşiğini geçti ({rsi_eski}→{rsi_yeni})"
+        macd_eski, macd_yeni = eski.get("macd_hist_1h"), analiz.get("macd_hist_1h")
+        if macd_eski is not None and macd_yeni is not None and (macd_eski > 0) != (macd_yeni > 0):
+            return True, f"MACD hist 1h işaret değiştirdi ({macd_eski}→{macd_yeni})"
+        fiyat_eski, fiyat_yeni = eski.get("fiyat"), analiz.get("fiyat")
+        bant = self.bant(eski)
+        if fiyat_eski and fiyat_yeni:
+            hareket = abs(fiyat_yeni - fiyat_eski)
+            if bant and hareket > bant:
+                return True, f"fiyat bandı aşıldı ({hareket:.6g} > {bant:.6g})"
+            return False, f"değişim yok (fiyat hareketi {hareket:.6g} / bant {bant:.6g}, yaş {int(yas)} sn)"
+        return False, f"değişim yok (yaş {int(yas)} sn)"
+
+    def kaydet(self, kimlik, analiz, simdi=None):
+        """AI'ın gördüğü analizi pozisyonun yeni referansı olarak sakla."""
+        self._anlik[kimlik] = self._goruntu(analiz, time.time() if simdi is None else simdi)
+
+    def unut(self, kimlik):
+        self._anlik.pop(kimlik, None)
+
+    def temizle(self, aktif_kimlikler):
+        """Artık açık olmayan pozisyonların görüntülerini at."""
+        for k in list(self._anlik):
+            if k not in aktif_kimlikler:
+                del self._anlik[k]
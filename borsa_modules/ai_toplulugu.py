@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Çok modelli AI kararı: aynı prompt birden çok modele paralel gönderilir, KARAR alanında
+`kuorum` kadar model uzlaştığı anda karar verilir — yavaş modeller beklenmez. Kalan
+istekler durdurulmaz (HTTP çağrıları kendi zaman aşımlarına kadar arka plan thread'inde
+sürer); yalnızca cevapları yok sayılır. Her modelin kendi zaman aşımı vardır; zaman aşımına
+uğrayan, boş dönen ya da KARAR alanı ayrıştırılamayan model oy vermemiş sayılır. Kuorum
+sağlanamazsa karar temkinli tarafa (BEKLE) düşer.
+
+Her oy (model, karar, güven, süre, durum, nihai karar) `ai_oylar` tablosuna yazılır;
+model bazlı gecikme ve uzlaşma oranı buradan okunur:
+    python -m borsa_modules.ai_toplulugu [--db borsa.db] [--gun 7]
+"""
+
+import os
+import queue
+import re
+import sqlite3
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+VARSAYILAN_MODELLER = [
+    "anthropic/claude-3.5-sonnet",
+    "openai/gpt-4-turbo",
+    "meta-llama/llama-3.1-70b-instruct",
+]
+TEMKINLI_KARAR = "BEKLE"
+# Uzlaşan cevaplarda ortanca alınan sayısal alanlar; diğerleri en hızlı uzlaşan cevaptan
+_SAYISAL = ("GÜVEN", "STOP_LOSS", "TAKE_PROFIT", "YENİ_SL", "YENİ_TP", "KISMİ_ORAN")
+
+
+def sema_kur(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ai_oylar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tarih_saat TEXT,
+            tur TEXT,
+            sembol TEXT,
+            model TEXT,
+            karar TEXT,
+            guven INTEGER,
+            sure_ms REAL,
+            durum TEXT,
+            nihai TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_oylar_tarih ON ai_oylar(tarih_saat)")
+
+
+def _birlestir(cevaplar):
+    """Uzlaşan (ayrıştırılmış) cevaplar → tek cevap: sayısallarda ortanca, metinlerde ilk cevap."""
+    out = dict(cevaplar[0])
+    for k in _SAYISAL:
+        degerler = [c[k] for c in cevaplar if isinstance(c.get(k), (int, float))]
+        if degerler:
+            orta = statistics.median(degerler)
+            out[k] = int(round(orta)) if k == "GÜVEN" else orta
+    return out
+
+
+class AITopluluk:
+    """
+      t = AITopluluk(lambda k, m, p, sn: openrouter_ask(k, m, p, timeout=sn), modeller, kuorum=2, zaman_asimi=30)
+      cevap_text, cevap, oylar = t.karar_ver(api_key, prompt, parse_ai_alim_cevap)
+
+    sor_fonk(api_key, model, prompt, timeout) -> metin ("" = başarısız).
+    oylar: [{model, karar, guven, sure_ms, durum[, metin]}] — durum: uyumlu / aykiri / kuorumsuz / zaman_asimi / hata / iptal
+    """
+
+    def __init__(self, sor_fonk, modeller=None, kuorum=2, zaman_asimi=30.0, zaman_asimlari=None, metrikler=None):
+        self.sor_fonk = sor_fonk
+        self.modeller = list(modeller or VARSAYILAN_MODELLER)
+        self.kuorum = max(1, min(int(kuorum), len(self.modeller)))
+        self.zaman_asimi = float(zaman_asimi)
+        self.zaman_asimlari = dict(zaman_asimlari or {})
+        self.metrikler = metrikler
+
+    def _sor(self, api_key, model, prompt, iptal, sonuclar):
+        t0 = time.perf_counter()
+        try:
+            metin = self.sor_fonk(api_key, model, prompt, self.zaman_asimlari.get(model, self.zaman_asimi))
+        except Exception:
+            metin = ""
+        if not iptal.is_set():  # karar verildikten sonra gelen cevap yok sayılır
+            sonuclar.put((model, metin, time.perf_counter() - t0))
+
+    def karar_ver(self, api_key, prompt, ayristir):
+        """(kazanan cevap metni, birleşik ayrıştırılmış cevap, oylar) döner."""
+        # Her çağrı kendi daemon thread'lerinde: önceki turun geciken istekleri yenisini bekletmez
+        iptal = threading.Event()
+        sonuclar = queue.Queue()
+        bas = time.monotonic()
+        son_an = {m: bas + self.zaman_asimlari.get(m, self.zaman_asimi) for m in self.modeller}
+        for m in self.modeller:
+            threading.Thread(target=self._sor, args=(api_key, m, prompt, iptal, sonuclar), daemon=True, name=f"ai-{m}").start()
+        bekleyen = set(self.modeller)
+        gelen = []  # (model, metin, ayrıştırılmış, süre) — geliş sırasıyla
+        oylar = {}
+        kazanan = None
+        while bekleyen and kazanan is None:
+            simdi = time.monotonic()
+            for m in [m for m in bekleyen if simdi >= son_an[m]]:
+                # Zaman aşımı dolan model artık beklenmez
+                oylar[m] = {"model": m, "karar": None, "guven": None, "sure_ms": (simdi - bas) * 1000, "durum": "zaman_asimi"}
+                bekleyen.discard(m)
+            if not bekleyen:
+                break
+            try:
+                model, metin, sure = sonuclar.get(timeout=min(son_an[m] for m in bekleyen) - simdi)
+            except queue.Empty:
+                continue
+            bekleyen.discard(model)
+            if not metin:
+                oylar[model] = {"model": model, "karar": None, "guven": None, "sure_ms": sure * 1000, "durum": "hata"}
+                continue
+            cevap = ayristir(metin)
+            if not re.search(r"KARAR\s*:\s*" + re.escape(cevap["KARAR"]), metin, re.I):
+                # Ayrıştırıcı KARAR bulamayınca varsayılana (BEKLE) düşer — bu bir oy değil
+                oylar[model] = {"model": model, "karar": None, "guven": None, "sure_ms": sure * 1000, "durum": "hata", "metin": metin}
+                continue
+            gelen.append((model, metin, cevap, sure))
+            oylar[model] = {"model": model, "karar": cevap["KARAR"], "guven": cevap.get("GÜVEN"), "sure_ms": sure * 1000, "metin": metin}
+            ayni = [g for g in gelen if g[2]["KARAR"] == cevap["KARAR"]]
+            if len(ayni) >= self.kuorum:
+                kazanan = ayni
+        iptal.set()
+        for m in bekleyen:
+            oylar[m] = {"model": m, "karar": None, "guven": None, "sure_ms": (time.monotonic() - bas) * 1000, "durum": "iptal"}
+        if kazanan:
+            nihai = kazanan[0][2]["KARAR"]
+            metin, cevap = kazanan[0][1], _birlestir([g[2] for g in kazanan])
+            cevap["GEREKÇE"] = f"[{len(kazanan)}/{len(self.modeller)} uzlaştı] " + (cevap.get("GEREKÇE") or "")
+        else:
+            nihai = TEMKINLI_KARAR
+            metin = gelen[0][1] if gelen else ""
+            cevap = ayristir("")
+            dagilim = ", ".join(f"{g[0]}: {g[2]['KARAR']}" for g in gelen) or "cevap yok"
+            cevap["GEREKÇE"] = f"Kuorum sağlanamadı ({dagilim})"
+        for o in oylar.values():
+            if "durum" not in o:
+                o["durum"] = "kuorumsuz" if not kazanan else "uyumlu" if o["karar"] == nihai else "aykiri"
+            self._olc(o)
+        return metin, cevap, [oylar[m] for m in self.modeller if m in oylar]
+
+    def _olc(self, oy):
+        if self.metrikler is None:
+            return
+        if oy["durum"] in ("uyumlu", "aykiri", "kuorumsuz", "hata"):
+            self.metrikler.gozlem(f"ai:{oy['model']}", oy["sure_ms"] / 1000, oy["durum"] == "hata")
+        self.metrikler.say("ai_oy", model=oy["model"], durum=oy["durum"])
+
+
+def oylari_kaydet(conn, tur, sembol, oylar, nihai):
+    tarih = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO ai_oylar (tarih_saat, tur, sembol, model, karar, guven, sure_ms, durum, nihai) VALUES (?,?,?,?,?,?,?,?,?)",
+        [(tarih, tur, sembol, o["model"], o["karar"], o["guven"], round(o["sure_ms"], 1), o["durum"], nihai) for o in oylar],
+    )
+    conn.commit()
+
+
+def model_istatistikleri(conn, gun=7):
+    """Model bazlı: tur sayısı, ortalama/maks cevap süresi, uzlaşma oranı (kuorumlu turlarda), zaman aşımı/iptal."""
+    sinir = (datetime.now() - timedelta(days=gun)).strftime("%Y-%m-%d %H:%M:%S")
+    satirlar = conn.execute("""
+        SELECT model, COUNT(*),
+               AVG(CASE WHEN durum IN ('uyumlu','aykiri','kuorumsuz') THEN sure_ms END),
+               MAX(CASE WHEN durum IN ('uyumlu','aykiri','kuorumsuz') THEN sure_ms END),
+               SUM(durum = 'uyumlu'), SUM(durum = 'aykiri'),
+               SUM(durum = 'zaman_asimi'), SUM(durum = 'iptal'), SUM(durum = 'hata')
+        FROM ai_oylar WHERE tarih_saat >= ? GROUP BY model ORDER BY model
+    """, (sinir,)).fetchall()
+    out = []
+    for model, n, ort, maks, uyumlu, aykiri, za, iptal, hata in satirlar:
+        oy = (uyumlu or 0) + (aykiri or 0)
+        out.append({"model": model, "tur": n, "ort_ms": round(ort or 0, 1), "max_ms": round(maks or 0, 1),
+                    "uzlasma": round(uyumlu / oy, 3) if oy else None,
+                    "zaman_asimi": za or 0, "iptal": iptal or 0, "hata": hata or 0})
+    return out
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="AI topluluğu — model bazlı gecikme / uzlaşma")
+    ap.add_argument("--db", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "borsa.db"))
+    ap.add_argument("--gun", type=int, default=7)
+    args = ap.parse_args(argv)
+    conn = sqlite3.connect(args.db)
+    sema_kur(conn)
+    print(f"{'model':<38}{'tur':>6}{'ort ms':>9}{'max ms':>9}{'uzlaşma':>9}{'z.aşımı':>9}{'iptal':>7}{'hata':>6}")
+    for s in model_istatistikleri(conn, args.gun):
+        uz = f"{s['uzlasma'] * 100:.0f}%" if s["uzlasma"] is not None else "—"
+        print(f"{s['model']:<38}{s['tur']:>6}{s['ort_ms']:>9.0f}{s['max_ms']:>9.0f}{uz:>9}{s['zaman_asimi']:>9}{s['iptal']:>7}{s['hata']:>6}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Canlı fiyat akışı, ham tick kaydı ve hızlandırılmış yeniden oynatma.
+Botun gördüğü her fiyat/ticker güncellemesi `LiveTick` olarak BISTLiveStream'e yayınlanır;
+abone olan tüketiciler (karar mantığı, kaydedici) aynı tick'i senkron alır.
+
+Kayıt biçimi — yalnızca eklenen segment dosyaları (`tick_YYYYmmdd_HHMMSS_NNNN.tik`):
+  b"TIK1" + sabit 40 baytlık kayıtlar (<d I I d d d): zaman, sembol no, tip, fiyat, hacim, değişim %
+  tip 0 sembol tanımıdır (ad, fiyat/hacim/değişim alanlarının 24 baytında); her segment kendi
+  sembol tablosunu taşır, tek başına okunabilir. Yarım kalmış son kayıt (çökme) yok sayılır.
+Oynatıcı segmentleri mmap ile açar ve tick'leri aynı akışa 1×, N× ya da azami hızda geri verir;
+yayın süresi tick → karar gecikmesi olarak ölçülür.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+_SIHIR = b"TIK1"
+KAYIT = struct.Struct("<dIIddd")
+_TANIM = 0
+# Kaynak adı <-> kayıt tipi (0 sembol tanımına ayrılmış)
+KAYNAKLAR = ("fiyat", "24hr", "ws")
+_AD_BAYT = 24
+
+
+@dataclass(frozen=True)
+class LiveTick:
+    sembol: str
+    fiyat: float
+    zaman: float
+    hacim: float = 0.0
+    degisim_pct: float = 0.0
+    kaynak: str = "fiyat"
+
+
+def _yuzdelik(sirali, p):
+    if not sirali:
+        return 0.0
+    return sirali[min(len(sirali) - 1, int(len(sirali) * p / 100))]
+
+
+class BISTLiveStream:
+    """
+      akis.abone_ol(fn)                        # fn(tick) — her yayında senkron çağrılır
+      akis.fiyat("BTCUSDT", 65000.0)           # tick üret ve yayınla
+      akis.yayinla(tick)                       # hazır tick (ör. oynatıcıdan)
+    Tüketici hatası diğer tüketicileri durdurmaz; `hata` sayacında tutulur.
+    """
+
+    def __init__(self, saat=time.time):
+        self.saat = saat
+        self._dinleyiciler = ()
+        self._lock = threading.Lock()
+        self.son = {}    # sembol -> son LiveTick
+        self.yayin = 0
+        self.hata = 0
+
+    def abone_ol(self, fn):
+        with self._lock:
+            self._dinleyiciler = self._dinleyiciler + (fn,)
+        return fn
+
+    def abonelikten_cik(self, fn):
+        with self._lock:
+            self._dinleyiciler = tuple(d for d in self._dinleyiciler if d != fn)  # bağlı metotlar her erişimde yeni nesne
+
+    def yayinla(self, tick):
+        self.son[tick.sembol] = tick
+        self.yayin += 1
+        for fn in self._dinleyiciler:
+            try:
+                fn(tick)
+            except Exception:
+                self.hata += 1
+
+    def fiyat(self, sembol, fiyat, hacim=0.0, degisim_pct=0.0, kaynak="fiyat"):
+        if not fiyat:
+            return
+        self.yayinla(LiveTick(sembol, float(fiyat), self.saat(), float(hacim or 0.0), float(degisim_pct or 0.0), kaynak))
+
+
+class TickKaydedici:
+    """
+    Akışa abone edilen ham tick kaydedici (çağrılabilir). Kayıtlar tamponlanır, her
+    `bosalt_n` kayıtta ya da kapatılırken diske yazılır; segment `segment_bayt`ı aşınca yenisi açılır.
+    """
+
+    def __init__(self, dizin, segment_bayt=64 * 1024 * 1024, bosalt_n=256):
+        self.dizin = dizin
+        self.segment_bayt = segment_bayt
+        self.bosalt_n = bosalt_n
+        self._lock = threading.Lock()
+        self._dosya = None
+        self._boyut = 0
+        self._semboller = {}
+        self._tampon = []
+        self._sira = 0
+        self.kayit = 0
+        os.makedirs(dizin, exist_ok=True)
+
+    def _yeni_segment(self):
+        if self._dosya is not None:
+            self._dosya.close()
+        self._sira += 1
+        ad = f"tick_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self._sira:04d}.tik"
+        self._dosya = open(os.path.join(self.dizin, ad), "ab")
+        self._dosya.write(_SIHIR)
+        self._boyut = len(_SIHIR)
+        self._semboller = {}
+
+    def __call__(self, tick):
+        with self._lock:
+            if self._dosya is None or self._boyut >= self.segment_bayt:
+                self._bosalt()
+                self._yeni_segment()
+            no = self._semboller.get(tick.sembol)
+            if no is None:
+                no = self._semboller[tick.sembol] = len(self._semboller) + 1
+                ad = tick.sembol.encode("utf-8")[:_AD_BAYT].ljust(_AD_BAYT, b"\0")
+                self._tampon.append(struct.pack("<dII", tick.zaman, no, _TANIM) + ad)
+                self._boyut += KAYIT.size
+            tip = KAYNAKLAR.index(tick.kaynak) + 1 if tick.kaynak in KAYNAKLAR else 1
+            self._tampon.append(KAYIT.pack(tick.zaman, no, tip, tick.fiyat, tick.hacim, tick.degisim_pct))
+            self._boyut += KAYIT.size
+            self.kayit += 1
+            if len(self._tampon) >= self.bosalt_n:
+                self._bosalt()
+
+    def _bosalt(self):
+        if self._tampon and self._dosya is not None:
+            self._dosya.write(b"".join(self._tampon))
+            self._dosya.flush()
+        self._tampon = []
+
+    def kapat(self):
+        with self._lock:
+            self._bosalt()
+            if self._dosya is not None:
+                self._dosya.close()
+                self._dosya = None
+
+
+def segmentler(dizin):
+    """Dizindeki segment dosyaları, kayıt sırasıyla."""
+    if not os.path.isdir(dizin):
+        return []
+    return [os.path.join(dizin, a) for a in sorted(os.listdir(dizin)) if a.endswith(".tik")]
+
+
+def segment_oku(yol):
+    """Tek segmentin tick'leri (mmap üzerinden). Bozuk/boş segment → hiç tick."""
+    with open(yol, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= len(_SIHIR):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(_SIHIR)] != _SIHIR:
+                return
+            semboller = {}
+            son = len(_SIHIR) + (len(mm) - len(_SIHIR)) // KAYIT.size * KAYIT.size
+            for ofs in range(len(_SIHIR), son, KAYIT.size):
+                zaman, no, tip, fiyat, hacim, degisim = KAYIT.unpack_from(mm, ofs)
+                if tip == _TANIM:
+                    semboller[no] = mm[ofs + 16:ofs + KAYIT.size].rstrip(b"\0").decode("utf-8")
+                    continue
+                yield LiveTick(semboller[no], fiyat, zaman, hacim, degisim,
+                               KAYNAKLAR[tip - 1] if tip <= len(KAYNAKLAR) else "fiyat")
+
+
+class TickOynatici:
+    """
+    Kayıtlı segmentleri bir akışa geri ver:
+      o = TickOynatici(segmentler("tickler"))
+      o.oynat(akis, hiz=10)      # 10× hız; hiz=None → azami hız (bekleme yok)
+    Dönen özet: tick sayısı, duvar süresi, tick/sn, yayın (tick → karar) gecikmesi p50/p99/max
+    ve hedef zamanlamanın gerisinde kalma (gec_kalma) p99'u.
+    """
+
+    def __init__(self, dosyalar, saat=time.perf_counter, uyku=time.sleep):
+        self.dosyalar = list(dosyalar)
+        self.saat = saat
+        self.uyku = uyku
+
+    def tickler(self):
+        for yol in self.dosyalar:
+            yield from segment_oku(yol)
+
+    def oynat(self, akis, hiz=1.0, sinir=None, dur=None):
+        gecikmeler, gec_kalma = [], []
+        ilk_kayit = bas = None
+        for tick in self.tickler():
+            if dur is not None and dur():
+                break
+            if sinir is not None and len(gecikmeler) >= sinir:
+                break
+            if ilk_kayit is None:
+                ilk_kayit, bas = tick.zaman, self.saat()
+            if hiz:
+                hedef = bas + (tick.zaman - ilk_kayit) / hiz
+                kalan = hedef - self.saat()
+                if kalan > 0:
+                    self.uyku(kalan)
+                else:
+                    gec_kalma.append(-kalan)
+            t0 = self.saat()
+            akis.yayinla(tick)
+            gecikmeler.append(self.saat() - t0)
+        sure = self.saat() - bas if bas is not None else 0.0
+        gecikmeler.sort()
+        gec_kalma.sort()
+        return {
+            "tick": len(gecikmeler),
+            "sure_sn": round(sure, 3),
+            "tick_sn": round(len(gecikmeler) / sure, 1) if sure > 0 else None,
+            "gecikme_p50_us": round(_yuzdelik(gecikmeler, 50) * 1e6, 1),
+            "gecikme_p99_us": round(_yuzdelik(gecikmeler, 99) * 1e6, 1),
+            "gecikme_max_us": round(gecikmeler[-1] * 1e6, 1) if gecikmeler else 0.0,
+            "gec_kalma_p99_ms": round(_yuzdelik(gec_kalma, 99) * 1e3, 2),
+        }
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Artımlı bakiye defteri — emir dolumları ve Binance kullanıcı veri akışı (user-data stream)
+ile güncellenir; `/api/v3/account` yalnızca açılışta ve periyodik mutabakatta çağrılır.
+Değerleme bellekte yapılır.
+"""
+
+import json
+import threading
+import time
+
+try:
+    import websocket  # websocket-client
+    HAS_WS = True
+except ImportError:
+    HAS_WS = False
+
+
+class BakiyeDefteri:
+    """Varlık → (free, locked). Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bakiyeler = {}
+        self._mutlak_zaman = {}  # varlık → son mutlak güncellemenin (akış/REST) ms zaman damgası
+        self._rest_zaman = 0
+        self.son_mutabakat = None
+        self.hazir = False
+
+    # ---------- yazma ----------
+    def rest_yukle(self, balances, zaman_ms=None):
+        """/api/v3/account `balances` listesiyle defteri baştan kur (sıfır bakiyeler atlanır)."""
+        zaman_ms = zaman_ms or int(time.time() * 1000)
+        yeni = {}
+        for b in balances or []:
+            free, locked = float(b.get("free", 0) or 0), float(b.get("locked", 0) or 0)
+            if free or locked:
+                yeni[b.get("asset")] = [free, locked]
+        with self._lock:
+            self._bakiyeler = yeni
+            self._mutlak_zaman = {a: zaman_ms for a in yeni}
+            self._rest_zaman = zaman_ms
+            self.hazir = True
+
+    def dolum_uygula(self, dolum, base, quote="USDT"):
+        """Emir motorunun dolum özetini defterde delta olarak uygula."""
+        if not dolum or not dolum.get("executedQty"):
+            return
+        zaman = (dolum.get("ham") or {}).get("transactTime") or int(time.time() * 1000)
+        q = dolum["executedQty"]
+        tutar = dolum.get("cummulativeQuoteQty") or q * (dolum.get("ortalama_fiyat") or 0)
+        deltalar = {}
+        if dolum.get("side") == "BUY":
+            deltalar[base] = q
+            deltalar[quote] = -tutar
+        else:
+            deltalar[base] = -q
+            deltalar[quote] = tutar
+        for varlik, kom in (dolum.get("komisyon") or {}).items():
+            if varlik and kom:
+                deltalar[varlik] = deltalar.get(varlik, 0.0) - kom
+        with self._lock:
+            for varlik, d in deltalar.items():
+                # Akıştan bu dolumdan daha yeni mutlak bakiye geldiyse delta zaten içindedir
+                if self._mutlak_zaman.get(varlik, self._rest_zaman) >= zaman:
+                    continue
+                b = self._bakiyeler.setdefault(varlik, [0.0, 0.0])
+                b[0] = max(0.0, b[0] + d)
+
+    def akis_olayi(self, olay):
+        """Kullanıcı veri akışı olayı: outboundAccountPosition mutlak bakiyeleri yazar."""
+        if olay.get("e") != "outboundAccountPosition":
+            return False
+        zaman = olay.get("u") or olay.get("E") or int(time.time() * 1000)
+        with self._lock:
+            for b in olay.get("B", []):
+                self._bakiyeler[b["a"]] = [float(b.get("f", 0) or 0), float(b.get("l", 0) or 0)]
+                self._mutlak_zaman[b["a"]] = zaman
+        return True
+
+    def mutabakat(self, balances, tolerans=1e-8):
+        """REST bakiyeleriyle karşılaştır, sapmaları [(varlık, defter, borsa)] döndür ve düzelt."""
+        borsa = {}
+        for b in balances or []:
+            t = float(b.get("free", 0) or 0) + float(b.get("locked", 0) or 0)
+            if t:
+                borsa[b.get("asset")] = t
+        with self._lock:
+            defter = {a: v[0] + v[1] for a, v in self._bakiyeler.items() if v[0] + v[1]}
+        sapmalar = []
+        for varlik in set(borsa) | set(defter):
+            d, b = defter.get(varlik, 0.0), borsa.get(varlik, 0.0)
+            if abs(d - b) > max(tolerans, abs(b) * 1e-6):
+                sapmalar.append((varlik, d, b))
+        self.rest_yukle(balances)
+        self.son_mutabakat = time.time()
+        return sapmalar
+
+    # ---------- okuma ----------
+    def bakiye(self, varlik):
+        with self._lock:
+            b = self._bakiyeler.get(varlik)
+            return (b[0] + b[1]) if b else 0.0
+
+    def bos(self, varlik):
+        with self._lock:
+            b = self._bakiyeler.get(varlik)
+            return b[0] if b else 0.0
+
+    def varliklar(self):
+        with self._lock:
+            return {a: v[0] + v[1] for a, v in self._bakiyeler.items()}
+
+    def degerle(self, fiyatlar, quote="USDT"):
+        """Tüm varlıkların quote cinsinden toplamı; fiyatlar: {"BTCUSDT": 65000.0, ...}."""
+        toplam = 0.0
+        for varlik, miktar in self.varliklar().items():
+            if varlik == quote:
+                toplam += miktar
+            elif fiyatlar.get(varlik + quote):
+                toplam += miktar * fiyatlar[varlik + quote]
+        return toplam
+
+
+class KullaniciAkisi:
+    """
+    Binance user-data stream istemcisi (websocket-client gerekir).
+    listen_key_al() -> str | None, listen_key_yenile(key) -> bool, olay_isle(dict).
+    """
+
+    def __init__(self, ws_base, listen_key_al, listen_key_yenile, olay_isle, yeniden_baglanma_sn=5, keepalive_sn=1800, log=None):
+        self.ws_base = ws_base.rstrip("/")
+        self.listen_key_al = listen_key_al
+        self.listen_key_yenile = listen_key_yenile
+        self.olay_isle = olay_isle
+        self.yeniden_baglanma_sn = yeniden_baglanma_sn
+        self.keepalive_sn = keepalive_sn
+        self.log = log or (lambda m: None)
+        self.bagli = False
+        self._dur = threading.Event()
+        self._ws = None
+        self._thread = None
+
+    def baslat(self):
+        if not HAS_WS:
+            self.log("websocket-client kurulu değil — kullanıcı veri akışı kapalı, REST mutabakatı kullanılacak.")
+            return False
+        self._dur.clear()
+        self._thread = threading.Thread(target=self._calis, daemon=True)
+        self._thread.start()
+        return True
+
+    def durdur(self):
+        self._dur.set()
+        self.durdur_baglanti()
+
+    def _keepalive(self, key, bitti):
+        while not bitti.wait(self.keepalive_sn):
+            if not self.listen_key_yenile(key):
+                self.log("listenKey yenilenemedi — yeniden bağlanılacak.")
+                self.durdur_baglanti()
+                return
+
+    def durdur_baglanti(self):
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def _mesaj(self, _ws, mesaj):
+        try:
+            olay = json.loads(mesaj)
+        except ValueError:
+            return
+        if olay.get("e") == "listenKeyExpired":
+            self.durdur_baglanti()
+            return
+        self.olay_isle(olay)
+
+    def _calis(self):
+        while not self._dur.is_set():
+            key = self.listen_key_al()
+            if not key:
+                self._dur.wait(self.yeniden_baglanma_sn)
+                continue
+            self._ws = websocket.WebSocketApp(
+                f"{self.ws_base}/ws/{key}",
+                on_message=self._mesaj,
+                on_open=lambda _ws: setattr(self, "bagli", True),
+            )
+            bitti = threading.Event()
+            threading.Thread(target=self._keepalive, args=(key, bitti), daemon=True).start()
+            try:
+                self._ws.run_forever(ping_interval=180, ping_timeout=10)
+            except Exception:
+                pass
+            bitti.set()
+            self.bagli = False
+            self._ws = None
+            if not self._dur.is_set():
+                self.log("Kullanıcı veri akışı koptu — yeniden bağlanılıyor.")
+                self._dur.wait(self.yeniden_baglanma_sn)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Destek/direnç motoru — çoklu zaman dilimi mum geçmişinden salınım pivotları (swing high/low)
+ve hacim profili kümeleri (NumPy ile vektörel). Mumlar MumDeposu'ndan (yerelde yeniden
+örneklenmiş) okunur; aday seviyeler sembol × zaman dilimi bazında önbelleklenir ve yalnızca
+o dilimde yeni mum kapandığında yeniden hesaplanır. Dilimler arası adaylar yüzde toleransla
+tek seviyede birleşir.
+"""
+
+import threading
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from borsa_modules.yeniden_ornekleme import DUSUK, HACIM, KAPANIS, KAPANIS_ZAMANI, YUKSEK
+
+# Zaman dilimi -> ağırlık. Üst dilimlerin seviyeleri daha güçlü sayılır.
+VARSAYILAN_DILIMLER = {"15m": 0.5, "1h": 1.0, "4h": 2.0, "1d": 3.0}
+
+
+def salinim_pivotlari(yuksek, dusuk, pencere=5):
+    """Her iki yanındaki `pencere` mumdan yüksek tepe / düşük dip indeksleri: (tepeler, dipler)."""
+    genislik = 2 * pencere + 1
+    if len(yuksek) < genislik:
+        bos = np.empty(0, dtype=np.intp)
+        return bos, bos
+    tepeler = np.flatnonzero(sliding_window_view(yuksek, genislik).argmax(axis=1) == pencere) + pencere
+    dipler = np.flatnonzero(sliding_window_view(dusuk, genislik).argmin(axis=1) == pencere) + pencere
+    return tepeler, dipler
+
+
+def hacim_profili(yuksek, dusuk, kapanis, hacim, kova=48):
+    """Tipik fiyatın hacim ağırlıklı histogramındaki yerel tepeler: (fiyatlar, hacim payları)."""
+    tipik = (yuksek + dusuk + kapanis) / 3.0
+    if len(tipik) == 0 or tipik.max() <= tipik.min():
+        return np.empty(0), np.empty(0)
+    hist, kenar = np.histogram(tipik, bins=kova, weights=hacim)
+    toplam = hist.sum()
+    if toplam <= 0:
+        return np.empty(0), np.empty(0)
+    merkez = (kenar[:-1] + kenar[1:]) / 2.0
+    sol = np.r_[-np.inf, hist[:-1]]
+    sag = np.r_[hist[1:], -np.inf]
+    tepe = (hist >= sol) & (hist > sag) & (hist > hist.mean())
+    return merkez[tepe], hist[tepe] / toplam
+
+
+def kumele(fiyatlar, agirliklar, tolerans_pct=0.5):
+    """Adayları log-fiyat ızgarasında tolerans_pct genişliğindeki kovalarda ağırlıklı ortalama
+    tek seviyede birleştir (zincirleme büyüyen küme olmaz).
+    (seviyeler, güçler, dokunma sayıları) döndür, fiyata göre artan."""
+    gecerli = fiyatlar > 0
+    fiyatlar, agirliklar = fiyatlar[gecerli], agirliklar[gecerli]
+    if len(fiyatlar) == 0:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.intp)
+    kova = np.floor(np.log(fiyatlar) / np.log1p(tolerans_pct / 100.0)).astype(np.int64)
+    _, grup = np.unique(kova, return_inverse=True)
+    guc = np.bincount(grup, weights=agirliklar)
+    seviye = np.bincount(grup, weights=agirliklar * fiyatlar) / guc
+    return seviye, guc, np.bincount(grup)
+
+
+class _Adaylar:
+    __slots__ = ("son_kapanis", "mumlar", "fiyatlar", "agirliklar")
+
+    def __init__(self, son_kapanis, mumlar, fiyatlar, agirliklar):
+        self.son_kapanis = son_kapanis
+        self.mumlar = mumlar
+        self.fiyatlar = fiyatlar
+        self.agirliklar = agirliklar
+
+
+class SeviyeMotoru:
+    """
+    kaynak.mumlar(sembol, aralik, kismi=False) -> kapanmış mumlar (ndarray) | None  (MumDeposu)
+    motor.seviyeler("BTCUSDT", fiyat) -> {support_1, support_2, resistance_1, resistance_2, ...}
+    """
+
+    def __init__(self, kaynak, dilimler=None, pivot_pencere=5, hacim_kovasi=48,
+                 tolerans_pct=0.5, min_guc_orani=0.15, salinim_mum=90):
+        self.kaynak = kaynak
+        self.dilimler = dict(dilimler or VARSAYILAN_DILIMLER)
+        self.pivot_pencere = pivot_pencere
+        self.hacim_kovasi = hacim_kovasi
+        self.tolerans_pct = tolerans_pct
+        self.min_guc_orani = min_guc_orani
+        self.salinim_mum = salinim_mum
+        self._adaylar = {}
+        self._lock = threading.Lock()
+        self.yenilenen = 0  # yeniden hesaplanan seri sayısı (benchmark/metrik)
+
+    def _dilim(self, sembol, aralik):
+        """Dilimin aday seviyeleri; yalnızca son kapanmış mum değiştiyse yeniden hesaplanır."""
+        mumlar = self.kaynak.mumlar(sembol, aralik, kismi=False)
+        if mumlar is None or not len(mumlar):
+            return None
+        son = int(mumlar[-1, KAPANIS_ZAMANI])
+        with self._lock:
+            eski = self._adaylar.get((sembol, aralik))
+        if eski is not None and eski.son_kapanis == son:
+            return eski
+        a = self._adaylari_hesapla(mumlar, self.dilimler[aralik])
+        with self._lock:
+            self._adaylar[(sembol, aralik)] = a
+            self.yenilenen += 1
+        return a
+
+    def _adaylari_hesapla(self, m, agirlik):
+        yuksek, dusuk, kapanis, hacim = m[:, YUKSEK], m[:, DUSUK], m[:, KAPANIS], m[:, HACIM]
+        n = len(m)
+        tepeler, dipler = salinim_pivotlari(yuksek, dusuk, self.pivot_pencere)
+        # Yakın tarihli pivotlar daha ağır (0.5 → 1.0)
+        yakinlik = 0.5 + 0.5 * np.arange(n) / max(n - 1, 1)
+        hv_fiyat, hv_pay = hacim_profili(yuksek, dusuk, kapanis, hacim, self.hacim_kovasi)
+        return _Adaylar(
+            int(m[-1, KAPANIS_ZAMANI]), m,
+            np.concatenate([yuksek[tepeler], dusuk[dipler], hv_fiyat]),
+            agirlik * np.concatenate([yakinlik[tepeler], yakinlik[dipler], hv_pay * self.hacim_kovasi / 4.0]),
+        )
+
+    # ---------- okuma ----------
+    def seviyeler(self, sembol, fiyat):
+        """Fiyatın altındaki en yakın iki güçlü destek ve üstündeki iki güçlü direnç."""
+        if not HAS_NUMPY or not fiyat:
+            return {}
+        dilimler = [a for a in (self._dilim(sembol, ar) for ar in self.dilimler) if a is not None]
+        if not dilimler:
+            return {}
+        seviye, guc, dokunma = kumele(
+            np.concatenate([a.fiyatlar for a in dilimler]),
+            np.concatenate([a.agirliklar for a in dilimler]),
+            self.tolerans_pct,
+        )
+        sonuc = {}
+        if len(seviye):
+            guclu = guc >= guc.max() * self.min_guc_orani
+            alt = np.flatnonzero(guclu & (seviye < fiyat))[::-1][:2]
+            ust = np.flatnonzero(guclu & (seviye > fiyat))[:2]
+            for i, j in enumerate(alt, 1):
+                sonuc[f"support_{i}"] = float(seviye[j])
+                sonuc[f"support_{i}_guc"] = round(float(guc[j]), 2)
+                sonuc[f"support_{i}_dokunma"] = int(dokunma[j])
+            for i, j in enumerate(ust, 1):
+                sonuc[f"resistance_{i}"] = float(seviye[j])
+                sonuc[f"resistance_{i}_guc"] = round(float(guc[j]), 2)
+                sonuc[f"resistance_{i}_dokunma"] = int(dokunma[j])
+        # Fibonacci için en üst dilimin salınım aralığı (24h yerine)
+        son = dilimler[-1].mumlar[-self.salinim_mum:]
+        sonuc["salinim_yuksek"] = float(son[:, YUKSEK].max())
+        sonuc["salinim_dusuk"] = float(son[:, DUSUK].min())
+        return sonuc
+
+    def unut(self, sembol):
+        with self._lock:
+            for anahtar in [k for k in self._adaylar if k[0] == sembol]:
+                del self._adaylar[anahtar]
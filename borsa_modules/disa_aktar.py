@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Log ve işlem tablolarının sabit bellekli dışa aktarımı (XLSX / PDF / CSV).
+Satırlar id üzerinden keyset sayfalarıyla (`id > ? ORDER BY id LIMIT ?`) akıtılır, hiçbir
+zaman tamamı belleğe alınmaz; her sayfa ayrı, kısa bir okuma olduğundan uzun bir dışa aktarım
+boyunca veritabanı kilidi tutulmaz (bot logu / işlem kaydı yazmaya devam eder): XLSX openpyxl write-only çalışma kitabıyla (sayfa başına Excel satır sınırında yeni
+sayfa), CSV doğrudan yazılır. PDF raporu reportlab canvas ile sayfa sayfa çizilir; başta SQL
+toplamlarıyla özet, ardından en fazla `pdf_max_satir` satır. İş ayrı thread'de çalışır,
+ilerleme geri çağrısı ve iptal destekler.
+"""
+
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+try:
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+
+# tablo -> (sorgu, başlıklar, tarih sütunu)
+TABLOLAR = {
+    "log": ("SELECT id, tarih_saat, tip, mesaj, detay FROM log", ["ID", "Tarih", "Tip", "Mesaj", "Detay"], "tarih_saat"),
+    "islemler": (
+        "SELECT id, sembol, giris_tarih, giris_fiyat, cikis_tarih, cikis_fiyat, miktar, stop_loss, take_profit, kar_zarar, notlar FROM islemler",
+        ["ID", "Sembol", "Giriş", "Giriş Fiyat", "Çıkış", "Çıkış Fiyat", "Miktar", "SL", "TP", "Kar/Zarar", "Not"],
+        "cikis_tarih",
+    ),
+}
+BICIMLER = ("xlsx", "pdf", "csv")
+PARTI = 5000
+EXCEL_MAX_SATIR = 1_048_575  # başlık satırı hariç
+PDF_MAX_SATIR = 50_000
+# Türkçe karakterler için TTF adayları (yoksa Helvetica)
+_FONT_ADAYLARI = [
+    "C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/segoeui.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf", "/System/Library/Fonts/Supplemental/Arial.ttf",
+]
+
+
+class Iptal(Exception):
+    pass
+
+
+def _kosul(tarih_sutunu, baslangic=None, bitis=None):
+    parcalar, params = [], []
+    if baslangic:
+        parcalar.append(f"{tarih_sutunu} >= ?")
+        params.append(baslangic)
+    if bitis:
+        parcalar.append(f"{tarih_sutunu} <= ?")
+        params.append(bitis)
+    return (" WHERE " + " AND ".join(parcalar) if parcalar else ""), params
+
+
+def satir_sayisi(conn, tablo, baslangic=None, bitis=None):
+    sorgu, _, tarih = TABLOLAR[tablo]
+    nerede, params = _kosul(tarih, baslangic, bitis)
+    return conn.execute(f"SELECT COUNT(*) FROM ({sorgu}{nerede})", params).fetchone()[0]
+
+
+def satirlar(conn, tablo, baslangic=None, bitis=None, parti=PARTI, limit=None):
+    """
+    Tablonun satırlarını id sırasıyla partiler halinde akıt. Her parti kendi sorgusuyla
+    tamamen okunur (son id'den devam) — açık kalan imleç yazıcıları kilitlemez.
+    """
+    sorgu, _, tarih = TABLOLAR[tablo]
+    nerede, params = _kosul(tarih, baslangic, bitis)
+    sql = f"{sorgu}{nerede}{' AND' if nerede else ' WHERE'} id > ? ORDER BY id LIMIT ?"
+    son_id, kalan = -1, int(limit) if limit else None
+    while kalan is None or kalan > 0:
+        n = parti if kalan is None else min(parti, kalan)
+        parca = conn.execute(sql, params + [son_id, n]).fetchall()
+        if not parca:
+            return
+        yield from parca
+        son_id = parca[-1][0]
+        if kalan is not None:
+            kalan -= len(parca)
+        if len(parca) < n:
+            return
+
+
+def xlsx_yaz(yol, basliklar, kaynak, adim):
+    wb = Workbook(write_only=True)
+    ws, sayfa_satir, sayfa_no = None, EXCEL_MAX_SATIR, 0
+    kalin = Font(bold=True)
+    for satir in kaynak:
+        if sayfa_satir >= EXCEL_MAX_SATIR:
+            sayfa_no += 1
+            ws = wb.create_sheet(f"Sayfa {sayfa_no}")
+            ust = []
+            for b in basliklar:
+                c = WriteOnlyCell(ws, value=b)
+                c.font = kalin
+                ust.append(c)
+            ws.append(ust)
+            sayfa_satir = 0
+        ws.append(list(satir))
+        sayfa_satir += 1
+        adim()
+    if ws is None:
+        wb.create_sheet("Sayfa 1").append(basliklar)
+    wb.save(yol)
+
+
+def csv_yaz(yol, basliklar, kaynak, adim):
+    with open(yol, "w", newline="", encoding="utf-8-sig") as f:  # BOM: Excel Türkçe karakterleri doğru açar
+        w = csv.writer(f, delimiter=";")
+        w.writerow(basliklar)
+        for satir in kaynak:
+            w.writerow(satir)
+            adim()
+
+
+def _pdf_font():
+    for yol in _FONT_ADAYLARI:
+        if os.path.exists(yol):
+            try:
+                pdfmetrics.registerFont(TTFont("RaporFont", yol))
+                return "RaporFont"
+            except Exception:
+                continue
+    return "Helvetica"
+
+
+def pdf_yaz(yol, baslik, basliklar, kaynak, adim, ozet=None, toplam=None):
+    """Yatay A4, sabit yükseklikli satırlar; sayfa dolunca showPage (canvas akış halinde çizer)."""
+    font = _pdf_font()
+    gen, yuk = landscape(A4)
+    kenar, satir_h, punto = 28, 11, 7
+    c = canvas.Canvas(yol, pagesize=(gen, yuk), pageCompression=1)
+    c.setTitle(baslik)
+    # Sütun genişlikleri: ID dar, metin sütunları geniş
+    agirlik = [0.6 if b == "ID" else 3.0 if b in ("Mesaj", "Detay", "Not") else 1.2 for b in basliklar]
+    birim = (gen - 2 * kenar) / sum(agirlik)
+    xler, x = [], kenar
+    for a in agirlik:
+        xler.append((x, a * birim))
+        x += a * birim
+    sayfa = [0]
+
+    def yeni_sayfa():
+        if sayfa[0]:
+            c.showPage()
+        sayfa[0] += 1
+        c.setFont(font, 11)
+        c.drawString(kenar, yuk - kenar, baslik)
+        c.setFont(font, punto)
+        c.drawRightString(gen - kenar, yuk - kenar, f"Sayfa {sayfa[0]} — {time.strftime('%Y-%m-%d %H:%M')}")
+        y = yuk - kenar - 18
+        for (sx, _), b in zip(xler, basliklar):
+            c.drawString(sx, y, b)
+        c.line(kenar, y - 3, gen - kenar, y - 3)
+        return y - satir_h - 2
+
+    def kirp(metin, genislik):
+        metin = "" if metin is None else str(metin).replace("\n", " ")
+        if pdfmetrics.stringWidth(metin, font, punto) <= genislik:
+            return metin
+        n = max(1, int(len(metin) * genislik / max(pdfmetrics.stringWidth(metin, font, punto), 1)) - 1)
+        return metin[:n] + "…"
+
+    y = yeni_sayfa()
+    if ozet:
+        c.setFont(font, 9)
+        for satir in ozet:
+            c.drawString(kenar, y, satir)
+            y -= satir_h + 2
+        y -= satir_h
+        c.setFont(font, punto)
+    yazilan = 0
+    for satir in kaynak:
+        if y < kenar:
+            y = yeni_sayfa()
+        for (sx, sg), deger in zip(xler, satir):
+            c.drawString(sx, y, kirp(deger, sg - 4))
+        y -= satir_h
+        yazilan += 1
+        adim()
+    if toplam is not None and toplam > yazilan:
+        if y < kenar + satir_h:
+            y = yeni_sayfa()
+        c.drawString(kenar, y - 4, f"… {toplam - yazilan:,} satır daha (tamamı için XLSX/CSV kullanın)")
+    c.save()
+
+
+def _pdf_ozet(conn, tablo, toplam, baslangic, bitis):
+    """SQL toplamlarıyla kısa özet (sabit bellek)."""
+    satirlar_ = [f"Toplam satır: {toplam:,}"]
+    _, _, tarih = TABLOLAR[tablo]
+    nerede, params = _kosul(tarih, baslangic, bitis)
+    if tablo == "log":
+        for tip, n in conn.execute(f"SELECT tip, COUNT(*) FROM log{nerede} GROUP BY tip ORDER BY 2 DESC LIMIT 10", params):
+            satirlar_.append(f"  {tip or '—'}: {n:,}")
+    elif tablo == "islemler":
+        n, kar, kazanan = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(kar_zarar), 0), SUM(CASE WHEN kar_zarar > 0 THEN 1 ELSE 0 END) FROM islemler{nerede}", params
+        ).fetchone()
+        if n:
+            satirlar_.append(f"  Toplam K/Z: {kar:,.2f} USDT | Kazanan: {kazanan or 0} / {n} (%{(kazanan or 0) / n * 100:.1f})")
+    ilk, son = conn.execute(f"SELECT MIN({tarih}), MAX({tarih}) FROM ({TABLOLAR[tablo][0]}{nerede})", params).fetchone()
+    if ilk:
+        satirlar_.append(f"  Aralık: {ilk} — {son}")
+    return satirlar_
+
+
+def bicim_hazir_mi(bicim):
+    return {"xlsx": HAS_OPENPYXL, "pdf": HAS_REPORTLAB, "csv": True}.get(bicim, False)
+
+
+def disa_aktar(db_yolu, tablo, bicim, yol, baslangic=None, bitis=None, ilerleme=None, iptal=None,
+               pdf_max_satir=PDF_MAX_SATIR, ilerleme_aralik=PARTI):
+    """
+    Senkron dışa aktarım. ilerleme(yazilan, toplam) her `ilerleme_aralik` satırda çağrılır;
+    iptal() True dönerse Iptal fırlatılır ve yarım dosya silinir. Yazılan satır sayısı döner.
+    """
+    if tablo not in TABLOLAR:
+        raise ValueError(f"Bilinmeyen tablo: {tablo}")
+    if not bicim_hazir_mi(bicim):
+        raise RuntimeError(f"{bicim.upper()} için gerekli paket kurulu değil")
+    _, basliklar, _ = TABLOLAR[tablo]
+    conn = sqlite3.connect(db_yolu)
+    sayac = [0]
+    try:
+        toplam = satir_sayisi(conn, tablo, baslangic, bitis)
+        hedef = min(toplam, pdf_max_satir) if bicim == "pdf" else toplam
+
+        def adim():
+            sayac[0] += 1
+            if sayac[0] % ilerleme_aralik == 0:
+                if iptal is not None and iptal():
+                    raise Iptal()
+                if ilerleme is not None:
+                    ilerleme(sayac[0], hedef)
+
+        tmp = yol + ".part"
+        try:
+            if bicim == "xlsx":
+                xlsx_yaz(tmp, basliklar, satirlar(conn, tablo, baslangic, bitis), adim)
+            elif bicim == "csv":
+                csv_yaz(tmp, basliklar, satirlar(conn, tablo, baslangic, bitis), adim)
+            else:
+                baslik = f"{tablo.capitalize()} raporu"
+                ozet = _pdf_ozet(conn, tablo, toplam, baslangic, bitis)
+                pdf_yaz(tmp, baslik, basliklar, satirlar(conn, tablo, baslangic, bitis, limit=pdf_max_satir), adim, ozet, toplam)
+            os.replace(tmp, yol)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        if ilerleme is not None:
+            ilerleme(sayac[0], hedef)
+        return sayac[0]
+    finally:
+        conn.close()
+
+
+class DisaAktarmaIsi:
+    """
+    Dışa aktarımı arka plan thread'inde çalıştır (Tk thread'i bloklanmaz):
+      is_ = DisaAktarmaIsi(DB_PATH, "log", "xlsx", yol, ilerleme=..., bitti=...)
+      is_.baslat(); is_.iptal()
+    bitti(yazilan | None, hata | None) iş thread'inden çağrılır; UI güncellemesini çağıran yönlendirir.
+    """
+
+    def __init__(self, db_yolu, tablo, bicim, yol, ilerleme=None, bitti=None, **secenekler):
+        self.db_yolu = db_yolu
+        self.tablo = tablo
+        self.bicim = bicim
+        self.yol = yol
+        self.ilerleme = ilerleme
+        self.bitti = bitti
+        self.secenekler = secenekler
+        self._iptal = threading.Event()
+        self._thread = None
+
+    @property
+    def calisiyor(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def baslat(self):
+        self._thread = threading.Thread(target=self._calis, daemon=True)
+        self._thread.start()
+
+    def iptal(self):
+        self._iptal.set()
+
+    def _calis(self):
+        try:
+            n = disa_aktar(self.db_yolu, self.tablo, self.bicim, self.yol, ilerleme=self.ilerleme,
+                           iptal=self._iptal.is_set, **self.secenekler)
+        except Iptal:
+            n, hata = None, "iptal edildi"
+        except Exception as e:
+            n, hata = None, str(e)
+        else:
+            hata = None
+        if self.bitti is not None:
+            self.bitti(n, hata)
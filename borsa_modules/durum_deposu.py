@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Bot durumu için sürümlü, değişmez görüntü deposu.
+İş thread'i (zamanlayıcı görevleri) ve akış thread'i durumu yazar; Tk, grafik, bildirimler ve
+metrikler okur. Her yazma mevcut görüntüden yenisini üretir ve tek referans atamasıyla
+yayınlar. Okuyucu `depo.goruntu` ile o anki görüntüyü alır: kilit yok, savunma kopyası yok —
+görüntü, içindeki pozisyonlar ve fiyat tablosu değiştirilemez; elindeki görüntünün tüm
+alanları aynı sürüme aittir (ör. toplam, o görüntüdeki pozisyon ve fiyatlarla hesaplanmıştır).
+Yazıcılar kendi aralarında tek kilitle sıralanır (oku-değiştir-yayınla yarışı olmasın);
+okuyucular bu kilide hiç girmez.
+"""
+
+import itertools
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+
+class Goruntu(NamedTuple):
+    """Durumun bir sürümü. pozisyonlar: salt okunur eşlemeler (her birinde benzersiz "kimlik")."""
+    surum: int
+    zaman: float
+    pozisyonlar: tuple
+    fiyatlar: MappingProxyType
+    bakiye_usdt: object  # float | None (henüz okunmadı)
+    toplam: float
+    son_islem_zamani: object  # str | None
+
+    def pozisyon(self, kimlik):
+        for p in self.pozisyonlar:
+            if p["kimlik"] == kimlik:
+                return p
+        return None
+
+    def sembolde_pozisyon(self, sembol):
+        return any(p["sembol"] == sembol for p in self.pozisyonlar)
+
+
+# degistir() ile atanabilen alanlar → görüntüdeki sıra (surum ve zaman depo tarafından yazılır)
+_SIRA = {ad: i for i, ad in enumerate(Goruntu._fields) if ad not in ("surum", "zaman")}
+
+
+def _dondur(p):
+    return p if isinstance(p, MappingProxyType) else MappingProxyType(dict(p))
+
+
+def _birlestir(fiyatlar, yeni):
+    # MappingProxyType.copy() alttaki dict'in copy()'si — {**proxy} genel eşleme yolundan çok daha hızlı
+    f = fiyatlar.copy()
+    f.update(yeni)
+    return f
+
+
+class DurumDeposu:
+    """
+      depo = DurumDeposu()
+      poz = depo.pozisyon_ekle({"sembol": "BTCUSDT", "miktar": 0.01, ...}, son_islem_zamani="14:05")
+      depo.pozisyon_guncelle(poz["kimlik"], {"sl": 61000.0})
+      depo.guncelle(fiyatlar={"BTCUSDT": 64000.0}, toplam=1234.5)
+      g = depo.goruntu          # okuyucu: kilitsiz, tutarlı görüntü
+    """
+
+    def __init__(self, saat=time.time):
+        self._saat = saat
+        self._kilit = threading.Lock()
+        self._kimlikler = itertools.count(1)
+        self._goruntu = Goruntu(0, saat(), (), MappingProxyType({}), None, 0.0, None)
+
+    @property
+    def goruntu(self):
+        return self._goruntu
+
+    @property
+    def surum(self):
+        return self._goruntu.surum
+
+    def degistir(self, fn):
+        """
+        fn(goruntu) -> {alan: yeni değer} | None. Yazıcı kilidi altında çalışır; değişiklikler
+        tek yeni sürüm olarak yayınlanır. Yeni (ya da mevcut) görüntü döner.
+        """
+        with self._kilit:
+            eski = self._goruntu
+            degisen = fn(eski)
+            if not degisen:
+                return eski
+            alanlar = list(eski)
+            for ad, deger in degisen.items():
+                i = _SIRA.get(ad)
+                if i is None:
+                    raise ValueError(f"Bilinmeyen durum alanı: {ad}")
+                if ad == "pozisyonlar" and deger is not eski.pozisyonlar:
+                    deger = tuple(_dondur(p) for p in deger)
+                elif ad == "fiyatlar" and deger is not eski.fiyatlar:
+                    deger = MappingProxyType(dict(deger))
+                alanlar[i] = deger
+            alanlar[0], alanlar[1] = eski.surum + 1, self._saat()
+            yeni = Goruntu._make(alanlar)  # _replace'ten belirgin hızlı (yazma sıcak yolda: her tick)
+            self._goruntu = yeni  # tek referans ataması: okuyucu ya eskiyi ya yeniyi görür
+            return yeni
+
+    def guncelle(self, fiyatlar=None, **alanlar):
+        """Üst düzey alanları ata; fiyatlar verilirse mevcut tabloyla birleştirilir."""
+        def fn(g):
+            degisen = dict(alanlar)
+            if fiyatlar:
+                degisen["fiyatlar"] = _birlestir(g.fiyatlar, fiyatlar)
+            return degisen
+        return self.degistir(fn)
+
+    def pozisyon_ekle(self, pozisyon, fiyatlar=None, **alanlar):
+        """Yeni pozisyon (kimlik atanır) + aynı sürümde üst düzey alanlar. Dondurulmuş pozisyon döner."""
+        yeni = _dondur({**pozisyon, "kimlik": next(self._kimlikler)})
+
+        def fn(g):
+            degisen = dict(alanlar, pozisyonlar=g.pozisyonlar + (yeni,))
+            if fiyatlar:
+                degisen["fiyatlar"] = _birlestir(g.fiyatlar, fiyatlar)
+            return degisen
+        self.degistir(fn)
+        return yeni
+
+    def pozisyon_guncelle(self, kimlik, degisiklik, **alanlar):
+        """Pozisyon alanlarını değiştir (yeni pozisyon nesnesi). Pozisyon artık yoksa None."""
+        sonuc = []
+
+        def fn(g):
+            p = g.pozisyon(kimlik)
+            if p is None:
+                return None
+            yeni = MappingProxyType(_birlestir(p, {**degisiklik, "kimlik": kimlik}))
+            sonuc.append(yeni)
+            return dict(alanlar, pozisyonlar=tuple(yeni if q is p else q for q in g.pozisyonlar))
+        self.degistir(fn)
+        return sonuc[0] if sonuc else None
+
+    def pozisyon_kapat(self, kimlik, **alanlar):
+        """Pozisyonu çıkar (+ aynı sürümde üst düzey alanlar). Zaten kapanmışsa False."""
+        kapandi = []
+
+        def fn(g):
+            if g.pozisyon(kimlik) is None:
+                return None
+            kapandi.append(True)
+            return dict(alanlar, pozisyonlar=tuple(q for q in g.pozisyonlar if q["kimlik"] != kimlik))
+        self.degistir(fn)
+        return bool(kapandi)
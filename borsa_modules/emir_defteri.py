@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Yerel emir defteri ve kayma (slippage) tahmini — MARKET emirden önce derinlik kontrolü.
+Her sembol için `/api/v3/depth` anlık görüntüsü + `<sembol>@depth@100ms` fark akışıyla
+Binance'in senkronizasyon kuralına göre güncel tutulan defter:
+  - akış olayları tamponlanır, görüntü alınır; u <= lastUpdateId olaylar atılır,
+  - ilk olay U <= lastUpdateId + 1 <= u olmalı, sonrakiler U == önceki u + 1 — kopukluk
+    olursa defter geçersizlenir ve yeniden görüntü alınır,
+  - miktarı 0 olan seviye silinir.
+websocket-client yoksa (ya da akış henüz senkron değilse) defter REST görüntüsüyle,
+`max_yas_sn`den eskiyse yeniden çekilerek kullanılır.
+
+Tahmin vektöreldir: defter kümülatif tutar/miktar dizilerine çevrilir, istenen tutar(lar)
+searchsorted ile doldurulacak seviyeye eşlenir; bir tutar dizisi tek çağrıda değerlendirilir.
+"""
+
+import json
+import threading
+import time
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import websocket  # websocket-client
+    HAS_WS = True
+except ImportError:
+    HAS_WS = False
+
+
+class EmirDefteri:
+    """Tek sembolün defteri: fiyat → miktar (bid/ask). Thread-safe."""
+
+    def __init__(self, sembol):
+        self.sembol = sembol
+        self._lock = threading.Lock()
+        self.bids = {}
+        self.asks = {}
+        self.son_id = None
+        self.zaman = 0.0  # son görüntü / olay (monotonic)
+        self.senkron = False
+        self._tampon = []
+        self._diziler = None  # (bid fiyat, bid miktar, ask fiyat, ask miktar) — değişince yeniden kurulur
+
+    def goruntu_yukle(self, veri):
+        """/api/v3/depth cevabı: {lastUpdateId, bids: [[p, q], ...], asks: [...]}. Tampondaki olaylar uygulanır."""
+        son_id = int(veri.get("lastUpdateId", 0))
+        with self._lock:
+            tampon = [olay for olay in self._tampon if olay["u"] > son_id]
+            if tampon and not (tampon[0]["U"] <= son_id + 1 <= tampon[0]["u"]):
+                # Görüntü tampondaki ilk olaydan eski: tampon korunur, sonraki görüntü onunla denenir
+                self.senkron = False
+                return False
+            self.bids = {float(p): float(q) for p, q in veri.get("bids", []) if float(q)}
+            self.asks = {float(p): float(q) for p, q in veri.get("asks", []) if float(q)}
+            self.son_id = son_id
+            self.zaman = time.monotonic()
+            self._diziler = None
+            self._tampon = []
+            self.senkron = True
+            for olay in tampon:
+                self._uygula(olay)
+            return True
+
+    def olay_isle(self, olay):
+        """depthUpdate olayı ({U, u, b, a}). Kopukluk olursa False (yeniden görüntü gerekir)."""
+        with self._lock:
+            if self.son_id is None or not self.senkron:
+                self._tampon.append(olay)
+                del self._tampon[:-1000]
+                return True
+            if olay["u"] <= self.son_id:
+                return True
+            if olay["U"] != self.son_id + 1 and not (olay["U"] <= self.son_id + 1 <= olay["u"]):
+                self.senkron = False
+                self._tampon = [olay]
+                return False
+            self._uygula(olay)
+            return True
+
+    def _uygula(self, olay):
+        for taraf, degisim in ((self.bids, olay.get("b", [])), (self.asks, olay.get("a", []))):
+            for p, q in degisim:
+                p, q = float(p), float(q)
+                if q:
+                    taraf[p] = q
+                else:
+                    taraf.pop(p, None)
+        self.son_id = olay["u"]
+        self.zaman = time.monotonic()
+        self._diziler = None
+
+    def diziler(self):
+        with self._lock:
+            if self._diziler is None:
+                bp = np.array(sorted(self.bids, reverse=True), dtype=np.float64)
+                ap = np.array(sorted(self.asks), dtype=np.float64)
+                self._diziler = (bp, np.array([self.bids[p] for p in bp.tolist()], dtype=np.float64),
+                                 ap, np.array([self.asks[p] for p in ap.tolist()], dtype=np.float64))
+            return self._diziler
+
+    def yas(self):
+        return time.monotonic() - self.zaman if self.zaman else float("inf")
+
+
+def dolum_tahmini(defter, taraf, tutarlar):
+    """
+    Vektörel dolum tahmini. taraf "BUY": tutarlar quote (USDT) — ask'lar tüketilir;
+    "SELL": tutarlar base miktar — bid'ler tüketilir. Dizi ya da skaler kabul eder.
+    {"ort_fiyat", "kayma_bps" (orta fiyata göre, aleyhte pozitif), "doldu" (defter yeterli mi),
+     "en_iyi", "orta"} — değerler tutarlar biçiminde ndarray.
+    """
+    bp, bq, ap, aq = defter.diziler()
+    t = np.atleast_1d(np.asarray(tutarlar, dtype=np.float64))
+    if not len(bp) or not len(ap):
+        bos = np.full(t.shape, np.nan)
+        return {"ort_fiyat": bos, "kayma_bps": bos, "doldu": np.zeros(t.shape, bool), "en_iyi": np.nan, "orta": np.nan}
+    orta = (bp[0] + ap[0]) / 2
+    # BUY: birim quote (p·q), karşılığı base; SELL: birim base (q), karşılığı quote
+    fiyat, miktar = (ap, aq) if taraf == "BUY" else (bp, bq)
+    birim, karsilik = (fiyat * miktar, miktar) if taraf == "BUY" else (miktar, fiyat * miktar)
+    kum, kum_karsilik = np.cumsum(birim), np.cumsum(karsilik)
+    i = np.minimum(np.searchsorted(kum, t, side="left"), len(fiyat) - 1)
+    once = np.where(i > 0, kum[i - 1], 0.0)
+    kalan = np.maximum(t - once, 0.0)  # defter yetmezse son seviyeden uzatılır (doldu=False)
+    if taraf == "BUY":
+        alinan = np.where(i > 0, kum_karsilik[i - 1], 0.0) + kalan / fiyat[i]
+        ort = np.divide(t, alinan, out=np.full(t.shape, np.nan), where=alinan > 0)
+        kayma = (ort / orta - 1) * 1e4
+    else:
+        gelen = np.where(i > 0, kum_karsilik[i - 1], 0.0) + kalan * fiyat[i]
+        ort = np.divide(gelen, t, out=np.full(t.shape, np.nan), where=t > 0)
+        kayma = (1 - ort / orta) * 1e4
+    return {"ort_fiyat": ort, "kayma_bps": kayma, "doldu": t <= kum[-1], "en_iyi": float(fiyat[0]), "orta": float(orta)}
+
+
+def emir_plani(defter, taraf, tutar, max_kayma_bps, max_parca=3):
+    """
+    Emri kayma eşiğine göre planla: eşik içindeyse tek parça; değilse eşiği aşmayan en
+    büyük parça boyutuna böl (en fazla max_parca). O kadar parçaya da sığmıyorsa sığan
+    kısım planlanır, geri kalanı reddedilir.
+    (parcalar, tahmin sözlüğü, neden) döner — parcalar boşsa emir gönderilmemeli.
+    """
+    tahmin = dolum_tahmini(defter, taraf, tutar)
+    kayma = float(tahmin["kayma_bps"][0])
+    ozet = {"kayma_bps": kayma, "ort_fiyat": float(tahmin["ort_fiyat"][0]), "orta": tahmin["orta"], "doldu": bool(tahmin["doldu"][0])}
+    if np.isnan(kayma):
+        return [], ozet, "defter boş"
+    if kayma <= max_kayma_bps and ozet["doldu"]:
+        return [tutar], ozet, "tek parça"
+    # Eşiği sağlayan en büyük parça: tutar ızgarasında tek vektörel değerlendirme
+    izgara = np.linspace(tutar / 200, tutar, 200)
+    t2 = dolum_tahmini(defter, taraf, izgara)
+    uygun = izgara[(t2["kayma_bps"] <= max_kayma_bps) & t2["doldu"]]
+    if not len(uygun):
+        return [], ozet, f"en küçük parçada bile kayma > {max_kayma_bps:g} bps"
+    parca = float(uygun[-1])
+    n = int(np.ceil(tutar / parca))
+    if n <= max_parca:
+        return [tutar / n] * n, ozet, f"{n} parçaya bölündü ({kayma:.1f} bps > {max_kayma_bps:g})"
+    return [parca] * max_parca, ozet, f"{max_parca} parça ile sınırlı — {tutar - parca * max_parca:.2f} reddedildi"
+
+
+class DerinlikDeposu:
+    """
+    Sembol → EmirDefteri. Akış varsa defterler fark olaylarıyla canlı, yoksa REST görüntüsü.
+      d = DerinlikDeposu(goruntu_fonk, ws_base); d.baslat(semboller)
+      defter = d.defter("BTCUSDT")   # gerekiyorsa görüntü çeker; alınamazsa None
+    goruntu_fonk(sembol) -> /api/v3/depth cevabı | None
+    Akış senkron değilken olaylar defterde tamponlanır; görüntü isteği başarısız olursa aynı
+    sembol için `goruntu_bekleme_sn`den başlayıp `max_goruntu_bekleme_sn`e kadar ikiye katlanan
+    bekleme uygulanır (her 100 ms'lik olayda REST ağırlığı harcanmaz).
+    """
+
+    def __init__(self, goruntu_fonk, ws_base=None, max_yas_sn=5.0, yeniden_baglanma_sn=5, log=None,
+                 goruntu_bekleme_sn=1.0, max_goruntu_bekleme_sn=60.0):
+        self.goruntu_fonk = goruntu_fonk
+        self.ws_base = ws_base.rstrip("/") if ws_base else None
+        self.max_yas_sn = max_yas_sn
+        self.yeniden_baglanma_sn = yeniden_baglanma_sn
+        self.goruntu_bekleme_sn = goruntu_bekleme_sn
+        self.max_goruntu_bekleme_sn = max_goruntu_bekleme_sn
+        self.log = log or (lambda m: None)
+        self._defterler = {}
+        self._bekleme = {}  # sembol -> (sonraki deneme (monotonic), son bekleme sn) — yalnızca akış thread'i
+        self._lock = threading.Lock()
+        self._dur = threading.Event()
+        self._ws = None
+        self.bagli = False
+
+    def _defter_nesnesi(self, sembol):
+        with self._lock:
+            d = self._defterler.get(sembol)
+            if d is None:
+                d = self._defterler[sembol] = EmirDefteri(sembol)
+            return d
+
+    def defter(self, sembol):
+        d = self._defter_nesnesi(sembol)
+        # Akış senkronsa görüntü yaşı önemsizdir (her olay günceller); değilse REST tazele
+        if not (self.bagli and d.senkron) and d.yas() > self.max_yas_sn:
+            veri = self.goruntu_fonk(sembol)
+            if not veri:
+                return d if d.son_id is not None and d.yas() < self.max_yas_sn * 6 else None
+            d.goruntu_yukle(veri)
+        return d
+
+    # ---------- akış ----------
+    def baslat(self, semboller):
+        if not HAS_WS or not self.ws_base or not semboller:
+            return False
+        self._dur.clear()
+        akislar = "/".join(f"{s.lower()}@depth@100ms" for s in semboller)
+        threading.Thread(target=self._calis, args=(f"{self.ws_base}/stream?streams={akislar}",), daemon=True).start()
+        return True
+
+    def durdur(self):
+        self._dur.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def _mesaj(self, _ws, mesaj):
+        try:
+            olay = json.loads(mesaj).get("data") or {}
+        except ValueError:
+            return
+        if olay.get("e") != "depthUpdate":
+            return
+        d = self._defter_nesnesi(olay["s"])
+        if d.olay_isle(olay) and d.senkron:
+            return
+        # Kopukluk ya da henüz görüntü yok: olay tamponda; görüntüyü akış thread'inde, geri çekilmeyle al
+        simdi = time.monotonic()
+        sonraki, bekleme = self._bekleme.get(d.sembol, (0.0, 0.0))
+        if simdi < sonraki:
+            return
+        veri = self.goruntu_fonk(d.sembol)
+        if veri and d.goruntu_yukle(veri):
+            self._bekleme.pop(d.sembol, None)
+            return
+        bekleme = min(max(bekleme * 2, self.goruntu_bekleme_sn), self.max_goruntu_bekleme_sn)
+        self._bekleme[d.sembol] = (simdi + bekleme, bekleme)
+        self.log(f"{d.sembol} derinlik senkronu kurulamadı — {bekleme:g} sn sonra tekrar denenecek")
+
+    def _calis(self, url):
+        while not self._dur.is_set():
+            self._ws = websocket.WebSocketApp(url, on_message=self._mesaj, on_open=lambda _ws: setattr(self, "bagli", True))
+            try:
+                self._ws.run_forever(ping_interval=180, ping_timeout=10)
+            except Exception:
+                pass
+            self.bagli = False
+            self._ws = None
+            with self._lock:
+                for d in self._defterler.values():
+                    d.senkron = False
+            if not self._dur.is_set():
+                self.log("Derinlik akışı koptu — yeniden bağlanılıyor.")
+                self._dur.wait(self.yeniden_baglanma_sn)
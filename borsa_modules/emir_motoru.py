@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Borsa filtrelerine duyarlı emir motoru.
+`/api/v3/exchangeInfo` bir kez çekilip diskte sembol bazlı filtre indeksine yazılır
+(LOT_SIZE, MARKET_LOT_SIZE, PRICE_FILTER, NOTIONAL/MIN_NOTIONAL). Miktarlar yerelde
+normalize edilir, her emre idempotent `newClientOrderId` eklenir ve dolumlar cevaptan
+ayrıştırılır.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from decimal import ROUND_DOWN, Decimal
+
+INDEKS_TTL_SN = 24 * 3600
+
+# Binance hata kodları
+HATA_FILTRE = -1013          # Filter failure: LOT_SIZE / NOTIONAL ...
+HATA_BILINMEYEN_EMIR = -2013  # Order does not exist
+
+
+@dataclass
+class SembolFiltresi:
+    sembol: str
+    durum: str = "TRADING"
+    base: str = ""
+    quote: str = ""
+    step_size: str = "0"
+    min_qty: str = "0"
+    max_qty: str = "0"
+    market_step_size: str = "0"
+    market_min_qty: str = "0"
+    market_max_qty: str = "0"
+    tick_size: str = "0"
+    min_notional: str = "0"
+    min_notional_market: bool = True
+
+    @classmethod
+    def exchange_info_sembolu(cls, s):
+        f = cls(sembol=s["symbol"], durum=s.get("status", "TRADING"), base=s.get("baseAsset", ""), quote=s.get("quoteAsset", ""))
+        for flt in s.get("filters", []):
+            tip = flt.get("filterType")
+            if tip == "LOT_SIZE":
+                f.step_size, f.min_qty, f.max_qty = flt.get("stepSize", "0"), flt.get("minQty", "0"), flt.get("maxQty", "0")
+            elif tip == "MARKET_LOT_SIZE":
+                f.market_step_size, f.market_min_qty, f.market_max_qty = flt.get("stepSize", "0"), flt.get("minQty", "0"), flt.get("maxQty", "0")
+            elif tip == "PRICE_FILTER":
+                f.tick_size = flt.get("tickSize", "0")
+            elif tip == "NOTIONAL":
+                f.min_notional = flt.get("minNotional", "0")
+                f.min_notional_market = bool(flt.get("applyMinToMarket", True))
+            elif tip == "MIN_NOTIONAL":
+                f.min_notional = flt.get("minNotional", "0")
+                f.min_notional_market = bool(flt.get("applyToMarket", True))
+        return f
+
+
+def _adima_yuvarla(deger, adim):
+    """Decimal değeri adımın katına aşağı yuvarla (adim 0 ise dokunma)."""
+    adim = Decimal(adim)
+    if adim <= 0:
+        return deger
+    return (deger / adim).to_integral_value(rounding=ROUND_DOWN) * adim
+
+
+def _metin(d):
+    """Decimal'i bilimsel gösterimsiz, sondaki sıfırlar atılmış metne çevir."""
+    s = format(d.normalize(), "f")
+    return s if s not in ("-0", "") else "0"
+
+
+def miktar_normallestir(filtre, miktar, fiyat=None, order_type="MARKET"):
+    """
+    (miktar_metni, None) ya da (None, neden) döndür.
+    MARKET emirlerde MARKET_LOT_SIZE (tanımlıysa) ve LOT_SIZE birlikte uygulanır.
+    """
+    q = Decimal(str(miktar))
+    adimlar = [filtre.step_size]
+    min_q, max_q = Decimal(filtre.min_qty or "0"), Decimal(filtre.max_qty or "0")
+    if order_type == "MARKET" and Decimal(filtre.market_step_size or "0") > 0:
+        adimlar.append(filtre.market_step_size)
+        min_q = max(min_q, Decimal(filtre.market_min_qty or "0"))
+        if Decimal(filtre.market_max_qty or "0") > 0:
+            max_q = min(max_q, Decimal(filtre.market_max_qty)) if max_q > 0 else Decimal(filtre.market_max_qty)
+    if max_q > 0 and q > max_q:
+        q = max_q
+    for adim in adimlar:
+        q = _adima_yuvarla(q, adim)
+    if q <= 0 or q < min_q:
+        return None, f"LOT_SIZE: miktar {_metin(q)} < min {_metin(min_q)}"
+    min_notional = Decimal(filtre.min_notional or "0")
+    if fiyat and min_notional > 0 and (order_type != "MARKET" or filtre.min_notional_market):
+        notional = q * Decimal(str(fiyat))
+        if notional < min_notional:
+            return None, f"NOTIONAL: {float(notional):.4f} < min {_metin(min_notional)}"
+    return _metin(q), None
+
+
+def fiyat_normallestir(filtre, fiyat):
+    """LIMIT emirler için PRICE_FILTER tickSize'a yuvarla."""
+    return _metin(_adima_yuvarla(Decimal(str(fiyat)), filtre.tick_size))
+
+
+def niyet_anahtari():
+    """
+    Yeni bir emir niyeti (alım kararı, pozisyon) için benzersiz anahtar. Karar anında bir kez
+    üretilir ve o niyetin tüm tekrar denemelerinde aynen kullanılır — zaman damgası gibi aynı
+    dakikadaki başka bir niyetle çakışamaz.
+    """
+    return uuid.uuid4().hex[:16]
+
+
+def istemci_emir_id(sembol, side, niyet=None):
+    """Binance newClientOrderId (≤36 karakter). Aynı niyet → aynı id (tekrar denemede idempotent)."""
+    if niyet is None:
+        return f"bs{side[:1]}{uuid.uuid4().hex[:30]}"
+    h = hashlib.sha1(f"{sembol}|{side}|{niyet}".encode("utf-8")).hexdigest()
+    return f"bs{side[:1]}{h[:30]}"
+
+
+def dolum_ayristir(cevap):
+    """Emir cevabından (FULL/RESULT/sorgu) dolum özetini çıkar."""
+    fills = cevap.get("fills") or []
+    toplam_q = Decimal(0)
+    toplam_tutar = Decimal(0)
+    komisyon = {}
+    for f in fills:
+        q, p = Decimal(str(f.get("qty", "0"))), Decimal(str(f.get("price", "0")))
+        toplam_q += q
+        toplam_tutar += q * p
+        varlik = f.get("commissionAsset") or ""
+        komisyon[varlik] = komisyon.get(varlik, Decimal(0)) + Decimal(str(f.get("commission", "0")))
+    executed = Decimal(str(cevap.get("executedQty", "0") or "0"))
+    quote = Decimal(str(cevap.get("cummulativeQuoteQty", "0") or "0"))
+    if toplam_q > 0:
+        ort = toplam_tutar / toplam_q
+    elif executed > 0 and quote > 0:
+        ort = quote / executed
+    else:
+        ort = Decimal(0)
+    return {
+        "orderId": cevap.get("orderId"),
+        "clientOrderId": cevap.get("clientOrderId"),
+        "sembol": cevap.get("symbol"),
+        "side": cevap.get("side"),
+        "durum": cevap.get("status"),
+        "executedQty": float(executed),
+        "cummulativeQuoteQty": float(quote),
+        "ortalama_fiyat": float(ort),
+        "komisyon": {k: float(v) for k, v in komisyon.items()},
+        "fills": fills,
+        "ham": cevap,
+    }
+
+
+class FiltreIndeksi:
+    """exchangeInfo'dan türetilmiş, diskte önbelleklenen sembol → SembolFiltresi indeksi."""
+
+    def __init__(self, yukle_fonk, cache_yolu=None, ttl_sn=INDEKS_TTL_SN):
+        self.yukle_fonk = yukle_fonk
+        self.cache_yolu = cache_yolu
+        self.ttl_sn = ttl_sn
+        self._indeks = {}
+        self._zaman = 0.0
+        self._lock = threading.Lock()
+
+    def _diskten(self):
+        """Kilit altında çağrılır."""
+        if not self.cache_yolu or not os.path.exists(self.cache_yolu):
+            return False
+        try:
+            with open(self.cache_yolu, "r", encoding="utf-8") as f:
+                veri = json.load(f)
+            if time.time() - veri.get("zaman", 0) > self.ttl_sn:
+                return False
+            self._indeks = {k: SembolFiltresi(**v) for k, v in veri.get("semboller", {}).items()}
+            self._zaman = veri.get("zaman", 0)
+            return bool(self._indeks)
+        except Exception:
+            return False
+
+    def _diske(self):
+        if not self.cache_yolu:
+            return
+        tmp = self.cache_yolu + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"zaman": self._zaman, "semboller": {k: asdict(v) for k, v in self._indeks.items()}}, f)
+            os.replace(tmp, self.cache_yolu)
+        except Exception:
+            pass
+
+    def yenile(self):
+        """exchangeInfo'yu yeniden çek. Başarılıysa True."""
+        veri = self.yukle_fonk()
+        if not veri or "symbols" not in veri:
+            return False
+        with self._lock:
+            self._indeks = {s["symbol"]: SembolFiltresi.exchange_info_sembolu(s) for s in veri["symbols"]}
+            self._zaman = time.time()
+            self._diske()
+        return True
+
+    def get(self, sembol):
+        with self._lock:
+            bos = (not self._indeks or time.time() - self._zaman > self.ttl_sn) and not self._diskten()
+        if bos:
+            self.yenile()  # ağ çağrısı kilit dışında; indeks kilit altında değiştirilir
+        with self._lock:
+            return self._indeks.get(sembol)
+
+
+class EmirMotoru:
+    """
+    istek_fonk(api_key, api_secret, method, endpoint, params) -> dict | None
+    (None = ağ hatası; hata cevapları Binance'in {code, msg} gövdesiyle döner)
+    """
+
+    def __init__(self, istek_fonk, indeks):
+        self.istek_fonk = istek_fonk
+        self.indeks = indeks
+
+    def _sorgula(self, api_key, api_secret, sembol, client_id):
+        return self.istek_fonk(api_key, api_secret, "GET", "/api/v3/order", {"symbol": sembol, "origClientOrderId": client_id})
+
+    def emir(self, api_key, api_secret, sembol, side, miktar, fiyat=None, order_type="MARKET", niyet=None):
+        """(ok, sonuc) — ok ise sonuc dolum özeti, değilse {code, msg} hata sözlüğü."""
+        filtre = self.indeks.get(sembol)
+        if filtre is None:
+            return False, {"code": None, "msg": f"{sembol} için exchangeInfo filtresi yok"}
+        if filtre.durum != "TRADING":
+            return False, {"code": None, "msg": f"{sembol} işlem durumu: {filtre.durum}"}
+        q, neden = miktar_normallestir(filtre, miktar, fiyat, order_type)
+        if q is None:
+            return False, {"code": HATA_FILTRE, "msg": f"Yerel filtre reddi — {neden}"}
+        client_id = istemci_emir_id(sembol, side, niyet)
+        params = {"symbol": sembol, "side": side, "type": order_type, "quantity": q,
+                  "newClientOrderId": client_id, "newOrderRespType": "FULL"}
+        if order_type == "LIMIT":
+            params["price"] = fiyat_normallestir(filtre, fiyat)
+            params["timeInForce"] = "GTC"
+        data = None
+        for deneme in range(2):
+            data = self.istek_fonk(api_key, api_secret, "POST", "/api/v3/order", params)
+            if data is not None:
+                break
+            # Ağ hatası: emir borsaya ulaşmış olabilir — aynı client id ile sorgula, yoksa tekrar gönder
+            sorgu = self._sorgula(api_key, api_secret, sembol, client_id)
+            if sorgu and "orderId" in sorgu:
+                data = sorgu
+                break
+        if data and "orderId" in data:
+            return True, dolum_ayristir(data)
+        if data and data.get("code") == HATA_FILTRE:
+            # Filtreler değişmiş olabilir: indeksi tazele (sonraki denemede güncel kurallar)
+            self.indeks.yenile()
+        return False, data or {"code": None, "msg": "Emir hatası (cevap yok)"}
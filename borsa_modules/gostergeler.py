@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Yerel teknik göstergeler (NumPy) — yeniden örneklenmiş mumlardan RSI, MACD, Stochastic,
+Bollinger, ATR, ADX, EMA/SMA ve OBV eğilimi; TradingView özet önerisine benzer oylama ile
+dilim sinyali (AL/SAT/BEKLE). Özyinelemeli yumuşatmalar (EMA/Wilder) düz döngüdür;
+mum sayısı dilim başına birkaç yüz olduğundan maliyet düşüktür.
+"""
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def sma(x, n):
+    if len(x) < n:
+        return None
+    return float(np.mean(x[-n:]))
+
+
+def ema_seri(x, n):
+    """EMA serisi (ilk n değerin SMA'sı ile tohumlanır). Yetersiz veri → boş dizi."""
+    if len(x) < n:
+        return np.empty(0)
+    a = 2.0 / (n + 1)
+    e = float(np.mean(x[:n]))
+    out = [e]
+    for v in x[n:].tolist():
+        e += a * (v - e)
+        out.append(e)
+    return np.array(out)
+
+
+def _wilder(x, n):
+    """Wilder yumuşatması (RMA) serisi — RSI/ATR/ADX için."""
+    if len(x) < n:
+        return np.empty(0)
+    e = float(np.mean(x[:n]))
+    out = [e]
+    for v in x[n:].tolist():
+        e += (v - e) / n
+        out.append(e)
+    return np.array(out)
+
+
+def rsi(kapanis, n=14):
+    if len(kapanis) <= n:
+        return None
+    fark = np.diff(kapanis)
+    kazanc = _wilder(np.clip(fark, 0, None), n)
+    kayip = _wilder(np.clip(-fark, 0, None), n)
+    if kayip[-1] == 0:
+        return 100.0
+    return float(100 - 100 / (1 + kazanc[-1] / kayip[-1]))
+
+
+def macd(kapanis, hizli=12, yavas=26, sinyal=9):
+    """(macd, sinyal, histogram) ya da None."""
+    e_yavas = ema_seri(kapanis, yavas)
+    if len(e_yavas) < sinyal:
+        return None
+    e_hizli = ema_seri(kapanis, hizli)[-len(e_yavas):]
+    m = e_hizli - e_yavas
+    s = ema_seri(m, sinyal)
+    return float(m[-1]), float(s[-1]), float(m[-1] - s[-1])
+
+
+def stoch_k(yuksek, dusuk, kapanis, n=14, yumusatma=3):
+    if len(kapanis) < n + yumusatma - 1:
+        return None
+    hh = np.lib.stride_tricks.sliding_window_view(yuksek, n).max(axis=1)[-yumusatma:]
+    ll = np.lib.stride_tricks.sliding_window_view(dusuk, n).min(axis=1)[-yumusatma:]
+    aralik = np.where(hh > ll, hh - ll, np.nan)
+    k = (kapanis[-yumusatma:] - ll) / aralik * 100
+    return float(np.nanmean(k)) if not np.isnan(k).all() else None
+
+
+def bollinger(kapanis, n=20, k=2.0):
+    if len(kapanis) < n:
+        return None
+    son = kapanis[-n:]
+    orta, std = float(son.mean()), float(son.std())
+    return orta + k * std, orta, orta - k * std
+
+
+def _gercek_aralik(yuksek, dusuk, kapanis):
+    onceki = kapanis[:-1]
+    return np.maximum(yuksek[1:] - dusuk[1:], np.maximum(np.abs(yuksek[1:] - onceki), np.abs(dusuk[1:] - onceki)))
+
+
+def atr(yuksek, dusuk, kapanis, n=14):
+    if len(kapanis) <= n:
+        return None
+    return float(_wilder(_gercek_aralik(yuksek, dusuk, kapanis), n)[-1])
+
+
+def adx(yuksek, dusuk, kapanis, n=14):
+    """(adx, +DI, -DI) ya da None."""
+    if len(kapanis) <= 2 * n:
+        return None
+    yukari, asagi = np.diff(yuksek), -np.diff(dusuk)
+    arti = np.where((yukari > asagi) & (yukari > 0), yukari, 0.0)
+    eksi = np.where((asagi > yukari) & (asagi > 0), asagi, 0.0)
+    tr = _wilder(_gercek_aralik(yuksek, dusuk, kapanis), n)
+    tr = np.where(tr > 0, tr, np.nan)
+    arti_di = 100 * _wilder(arti, n) / tr
+    eksi_di = 100 * _wilder(eksi, n) / tr
+    toplam = arti_di + eksi_di
+    dx = np.where(toplam > 0, 100 * np.abs(arti_di - eksi_di) / toplam, 0.0)
+    adx_seri = _wilder(np.nan_to_num(dx), n)
+    return float(adx_seri[-1]), float(arti_di[-1]), float(eksi_di[-1])
+
+
+def obv_egilimi(kapanis, hacim, n=20):
+    """Son n mumda OBV eğimi: 'yükseliş' / 'düşüş' / 'yatay'."""
+    if len(kapanis) <= n:
+        return None
+    obv = np.cumsum(np.sign(np.diff(kapanis[-n - 1:])) * hacim[-n:])
+    egim = np.polyfit(np.arange(n), obv, 1)[0]
+    olcek = float(np.abs(hacim[-n:]).mean()) or 1.0
+    if egim > 0.05 * olcek:
+        return "yükseliş"
+    if egim < -0.05 * olcek:
+        return "düşüş"
+    return "yatay"
+
+
+def hesapla(yuksek, dusuk, kapanis, hacim):
+    """Tek dilimin gösterge sözlüğü (yetersiz veri → ilgili anahtar None)."""
+    g = {"kapanis": float(kapanis[-1]) if len(kapanis) else None}
+    g["rsi"] = rsi(kapanis)
+    m = macd(kapanis)
+    g["macd"], g["macd_sinyal"], g["macd_hist"] = m if m else (None, None, None)
+    g["stoch"] = stoch_k(yuksek, dusuk, kapanis)
+    bb = bollinger(kapanis)
+    g["bb_ust"], g["bb_orta"], g["bb_alt"] = bb if bb else (None, None, None)
+    g["atr"] = atr(yuksek, dusuk, kapanis)
+    a = adx(yuksek, dusuk, kapanis)
+    g["adx"], g["arti_di"], g["eksi_di"] = a if a else (None, None, None)
+    for n in (9, 21, 50, 200):
+        e = ema_seri(kapanis, n)
+        g[f"ema_{n}"] = float(e[-1]) if len(e) else None
+    g["sma_50"], g["sma_200"] = sma(kapanis, 50), sma(kapanis, 200)
+    g["obv_trend"] = obv_egilimi(kapanis, hacim)
+    return g
+
+
+def sinyal(g):
+    """TradingView 'Recommend.All' benzeri oylama: ortalama > 0.1 AL, < -0.1 SAT, aksi BEKLE."""
+    oylar = []
+    c = g.get("kapanis")
+    if g.get("rsi") is not None:
+        oylar.append(1 if g["rsi"] < 30 else -1 if g["rsi"] > 70 else 0)
+    if g.get("stoch") is not None:
+        oylar.append(1 if g["stoch"] < 20 else -1 if g["stoch"] > 80 else 0)
+    if g.get("macd") is not None:
+        oylar.append(1 if g["macd"] > g["macd_sinyal"] else -1)
+    if g.get("adx") is not None and g["adx"] > 20:
+        oylar.append(1 if g["arti_di"] > g["eksi_di"] else -1)
+    for k in ("ema_21", "ema_50", "sma_200"):
+        if c is not None and g.get(k) is not None:
+            oylar.append(1 if c > g[k] else -1)
+    if not oylar:
+        return "—"
+    ort = sum(oylar) / len(oylar)
+    return "AL" if ort > 0.1 else "SAT" if ort < -0.1 else "BEKLE"
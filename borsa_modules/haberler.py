@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Arka plan haber ve duyarlılık (sentiment) hattı.
+Kripto RSS/Atom kaynakları eş zamanlı çekilir; ETag / Last-Modified ile koşullu GET yapılır
+(304 → ayrıştırma yok). Yerel dosya kaynaklarında (yol ya da file://) değişiklik tarihi aynı
+amaçla kullanılır. Haberler içerik hash'iyle tekilleştirilir, yeni olanlar tur sonunda toplu
+puanlanır (TextBlob; kurulu değilse küçük bir sözlük) ve başlık/özetteki sembol adlarına göre
+sembol başına kayan pencereye eklenir. Özetler tur sonunda hazırlanır; işlem yolundaki
+okuma (`ozet`) tek sözlük erişimidir, ağa çıkmaz.
+"""
+
+import calendar
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+try:
+    import feedparser
+    HAS_FEEDPARSER = True
+except ImportError:
+    HAS_FEEDPARSER = False
+
+try:
+    from textblob import TextBlob
+    HAS_TEXTBLOB = True
+except ImportError:
+    HAS_TEXTBLOB = False
+
+VARSAYILAN_KAYNAKLAR = [
+    "https://www.coindesk.com/arc/outboundfeeds/rss/",
+    "https://cointelegraph.com/rss",
+    "https://decrypt.co/feed",
+    "https://bitcoinmagazine.com/feed",
+]
+
+# Base varlık -> başlıkta geçebilecek adlar (büyük/küçük harf duyarsız). Sembolün kendisi yalnızca
+# ticker biçiminde aranır (LINK, $link, LINKUSDT, LINK/USDT) — "link", "dot" gibi sıradan kelimeler eşleşmez.
+VARLIK_ADLARI = {
+    "BTC": ("bitcoin",), "ETH": ("ethereum", "ether"), "BNB": ("binance coin",),
+    "XRP": ("ripple",), "SOL": ("solana",), "ADA": ("cardano",), "DOGE": ("dogecoin",),
+    "AVAX": ("avalanche",), "LINK": ("chainlink",), "DOT": ("polkadot",),
+}
+PIYASA = "*"  # hiçbir sembole eşleşmeyen haberler: genel piyasa havası
+
+# TextBlob yokken kullanılan kaba sözlük (kelime kökü -> puan)
+_SOZLUK = {
+    "surge": 1, "soar": 1, "rally": 1, "gain": 0.5, "rise": 0.5, "jump": 0.8, "record": 0.5, "bull": 0.8,
+    "approv": 0.8, "adopt": 0.6, "partnership": 0.5, "upgrade": 0.4, "inflow": 0.6, "breakout": 0.7,
+    "plunge": -1, "crash": -1, "drop": -0.6, "fall": -0.5, "slump": -0.8, "bear": -0.8, "hack": -1,
+    "exploit": -1, "lawsuit": -0.8, "sue": -0.7, "ban": -0.8, "fraud": -1, "outflow": -0.6,
+    "liquidat": -0.7, "sell-off": -0.8, "selloff": -0.8, "reject": -0.6, "delay": -0.4, "warn": -0.5,
+}
+_KELIME = re.compile(r"[a-z][a-z\-]+")
+_ETIKET = re.compile(r"<[^>]+>")
+
+
+def duygu_puanla(metinler):
+    """Metin listesini toplu puanla: her biri [-1, 1] (negatif → olumsuz)."""
+    if HAS_TEXTBLOB:
+        return [float(TextBlob(m).sentiment.polarity) for m in metinler]
+    puanlar = []
+    for m in metinler:
+        toplam, n = 0.0, 0
+        for k in _KELIME.findall(m.lower()):
+            for kok, p in _SOZLUK.items():
+                if k.startswith(kok):
+                    toplam += p
+                    n += 1
+                    break
+        puanlar.append(max(-1.0, min(1.0, toplam / math.sqrt(n))) if n else 0.0)
+    return puanlar
+
+
+def _metin(el, *adlar):
+    for ad in adlar:
+        x = el.find(ad)
+        if x is not None and (x.text or "").strip():
+            return x.text.strip()
+    return ""
+
+
+def _zaman_coz(deger):
+    if not deger:
+        return None
+    try:
+        return parsedate_to_datetime(deger).timestamp()  # RSS (RFC 822)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(deger.replace("Z", "+00:00")).timestamp()  # Atom (ISO 8601)
+    except ValueError:
+        return None
+
+
+def akis_ayristir(icerik):
+    """RSS/Atom içeriği → [{baslik, ozet, link, zaman}]. feedparser yoksa ElementTree ile."""
+    if HAS_FEEDPARSER:
+        d = feedparser.parse(icerik)
+        out = []
+        for e in d.entries:
+            z = e.get("published_parsed") or e.get("updated_parsed")
+            out.append({
+                "baslik": e.get("title", ""),
+                "ozet": _ETIKET.sub(" ", e.get("summary", "")),
+                "link": e.get("link", ""),
+                "zaman": calendar.timegm(z) if z else None,
+            })
+        return out
+    try:
+        kok = ET.fromstring(icerik)
+    except ET.ParseError:
+        return []
+    atom = "{http://www.w3.org/2005/Atom}"
+    out = []
+    for it in kok.iter("item"):
+        out.append({"baslik": _metin(it, "title"), "ozet": _ETIKET.sub(" ", _metin(it, "description")),
+                    "link": _metin(it, "link"), "zaman": _zaman_coz(_metin(it, "pubDate"))})
+    for it in kok.iter(f"{atom}entry"):
+        link = it.find(f"{atom}link")
+        out.append({"baslik": _metin(it, f"{atom}title"), "ozet": _ETIKET.sub(" ", _metin(it, f"{atom}summary", f"{atom}content")),
+                    "link": link.get("href", "") if link is not None else "",
+                    "zaman": _zaman_coz(_metin(it, f"{atom}updated", f"{atom}published"))})
+    return out
+
+
+def _hash(haber):
+    metin = re.sub(r"\s+", " ", f"{haber['baslik']} {haber['ozet']}".lower()).strip()
+    return hashlib.sha1(metin.encode("utf-8")).hexdigest()
+
+
+class HaberHatti:
+    """
+      h = HaberHatti(["BTCUSDT", ...], kaynaklar)
+      h.baslat(aralik_sn=300)          # arka planda periyodik tur
+      h.tur()                          # tek tur (senkron; test / CLI)
+      h.ozet("BTCUSDT")                # {"skor", "haber", "olumlu", "olumsuz", "basliklar", "zaman"} | None
+    """
+
+    def __init__(self, semboller, kaynaklar=None, es_zamanli=4, pencere_sn=6 * 3600, yari_omur_sn=3 * 3600,
+                 sembol_kapasitesi=50, gorulen_kapasitesi=5000, zaman_asimi=8, saat=time.time, log=None):
+        self.kaynaklar = list(kaynaklar or VARSAYILAN_KAYNAKLAR)
+        self.es_zamanli = es_zamanli
+        self.pencere_sn = pencere_sn
+        self.yari_omur_sn = yari_omur_sn
+        self.sembol_kapasitesi = sembol_kapasitesi
+        self.gorulen_kapasitesi = gorulen_kapasitesi
+        self.zaman_asimi = zaman_asimi
+        self.saat = saat
+        self.log = log or (lambda m: None)
+        self._desenler = {}
+        for s in semboller:
+            base = s[:-4] if s.endswith("USDT") else s
+            t = re.escape(base)
+            secenekler = [rf"\b{t}(?:/?USDT)?\b", rf"(?i:\${t}\b|\b{t}/?USDT\b)"]
+            if VARLIK_ADLARI.get(base):
+                secenekler.append(r"(?i:\b(?:" + "|".join(re.escape(a) for a in VARLIK_ADLARI[base]) + r")\b)")
+            self._desenler[s] = re.compile("|".join(secenekler))
+        self._kosul = {}               # kaynak -> {"etag", "last_modified"} | {"mtime"}
+        self._gorulen = OrderedDict()  # içerik hash'i -> ilk görülme
+        self._haberler = {}            # sembol -> deque[(zaman, skor, baslik)]
+        self._ozetler = {}             # sembol -> hazır özet (okuma yolu)
+        self._lock = threading.Lock()
+        self._dur = threading.Event()
+        self._thread = None
+        self.sayac = {"tur": 0, "cekim": 0, "degismedi": 0, "hata": 0, "yeni": 0, "tekrar": 0}
+
+    # ---------- çekim ----------
+    def _say(self, ad):
+        with self._lock:  # _cek havuz thread'lerinde eş zamanlı çalışır
+            self.sayac[ad] += 1
+
+    def _cek(self, kaynak):
+        """(içerik | None). Değişmediyse (304 / aynı mtime) ya da hata → None."""
+        if kaynak.startswith("file://") or os.path.exists(kaynak):
+            yol = kaynak[7:] if kaynak.startswith("file://") else kaynak
+            try:
+                mtime = os.path.getmtime(yol)
+                with self._lock:
+                    degismedi = self._kosul.get(kaynak, {}).get("mtime") == mtime
+                if degismedi:
+                    self._say("degismedi")
+                    return None
+                with open(yol, "rb") as f:
+                    icerik = f.read()
+            except OSError:
+                self._say("hata")
+                return None
+            with self._lock:
+                self._kosul[kaynak] = {"mtime": mtime}
+            self._say("cekim")
+            return icerik
+        if not HAS_REQUESTS:
+            return None
+        with self._lock:
+            kosul = dict(self._kosul.get(kaynak, {}))
+        basliklar = {"User-Agent": "borsa-haber/1.0"}
+        if kosul.get("etag"):
+            basliklar["If-None-Match"] = kosul["etag"]
+        if kosul.get("last_modified"):
+            basliklar["If-Modified-Since"] = kosul["last_modified"]
+        try:
+            r = requests.get(kaynak, headers=basliklar, timeout=self.zaman_asimi)
+        except Exception:
+            self._say("hata")
+            return None
+        if r.status_code == 304:
+            self._say("degismedi")
+            return None
+        if r.status_code != 200:
+            self._say("hata")
+            return None
+        with self._lock:
+            self._kosul[kaynak] = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+        self._say("cekim")
+        return r.content
+
+    def tur(self):
+        """Tüm kaynakları eş zamanlı çek, yeni haberleri puanla, özetleri yenile. Yeni haber sayısı."""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.es_zamanli, len(self.kaynaklar)))) as havuz:
+            icerikler = list(havuz.map(self._cek, self.kaynaklar))
+        simdi = self.saat()
+        yeniler = []
+        for icerik in icerikler:
+            if icerik is None:
+                continue
+            for h in akis_ayristir(icerik):
+                if not h["baslik"]:
+                    continue
+                z = h["zaman"] or simdi
+                if simdi - z > self.pencere_sn:
+                    continue
+                anahtar = _hash(h)
+                if anahtar in self._gorulen:
+                    self._say("tekrar")
+                    continue
+                self._gorulen[anahtar] = simdi
+                if len(self._gorulen) > self.gorulen_kapasitesi:
+                    self._gorulen.popitem(last=False)
+                h["zaman"] = z
+                yeniler.append(h)
+        puanlar = duygu_puanla([f"{h['baslik']}. {h['ozet']}" for h in yeniler]) if yeniler else []
+        with self._lock:
+            for h, skor in zip(yeniler, puanlar):
+                metin = f"{h['baslik']} {h['ozet']}"
+                eslesen = [s for s, d in self._desenler.items() if d.search(metin)] or [PIYASA]
+                for s in eslesen:
+                    kuyruk = self._haberler.get(s)
+                    if kuyruk is None:
+                        kuyruk = self._haberler[s] = deque(maxlen=self.sembol_kapasitesi)
+                    kuyruk.append((h["zaman"], skor, h["baslik"]))
+            self._ozetleri_hazirla(simdi)
+            self.sayac["tur"] += 1
+            self.sayac["yeni"] += len(yeniler)
+        return len(yeniler)
+
+    def _ozetleri_hazirla(self, simdi):
+        """Pencere dışına düşenleri at; sembol başına zamanla sönümlenen ortalama skoru hesapla."""
+        ozetler = {}
+        for s, kuyruk in self._haberler.items():
+            gecerli = sorted((h for h in kuyruk if simdi - h[0] <= self.pencere_sn), key=lambda h: h[0])
+            kuyruk.clear()
+            kuyruk.extend(gecerli)
+            if not gecerli:
+                continue
+            agirlik = [0.5 ** ((simdi - z) / self.yari_omur_sn) for z, _, _ in gecerli]
+            ozetler[s] = {
+                "skor": round(sum(w * p for w, (_, p, _) in zip(agirlik, gecerli)) / sum(agirlik), 3),
+                "haber": len(gecerli),
+                "olumlu": sum(1 for _, p, _ in gecerli if p > 0.1),
+                "olumsuz": sum(1 for _, p, _ in gecerli if p < -0.1),
+                "basliklar": [b for _, _, b in gecerli[-3:]][::-1],
+                "zaman": simdi,
+            }
+        self._ozetler = ozetler
+
+    # ---------- okuma (işlem yolu) ----------
+    def ozet(self, sembol):
+        return self._ozetler.get(sembol)
+
+    def piyasa(self):
+        return self._ozetler.get(PIYASA)
+
+    # ---------- arka plan ----------
+    def baslat(self, aralik_sn=300):
+        self._dur.clear()
+        self._thread = threading.Thread(target=self._calis, args=(aralik_sn,), daemon=True)
+        self._thread.start()
+
+    def durdur(self):
+        self._dur.set()
+
+    def _calis(self, aralik_sn):
+        while not self._dur.is_set():
+            try:
+                yeni = self.tur()
+                if yeni:
+                    self.log(f"📰 {yeni} yeni haber puanlandı")
+            except Exception as e:
+                self.log(f"Haber turu hatası: {e}")
+            self._dur.wait(aralik_sn)
+
+
+def main(argv=None):
+    """Yerel dosya ya da URL kaynaklarıyla tek tur: python -m borsa_modules.haberler akis.xml ..."""
+    import argparse
+    ap = argparse.ArgumentParser(description="Haber/duyarlılık hattı — tek tur")
+    ap.add_argument("kaynaklar", nargs="*", help="RSS/Atom dosyaları ya da URL'ler (boşsa varsayılan kaynaklar)")
+    ap.add_argument("--sembol", default="BTCUSDT,ETHUSDT,BNBUSDT,XRPUSDT,SOLUSDT,ADAUSDT,DOGEUSDT,AVAXUSDT,LINKUSDT,DOTUSDT")
+    ap.add_argument("--pencere-saat", type=float, default=24 * 365, help="Bu kadar saatten eski haberleri yok say")
+    args = ap.parse_args(argv)
+    semboller = [s.strip() for s in args.sembol.split(",") if s.strip()]
+    h = HaberHatti(semboller, args.kaynaklar or None, pencere_sn=args.pencere_saat * 3600)
+    t0 = time.perf_counter()
+    yeni = h.tur()
+    print(f"{yeni} yeni haber, {time.perf_counter() - t0:.2f} sn — {h.sayac} (TextBlob: {'var' if HAS_TEXTBLOB else 'yok, sözlük'})")
+    for s in semboller + [PIYASA]:
+        o = h.ozet(s)
+        if o:
+            print(f"  {s:<10} skor {o['skor']:+.3f}  haber {o['haber']:>3} (+{o['olumlu']}/-{o['olumsuz']})  {o['basliklar'][0][:70]}")
+
+
+if __name__ == "__main__":
+    main()
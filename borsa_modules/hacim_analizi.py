@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Günün saatine göre hacim tabanı ve anomali tespiti.
+Her sembol için gün `bar_ms`lik dilimlere bölünür (15m → 96 dilim). Her dilimde log(1 + hacim)'in
+üstel ağırlıklı ortalaması tutulur (dilim günde bir gözlem alır; yarılanma gün cinsinden).
+Dağılım ise sembol başına tek: mumun kendi dilim ortalamasından sapmasının (artık) her barda
+güncellenen üstel ağırlıklı varyansı — dilim başına birkaç günlük gözlemle varyans kestirmek
+kalın kuyruk (çok yanlış alarm) verir. Yeni kapanmış mum önce tabana göre z-skoruna çevrilir,
+sonra tabana işlenir — mum başına O(1), geçmiş saklanmaz. Dilim henüz `min_gozlem` gözlem
+görmediyse sembolün gün içi ayrımı yapmayan genel tabanı kullanılır (ısınma).
+Borsa açılışı / Asya-ABD seansı gibi her gün tekrarlayan hacim artışları kendi dilimlerinin
+tabanına girdiği için anomali sayılmaz; düz (tek tabanlı) z-skoruna göre yanlış alarm azalır.
+
+Tüm evren tek barda vektörel işlenebilir (bar_ekle): bar başına birkaç numpy işlemi.
+"""
+
+import math
+import threading
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+GUN_MS = 24 * 3_600_000
+
+
+def _ewma_adim(ort, var, x, a):
+    """Üstel ağırlıklı ortalama / varyans tek adım (skaler ya da dizi)."""
+    d = x - ort
+    return ort + a * d, (1 - a) * (var + a * d * d)
+
+
+class HacimProfili:
+    """
+      p = HacimProfili(SEMBOL_LISTESI, bar_ms=15 * 60_000)
+      p.seriden_guncelle("BTCUSDT", acilis_zamanlari, hacimler)   # yeni kapanmış mumlar işlenir
+      p.bar_ekle(acilis_ms, hacimler)                             # tüm evren tek barda (p.semboller sırası, eksik = NaN)
+      p.degerlendir("BTCUSDT", kismi=(acilis_ms, hacim))          # {"hacim_z", "hacim_anomali", ...}
+    Yeni sembol ilk görüldüğünde eklenir. Thread-safe.
+    Artık varyansı, dilimi en az `min_artik_dilim` gözlemli mumlardan beslenir (daha az gözlemli dilim
+    ortalamasının kestirim hatası varyansı şişirmesin).
+    """
+
+    def __init__(self, semboller=(), bar_ms=15 * 60_000, yarilanma_gun=14.0, genel_yarilanma_bar=None,
+                 min_gozlem=3, min_artik_dilim=2, esik_z=3.0, dusuk_z=-2.0, min_std=0.05):
+        if GUN_MS % int(bar_ms):
+            raise ValueError(f"bar_ms ({bar_ms}) günü tam bölmeli")
+        self.bar_ms = int(bar_ms)
+        self.dilim_sayisi = GUN_MS // self.bar_ms
+        # Dilim günde bir gözlem alır; genel taban her barda (varsayılan yarılanma: bir gün)
+        self.alfa = 1 - 0.5 ** (1 / float(yarilanma_gun))
+        self.genel_alfa = 1 - 0.5 ** (1 / float(genel_yarilanma_bar or self.dilim_sayisi))
+        self.min_gozlem = int(min_gozlem)
+        self.min_artik_dilim = int(min_artik_dilim)
+        self.esik_z = float(esik_z)
+        self.dusuk_z = float(dusuk_z)
+        self.min_std = float(min_std)
+        self.semboller = []
+        self.indeks = {}
+        self._lock = threading.Lock()
+        if not HAS_NUMPY:
+            return  # profil tutulmaz: güncellemeler no-op, okumalar None
+        self._ayir(max(8, len(semboller)))
+        for s in semboller:
+            self._sembol(s)
+
+    def _ayir(self, kapasite):
+        """Sembol satırlarını `kapasite`ye büyüt (mevcut durum korunur)."""
+        n, d = len(self.semboller), self.dilim_sayisi
+        eski = getattr(self, "_ort", None)
+        yeni = {
+            "_ort": np.zeros((kapasite, d)), "_say": np.zeros((kapasite, d), dtype=np.int32),
+            "_g_ort": np.zeros(kapasite), "_g_var": np.zeros(kapasite), "_g_say": np.zeros(kapasite, dtype=np.int64),
+            "_a_var": np.zeros(kapasite), "_a_say": np.zeros(kapasite, dtype=np.int64),
+            "_son_zaman": np.full(kapasite, -1, dtype=np.int64), "_son_z": np.full(kapasite, np.nan),
+        }
+        for ad, dizi in yeni.items():
+            if eski is not None:
+                dizi[:n] = getattr(self, ad)[:n]
+            setattr(self, ad, dizi)
+
+    def _sembol(self, sembol):
+        i = self.indeks.get(sembol)
+        if i is None:
+            i = len(self.semboller)
+            if i >= len(self._ort):
+                self._ayir(2 * len(self._ort))
+            self.semboller.append(sembol)
+            self.indeks[sembol] = i
+        return i
+
+    def _dilim(self, acilis_ms):
+        return (int(acilis_ms) % GUN_MS) // self.bar_ms
+
+    def _taban(self, i, d):
+        """(ortalama, varyans) — dilim hazırsa dilim ortalaması + artık varyansı, değilse genel taban; yoksa None."""
+        if self._say[i, d] >= self.min_gozlem and self._a_say[i] >= self.min_gozlem:
+            return float(self._ort[i, d]), float(self._a_var[i])
+        if self._g_say[i] >= self.min_gozlem:
+            return float(self._g_ort[i]), float(self._g_var[i])
+        return None
+
+    def _z(self, i, d, x):
+        taban = self._taban(i, d)
+        if taban is None:
+            return math.nan
+        return (x - taban[0]) / max(math.sqrt(taban[1]), self.min_std)
+
+    # ---------- besleme ----------
+    def _mum(self, i, acilis_ms, hacim):
+        """Kilit altında: tek kapanmış mum (skaler yol). Önceki tabana göre z döner."""
+        d = self._dilim(acilis_ms)
+        x = math.log1p(max(float(hacim), 0.0))
+        z = self._z(i, d, x)
+        # İlk gözlemlerde a = 1/(n+1): taban basit ortalamayla ısınır
+        say = int(self._say[i, d])
+        ort = float(self._ort[i, d])
+        if say >= self.min_artik_dilim:
+            a_say = int(self._a_say[i])
+            _, self._a_var[i] = _ewma_adim(0.0, float(self._a_var[i]), x - ort, max(self.genel_alfa, 1.0 / (a_say + 1)))
+            self._a_say[i] = a_say + 1
+        self._ort[i, d] = ort + max(self.alfa, 1.0 / (say + 1)) * (x - ort)
+        self._say[i, d] = say + 1
+        g_say = int(self._g_say[i])
+        self._g_ort[i], self._g_var[i] = _ewma_adim(float(self._g_ort[i]), float(self._g_var[i]), x, max(self.genel_alfa, 1.0 / (g_say + 1)))
+        self._g_say[i] = g_say + 1
+        self._son_zaman[i] = acilis_ms
+        self._son_z[i] = z
+        return z
+
+    def mum_ekle(self, sembol, acilis_ms, hacim):
+        """Tek kapanmış mum. Önceki tabana göre z-skoru (taban hazır değilse NaN); zaten işlenmişse None."""
+        if not HAS_NUMPY:
+            return None
+        with self._lock:
+            i = self._sembol(sembol)
+            if acilis_ms <= self._son_zaman[i]:
+                return None
+            return self._mum(i, acilis_ms, hacim)
+
+    def seriden_guncelle(self, sembol, acilis_zamanlari, hacimler):
+        """Sembolün mum serisinden son işlenenden yeni olan kapanmış mumları işle. İşlenen mum sayısı döner."""
+        if not HAS_NUMPY or acilis_zamanlari is None or not len(acilis_zamanlari):
+            return 0
+        z = np.asarray(acilis_zamanlari, dtype=np.int64)
+        h = np.asarray(hacimler, dtype=np.float64)
+        with self._lock:
+            i = self._sembol(sembol)
+            sec = z > self._son_zaman[i]
+            for t, v in zip(z[sec].tolist(), h[sec].tolist()):
+                self._mum(i, t, v)
+            return int(sec.sum())
+
+    def bar_ekle(self, acilis_ms, hacimler):
+        """
+        Tüm evrenin aynı açılış zamanlı mumu: hacimler `semboller` sırasında (eksik = NaN).
+        Vektörel; semboller dizisi kadar z-skoru döner (işlenmeyen / taban hazır değil = NaN). numpy yoksa None.
+        """
+        if not HAS_NUMPY:
+            return None
+        h = np.asarray(hacimler, dtype=np.float64)
+        with self._lock:
+            n = len(self.semboller)
+            z = np.full(n, np.nan)
+            sec = np.flatnonzero(~np.isnan(h[:n]) & (self._son_zaman[:n] < acilis_ms))
+            if not len(sec):
+                return z
+            d = self._dilim(acilis_ms)
+            x = np.log1p(np.maximum(h[sec], 0.0))
+            ort, say = self._ort[sec, d], self._say[sec, d]
+            g_ort, g_var, g_say = self._g_ort[sec], self._g_var[sec], self._g_say[sec]
+            a_var, a_say = self._a_var[sec], self._a_say[sec]
+            dilim_hazir = (say >= self.min_gozlem) & (a_say >= self.min_gozlem)
+            m = np.where(dilim_hazir, ort, g_ort)
+            v = np.where(dilim_hazir, a_var, g_var)
+            zs = (x - m) / np.maximum(np.sqrt(v), self.min_std)
+            zs[~dilim_hazir & (g_say < self.min_gozlem)] = np.nan
+            z[sec] = zs
+            artik = say >= self.min_artik_dilim
+            _, yeni_a_var = _ewma_adim(0.0, a_var, x - ort, np.maximum(self.genel_alfa, 1.0 / (a_say + 1)))
+            self._a_var[sec] = np.where(artik, yeni_a_var, a_var)
+            self._a_say[sec] = a_say + artik
+            self._ort[sec, d] = ort + np.maximum(self.alfa, 1.0 / (say + 1)) * (x - ort)
+            self._say[sec, d] = say + 1
+            self._g_ort[sec], self._g_var[sec] = _ewma_adim(g_ort, g_var, x, np.maximum(self.genel_alfa, 1.0 / (g_say + 1)))
+            self._g_say[sec] = g_say + 1
+            self._son_zaman[sec] = acilis_ms
+            self._son_z[sec] = zs
+            return z
+
+    # ---------- okuma ----------
+    def beklenen_hacim(self, sembol, sure_ms=GUN_MS):
+        """
+        Son `sure_ms` için tabandan beklenen toplam hacim (dilim başına log-normal ortalama; hazır
+        olmayan dilimlerde genel taban). Veri yoksa None.
+        """
+        with self._lock:
+            i = self.indeks.get(sembol)
+            if i is None or self._g_say[i] < self.min_gozlem:
+                return None
+            hazir = (self._say[i] >= self.min_gozlem) & (self._a_say[i] >= self.min_gozlem)
+            m = np.where(hazir, self._ort[i], self._g_ort[i])
+            v = np.where(hazir, self._a_var[i], self._g_var[i])
+            beklenen = np.expm1(m + v / 2)
+            dilim = min(self.dilim_sayisi, max(1, int(sure_ms) // self.bar_ms))
+            if dilim == self.dilim_sayisi:
+                return float(beklenen.sum())
+            # Son işlenen mumla biten pencere (dilimler gün başından sarar)
+            son = self._dilim(self._son_zaman[i])
+            return float(beklenen[(np.arange(son - dilim + 1, son + 1)) % self.dilim_sayisi].sum())
+
+    def degerlendir(self, sembol, kismi=None):
+        """
+        Son kapanmış mumun z-skoru, (verilirse) oluşmakta olan mumun projeksiyonsuz z-skoru ve
+        tabandan beklenen 24s hacim. kismi=(açılış ms, şimdiye kadarki hacim). Veri yoksa None.
+          {"hacim_z", "hacim_z_kismi", "hacim_anomali", "hacim", "hacim_ortalama", "hacim_profil_gozlem"}
+        Oluşmakta olan mum henüz dolmadığından yalnızca yukarı yönlü sinyal olarak kullanılır.
+        """
+        beklenen = self.beklenen_hacim(sembol)
+        with self._lock:
+            i = self.indeks.get(sembol)
+            if i is None or self._son_zaman[i] < 0:
+                return None
+            z = float(self._son_z[i])
+            z_kismi = math.nan
+            if kismi is not None and kismi[0] > self._son_zaman[i]:
+                z_kismi = self._z(i, self._dilim(kismi[0]), math.log1p(max(float(kismi[1]), 0.0)))
+            gozlem = int(self._g_say[i])
+        yuksek = (z >= self.esik_z) or (z_kismi >= self.esik_z)  # NaN karşılaştırması False
+        return {
+            "hacim_z": round(z, 2) if not math.isnan(z) else None,
+            "hacim_z_kismi": round(z_kismi, 2) if not math.isnan(z_kismi) else None,
+            "hacim_anomali": bool(yuksek),
+            "hacim": "yüksek" if yuksek else "düşük" if z <= self.dusuk_z else "normal",
+            "hacim_ortalama": beklenen if beklenen is not None else 0,
+            "hacim_profil_gozlem": gozlem,
+        }
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""
+Kağıt işlem (paper trading) borsası — botun kullandığı Binance spot API alt kümesini bellekte
+taklit eden eşleştirme motoru. Anahtar ve ağ gerekmez; emirler canlı ya da kayıttan
+oynatılan fiyatlara karşı doldurulur:
+  GET    /api/v3/account                    bakiyeler (free / locked)
+  POST   /api/v3/order                      MARKET, LIMIT (GTC / IOC / FOK); FULL cevap
+  GET    /api/v3/order                      orderId ya da origClientOrderId ile sorgu
+  DELETE /api/v3/order                      açık LIMIT emri iptal (kilitli bakiye çözülür)
+  GET    /api/v3/openOrders                 açık emirler (symbol isteğe bağlı)
+  POST|PUT|DELETE /api/v3/userDataStream    sahte listenKey
+MARKET emir son fiyattan `kayma_bps` aleyhte dolar (derinlik_fonk bir emir defteri verirse
+defter yürünerek). LIMIT emir pazarlanabilirse hemen, değilse dayanır ve fiyat_guncelle()
+limit fiyatını geçince limit fiyatından dolar. Komisyon alınan varlıktan kesilir
+(BUY → base, SELL → quote). Borsa filtreleri (LOT_SIZE, MARKET_LOT_SIZE, PRICE_FILTER,
+NOTIONAL) ve bakiye yetersizliği gerçek borsanın hata kodlarıyla reddedilir. Her bakiye
+değişikliği abonelere outboundAccountPosition olayı olarak, değişiklik sırasıyla yayınlanır
+(BakiyeDefteri.akis_olayi ile doğrudan uyumlu). Olaylar kilit altında sıraya alınır, dinleyiciler
+kilit dışında çağrılır — dinleyici KagitBorsa'yı geri çağırabilir.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from decimal import Decimal
+
+from borsa_modules.emir_defteri import dolum_tahmini
+from borsa_modules.emir_motoru import HATA_BILINMEYEN_EMIR, HATA_FILTRE
+
+# Binance hata kodları (emir_motoru'ndakilere ek)
+HATA_BILINMEYEN = -1000      # paper: fiyat yok vb.
+HATA_KARAKTER = -1100        # Illegal characters found in a parameter
+HATA_PARAMETRE = -1102       # Mandatory parameter was not sent
+HATA_EMIR_TIPI = -1116       # Invalid orderType
+HATA_YON = -1117             # Invalid side
+HATA_TIF = -1115             # Invalid timeInForce
+HATA_SEMBOL = -1121          # Invalid symbol
+HATA_RED = -2010             # Insufficient balance / Duplicate order sent
+HATA_IPTAL = -2011           # Unknown order sent (iptal)
+
+_SIFIR = Decimal(0)
+
+
+def _hata(kod, mesaj, http=400):
+    return http, {"code": kod, "msg": mesaj}
+
+
+def _gecerli_id(deger):
+    """orderId parametresi yok ya da rakamlardan oluşuyor mu (Binance: ^[0-9]{1,20}$)."""
+    if deger is None or isinstance(deger, int):
+        return True
+    return isinstance(deger, str) and deger.isdigit() and len(deger) <= 20
+
+
+def _gorunum(emir):
+    """GET /order ve openOrders cevabı: Binance sorgu cevabında fills yoktur."""
+    return {k: v for k, v in emir.items() if k != "fills"}
+
+
+class _Kurallar:
+    """SembolFiltresi'nin Decimal'e çevrilmiş hali (her emirde metin ayrıştırılmasın)."""
+
+    __slots__ = ("filtre", "base", "quote", "lot", "market_lot", "tick", "min_notional", "notional_market")
+
+    def __init__(self, filtre):
+        self.filtre = filtre
+        self.base = filtre.base or filtre.sembol[:-4]
+        self.quote = filtre.quote or "USDT"
+        self.lot = (Decimal(filtre.step_size or "0"), Decimal(filtre.min_qty or "0"), Decimal(filtre.max_qty or "0"))
+        self.market_lot = (Decimal(filtre.market_step_size or "0"), Decimal(filtre.market_min_qty or "0"),
+                           Decimal(filtre.market_max_qty or "0"))
+        self.tick = Decimal(filtre.tick_size or "0")
+        self.min_notional = Decimal(filtre.min_notional or "0")
+        self.notional_market = filtre.min_notional_market
+
+    def ihlal(self, q, fiyat, tip):
+        """Borsanın uygulayacağı ilk filtre ihlali (ad) ya da None. Normalize etmez, yalnızca denetler."""
+        lotlar = [("LOT_SIZE", self.lot)]
+        if tip == "MARKET":
+            lotlar.append(("MARKET_LOT_SIZE", self.market_lot))
+        for ad, (adim, mn, mx) in lotlar:
+            if q <= 0 or (mn > 0 and q < mn) or (mx > 0 and q > mx) or (adim > 0 and q % adim != _SIFIR):
+                return ad
+        if tip != "MARKET" and self.tick > 0 and fiyat % self.tick != _SIFIR:
+            return "PRICE_FILTER"
+        if self.min_notional > 0 and (tip != "MARKET" or self.notional_market) and q * fiyat < self.min_notional:
+            return "NOTIONAL"
+        return None
+
+
+class KagitBorsa:
+    """
+      kb = KagitBorsa(binance_fiyat, FILTRE_INDEKSI, {"USDT": 10000.0}, komisyon_bps=10, kayma_bps=2)
+      kb.abone_ol(defter.akis_olayi)             # hesap olayları (outboundAccountPosition)
+      kb.fiyat_guncelle("BTCUSDT", 65000.0)      # canlı / oynatılan fiyat; dayanan LIMIT'ler eşleşir
+      kod, govde = kb.istek("POST", "/api/v3/order", {...})   # (HTTP kodu, Binance gövdesi)
+    fiyat_fonk(sembol) -> float | None: bu sembol için henüz fiyat gelmediyse başvurulur.
+    indeks.get(sembol) -> SembolFiltresi | None (emir motorunun FiltreIndeksi).
+    Thread-safe; gecikme_ms > 0 ise her istek işlenmeden önce o kadar bekletilir (ağ gidiş-dönüşü).
+    Kapanmış emirlerin en fazla `max_gecmis` tanesi sorgu için tutulur.
+    """
+
+    def __init__(self, fiyat_fonk, indeks, bakiyeler=None, komisyon_bps=10.0, kayma_bps=0.0, gecikme_ms=0.0,
+                 derinlik_fonk=None, max_gecmis=100000, saat=time.time, uyku=time.sleep):
+        self.fiyat_fonk = fiyat_fonk
+        self.indeks = indeks
+        self.komisyon_bps = float(komisyon_bps)
+        self.kayma_bps = float(kayma_bps)
+        self.gecikme_ms = float(gecikme_ms)
+        self.derinlik_fonk = derinlik_fonk
+        self.max_gecmis = max_gecmis
+        self.saat = saat
+        self.uyku = uyku
+        self._lock = threading.Lock()
+        self._bakiyeler = {a: [float(v), 0.0] for a, v in (bakiyeler or {}).items()}
+        self._fiyatlar = {}
+        self._kurallar = {}            # sembol -> _Kurallar
+        self._emirler = OrderedDict()  # orderId -> emir (Binance cevap biçiminde)
+        self._istemci = {}             # clientOrderId -> orderId
+        self._acik = {}                # orderId -> (emir, kurallar) — dayanan LIMIT'ler
+        self._alislar = {}             # sembol -> yığın [(-fiyat, orderId)]
+        self._satislar = {}            # sembol -> yığın [(fiyat, orderId)]
+        self._order_id = itertools.count(1)
+        self._trade_id = itertools.count(1)
+        self._dinleyiciler = ()
+        self._giden = deque()          # kilit altında sıraya alınan, henüz dağıtılmamış olaylar
+        self._dagitim = threading.Lock()  # aynı anda tek dağıtıcı: olaylar sırayla iletilir
+        self.sayac = {"emir": 0, "dolum": 0, "red": 0, "iptal": 0, "dayanan_dolum": 0}
+        self.komisyonlar = {}          # varlık -> ödenen toplam komisyon
+
+    # ---------- abonelik ----------
+    def abone_ol(self, fn):
+        with self._lock:
+            self._dinleyiciler = self._dinleyiciler + (fn,)
+        return fn
+
+    def abonelikten_cik(self, fn):
+        with self._lock:
+            self._dinleyiciler = tuple(d for d in self._dinleyiciler if d != fn)
+
+    def _yayinla(self, varliklar, zaman_ms):
+        """
+        Kilit altında: değişen varlıkların mutlak bakiyelerini olay olarak sıraya al. Sıraya alma
+        kilit altında olduğu için olay sırası bakiye sırasıyla aynıdır; iletim _dagit() ile.
+        """
+        if not self._dinleyiciler or not varliklar:
+            return
+        self._giden.append({"e": "outboundAccountPosition", "E": zaman_ms, "u": zaman_ms,
+                            "B": [{"a": a, "f": f"{self._bakiyeler[a][0]:.8f}", "l": f"{self._bakiyeler[a][1]:.8f}"} for a in varliklar]})
+
+    def _dagit(self):
+        """
+        Kilit dışında: sıradaki olayları dinleyicilere ilet. Başka bir thread dağıtıyorsa olaylar
+        onun tarafından (sırayla) iletilir; dinleyiciden gelen geri çağrı da böyle kilitlenmez.
+        """
+        while self._giden and self._dagitim.acquire(blocking=False):
+            try:
+                while self._giden:
+                    olay = self._giden.popleft()
+                    for fn in self._dinleyiciler:
+                        try:
+                            fn(olay)
+                        except Exception:
+                            pass
+            finally:
+                self._dagitim.release()
+
+    # ---------- fiyat ----------
+    def fiyat_guncelle(self, sembol, fiyat):
+        """Son fiyatı yaz; bu fiyatın geçtiği dayanan LIMIT emirleri doldur. Dolan emir sayısı döner."""
+        with self._lock:
+            self._fiyatlar[sembol] = fiyat
+            n, varliklar = self._eslestir(sembol, fiyat)
+            self._yayinla(varliklar, int(self.saat() * 1000))
+        self._dagit()
+        return n
+
+    def tick_al(self, tick):
+        """Fiyat akışı tüketicisi (BISTLiveStream.abone_ol) — canlı ya da TickOynatici'dan."""
+        self.fiyat_guncelle(tick.sembol, tick.fiyat)
+
+    def _fiyat(self, sembol):
+        with self._lock:
+            fiyat = self._fiyatlar.get(sembol)
+        if fiyat is None and self.fiyat_fonk is not None:
+            fiyat = self.fiyat_fonk(sembol)  # ağ olabilir: kilit dışında
+            if fiyat:
+                with self._lock:
+                    self._fiyatlar.setdefault(sembol, fiyat)
+        return fiyat or None
+
+    def _piyasa_dolum_fiyati(self, sembol, side, q, ref):
+        """MARKET dolum fiyatı: defter varsa yürünerek ortalama, yoksa son fiyat ± kayma_bps."""
+        if self.derinlik_fonk is not None:
+            try:
+                defter = self.derinlik_fonk(sembol)
+                if defter is not None:
+                    t = dolum_tahmini(defter, side, q * ref if side == "BUY" else q)
+                    ort = float(t["ort_fiyat"][0])
+                    if ort > 0 and bool(t["doldu"][0]):
+                        return ort
+            except Exception:
+                pass
+        kayma = self.kayma_bps / 1e4
+        return ref * (1 + kayma) if side == "BUY" else ref * (1 - kayma)
+
+    def _kural(self, sembol):
+        filtre = self.indeks.get(sembol)
+        if filtre is None:
+            return None
+        k = self._kurallar.get(sembol)
+        if k is None or k.filtre is not filtre:  # indeks yenilendiyse yeniden çevir
+            k = self._kurallar[sembol] = _Kurallar(filtre)
+        return k
+
+    # ---------- istek yönlendirme ----------
+    def istek(self, method, endpoint, params=None):
+        """(HTTP kodu, gövde) — gövde Binance cevabı ya da {code, msg}."""
+        if self.gecikme_ms > 0:
+            self.uyku(self.gecikme_ms / 1000.0)
+        isleyici = _UCLAR.get((method, endpoint))
+        if isleyici is None:
+            return _hata(HATA_BILINMEYEN, f"Kağıt borsada desteklenmeyen uç: {method} {endpoint}", 404)
+        return isleyici(self, params or {})
+
+    def _account(self, _params):
+        with self._lock:
+            balances = [{"asset": a, "free": f"{b[0]:.8f}", "locked": f"{b[1]:.8f}"} for a, b in self._bakiyeler.items()]
+        bps = int(round(self.komisyon_bps))
+        return 200, {"makerCommission": bps, "takerCommission": bps, "canTrade": True, "accountType": "SPOT",
+                     "updateTime": int(self.saat() * 1000), "balances": balances}
+
+    def _emir_ver(self, p):
+        for ad in ("symbol", "side", "type", "quantity"):
+            if not p.get(ad):
+                return _hata(HATA_PARAMETRE, f"Mandatory parameter '{ad}' was not sent, was empty/null, or malformed.")
+        sembol, side, tip = p["symbol"], p["side"], p["type"]
+        if side not in ("BUY", "SELL"):
+            return _hata(HATA_YON, "Invalid side.")
+        if tip not in ("MARKET", "LIMIT"):
+            return _hata(HATA_EMIR_TIPI, "Invalid orderType.")
+        tif = None
+        if tip == "LIMIT":
+            if not p.get("price"):
+                return _hata(HATA_PARAMETRE, "Mandatory parameter 'price' was not sent, was empty/null, or malformed.")
+            tif = p.get("timeInForce") or "GTC"
+            if tif not in ("GTC", "IOC", "FOK"):
+                return _hata(HATA_TIF, "Invalid timeInForce.")
+        kural = self._kural(sembol)
+        if kural is None or kural.filtre.durum != "TRADING":
+            return self._reddet(HATA_SEMBOL, "Invalid symbol.")
+        ref = self._fiyat(sembol)
+        if ref is None:
+            return self._reddet(HATA_BILINMEYEN, f"{sembol} için fiyat yok")
+        try:
+            q = Decimal(str(p["quantity"]))
+            limit = Decimal(str(p["price"])) if tip == "LIMIT" else None
+        except ArithmeticError:
+            return _hata(HATA_PARAMETRE, "Illegal characters found in parameter 'quantity' or 'price'.")
+        ihlal = kural.ihlal(q, limit if limit is not None else Decimal(repr(ref)), tip)
+        if ihlal:
+            return self._reddet(HATA_FILTRE, f"Filter failure: {ihlal}")
+        qf = float(q)
+        if tip == "MARKET":
+            dolum_fiyati = self._piyasa_dolum_fiyati(sembol, side, qf, ref)
+        else:
+            lf = float(limit)
+            # Pazarlanabilir LIMIT taker olarak dolar, ama limitten kötü fiyata değil
+            if side == "BUY":
+                dolum_fiyati = min(lf, self._piyasa_dolum_fiyati(sembol, side, qf, ref)) if lf >= ref else None
+            else:
+                dolum_fiyati = max(lf, self._piyasa_dolum_fiyati(sembol, side, qf, ref)) if lf <= ref else None
+
+        zaman = int(self.saat() * 1000)
+        with self._lock:
+            client_id = p.get("newClientOrderId")
+            # Binance: clientOrderId açık emirler arasında benzersiz olmalı
+            if client_id and self._istemci.get(client_id) in self._acik:
+                self.sayac["red"] += 1
+                return _hata(HATA_RED, "Duplicate order sent.")
+            if side == "BUY":
+                varlik, gerekli = kural.quote, qf * (dolum_fiyati if dolum_fiyati is not None else lf)
+            else:
+                varlik, gerekli = kural.base, qf
+            b = self._bakiyeler.get(varlik)
+            if b is None or b[0] + 1e-9 < gerekli:
+                self.sayac["red"] += 1
+                return _hata(HATA_RED, "Account has insufficient balance for requested action.")
+            order_id = next(self._order_id)
+            client_id = client_id or f"kagit{order_id}"
+            emir = {
+                "symbol": sembol, "orderId": order_id, "orderListId": -1, "clientOrderId": client_id,
+                "transactTime": zaman, "price": f"{limit:f}" if limit is not None else "0.00000000",
+                "origQty": f"{q:f}", "executedQty": "0.00000000", "cummulativeQuoteQty": "0.00000000",
+                "status": "NEW", "timeInForce": tif or "GTC", "type": tip, "side": side,
+                "workingTime": zaman, "updateTime": zaman, "fills": [],
+            }
+            self._kaydet(emir)
+            self.sayac["emir"] += 1
+            varliklar = ()
+            if dolum_fiyati is not None:
+                varliklar = self._doldur(emir, kural, dolum_fiyati, zaman, kilitli=False)
+            elif tif != "GTC":
+                emir["status"] = "EXPIRED"  # IOC/FOK: hemen dolmayan kısım iptal (burada tamamı)
+            else:
+                b[0] -= gerekli
+                b[1] += gerekli
+                varliklar = (varlik,)
+                self._acik[order_id] = (emir, kural)
+                if side == "BUY":
+                    heapq.heappush(self._alislar.setdefault(sembol, []), (-lf, order_id))
+                else:
+                    heapq.heappush(self._satislar.setdefault(sembol, []), (lf, order_id))
+            cevap = dict(emir, fills=list(emir["fills"]))
+            self._yayinla(varliklar, zaman)
+            if dolum_fiyati is None and tif == "GTC":
+                # Fiyat, ref okunduktan sonra gelen bir tick'le limiti zaten geçmiş olabilir
+                _, varliklar = self._eslestir(sembol, self._fiyatlar.get(sembol, ref))
+                self._yayinla(varliklar, zaman)
+        self._dagit()
+        return 200, cevap
+
+    def _reddet(self, kod, mesaj):
+        with self._lock:
+            self.sayac["red"] += 1
+        return _hata(kod, mesaj)
+
+    def _kaydet(self, emir):
+        """Kilit altında: emir geçmişine ekle, sınırı aşan en eski kapanmış emri at."""
+        oid = emir["orderId"]
+        self._emirler[oid] = emir
+        self._istemci[emir["clientOrderId"]] = oid
+        while len(self._emirler) > self.max_gecmis:
+            eski_id, eski = self._emirler.popitem(last=False)
+            if eski_id in self._acik:
+                self._emirler[eski_id] = eski  # açık emir atılmaz; sona taşınır
+                break
+            if self._istemci.get(eski["clientOrderId"]) == eski_id:
+                del self._istemci[eski["clientOrderId"]]
+
+    def _doldur(self, emir, kural, fiyat, zaman, kilitli):
+        """Kilit altında: emri tek seferde `fiyat`tan doldur, bakiyeleri yaz. Değişen varlıklar döner."""
+        q = float(emir["origQty"])
+        tutar = q * fiyat
+        oran = self.komisyon_bps / 1e4
+        base = self._bakiyeler.setdefault(kural.base, [0.0, 0.0])
+        quote = self._bakiyeler.setdefault(kural.quote, [0.0, 0.0])
+        if emir["side"] == "BUY":
+            if kilitli:
+                kilit = q * float(emir["price"])
+                quote[1] = max(0.0, quote[1] - kilit)
+                quote[0] += kilit - tutar  # limit altı dolum farkı serbest kalır
+            else:
+                quote[0] = max(0.0, quote[0] - tutar)
+            kom, kom_varlik = q * oran, kural.base
+            base[0] += q - kom
+        else:
+            if kilitli:
+                base[1] = max(0.0, base[1] - q)
+            else:
+                base[0] = max(0.0, base[0] - q)
+            kom, kom_varlik = tutar * oran, kural.quote
+            quote[0] += tutar - kom
+        self.komisyonlar[kom_varlik] = self.komisyonlar.get(kom_varlik, 0.0) + kom
+        emir.update(status="FILLED", executedQty=emir["origQty"], cummulativeQuoteQty=f"{tutar:.8f}", updateTime=zaman)
+        emir["fills"] = [{"price": f"{fiyat:.8f}", "qty": emir["origQty"], "commission": f"{kom:.8f}",
+                          "commissionAsset": kom_varlik, "tradeId": next(self._trade_id)}]
+        self.sayac["dolum"] += 1
+        return kural.base, kural.quote
+
+    def _eslestir(self, sembol, fiyat):
+        """Kilit altında: fiyatın geçtiği dayanan emirleri limit fiyatından doldur. (adet, varlıklar)"""
+        n, varliklar, zaman = 0, set(), int(self.saat() * 1000)
+        for yigin, gecti in ((self._alislar.get(sembol), lambda e: -e >= fiyat), (self._satislar.get(sembol), lambda e: e <= fiyat)):
+            while yigin and gecti(yigin[0][0]):
+                _, oid = heapq.heappop(yigin)
+                kayit = self._acik.pop(oid, None)
+                if kayit is None:
+                    continue  # iptal edilmiş
+                emir, kural = kayit
+                varliklar.update(self._doldur(emir, kural, float(emir["price"]), zaman, kilitli=True))
+                self.sayac["dayanan_dolum"] += 1
+                n += 1
+        return n, varliklar
+
+    def _bul(self, p):
+        """Kilit altında: orderId ya da origClientOrderId ile emir (sembol de tutmalı)."""
+        oid = p.get("orderId")
+        if oid is None and p.get("origClientOrderId"):
+            oid = self._istemci.get(p["origClientOrderId"])
+        emir = self._emirler.get(int(oid)) if oid is not None else None
+        if emir is None or emir["symbol"] != p.get("symbol"):
+            return None
+        return emir
+
+    def _emir_sorgula(self, p):
+        if not _gecerli_id(p.get("orderId")):
+            return _hata(HATA_KARAKTER, "Illegal characters found in parameter 'orderId'; legal range is '^[0-9]{1,20}$'.")
+        with self._lock:
+            emir = self._bul(p)
+            if emir is None:
+                return _hata(HATA_BILINMEYEN_EMIR, "Order does not exist.")
+            return 200, _gorunum(emir)
+
+    def _emir_iptal(self, p):
+        if not _gecerli_id(p.get("orderId")):
+            return _hata(HATA_KARAKTER, "Illegal characters found in parameter 'orderId'; legal range is '^[0-9]{1,20}$'.")
+        zaman = int(self.saat() * 1000)
+        with self._lock:
+            emir = self._bul(p)
+            kayit = self._acik.pop(emir["orderId"], None) if emir is not None else None
+            if kayit is None:
+                return _hata(HATA_IPTAL, "Unknown order sent.")
+            _, kural = kayit
+            q = float(emir["origQty"])
+            varlik, miktar = (kural.quote, q * float(emir["price"])) if emir["side"] == "BUY" else (kural.base, q)
+            b = self._bakiyeler[varlik]
+            b[1] = max(0.0, b[1] - miktar)
+            b[0] += miktar
+            emir.update(status="CANCELED", updateTime=zaman)
+            self.sayac["iptal"] += 1
+            cevap = dict(_gorunum(emir), origClientOrderId=emir["clientOrderId"])
+            self._yayinla((varlik,), zaman)
+        self._dagit()
+        return 200, cevap
+
+    def _acik_emirler(self, p):
+        sembol = p.get("symbol")
+        with self._lock:
+            return 200, [_gorunum(e) for e, _ in self._acik.values() if not sembol or e["symbol"] == sembol]
+
+    def _listen_key(self, _p):
+        return 200, {"listenKey": "kagit"}
+
+    # ---------- durum ----------
+    def bakiyeler(self):
+        """{varlık: (free, locked)} kopyası."""
+        with self._lock:
+            return {a: (b[0], b[1]) for a, b in self._bakiyeler.items()}
+
+    def durum(self):
+        with self._lock:
+            return dict(self.sayac, acik=len(self._acik), gecmis=len(self._emirler),
+                        komisyon={a: round(v, 8) for a, v in self.komisyonlar.items()})
+
+
+_UCLAR = {
+    ("GET", "/api/v3/account"): KagitBorsa._account,
+    ("POST", "/api/v3/order"): KagitBorsa._emir_ver,
+    ("GET", "/api/v3/order"): KagitBorsa._emir_sorgula,
+    ("DELETE", "/api/v3/order"): KagitBorsa._emir_iptal,
+    ("GET", "/api/v3/openOrders"): KagitBorsa._acik_emirler,
+    ("POST", "/api/v3/userDataStream"): KagitBorsa._listen_key,
+    ("PUT", "/api/v3/userDataStream"): KagitBorsa._listen_key,
+    ("DELETE", "/api/v3/userDataStream"): KagitBorsa._listen_key,
+}
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Portföy riski için artımlı kayan kovaryans / korelasyon.
+Tarama evrenindeki her sembolün bar getirisi (log) `pencere` uzunluğunda halka tampondadır;
+her yeni barda yalnızca giren ve çıkan getiri vektörlerinin dış çarpımları toplamlara
+eklenir / çıkarılır (bar başına O(n²)), matris baştan hesaplanmaz. Eksik veri (sembol o
+barda yok) çiftler bazında sayılır: her (i, j) çifti yalnızca ikisinin de getirisi olan
+barlardan hesaplanır. Kayan noktalı birikim hatasına karşı her `pencere` barda bir kez
+tampondan tam yeniden hesap yapılır.
+
+Alım öncesi kontrol önbelleklenmiş matris üzerinde birkaç indeksleme + küçük bir
+w'Σw'dir (mikrosaniyeler):
+  - aday ile açık pozisyonlardan herhangi birinin korelasyonu max_korelasyon'u aşıyorsa red,
+  - aday eklendiğinde portföyün günlük oynaklığı özkaynağın max_vol_pct'ini aşıyorsa red.
+"""
+
+import math
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+GUN_MS = 24 * 3_600_000
+_ISARET = np.array([[1.0], [-1.0]]) if HAS_NUMPY else None
+
+
+class KovaryansMotoru:
+    """
+      m = KovaryansMotoru(SEMBOL_LISTESI, pencere=168, bar_ms=3_600_000)
+      m.seriden_guncelle({s: (acilis_zamanlari, kapanislar)})   # yeni kapanmış barları işler
+      ok, neden, detay = m.kontrol("SOLUSDT", 200.0, {"ETHUSDT": 350.0}, ozkaynak=1000.0)
+    """
+
+    def __init__(self, semboller, pencere=168, bar_ms=3_600_000, min_gozlem=48):
+        self.semboller = list(semboller)
+        self.indeks = {s: i for i, s in enumerate(self.semboller)}
+        self.pencere = int(pencere)
+        self.bar_ms = int(bar_ms)
+        self.min_gozlem = int(min_gozlem)
+        n = len(self.semboller)
+        self._getiri = np.full((self.pencere, n), np.nan)
+        self._konum = 0
+        self._son_fiyat = np.full(n, np.nan)
+        self._son_fiyat_zamani = np.full(n, -1, dtype=np.int64)
+        self.son_zaman = None  # işlenen son barın açılış zamanı (ms)
+        self.bar_sayisi = 0
+        self.yeniden_hesap = 0
+        self._sifirla_toplamlar()
+        self._onbellek = None
+
+    def _sifirla_toplamlar(self):
+        n = len(self.semboller)
+        # Çift bazında (i ve j'nin birlikte var olduğu barlar üzerinden) toplamlar
+        self._say = np.zeros((n, n))
+        self._sx = np.zeros((n, n))    # Σ x_i
+        self._sxx = np.zeros((n, n))   # Σ x_i²
+        self._sxy = np.zeros((n, n))   # Σ x_i·x_j
+
+    @staticmethod
+    def _carpimlar(g, isaret=None):
+        """Getiri satırları (k × n, NaN = yok) → (say, Σx_i, Σx_i², Σx_i·x_j) katkıları; isaret satır başına ±1."""
+        m = ~np.isnan(g)
+        x = np.where(m, g, 0.0)
+        mf = m.astype(np.float64)
+        xs, ms, x2s = (x, mf, x * x) if isaret is None else (x * isaret, mf * isaret, x * x * isaret)
+        return ms.T @ mf, xs.T @ mf, x2s.T @ mf, xs.T @ x
+
+    def _tam_hesap(self):
+        """Halka tampondan toplamları baştan kur (birikim hatası temizliği)."""
+        self._say, self._sx, self._sxx, self._sxy = self._carpimlar(self._getiri)
+        self.yeniden_hesap += 1
+
+    # ---------- besleme ----------
+    def bar_ekle(self, zaman, fiyatlar):
+        """Bir barın kapanış fiyatları (semboller sırasında, eksik = NaN). Getiri önceki bardan hesaplanır."""
+        f = np.asarray(fiyatlar, dtype=np.float64)
+        # Yalnızca bir önceki barda da fiyatı olan sembolün getirisi alınır (boşluk atlayan getiri varyansı şişirir)
+        ardisik = (self._son_fiyat_zamani == zaman - self.bar_ms) & (f > 0) & (self._son_fiyat > 0)
+        r = np.full(len(f), np.nan)
+        np.log(f / self._son_fiyat, out=r, where=ardisik)
+        var = ~np.isnan(f) & (f > 0)
+        self._son_fiyat[var] = f[var]
+        self._son_fiyat_zamani[var] = zaman
+        self.son_zaman = zaman
+        if not ardisik.any():
+            return
+        eski = self._getiri[self._konum].copy()
+        self._getiri[self._konum] = r
+        self._konum = (self._konum + 1) % self.pencere
+        self.bar_sayisi += 1
+        if self._konum == 0:
+            self._tam_hesap()
+        else:
+            # Giren ve çıkan bar tek rank-2 çarpımda: toplam += r·rᵀ − eski·eskiᵀ (aynısı diğer toplamlar için)
+            katki = self._carpimlar(np.vstack([r, eski]), _ISARET)
+            for toplam, d in zip((self._say, self._sx, self._sxx, self._sxy), katki):
+                toplam += d
+        self._onbellek = None
+
+    def seriden_guncelle(self, seriler):
+        """
+        {sembol: (açılış zamanları ms, kapanışlar)} — son işlenen bardan yeni olan kapanmış barları
+        zaman sırasıyla işler. İlk çağrıda yalnızca son pencere+1 bar alınır. İşlenen bar sayısı döner.
+        """
+        yeni = {}
+        for s, (zamanlar, kapanislar) in seriler.items():
+            i = self.indeks.get(s)
+            if i is None or zamanlar is None or not len(zamanlar):
+                continue
+            z = np.asarray(zamanlar, dtype=np.int64)
+            k = np.asarray(kapanislar, dtype=np.float64)
+            sec = z > self.son_zaman if self.son_zaman is not None else slice(None)
+            yeni[i] = (z[sec], k[sec])
+        if not yeni:
+            return 0
+        tum = np.unique(np.concatenate([z for z, _ in yeni.values()]))
+        if self.son_zaman is None:
+            tum = tum[-(self.pencere + 1):]
+        if not len(tum):
+            return 0
+        matris = np.full((len(tum), len(self.semboller)), np.nan)
+        for i, (z, k) in yeni.items():
+            konum = np.searchsorted(tum, z)
+            icerde = (konum < len(tum)) & (tum[np.minimum(konum, len(tum) - 1)] == z)
+            matris[konum[icerde], i] = k[icerde]
+        for zaman, satir in zip(tum.tolist(), matris):
+            self.bar_ekle(zaman, satir)
+        return len(tum)
+
+    # ---------- okuma ----------
+    def _matrisler(self):
+        if self._onbellek is None:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                say = self._say
+                ort_i = self._sx / say
+                ort_j = self._sx.T / say
+                kov = (self._sxy - say * ort_i * ort_j) / (say - 1)
+                var_i = (self._sxx - say * ort_i * ort_i) / (say - 1)
+                var_j = var_i.T
+                kor = kov / np.sqrt(var_i * var_j)
+            yetersiz = say < self.min_gozlem
+            kov[yetersiz] = np.nan
+            kor[yetersiz] = np.nan
+            # Kontrol birkaç pozisyonluk satırları okur: satırlar ilk erişimde listeye çevrilip saklanır
+            # (küçük erişimlerde liste, numpy indekslemeden hızlı)
+            self._onbellek = (kov, np.clip(kor, -1.0, 1.0), {}, {})
+        return self._onbellek
+
+    def _satir(self, hangi, i):
+        kov, kor, kov_satir, kor_satir = self._matrisler()
+        onbellek = kov_satir if hangi == "kov" else kor_satir
+        satir = onbellek.get(i)
+        if satir is None:
+            # Kovaryansta yetersiz gözlem 0 sayılır (w'Σw'ye katkı yok); korelasyonda NaN kalır (atlanır)
+            satir = onbellek[i] = np.nan_to_num(kov[i]).tolist() if hangi == "kov" else kor[i].tolist()
+        return satir
+
+    def kovaryans(self):
+        """Bar getirisi kovaryans matrisi (semboller sırasında); yetersiz gözlemli çiftler NaN."""
+        return self._matrisler()[0]
+
+    def korelasyon(self):
+        return self._matrisler()[1]
+
+    def portfoy_volatilitesi(self, tutarlar):
+        """{sembol: USDT} → günlük oynaklık (USDT). Verisi olmayan sembol yok sayılır."""
+        ag = [(self.indeks[s], w) for s, w in tutarlar.items() if s in self.indeks]
+        varyans = sum(wi * wj * self._satir("kov", i)[j] for i, wi in ag for j, wj in ag)
+        return math.sqrt(max(varyans, 0.0) * GUN_MS / self.bar_ms)
+
+    def kontrol(self, aday, tutar, pozisyonlar, ozkaynak=None, max_korelasyon=0.85, max_vol_pct=None):
+        """
+        Aday alımı portföy riskine göre değerlendir. pozisyonlar: {sembol: USDT değeri}.
+        tutar None ise yalnızca korelasyona bakılır (boyut henüz bilinmiyorken ön eleme).
+        (ok, neden, detay) döner; aday için yeterli veri yoksa engellenmez.
+        """
+        detay = {"max_kor": None, "kor_sembol": None, "vol_once_pct": None, "vol_sonra_pct": None}
+        i = self.indeks.get(aday)
+        if i is None:
+            return True, "korelasyon verisi yok", detay
+        satir = self._satir("kor", i)
+        for s in pozisyonlar:
+            j = self.indeks.get(s)
+            if j is None or s == aday or math.isnan(satir[j]):
+                continue
+            if detay["max_kor"] is None or satir[j] > detay["max_kor"]:
+                detay["max_kor"], detay["kor_sembol"] = satir[j], s
+        if max_korelasyon is not None and detay["max_kor"] is not None and detay["max_kor"] > max_korelasyon:
+            return False, f"{detay['kor_sembol']} ile korelasyon {detay['max_kor']:.2f} > {max_korelasyon:g}", detay
+        if tutar is None or not max_vol_pct or not ozkaynak:
+            return True, "uygun", detay
+        once = dict(pozisyonlar)
+        sonra = dict(once)
+        sonra[aday] = sonra.get(aday, 0.0) + tutar
+        detay["vol_once_pct"] = self.portfoy_volatilitesi(once) / ozkaynak * 100
+        detay["vol_sonra_pct"] = self.portfoy_volatilitesi(sonra) / ozkaynak * 100
+        if detay["vol_sonra_pct"] > max_vol_pct:
+            return False, f"portföy oynaklığı %{detay['vol_sonra_pct']:.2f}/gün > %{max_vol_pct:g}", detay
+        return True, "uygun", detay
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+`log` tablosu için depolama katmanı: tarih_saat ve (tip, tarih_saat) indeksleri, `mesaj`
+üzerinde FTS5 tam metin indeksi (harici içerik tablosu; tetikleyicilerle senkron) ve
+saklama süresi. Eski kayıtlar tarih indeksiyle partiler halinde silinir, boşalan sayfalar
+artımlı VACUUM ile her turda sınırlı sayıda diske iade edilir — dosya sınırsız büyümez.
+Artımlı auto_vacuum moduna geçiş (tek seferlik tam VACUUM) açılışta init_db'de yapılır,
+bot çalışırken değil. SQLite FTS5 olmadan derlenmişse arama LIKE'a düşer.
+
+Log görünümü `log.id` üzerinden keyset sayfalama ile okunur (OFFSET yok: milyonuncu satırın
+sayfası da ilk sayfa kadar ucuz); `LogSayfalayici` sorguları arka plan thread'inde çalıştırır,
+bir sonraki sayfayı önceden çeker ve filtre değişince eski sonuçları yok sayar.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+FTS_TABLOSU = "log_fts"
+SAYFA_BOYUTU = 200
+
+
+def fts_var_mi(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLOSU,)).fetchone() is not None
+
+
+def sema_kur(conn):
+    """İndeksleri ve FTS5 indeksini (yoksa) kur; ilk kurulumda mevcut satırlar indekslenir. FTS var mı döner."""
+    c = conn.cursor()
+    c.execute("CREATE INDEX IF NOT EXISTS idx_log_tarih ON log(tarih_saat)")
+    # Tek sütun: indeks içinde rowid sırası korunur, "tip = ? ORDER BY id DESC" sıralama gerektirmez
+    c.execute("CREATE INDEX IF NOT EXISTS idx_log_tip ON log(tip)")
+    if fts_var_mi(conn):
+        return True
+    try:
+        c.execute(f"CREATE VIRTUAL TABLE {FTS_TABLOSU} USING fts5(mesaj, content='log', content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+    except sqlite3.OperationalError:
+        return False  # FTS5 yok
+    c.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS log_fts_ekle AFTER INSERT ON log BEGIN
+            INSERT INTO {FTS_TABLOSU}(rowid, mesaj) VALUES (new.id, new.mesaj);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_fts_sil AFTER DELETE ON log BEGIN
+            INSERT INTO {FTS_TABLOSU}({FTS_TABLOSU}, rowid, mesaj) VALUES ('delete', old.id, old.mesaj);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_fts_guncelle AFTER UPDATE OF mesaj ON log BEGIN
+            INSERT INTO {FTS_TABLOSU}({FTS_TABLOSU}, rowid, mesaj) VALUES ('delete', old.id, old.mesaj);
+            INSERT INTO {FTS_TABLOSU}(rowid, mesaj) VALUES (new.id, new.mesaj);
+        END;
+    """)
+    c.execute(f"INSERT INTO {FTS_TABLOSU}({FTS_TABLOSU}) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def artimli_vacuum_kur(conn):
+    """
+    Veritabanını artımlı auto_vacuum moduna geçir (açılışta, bot başlamadan). Mod değişikliği
+    ancak tam VACUUM ile geçerli olur: büyük dosyada saniyeler sürebilir, yalnızca bir kez yapılır.
+    Geçiş yapıldıysa True.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.commit()  # VACUUM açık işlem içinde çalışmaz
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def fts_sorgusu(metin):
+    """Serbest metni güvenli FTS5 sorgusuna çevir: her kelime tırnaklı ve önek eşleşmeli (AND)."""
+    kelimeler = [k.replace('"', '""') for k in metin.split() if k.strip('"')]
+    return " ".join(f'"{k}"*' for k in kelimeler)
+
+
+def log_ara(conn, metin=None, tip=None, baslangic=None, bitis=None, limit=200, once_id=None, sonra_id=None):
+    """
+    Filtreli log araması, yeniden eskiye. baslangic/bitis 'YYYY-mm-dd HH:MM:SS' metni;
+    once_id verilirse yalnızca daha eski (id < once_id), sonra_id verilirse yalnızca daha yeni
+    (id > sonra_id; sonra_id'ye en yakın `limit` kayıt) kayıtlar — iki yönlü sayfalama için.
+    (id, tarih_saat, tip, mesaj) satırları döner.
+    """
+    kosullar, params = [], []
+    if tip:
+        kosullar.append("l.tip = ?")
+        params.append(tip)
+    if baslangic:
+        kosullar.append("l.tarih_saat >= ?")
+        params.append(baslangic)
+    if bitis:
+        kosullar.append("l.tarih_saat <= ?")
+        params.append(bitis)
+    if once_id is not None:
+        kosullar.append("l.id < ?")
+        params.append(once_id)
+    if sonra_id is not None:
+        kosullar.append("l.id > ?")
+        params.append(sonra_id)
+    kaynak, sira = "log l", "l.id"
+    if metin and metin.strip():
+        if fts_var_mi(conn):
+            # FTS5 rowid sırasını kendisi verir; f.rowid ile sıralamada ayrı sıralama adımı yok
+            kaynak, sira = f"{FTS_TABLOSU} f JOIN log l ON l.id = f.rowid", "f.rowid"
+            kosullar.insert(0, f"{FTS_TABLOSU} MATCH ?")
+            params.insert(0, fts_sorgusu(metin))
+        else:
+            kosullar.append("l.mesaj LIKE ?")
+            params.append(f"%{metin.strip()}%")
+    nerede = " WHERE " + " AND ".join(kosullar) if kosullar else ""
+    yon = "ASC" if sonra_id is not None and once_id is None else "DESC"
+    sql = f"SELECT l.id, l.tarih_saat, l.tip, l.mesaj FROM {kaynak}{nerede} ORDER BY {sira} {yon} LIMIT ?"
+    satirlar = conn.execute(sql, params + [int(limit)]).fetchall()
+    return satirlar[::-1] if yon == "ASC" else satirlar
+
+
+def log_tipleri(conn):
+    """Farklı tip değerleri (idx_log_tip üzerinden, tablo taranmaz)."""
+    return [r[0] for r in conn.execute("SELECT DISTINCT tip FROM log WHERE tip IS NOT NULL ORDER BY tip")]
+
+
+def log_temizle(conn, saklama_gun, parti=5000, bekleme_sn=0.0, max_iade_sayfa=2000):
+    """
+    `saklama_gun`den eski kayıtları partiler halinde sil (kilit kısa tutulur), FTS'yi
+    optimize et ve en fazla `max_iade_sayfa` boş sayfayı iade et (kalanı sonraki turlarda).
+    Veritabanı artımlı auto_vacuum modunda değilse (artimli_vacuum_kur) iade yapılmaz;
+    burada tam VACUUM asla çalışmaz. (silinen satır, iade edilen sayfa) döner.
+    """
+    if not saklama_gun or saklama_gun <= 0:
+        return 0, 0
+    sinir = (datetime.now() - timedelta(days=saklama_gun)).strftime("%Y-%m-%d %H:%M:%S")
+    silinen = 0
+    while True:
+        cur = conn.execute(
+            "DELETE FROM log WHERE id IN (SELECT id FROM log WHERE tarih_saat < ? ORDER BY tarih_saat LIMIT ?)",
+            (sinir, parti),
+        )
+        conn.commit()
+        silinen += cur.rowcount
+        if cur.rowcount < parti:
+            break
+        if bekleme_sn:
+            time.sleep(bekleme_sn)  # yazıcılara (bot logu) nefes aldır
+    if silinen and fts_var_mi(conn):
+        conn.execute(f"INSERT INTO {FTS_TABLOSU}({FTS_TABLOSU}) VALUES ('optimize')")
+        conn.commit()
+    # Önceki turlardan kalan boş sayfalar da (silinen yoksa bile) parça parça iade edilir
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2 or not conn.execute("PRAGMA freelist_count").fetchone()[0]:
+        return silinen, 0
+    once = conn.execute("PRAGMA page_count").fetchone()[0]
+    conn.executescript(f"PRAGMA incremental_vacuum({int(max_iade_sayfa)})")  # execute() yalnızca tek sayfa adımlar
+    conn.commit()
+    return silinen, once - conn.execute("PRAGMA page_count").fetchone()[0]
+
+
+class LogSayfalayici:
+    """
+    Log görünümü için arka planda keyset sayfalama — Tk thread'i sorgu beklemez:
+      s = LogSayfalayici(DB_PATH, hazir=lambda: root.after(0, ciz))
+      s.filtre(metin="timeout", tip="bot")     # yeni nesil; en yeni sayfa arka planda çekilir
+      s.sayfa(None)                            # en yeni sayfa — hazır değilse None, gelince hazir()
+      s.sayfa(("once", en_eski_id))            # daha eski sayfa; ("sonra", en_yeni_id) daha yeni
+    Bir sayfa okunduğunda aynı yöndeki sonraki sayfa önceden çekilir. Sayfalar (id, tarih_saat,
+    tip, mesaj) satırlarıdır, yeniden eskiye. hazir() iş thread'inden çağrılır.
+    """
+
+    def __init__(self, db_yolu, hazir=None, sayfa_boyutu=SAYFA_BOYUTU, onbellek_sayfa=16):
+        self.db_yolu = db_yolu
+        self.hazir = hazir
+        self.sayfa_boyutu = sayfa_boyutu
+        self.onbellek_sayfa = onbellek_sayfa
+        self._lock = threading.Lock()
+        self._istekler = queue.Queue()
+        self._thread = None
+        self._nesil = 0
+        self._filtre = {}
+        self._sayfalar = OrderedDict()  # anahtar -> satırlar (LRU)
+        self._bekleyen = set()
+        self.tipler = []
+        self.hata = None
+        self.son_sure_ms = 0.0
+
+    def filtre(self, metin=None, tip=None, baslangic=None, bitis=None):
+        """Yeni filtre: önbellek boşaltılır, uçuştaki eski sorguların sonucu atılır."""
+        with self._lock:
+            self._nesil += 1
+            self._filtre = {"metin": metin, "tip": tip, "baslangic": baslangic, "bitis": bitis}
+            self._sayfalar.clear()
+            self._bekleyen.clear()
+            self.hata = None
+        self._iste(None)
+        self._istekler.put((self._nesil, "tipler"))
+
+    def sayfa(self, anahtar):
+        """Önbellekteki sayfa ya da None (istek kuyruğa alınır, gelince hazir() çağrılır)."""
+        with self._lock:
+            satirlar = self._sayfalar.get(anahtar)
+            if satirlar is not None:
+                self._sayfalar.move_to_end(anahtar)
+        if satirlar is None:
+            self._iste(anahtar)
+            return None
+        if len(satirlar) == self.sayfa_boyutu:
+            # Aynı yönde bir sonraki sayfayı önceden çek (ilk sayfa için "daha eski" yön)
+            yon = "sonra" if anahtar and anahtar[0] == "sonra" else "once"
+            self._iste((yon, satirlar[0][0] if yon == "sonra" else satirlar[-1][0]))
+        return satirlar
+
+    def kapat(self):
+        self._istekler.put(None)
+
+    # ---------- iş thread'i ----------
+    def _iste(self, anahtar):
+        with self._lock:
+            if anahtar in self._sayfalar or anahtar in self._bekleyen:
+                return
+            self._bekleyen.add(anahtar)
+            nesil = self._nesil
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._calis, daemon=True, name="log-sayfa")
+                self._thread.start()
+        self._istekler.put((nesil, anahtar))
+
+    def _calis(self):
+        conn = sqlite3.connect(self.db_yolu)
+        try:
+            while True:
+                is_ = self._istekler.get()
+                if is_ is None:
+                    return
+                nesil, anahtar = is_
+                with self._lock:
+                    if nesil != self._nesil:
+                        continue  # filtre değişti
+                    filtre = dict(self._filtre)
+                satirlar, hata, bildir = None, None, False
+                t0 = time.perf_counter()
+                try:
+                    if anahtar == "tipler":
+                        tipler = log_tipleri(conn)
+                        with self._lock:
+                            self.tipler = tipler
+                    else:
+                        yon, kenar = anahtar if anahtar else (None, None)
+                        satirlar = log_ara(conn, limit=self.sayfa_boyutu, once_id=kenar if yon == "once" else None,
+                                           sonra_id=kenar if yon == "sonra" else None, **filtre)
+                except Exception as e:  # iş thread'i ölmez; hata görünüme bildirilir
+                    hata = str(e) or type(e).__name__
+                    if anahtar != "tipler":
+                        satirlar = []
+                finally:
+                    with self._lock:
+                        # Nesil değiştiyse bekleyen kümesi yeni nesle ait, dokunulmaz
+                        if nesil == self._nesil:
+                            self._bekleyen.discard(anahtar)
+                            self.hata = hata or self.hata
+                            if satirlar is not None:
+                                self.son_sure_ms = (time.perf_counter() - t0) * 1000
+                                self._sayfalar[anahtar] = satirlar
+                                while len(self._sayfalar) > self.onbellek_sayfa:
+                                    self._sayfalar.popitem(last=False)
+                            bildir = satirlar is not None or hata is not None
+                if bildir and self.hazir is not None:
+                    self.hazir()
+        finally:
+            conn.close()
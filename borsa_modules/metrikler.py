@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Sıcak yol enstrümantasyonu — aşama bazında süre histogramları, sayaçlar ve hata oranları.
+Prometheus metin formatında yerel HTTP uç noktası, opsiyonel SQLite rollup ve
+tek döngülük profil isteği.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Saniye cinsinden histogram kova sınırları (+Inf ayrıca eklenir)
+KOVALAR = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SON_GOZLEM_SAYISI = 2048
+
+
+class _Histogram:
+    __slots__ = ("kovalar", "toplam", "sayi", "hata", "son")
+
+    def __init__(self):
+        self.kovalar = [0] * (len(KOVALAR) + 1)
+        self.toplam = 0.0
+        self.sayi = 0
+        self.hata = 0
+        self.son = deque(maxlen=SON_GOZLEM_SAYISI)
+
+    def ekle(self, saniye):
+        i = 0
+        while i < len(KOVALAR) and saniye > KOVALAR[i]:
+            i += 1
+        self.kovalar[i] += 1
+        self.toplam += saniye
+        self.sayi += 1
+        self.son.append(saniye)
+
+
+def yuzdelik(degerler, p):
+    """Doğrusal interpolasyonlu yüzdelik (degerler boşsa 0)."""
+    if not degerler:
+        return 0.0
+    s = sorted(degerler)
+    k = (len(s) - 1) * p / 100.0
+    alt = int(k)
+    ust = min(alt + 1, len(s) - 1)
+    return s[alt] + (s[ust] - s[alt]) * (k - alt)
+
+
+class Metrikler:
+    """Thread-safe metrik kaydı. Aşama = bakiye, analiz, ai, emir, bildirim, dongu ..."""
+
+    def __init__(self, onek="borsa"):
+        self.onek = onek
+        self._lock = threading.Lock()
+        self._hist = {}
+        self._sayaclar = {}
+        self._gostergeler = {}
+        self._profil_istegi = threading.Event()
+        self._son_rollup = {}
+
+    # ---------- kayıt ----------
+    def gozlem(self, asama, saniye, hata=False):
+        with self._lock:
+            h = self._hist.get(asama)
+            if h is None:
+                h = self._hist[asama] = _Histogram()
+            h.ekle(saniye)
+            if hata:
+                h.hata += 1
+
+    def say(self, ad, n=1, **etiketler):
+        anahtar = (ad, tuple(sorted(etiketler.items())))
+        with self._lock:
+            self._sayaclar[anahtar] = self._sayaclar.get(anahtar, 0) + n
+
+    def gosterge(self, ad, deger, **etiketler):
+        with self._lock:
+            self._gostergeler[(ad, tuple(sorted(etiketler.items())))] = deger
+
+    @contextmanager
+    def zamanla(self, asama):
+        t0 = time.perf_counter()
+        hata = False
+        try:
+            yield
+        except Exception:
+            hata = True
+            raise
+        finally:
+            self.gozlem(asama, time.perf_counter() - t0, hata)
+
+    def olc(self, asama, hata=None):
+        """Dekoratör: fonksiyon süresini `asama` altında kaydeder. hata(sonuc) True ise hata sayılır."""
+        def dekorator(fn):
+            @functools.wraps(fn)
+            def sarici(*args, **kwargs):
+                t0 = time.perf_counter()
+                basarisiz = True
+                try:
+                    sonuc = fn(*args, **kwargs)
+                    basarisiz = bool(hata and hata(sonuc))
+                    return sonuc
+                finally:
+                    self.gozlem(asama, time.perf_counter() - t0, basarisiz)
+            return sarici
+        return dekorator
+
+    def sifirla(self):
+        with self._lock:
+            self._hist.clear()
+            self._sayaclar.clear()
+            self._gostergeler.clear()
+            self._son_rollup.clear()
+
+    # ---------- okuma ----------
+    def ozet(self):
+        """{asama: {n, hata, ort_ms, p50_ms, p90_ms, p99_ms, max_ms}} — son gözlemlerden."""
+        with self._lock:
+            kopya = {a: (h.sayi, h.hata, h.toplam, list(h.son)) for a, h in self._hist.items()}
+        out = {}
+        for asama, (sayi, hata, toplam, son) in sorted(kopya.items()):
+            out[asama] = {
+                "n": sayi,
+                "hata": hata,
+                "ort_ms": round(toplam / sayi * 1000, 3) if sayi else 0.0,
+                "p50_ms": round(yuzdelik(son, 50) * 1000, 3),
+                "p90_ms": round(yuzdelik(son, 90) * 1000, 3),
+                "p99_ms": round(yuzdelik(son, 99) * 1000, 3),
+                "max_ms": round(max(son) * 1000, 3) if son else 0.0,
+            }
+        return out
+
+    def son_gozlemler(self, asama):
+        with self._lock:
+            h = self._hist.get(asama)
+            return list(h.son) if h else []
+
+    def prometheus_metni(self):
+        p = self.onek
+        with self._lock:
+            hist = {a: (list(h.kovalar), h.toplam, h.sayi, h.hata) for a, h in self._hist.items()}
+            sayaclar = dict(self._sayaclar)
+            gostergeler = dict(self._gostergeler)
+        satirlar = [
+            f"# HELP {p}_asama_sure_saniye Aşama süresi (saniye).",
+            f"# TYPE {p}_asama_sure_saniye histogram",
+        ]
+        for asama, (kovalar, toplam, sayi, _) in sorted(hist.items()):
+            kumulatif = 0
+            for sinir, n in zip(KOVALAR, kovalar):
+                kumulatif += n
+                satirlar.append(f'{p}_asama_sure_saniye_bucket{{asama="{asama}",le="{sinir}"}} {kumulatif}')
+            satirlar.append(f'{p}_asama_sure_saniye_bucket{{asama="{asama}",le="+Inf"}} {sayi}')
+            satirlar.append(f'{p}_asama_sure_saniye_sum{{asama="{asama}"}} {toplam:.6f}')
+            satirlar.append(f'{p}_asama_sure_saniye_count{{asama="{asama}"}} {sayi}')
+        satirlar.append(f"# HELP {p}_asama_hata_total Başarısız aşama çağrıları.")
+        satirlar.append(f"# TYPE {p}_asama_hata_total counter")
+        for asama, (_, _, _, hata) in sorted(hist.items()):
+            satirlar.append(f'{p}_asama_hata_total{{asama="{asama}"}} {hata}')
+        # Her aile bir kez HELP/TYPE ile açılır; sayaçlar Prometheus adlandırmasıyla _total sonekli
+        for degerler, tip, sonek, aciklama in ((sayaclar, "counter", "_total", "Sayaç"), (gostergeler, "gauge", "", "Gösterge")):
+            onceki = None
+            for (ad, etiketler), deger in sorted(degerler.items()):
+                isim = f"{p}_{ad}{sonek}"
+                if ad != onceki:
+                    satirlar.append(f"# HELP {isim} {aciklama}: {ad}.")
+                    satirlar.append(f"# TYPE {isim} {tip}")
+                    onceki = ad
+                satirlar.append(f"{isim}{_etiket_metni(etiketler)} {deger}")
+        return "\n".join(satirlar) + "\n"
+
+    # ---------- SQLite rollup ----------
+    def sqlite_rollup(self, conn):
+        """Son rollup'tan bu yana biriken gözlemleri `metrik_ozet` tablosuna yaz."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS metrik_ozet (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tarih_saat TEXT,
+                asama TEXT,
+                sayi INTEGER,
+                hata INTEGER,
+                toplam_sn REAL,
+                p50_ms REAL,
+                p99_ms REAL
+            )
+        """)
+        tarih = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            satirlar = []
+            for asama, h in self._hist.items():
+                onceki_sayi, onceki_hata, onceki_toplam = self._son_rollup.get(asama, (0, 0, 0.0))
+                yeni = h.sayi - onceki_sayi
+                if yeni <= 0:
+                    continue
+                son = list(h.son)[-yeni:]
+                satirlar.append((tarih, asama, yeni, h.hata - onceki_hata, h.toplam - onceki_toplam,
+                                 round(yuzdelik(son, 50) * 1000, 3), round(yuzdelik(son, 99) * 1000, 3)))
+                self._son_rollup[asama] = (h.sayi, h.hata, h.toplam)
+        if satirlar:
+            conn.executemany(
+                "INSERT INTO metrik_ozet (tarih_saat, asama, sayi, hata, toplam_sn, p50_ms, p99_ms) VALUES (?,?,?,?,?,?,?)",
+                satirlar,
+            )
+            conn.commit()
+        return len(satirlar)
+
+    # ---------- profil ----------
+    def profil_iste(self):
+        """Bir sonraki döngünün cProfile ile çalıştırılmasını iste."""
+        self._profil_istegi.set()
+
+    def profil_al(self):
+        """Bekleyen profil isteği varsa tüket ve True döndür."""
+        if self._profil_istegi.is_set():
+            self._profil_istegi.clear()
+            return True
+        return False
+
+
+def _etiket_metni(etiketler):
+    if not etiketler:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in etiketler) + "}"
+
+
+class MetrikSunucusu:
+    """
+    Yerel HTTP uç noktası:
+      GET /metrics        Prometheus metin formatı
+      GET|POST /profil    Sonraki döngüyü profille
+    """
+
+    def __init__(self, metrikler, port=9108, host="127.0.0.1"):
+        self.metrikler = metrikler
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def baslat(self):
+        metrikler = self.metrikler
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _yaz(self, durum, metin, tip="text/plain; version=0.0.4; charset=utf-8"):
+                veri = metin.encode("utf-8")
+                self.send_response(durum)
+                self.send_header("Content-Type", tip)
+                self.send_header("Content-Length", str(len(veri)))
+                self.end_headers()
+                self.wfile.write(veri)
+
+            def do_GET(self):
+                if self.path.split("?")[0] == "/metrics":
+                    self._yaz(200, metrikler.prometheus_metni())
+                elif self.path.split("?")[0] == "/profil":
+                    metrikler.profil_iste()
+                    self._yaz(202, "Sonraki döngü profillenecek.\n")
+                else:
+                    self._yaz(404, "Bulunamadı\n")
+
+            do_POST = do_GET
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.port
+
+    def durdur(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Vektörel Monte Carlo — pozisyon boyutu / risk ayarlarını canlıya almadan önce sınamak için.
+Geçmiş işlem getirileri (islemler tablosu ya da sentetik) yerine koyarak örneklenir
+(bootstrap); on binlerce özkaynak yolu tek seferde (yol × işlem matrisi) NumPy ile
+ilerletilir. Her yol için en büyük düşüş (drawdown) ve iflas eşiğinin altına inme ölçülür.
+
+Kullanım (proje kökünden):
+    python -m borsa_modules.monte_carlo                      # borsa.db'deki işlemler
+    python -m borsa_modules.monte_carlo --sentetik 200       # TP/SL ayarlarından sentetik
+    python -m borsa_modules.monte_carlo --risk 1,2,5 --yontem sabit_oran,atr,kelly --yol 50000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from borsa_modules.pozisyon_boyutu import YONTEMLER, islem_istatistikleri, islemleri_oku, kelly_orani, pozisyon_orani
+
+DD_ESIKLERI = (0.10, 0.20, 0.30, 0.50)
+# Bellek sınırı: tek partide en fazla bu kadar hücre (yol × işlem)
+PARTI_HUCRE = 4_000_000
+
+
+def oranlar(yontem, risk_pct, getiriler, stop_mesafeleri=None, varsayilan_stop_pct=4.0,
+            kelly_kesri=0.5, max_pozisyon_pct=25.0):
+    """İşlem başına notional oranı dizisi (getirilerle aynı sıra) ve kullanılan yöntem."""
+    n = len(getiriler)
+    if yontem == "atr":
+        stop = np.full(n, varsayilan_stop_pct) if stop_mesafeleri is None else \
+            np.where(np.isnan(stop_mesafeleri), varsayilan_stop_pct, stop_mesafeleri)
+        f = np.minimum(risk_pct / stop, max_pozisyon_pct / 100.0)
+        return f, "atr"
+    kelly = kelly_orani(getiriler) if yontem == "kelly" else None
+    oran, kullanilan = pozisyon_orani(yontem, risk_pct, kelly=kelly, kelly_kesri=kelly_kesri,
+                                      max_pozisyon_pct=max_pozisyon_pct)
+    return np.full(n, oran), kullanilan
+
+
+def simule_et(getiriler, f, islem_sayisi=250, yol_sayisi=20000, iflas_esigi=0.5, tohum=None):
+    """
+    getiriler[i] getirili işleme f[i] oranında girilerek `islem_sayisi` işlemlik `yol_sayisi`
+    yol. Özkaynak 1.0'dan başlar. Son özkaynak yüzdelikleri, en büyük düşüş dağılımı,
+    P(düşüş ≥ eşik) ve iflas (özkaynak ≤ iflas_esigi) olasılığı döner.
+    """
+    getiriler = np.asarray(getiriler, dtype=float)
+    adim = np.maximum(1.0 + np.asarray(f, dtype=float) * getiriler, 0.0)  # işlem başına çarpan
+    rng = np.random.default_rng(tohum)
+    parti = max(1, PARTI_HUCRE // max(islem_sayisi, 1))
+    son, max_dd, iflas = [], [], []
+    t0 = time.perf_counter()
+    for bas in range(0, yol_sayisi, parti):
+        m = min(parti, yol_sayisi - bas)
+        idx = rng.integers(0, len(getiriler), size=(m, islem_sayisi))
+        ozkaynak = np.cumprod(adim[idx], axis=1)
+        tepe = np.maximum(np.maximum.accumulate(ozkaynak, axis=1), 1.0)
+        max_dd.append((1.0 - ozkaynak / tepe).max(axis=1))
+        iflas.append(ozkaynak.min(axis=1) <= iflas_esigi)
+        son.append(ozkaynak[:, -1])
+    son, max_dd, iflas = np.concatenate(son), np.concatenate(max_dd), np.concatenate(iflas)
+    return {
+        "yol": yol_sayisi,
+        "islem": islem_sayisi,
+        "son_p5": float(np.percentile(son, 5)),
+        "son_p50": float(np.percentile(son, 50)),
+        "son_p95": float(np.percentile(son, 95)),
+        "zarar_olasiligi": float((son < 1.0).mean()),
+        "max_dd_p50": float(np.percentile(max_dd, 50)),
+        "max_dd_p95": float(np.percentile(max_dd, 95)),
+        "dd_olasiligi": {f"{e:.0%}": float((max_dd >= e).mean()) for e in DD_ESIKLERI},
+        "iflas_olasiligi": float(iflas.mean()),
+        "sure_sn": round(time.perf_counter() - t0, 3),
+    }
+
+
+def sentetik_getiriler(n, tp_pct=3.0, sl_pct=-2.0, kazanma=0.5, tohum=0):
+    """TP/SL ayarlarına göre kaba işlem dağılımı (kayma ve erken AI satışları için gürültülü)."""
+    rng = np.random.default_rng(tohum)
+    kazandi = rng.random(n) < kazanma
+    r = np.where(kazandi, tp_pct / 100.0, sl_pct / 100.0)
+    # AI satışları hedefe varmadan kapatır: getirinin bir kısmı
+    erken = rng.random(n) < 0.3
+    r = np.where(erken, r * rng.uniform(0.1, 0.9, n), r)
+    return r + rng.normal(0, 0.002, n), np.full(n, abs(sl_pct))
+
+
+def karsilastir(getiriler, stop_mesafeleri, riskler, yontemler, komisyon_pct=0.2, **kw):
+    """Risk % × yöntem ızgarası için simülasyon sonuçları."""
+    net = np.asarray(getiriler, dtype=float) - komisyon_pct / 100.0
+    sonuclar = []
+    for yontem in yontemler:
+        for risk in riskler:
+            f, kullanilan = oranlar(yontem, risk, net, stop_mesafeleri,
+                                    kelly_kesri=kw.get("kelly_kesri", 0.5),
+                                    max_pozisyon_pct=kw.get("max_pozisyon_pct", 25.0))
+            s = simule_et(net, f, kw.get("islem_sayisi", 250), kw.get("yol_sayisi", 20000),
+                          kw.get("iflas_esigi", 0.5), kw.get("tohum"))
+            s.update({"yontem": yontem, "kullanilan": kullanilan, "risk_pct": risk, "ort_oran": float(f.mean())})
+            sonuclar.append(s)
+    return {"istatistik": islem_istatistikleri(net), "sonuclar": sonuclar}
+
+
+def rapor_yaz(rapor, iflas_esigi, out=sys.stdout):
+    ist = rapor["istatistik"]
+    if ist["islem"]:
+        oduk = f"{ist['odul_risk']:.2f}" if ist["odul_risk"] is not None else "—"
+        out.write(f"İşlem: {ist['islem']} | kazanma %{ist['kazanma_orani']*100:.1f} | ort. kazanç %{ist['ort_kazanc']*100:.2f}"
+                  f" | ort. kayıp %{ist['ort_kayip']*100:.2f} | ödül/risk {oduk} | beklenti %{ist['beklenti']*100:.3f}\n")
+    out.write(f"{'yöntem':<12}{'risk%':>6}{'oran':>7}{'son p5':>9}{'p50':>8}{'p95':>8}{'DD p50':>9}{'DD p95':>9}"
+              f"{'P(DD≥20%)':>11}{'P(DD≥30%)':>11}{f'iflas≤{iflas_esigi:g}':>11}{'sn':>7}\n")
+    for s in rapor["sonuclar"]:
+        ad = s["yontem"] if s["kullanilan"] == s["yontem"] else f"{s['yontem']}→{s['kullanilan'][:5]}"
+        out.write(f"{ad:<12}{s['risk_pct']:>6g}{s['ort_oran']:>7.3f}{s['son_p5']:>9.3f}{s['son_p50']:>8.3f}{s['son_p95']:>8.3f}"
+                  f"{s['max_dd_p50']*100:>8.1f}%{s['max_dd_p95']*100:>8.1f}%{s['dd_olasiligi']['20%']*100:>10.1f}%"
+                  f"{s['dd_olasiligi']['30%']*100:>10.1f}%{s['iflas_olasiligi']*100:>10.2f}%{s['sure_sn']:>7.2f}\n")
+
+
+def _liste(deger, tip=float):
+    return [tip(x) for x in deger.split(",") if x.strip()]
+
+
+def main(argv=None):
+    kok = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description="Pozisyon boyutu / risk Monte Carlo simülatörü")
+    ap.add_argument("--db", default=os.path.join(kok, "borsa.db"), help="islemler tablosunu içeren veritabanı")
+    ap.add_argument("--sentetik", type=int, default=0, help="DB yerine bu kadar sentetik işlem kullan")
+    ap.add_argument("--risk", default="1,2,3,5", help="Denenecek risk yüzdeleri (virgülle)")
+    ap.add_argument("--yontem", default=",".join(YONTEMLER), help="Denenecek yöntemler (virgülle)")
+    ap.add_argument("--islem", type=int, default=250, help="Yol başına işlem sayısı")
+    ap.add_argument("--yol", type=int, default=20000, help="Yol sayısı")
+    ap.add_argument("--iflas", type=float, default=0.5, help="İflas sayılan özkaynak oranı")
+    ap.add_argument("--komisyon", type=float, default=0.2, help="İşlem başına toplam komisyon %% (giriş + çıkış)")
+    ap.add_argument("--kelly-kesri", type=float, default=0.5)
+    ap.add_argument("--max-pozisyon", type=float, default=25.0, help="Tek pozisyon üst sınırı (özkaynak %%)")
+    ap.add_argument("--tohum", type=int, default=None)
+    ap.add_argument("--json", help="Sonucu JSON olarak bu dosyaya yaz")
+    args = ap.parse_args(argv)
+
+    if args.sentetik:
+        getiriler, stoplar = sentetik_getiriler(args.sentetik, tohum=args.tohum or 0)
+    else:
+        getiriler, stoplar = islemleri_oku(args.db)
+        if len(getiriler) < 10:
+            ap.exit(1, f"{args.db}: yeterli kapanmış işlem yok ({len(getiriler)}); --sentetik N ile deneyin.\n")
+    yontemler = [y for y in _liste(args.yontem, str) if y in YONTEMLER]
+    rapor = karsilastir(getiriler, stoplar, _liste(args.risk), yontemler, komisyon_pct=args.komisyon,
+                        islem_sayisi=args.islem, yol_sayisi=args.yol, iflas_esigi=args.iflas, tohum=args.tohum,
+                        kelly_kesri=args.kelly_kesri, max_pozisyon_pct=args.max_pozisyon)
+    rapor_yaz(rapor, args.iflas)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
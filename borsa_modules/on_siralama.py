@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Tarama adayları için yerel ML ön sıralayıcı.
+Her taramada evrendeki sembollerin özellik anlık görüntüsü (analiz sözlüğünden sayısal
+vektör) `ozellik_anlik` tablosuna yazılır; ufuk süresi dolunca aynı sembolün sonraki
+görüntüsünden ileri getiri etiketlenir. Bu geçmişle eğitilen sınıflandırıcı (scikit-learn
+HistGradientBoosting — eksik değerleri kendisi işler) "ufuk içinde getiri > eşik"
+olasılığını verir. Çıkarım tüm evren için tek matris çağrısıdır; yalnızca en olası ilk K
+aday LLM'e sorulur. Modeller `modeller/` altında sürümlü saklanır, `on_siralama_guncel.json`
+etkin sürümü gösterir. Yeni model, zaman sıralı doğrulamada ilk K isabeti el yazımı skorun
+altındaysa etkinleştirilmez (--zorla ile zorlanabilir). Model yoksa / sklearn kurulu değilse
+el yazımı skor kullanılır.
+
+Kullanım (proje kökünden):
+    python -m borsa_modules.on_siralama egit --ufuk-dk 240 --esik 1.0
+    python -m borsa_modules.on_siralama egit --zorla
+    python -m borsa_modules.on_siralama bilgi
+"""
+
+import json
+import os
+import pickle
+import time
+from array import array
+from datetime import datetime
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.metrics import roc_auc_score
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
+# Özellik şeması; değişirse OZELLIK_SURUMU artırılır (eski görüntüler eğitime girmez)
+OZELLIK_SURUMU = 1
+OZELLIKLER = [
+    "sinyal_15m", "sinyal_1h", "sinyal_4h", "sinyal_1d",
+    "rsi_15m", "rsi_1h", "rsi_4h", "stoch_15m", "stoch_1h", "stoch_4h",
+    "macd_hist_15m_n", "macd_hist_1h_n", "macd_hist_4h_n",
+    "bb_position", "atr_pct", "adx", "degisim_24h", "fiyat_1h_degisim", "fiyat_4h_degisim",
+    "distance_to_support", "distance_to_resistance", "fiyat_ema50", "ema50_ema200",
+    "golden_cross", "death_cross", "obv_trend", "momentum", "hacim_anomali", "el_skoru",
+]
+_SINYAL = {"AL": 1.0, "SAT": -1.0, "BEKLE": 0.0}
+_YON = {"yükseliş": 1.0, "düşüş": -1.0, "yatay": 0.0, "güçlü_yükseliş": 2.0, "güçlü_düşüş": -2.0, "nötr": 0.0}
+_GUNCEL = "on_siralama_guncel.json"
+SAKLANAN_SURUM = 5
+
+
+def _sayi(v):
+    return float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else float("nan")
+
+
+def _oran(a, b):
+    return a / b - 1.0 if isinstance(a, (int, float)) and isinstance(b, (int, float)) and b else float("nan")
+
+
+def ozellik_vektoru(analiz, el_skoru=None):
+    """Analiz sözlüğü → OZELLIKLER sırasıyla float listesi (eksik → NaN)."""
+    fiyat = analiz.get("fiyat") or 0
+    v = {}
+    for k in ("sinyal_15m", "sinyal_1h", "sinyal_4h", "sinyal_1d"):
+        v[k] = _SINYAL.get(analiz.get(k), float("nan"))
+    for k in ("rsi_15m", "rsi_1h", "rsi_4h", "stoch_15m", "stoch_1h", "stoch_4h", "bb_position", "adx",
+              "degisim_24h", "fiyat_1h_degisim", "fiyat_4h_degisim", "distance_to_support", "distance_to_resistance"):
+        v[k] = _sayi(analiz.get(k))
+    for k in ("macd_hist_15m", "macd_hist_1h", "macd_hist_4h"):
+        v[k + "_n"] = _sayi(analiz.get(k)) / fiyat * 100 if fiyat else float("nan")
+    v["atr_pct"] = _sayi(analiz.get("atr")) / fiyat * 100 if fiyat else float("nan")
+    v["fiyat_ema50"] = _oran(fiyat, analiz.get("ema_50"))
+    v["ema50_ema200"] = _oran(analiz.get("ema_50"), analiz.get("ema_200"))
+    v["golden_cross"] = 1.0 if analiz.get("golden_cross") else 0.0
+    v["death_cross"] = 1.0 if analiz.get("death_cross") else 0.0
+    v["obv_trend"] = _YON.get(analiz.get("obv_trend"), float("nan"))
+    v["momentum"] = _YON.get(analiz.get("momentum"), float("nan"))
+    v["hacim_anomali"] = 1.0 if analiz.get("hacim_anomali") else 0.0
+    v["el_skoru"] = float(el_skoru) if el_skoru is not None else float("nan")
+    return [v[k] for k in OZELLIKLER]
+
+
+# ---------- anlık görüntü deposu ----------
+def sema_kur(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ozellik_anlik (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            zaman REAL NOT NULL,
+            sembol TEXT NOT NULL,
+            fiyat REAL NOT NULL,
+            surum INTEGER NOT NULL,
+            el_skoru REAL,
+            ozellikler BLOB NOT NULL,
+            ileri_getiri REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ozellik_sembol_zaman ON ozellik_anlik(sembol, zaman)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ozellik_etiketsiz ON ozellik_anlik(zaman) WHERE ileri_getiri IS NULL")
+
+
+def anlik_kaydet(conn, zaman, kayitlar):
+    """kayitlar: [(sembol, fiyat, el_skoru, vektör)] — float32 BLOB olarak tek seferde yaz."""
+    conn.executemany(
+        "INSERT INTO ozellik_anlik (zaman, sembol, fiyat, surum, el_skoru, ozellikler) VALUES (?,?,?,?,?,?)",
+        [(zaman, s, f, OZELLIK_SURUMU, sk, array("f", v).tobytes()) for s, f, sk, v in kayitlar if f],
+    )
+    conn.commit()
+
+
+def etiketle(conn, ufuk_sn, tolerans_sn=None, simdi=None, geriye_sn=86400):
+    """
+    Ufku dolmuş etiketsiz görüntülere ileri getiri yaz: aynı sembolün zaman + ufuk sonrası
+    ilk görüntüsünün fiyatı (ufuk + tolerans içinde yoksa etiketlenmez). Etiketlenen sayı.
+    Penceresi (ufuk + tolerans) `geriye_sn`den daha önce kapanmış görüntüler artık
+    etiketlenemez ve taranmaz — periyodik çağrının maliyeti birikmiş etiketsizlerle büyümez.
+    geriye_sn=None: tüm etiketsiz geçmiş (çevrimdışı eğitim).
+    """
+    simdi = simdi or time.time()
+    tolerans_sn = tolerans_sn if tolerans_sn is not None else ufuk_sn / 2
+    alt = simdi - ufuk_sn - tolerans_sn - geriye_sn if geriye_sn is not None else float("-inf")
+    cur = conn.execute("""
+        UPDATE ozellik_anlik SET ileri_getiri = (
+            SELECT b.fiyat FROM ozellik_anlik b
+            WHERE b.sembol = ozellik_anlik.sembol AND b.zaman >= ozellik_anlik.zaman + ?1
+              AND b.zaman <= ozellik_anlik.zaman + ?1 + ?2
+            ORDER BY b.zaman LIMIT 1
+        ) / fiyat - 1.0
+        WHERE ileri_getiri IS NULL AND zaman <= ?3 AND zaman > ?4
+    """, (ufuk_sn, tolerans_sn, simdi - ufuk_sn, alt))
+    conn.commit()
+    return cur.rowcount
+
+
+def veri_kumesi(conn, surum=OZELLIK_SURUMU):
+    """Etiketli görüntüler → (zaman, X, ileri getiri, el skoru), zamana göre sıralı."""
+    satirlar = conn.execute(
+        "SELECT zaman, ozellikler, ileri_getiri, el_skoru FROM ozellik_anlik "
+        "WHERE surum = ? AND ileri_getiri IS NOT NULL ORDER BY zaman", (surum,)
+    ).fetchall()
+    if not satirlar:
+        return np.empty(0), np.empty((0, len(OZELLIKLER))), np.empty(0), np.empty(0)
+    X = np.frombuffer(b"".join(r[1] for r in satirlar), dtype=np.float32).reshape(len(satirlar), -1).astype(np.float64)
+    return (np.array([r[0] for r in satirlar]), X, np.array([r[2] for r in satirlar]),
+            np.array([np.nan if r[3] is None else r[3] for r in satirlar]))
+
+
+# ---------- eğitim ----------
+def _isabet(zaman, skor, y, k):
+    """Her tarama anında (aynı zaman damgası) skoru en yüksek k adayın isabet oranı."""
+    isabet, n = 0, 0
+    for t in np.unique(zaman):
+        m = zaman == t
+        sira = np.argsort(-np.nan_to_num(skor[m], nan=-np.inf), kind="stable")[:k]
+        isabet += int(y[m][sira].sum())
+        n += len(sira)
+    return round(isabet / n, 4) if n else None
+
+
+def egit(zaman, X, getiri, el_skoru, esik_pct=1.0, dogrulama_orani=0.2, top_k=2, tohum=0):
+    """
+    Zaman sıralı ayrımla eğit: son `dogrulama_orani` doğrulama. Son model tüm veriyle yeniden
+    eğitilir. (model, metrikler) döner.
+    """
+    y = (getiri > esik_pct / 100.0).astype(int)
+    if len(y) < 200 or y.min() == y.max():
+        raise ValueError(f"Yetersiz ya da tek sınıflı veri ({len(y)} örnek, pozitif {int(y.sum())})")
+    # Hiç dolmamış sütun (ör. eski sürümde hesaplanmayan gösterge) binlemeyi bozar — sabitle
+    X = np.where(np.isnan(X).all(axis=0), 0.0, X)
+    kesim = np.searchsorted(zaman, np.quantile(zaman, 1 - dogrulama_orani))
+    parametreler = dict(max_iter=200, learning_rate=0.05, max_leaf_nodes=15, l2_regularization=1.0,
+                        early_stopping=False, random_state=tohum)
+    model = HistGradientBoostingClassifier(**parametreler).fit(X[:kesim], y[:kesim])
+    olasilik = model.predict_proba(X[kesim:])[:, 1]
+    yd, zd = y[kesim:], zaman[kesim:]
+    metrikler = {
+        "ornek": int(len(y)), "pozitif_orani": round(float(y.mean()), 4),
+        "egitim": int(kesim), "dogrulama": int(len(y) - kesim),
+        "auc": round(float(roc_auc_score(yd, olasilik)), 4) if 0 < yd.sum() < len(yd) else None,
+        "isabet_model": _isabet(zd, olasilik, yd, top_k),
+        "isabet_el_skoru": _isabet(zd, el_skoru[kesim:], yd, top_k),
+        "isabet_rastgele": round(float(yd.mean()), 4),
+        "top_k": top_k, "esik_pct": esik_pct,
+    }
+    return HistGradientBoostingClassifier(**parametreler).fit(X, y), metrikler
+
+
+def terfi_uygun_mu(metrikler):
+    """
+    Model etkinleştirilebilir mi: doğrulamadaki ilk K isabeti el yazımı skorunkinden düşük
+    olmamalı (AI'a daha az aday sorulurken isabet düşmesin). (uygun, neden)
+    """
+    model, el = metrikler.get("isabet_model"), metrikler.get("isabet_el_skoru")
+    if model is None:
+        return False, "doğrulama isabeti hesaplanamadı"
+    if el is not None and model < el:
+        return False, f"doğrulama isabeti {model} < el yazımı skor {el}"
+    return True, f"doğrulama isabeti {model} ≥ el yazımı skor {el}"
+
+
+def kaydet(dizin, model, metrikler, ufuk_sn):
+    """Modeli sürüm adıyla yaz, güncel işaretçisini atomik değiştir, eski sürümleri buda."""
+    os.makedirs(dizin, exist_ok=True)
+    surum = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ad = f"on_siralama_{surum}.pkl"
+    meta = {"surum": surum, "dosya": ad, "ozellik_surumu": OZELLIK_SURUMU, "ozellikler": OZELLIKLER,
+            "ufuk_sn": ufuk_sn, "metrikler": metrikler}
+    with open(os.path.join(dizin, ad), "wb") as f:
+        pickle.dump({"model": model, "meta": meta}, f)
+    tmp = os.path.join(dizin, _GUNCEL + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, os.path.join(dizin, _GUNCEL))
+    eskiler = sorted(a for a in os.listdir(dizin) if a.startswith("on_siralama_") and a.endswith(".pkl"))
+    for a in eskiler[:-SAKLANAN_SURUM]:
+        os.remove(os.path.join(dizin, a))
+    return meta
+
+
+class OnSiralayici:
+    """
+      o = OnSiralayici(dizin); o.yukle()
+      o.olasiliklar([analiz, ...], [skor, ...]) -> ndarray | None   (model yoksa None)
+    """
+
+    def __init__(self, dizin):
+        self.dizin = dizin
+        self.model = None
+        self.meta = None
+        self._mtime = None
+
+    @property
+    def hazir(self):
+        return self.model is not None
+
+    def yukle(self):
+        """Güncel sürümü yükle (işaretçi değişmediyse bir şey yapmaz). Hazır mı döner."""
+        if not HAS_SKLEARN or not HAS_NUMPY:
+            return False
+        yol = os.path.join(self.dizin, _GUNCEL)
+        try:
+            mtime = os.path.getmtime(yol)
+            if mtime == self._mtime:
+                return self.hazir
+            with open(yol, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("ozellik_surumu") != OZELLIK_SURUMU or meta.get("ozellikler") != OZELLIKLER:
+                self.model, self.meta, self._mtime = None, meta, mtime  # şema değişti — yeniden eğitilmeli
+                return False
+            with open(os.path.join(self.dizin, meta["dosya"]), "rb") as f:
+                paket = pickle.load(f)
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError, AttributeError, ImportError):
+            return self.hazir
+        self.model, self.meta, self._mtime = paket["model"], meta, mtime
+        return True
+
+    def olasiliklar(self, analizler, el_skorlari=None):
+        if not self.hazir or not analizler:
+            return None
+        el_skorlari = el_skorlari or [None] * len(analizler)
+        X = np.array([ozellik_vektoru(a, s) for a, s in zip(analizler, el_skorlari)], dtype=np.float64)
+        return self.model.predict_proba(X)[:, 1]
+
+
+def main(argv=None):
+    import argparse
+    import sqlite3
+    kok = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description="Tarama ön sıralayıcı — eğitim / bilgi")
+    ap.add_argument("komut", choices=["egit", "bilgi"])
+    ap.add_argument("--db", default=os.path.join(kok, "borsa.db"))
+    ap.add_argument("--dizin", default=os.path.join(kok, "modeller"))
+    ap.add_argument("--ufuk-dk", type=float, default=240, help="İleri getiri ufku (dakika)")
+    ap.add_argument("--esik", type=float, default=1.0, help="Pozitif sayılan ileri getiri %%")
+    ap.add_argument("--top-k", type=int, default=2)
+    ap.add_argument("--zorla", action="store_true", help="El yazımı skoru geçemese de etkinleştir")
+    args = ap.parse_args(argv)
+    if args.komut == "bilgi":
+        o = OnSiralayici(args.dizin)
+        print(json.dumps(o.meta if o.yukle() or o.meta else {"durum": "model yok"}, indent=2, ensure_ascii=False))
+        return
+    if not HAS_SKLEARN:
+        ap.exit(1, "scikit-learn kurulu değil (pip install scikit-learn)\n")
+    conn = sqlite3.connect(args.db)
+    sema_kur(conn)
+    n = etiketle(conn, args.ufuk_dk * 60, geriye_sn=None)
+    zaman, X, getiri, el = veri_kumesi(conn)
+    conn.close()
+    print(f"{n} yeni etiket, {len(zaman)} etiketli görüntü")
+    try:
+        model, metrikler = egit(zaman, X, getiri, el, esik_pct=args.esik, top_k=args.top_k)
+    except ValueError as e:
+        ap.exit(1, f"{e}\n")
+    print(json.dumps(metrikler, indent=2, ensure_ascii=False))
+    uygun, neden = terfi_uygun_mu(metrikler)
+    if not uygun and not args.zorla:
+        ap.exit(1, f"Model etkinleştirilmedi: {neden} (etkin sürüm değişmedi; zorlamak için --zorla)\n")
+    meta = kaydet(args.dizin, model, metrikler, args.ufuk_dk * 60)
+    t0 = time.perf_counter()
+    model.predict_proba(X[-300:])
+    print(f"Sürüm {meta['surum']} kaydedildi; 300 sembol çıkarımı {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Sabit bellekli özkaynak (portföy değeri) geçmişi.
+Her çözünürlük `array('d')` tabanlı bir halka tampondur (1 dk × 1 gün, 15 dk × 30 gün,
+1 saat × 1 yıl); üst çözünürlükler her kovanın son değeriyle beslenir. Grafik için istenen
+aralığı kapsayan en ince çözünürlük seçilir ve LTTB ile sabit nokta sayısına indirilir.
+Alım/satım olayları sınırlı bir kuyrukta tutulur. Tamamı diske atomik olarak yazılır.
+"""
+
+import bisect
+import json
+import os
+import struct
+import threading
+from array import array
+from collections import deque
+
+# (adım sn, kapasite)
+VARSAYILAN_COZUNURLUKLER = ((60, 1440), (900, 2880), (3600, 8760))
+OLAY_KAPASITESI = 500
+_SIHIR = b"OZK1"
+
+
+class HalkaTampon:
+    """Zaman damgası + değer çiftleri için sabit kapasiteli halka tampon."""
+
+    __slots__ = ("kapasite", "zaman", "deger", "_bas", "_n")
+
+    def __init__(self, kapasite):
+        self.kapasite = kapasite
+        self.zaman = array("d", bytes(8 * kapasite))
+        self.deger = array("d", bytes(8 * kapasite))
+        self._bas = 0
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def ekle(self, t, v):
+        i = (self._bas + self._n) % self.kapasite
+        self.zaman[i] = t
+        self.deger[i] = v
+        if self._n < self.kapasite:
+            self._n += 1
+        else:
+            self._bas = (self._bas + 1) % self.kapasite
+
+    def son(self):
+        if not self._n:
+            return None
+        i = (self._bas + self._n - 1) % self.kapasite
+        return self.zaman[i], self.deger[i]
+
+    def ilk_zaman(self):
+        return self.zaman[self._bas] if self._n else None
+
+    def sirali(self):
+        """Eskiden yeniye (zamanlar, değerler) dizileri."""
+        son = self._bas + self._n
+        if son <= self.kapasite:
+            return self.zaman[self._bas:son], self.deger[self._bas:son]
+        k = son - self.kapasite
+        return self.zaman[self._bas:] + self.zaman[:k], self.deger[self._bas:] + self.deger[:k]
+
+
+def lttb(xs, ys, hedef):
+    """Largest-Triangle-Three-Buckets: görsel biçimi koruyarak `hedef` noktaya indir."""
+    n = len(xs)
+    if hedef >= n or hedef < 3:
+        return list(xs), list(ys)
+    ox, oy = [xs[0]], [ys[0]]
+    kova = (n - 2) / (hedef - 2)
+    a = 0
+    for i in range(hedef - 2):
+        bas = int(i * kova) + 1
+        bit = int((i + 1) * kova) + 1
+        sonraki_bas, sonraki_bit = bit, min(int((i + 2) * kova) + 1, n)
+        if sonraki_bit <= sonraki_bas:
+            sonraki_bit = sonraki_bas + 1
+        m = sonraki_bit - sonraki_bas
+        ort_x = sum(xs[sonraki_bas:sonraki_bit]) / m
+        ort_y = sum(ys[sonraki_bas:sonraki_bit]) / m
+        ax, ay = xs[a], ys[a]
+        en_iyi, en_alan = bas, -1.0
+        for j in range(bas, bit):
+            alan = abs((ax - ort_x) * (ys[j] - ay) - (ax - xs[j]) * (ort_y - ay))
+            if alan > en_alan:
+                en_alan, en_iyi = alan, j
+        ox.append(xs[en_iyi])
+        oy.append(ys[en_iyi])
+        a = en_iyi
+    ox.append(xs[-1])
+    oy.append(ys[-1])
+    return ox, oy
+
+
+class OzkaynakGecmisi:
+    """
+      g.ekle(time.time(), toplam)              # en ince adımdan sık gelen örnekler yok sayılır
+      g.olay(time.time(), toplam, "alim")
+      g.aralik(baslangic) -> (zamanlar, değerler)  # en ince uygun çözünürlük, LTTB'siz
+      g.grafik(baslangic, nokta=600)          # LTTB ile indirilmiş
+    """
+
+    def __init__(self, cozunurlukler=VARSAYILAN_COZUNURLUKLER, olay_kapasitesi=OLAY_KAPASITESI):
+        self.cozunurlukler = tuple(cozunurlukler)
+        self.tamponlar = [HalkaTampon(k) for _, k in self.cozunurlukler]
+        self._bekleyen = [None] * len(self.cozunurlukler)  # üst seviyelerin açık kovası: (kova, t, v)
+        self.olaylar = deque(maxlen=olay_kapasitesi)
+        self.surum = 0  # her değişimde artar (grafik yeniden çizim imzası)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tamponlar[0])
+
+    def ekle(self, t, deger):
+        """Örnek ekle. En ince adım dolmadıysa False."""
+        with self._lock:
+            son = self.tamponlar[0].son()
+            if son is not None and t - son[0] < self.cozunurlukler[0][0]:
+                return False
+            self.tamponlar[0].ekle(t, deger)
+            for i in range(1, len(self.cozunurlukler)):
+                adim = self.cozunurlukler[i][0]
+                kova = int(t // adim)
+                b = self._bekleyen[i]
+                if b is not None and b[0] != kova:
+                    self.tamponlar[i].ekle(b[1], b[2])  # kapanan kovanın son örneği
+                self._bekleyen[i] = (kova, t, deger)
+            self.surum += 1
+            return True
+
+    def olay(self, t, deger, tip):
+        with self._lock:
+            self.olaylar.append((t, deger, tip))
+            self.surum += 1
+
+    def son(self):
+        with self._lock:
+            return self.tamponlar[0].son()
+
+    def aralik(self, baslangic):
+        """`baslangic`tan bu yana noktalar — aralığı kapsayan en ince çözünürlükten."""
+        with self._lock:
+            secilen = len(self.tamponlar) - 1
+            for i, (tampon, (adim, _)) in enumerate(zip(self.tamponlar, self.cozunurlukler)):
+                ilk = tampon.ilk_zaman()
+                if ilk is not None and (ilk <= baslangic + adim or len(tampon) < tampon.kapasite):
+                    secilen = i
+                    break
+            zamanlar, degerler = self.tamponlar[secilen].sirali()
+            if secilen and self._bekleyen[secilen] is not None:
+                _, t, v = self._bekleyen[secilen]
+                zamanlar.append(t)
+                degerler.append(v)
+        i = bisect.bisect_left(zamanlar, baslangic)
+        return zamanlar[i:], degerler[i:]
+
+    def grafik(self, baslangic, nokta=600):
+        zamanlar, degerler = self.aralik(baslangic)
+        return lttb(zamanlar, degerler, nokta)
+
+    def olaylar_aralik(self, baslangic):
+        with self._lock:
+            return [o for o in self.olaylar if o[0] >= baslangic]
+
+    # ---------- kalıcılık ----------
+    def kaydet(self, yol):
+        """İkili dosyaya atomik yaz: başlık (JSON) + her çözünürlüğün sıralı dizileri."""
+        with self._lock:
+            parcalar = [t.sirali() for t in self.tamponlar]
+            baslik = {
+                "cozunurlukler": self.cozunurlukler,
+                "uzunluklar": [len(z) for z, _ in parcalar],
+                "bekleyen": self._bekleyen,
+                "olaylar": list(self.olaylar),
+            }
+        veri = json.dumps(baslik).encode("utf-8")
+        tmp = yol + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_SIHIR + struct.pack("<I", len(veri)) + veri)
+            for zamanlar, degerler in parcalar:
+                zamanlar.tofile(f)
+                degerler.tofile(f)
+        os.replace(tmp, yol)
+
+    def yukle(self, yol):
+        """Kayıtlı geçmişi oku. Dosya yok/bozuk ya da çözünürlükler farklıysa False."""
+        if not os.path.exists(yol):
+            return False
+        try:
+            with open(yol, "rb") as f:
+                if f.read(4) != _SIHIR:
+                    return False
+                (uzunluk,) = struct.unpack("<I", f.read(4))
+                baslik = json.loads(f.read(uzunluk).decode("utf-8"))
+                if [tuple(c) for c in baslik["cozunurlukler"]] != list(self.cozunurlukler):
+                    return False
+                tamponlar = []
+                for (_, kapasite), n in zip(self.cozunurlukler, baslik["uzunluklar"]):
+                    zamanlar, degerler = array("d"), array("d")
+                    zamanlar.fromfile(f, n)
+                    degerler.fromfile(f, n)
+                    tampon = HalkaTampon(kapasite)
+                    for t, v in zip(zamanlar[-kapasite:], degerler[-kapasite:]):
+                        tampon.ekle(t, v)
+                    tamponlar.append(tampon)
+        except (OSError, ValueError, KeyError, EOFError, struct.error):
+            return False
+        with self._lock:
+            self.tamponlar = tamponlar
+            self._bekleyen = [tuple(b) if b else None for b in baslik.get("bekleyen", [])] or [None] * len(tamponlar)
+            self.olaylar.clear()
+            self.olaylar.extend(tuple(o) for o in baslik.get("olaylar", []))
+            self.surum += 1
+        return True
+
@@ -0,0 +1,601 @@
+# -*- coding: utf-8 -*-
+"""
+Aynı makinedeki bot örnekleri için ortak piyasa verisi servisi.
+Tüm üst kaynak çekimleri (fiyat, 24s ticker, kline, TradingView göstergeleri) tek süreçte
+yapılır; yerel istemciler Unix soketi üzerinden kompakt ikili çerçevelerle sorar. Aynı anda
+gelen özdeş istekler tek üst kaynak çağrısında birleştirilir (tek uçuş), sonuçlar kısa TTL
+ile önbelleklenir. Fiyatlar ayrıca paylaşımlı bellekteki sabit düzenli bir tabloya yazılır:
+istemci fiyatı soket turu olmadan doğrudan tablodan okur (seqlock — yazıcı tek, okuyucu kilitsiz).
+
+Çerçeve (aynı makine — sabit küçük-endian başlık, gövde yerel double):
+  başlık <IBBI: gövde uzunluğu, işlem, durum (istekte 0), istek no
+  FIYATLAR  istek: "BTCUSDT,ETHUSDT"          cevap: n × float64 (yok = NaN)
+  TICKER    istek: "BTCUSDT"                  cevap: 6 × float64 (TICKER_ALANLARI sırası)
+  KLINES    istek: <Hq limit, başlangıç ms (-1 = yok) + "SEMBOL|15m"   cevap: n × 7 float64
+  TV        istek: "SEMBOL|fiyat"             cevap: JSON (gösterge alanları)
+  MERHABA / DURUM                             cevap: JSON (tablo adı / istatistik)
+"""
+
+import json
+import math
+import mmap
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import tempfile
+import threading
+import time
+from array import array
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+    HAS_SHM = True
+except ImportError:
+    HAS_SHM = False
+
+HAS_UNIX = hasattr(socket, "AF_UNIX")
+
+_UID = os.getuid() if hasattr(os, "getuid") else None
+
+
+def _soket_dizini():
+    """$XDG_RUNTIME_DIR (kullanıcıya özel, 0700) varsa o; yoksa geçici dizin altında kullanıcıya özel alt dizin."""
+    xdg = os.environ.get("XDG_RUNTIME_DIR")
+    if xdg and os.path.isdir(xdg):
+        return xdg
+    return os.path.join(tempfile.gettempdir(), f"borsa_piyasa_{_UID or 0}")
+
+
+VARSAYILAN_SOKET = os.path.join(_soket_dizini(), "borsa_piyasa.sock")
+
+FIYATLAR, TICKER, KLINES, TV, MERHABA, DURUM = range(1, 7)
+TAMAM, YOK, HATA = range(3)
+_ISLEM_ADLARI = {FIYATLAR: "fiyatlar", TICKER: "ticker", KLINES: "klines", TV: "tv", MERHABA: "merhaba", DURUM: "durum"}
+
+_BASLIK = struct.Struct("<IBBI")
+_KLINES_ISTEK = struct.Struct("<Hq")
+MAX_GOVDE = 64 << 20
+
+TICKER_ALANLARI = ("priceChangePercent", "volume", "quoteVolume", "lastPrice", "highPrice", "lowPrice")
+KLINE_SUTUN = 7  # açılış zamanı, o, h, l, c, v, kapanış zamanı (MumDeposu'nun kullandığı kısım)
+
+# Saniye; fiyat ayrıca arka planda fiyat_aralik_sn'de bir tazelenir
+VARSAYILAN_TTL = {"fiyat": 2.0, "ticker": 10.0, "klines": 5.0, "tv": 60.0}
+
+
+class ServisYok(ConnectionError):
+    """Servise ulaşılamadı (soket yok / koptu / zaman aşımı) — çağıran doğrudan çekmeli."""
+
+
+def _oku(sock, n):
+    tampon = bytearray(n)
+    gorunum = memoryview(tampon)
+    alinan = 0
+    while alinan < n:
+        k = sock.recv_into(gorunum[alinan:])
+        if not k:
+            raise ConnectionError("bağlantı kapandı")
+        alinan += k
+    return bytes(tampon)
+
+
+def _gonder(sock, islem, durum, istek_no, govde):
+    sock.sendall(_BASLIK.pack(len(govde), islem, durum, istek_no) + govde)
+
+
+def _al(sock):
+    uzunluk, islem, durum, istek_no = _BASLIK.unpack(_oku(sock, _BASLIK.size))
+    if uzunluk > MAX_GOVDE:
+        raise ConnectionError(f"çerçeve çok büyük: {uzunluk}")
+    return islem, durum, istek_no, (_oku(sock, uzunluk) if uzunluk else b"")
+
+
+# ---------- paylaşımlı fiyat tablosu ----------
+_TABLO_BASLIK = struct.Struct("<QI4x")  # seqlock sayacı (tekse yazım sürüyor), kayıt sayısı
+_TABLO_KAYIT = struct.Struct("<16sdd")  # sembol (ASCII, 0 dolgulu), fiyat, zaman (epoch sn)
+TABLO_KAPASITE = 512
+
+
+def _shm_baglan(ad):
+    """
+    Mevcut segmente salt okunur bağlan. <3.13'te SharedMemory bağlanan süreci de resource_tracker'a
+    kaydeder ve süreç çıkarken segmenti siler; bu yüzden orada /dev/shm doğrudan eşlenir (Linux).
+    """
+    try:
+        return SharedMemory(ad, track=False)  # 3.13+
+    except TypeError:
+        pass
+    with open(os.path.join("/dev/shm", ad), "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class FiyatTablosu:
+    """
+    Sabit düzen: başlık + kapasite × kayıt. Semboller yalnızca eklenir (yuvası değişmez).
+    Tek yazıcı (servis) yazarken sayacı tek yapar, bitince çift; okuyucu sayaç değişmediyse
+    okuduğunu kabul eder, değiştiyse tekrar dener.
+    """
+
+    def __init__(self, ad, olustur=False, kapasite=TABLO_KAPASITE):
+        self.ad = ad
+        self._sahip = olustur
+        if olustur:
+            self._shm = SharedMemory(ad, create=True, size=_TABLO_BASLIK.size + kapasite * _TABLO_KAYIT.size)
+            self._shm.buf[:_TABLO_BASLIK.size] = bytes(_TABLO_BASLIK.size)
+        else:
+            self._shm = _shm_baglan(ad)
+        self._buf = self._shm.buf if isinstance(self._shm, SharedMemory) else memoryview(self._shm)
+        self.kapasite = (len(self._buf) - _TABLO_BASLIK.size) // _TABLO_KAYIT.size
+        self._indeks = {}
+
+    @staticmethod
+    def _konum(i):
+        return _TABLO_BASLIK.size + i * _TABLO_KAYIT.size
+
+    def yaz(self, fiyatlar, zaman):
+        sayac, _ = _TABLO_BASLIK.unpack_from(self._buf, 0)
+        _TABLO_BASLIK.pack_into(self._buf, 0, sayac + 1, len(self._indeks))
+        for sembol, fiyat in fiyatlar.items():
+            i = self._indeks.get(sembol)
+            if i is None:
+                if len(self._indeks) >= self.kapasite:
+                    continue
+                i = self._indeks[sembol] = len(self._indeks)
+            _TABLO_KAYIT.pack_into(self._buf, self._konum(i), sembol.encode("ascii"), fiyat, zaman)
+        _TABLO_BASLIK.pack_into(self._buf, 0, sayac + 2, len(self._indeks))
+
+    def oku(self, semboller, max_yas, simdi=None):
+        """{sembol: fiyat} — yalnızca max_yas saniyeden taze olanlar. Tutarlı okuma alınamazsa {}."""
+        simdi = time.time() if simdi is None else simdi
+        for _ in range(8):
+            sayac, n = _TABLO_BASLIK.unpack_from(self._buf, 0)
+            if sayac & 1:
+                continue
+            indeks = self._indeks
+            if n > len(indeks):
+                indeks = dict(indeks)
+                for i in range(len(indeks), n):
+                    indeks[_TABLO_KAYIT.unpack_from(self._buf, self._konum(i))[0].rstrip(b"\0").decode("ascii")] = i
+            out = {}
+            for s in semboller:
+                i = indeks.get(s)
+                if i is not None:
+                    _, fiyat, zaman = _TABLO_KAYIT.unpack_from(self._buf, self._konum(i))
+                    if simdi - zaman <= max_yas:
+                        out[s] = fiyat
+            if _TABLO_BASLIK.unpack_from(self._buf, 0)[0] == sayac:
+                self._indeks = indeks
+                return out
+        return {}
+
+    def kapat(self):
+        self._buf.release()
+        self._shm.close()
+        if self._sahip:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# ---------- sunucu ----------
+class _TekUcus:
+    """Anahtar başına: TTL içinde önbellekten; değilse tek çağrı — aynı anda gelenler onun sonucunu bekler."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._kayit = {}   # anahtar -> (zaman, değer)
+        self._ucan = {}    # anahtar -> Event
+        self.isabet = 0
+        self.birlesen = 0
+        self.cagri = 0
+
+    def al(self, anahtar, ttl, fonk):
+        with self._lock:
+            k = self._kayit.get(anahtar)
+            if k is not None and time.monotonic() - k[0] < ttl:
+                self.isabet += 1
+                return k[1]
+            olay = self._ucan.get(anahtar)
+            lider = olay is None
+            if lider:
+                olay = self._ucan[anahtar] = threading.Event()
+                self.cagri += 1
+            else:
+                self.birlesen += 1
+        if not lider:
+            bekleme = time.monotonic()
+            olay.wait(60)
+            with self._lock:
+                k = self._kayit.get(anahtar)
+            # Liderin çağrısı başarısızsa eski (süresi geçmiş) kayıt döndürülmez
+            return k[1] if k is not None and k[0] >= bekleme else None
+        deger = None
+        try:
+            deger = fonk()
+        finally:
+            with self._lock:
+                if deger is not None:
+                    self._kayit[anahtar] = (time.monotonic(), deger)
+                    if len(self._kayit) > 4096:
+                        esik = time.monotonic() - max(VARSAYILAN_TTL.values()) * 2
+                        self._kayit = {a: k for a, k in self._kayit.items() if k[0] >= esik}
+                del self._ucan[anahtar]
+            olay.set()
+        return deger
+
+
+def _bizim_mi(yol):
+    """Soket dosyası bu kullanıcıya mı ait? (başkasının /tmp'ye bıraktığı sahte sokete bağlanılmaz)"""
+    try:
+        return _UID is None or os.stat(yol).st_uid == _UID
+    except OSError:
+        return False
+
+
+def _dizin_hazirla(yol):
+    """
+    Soketin dizinini gerekirse 0700 ile oluşturur. Dizin başkasınınsa (yapışkan bit taşıyan /tmp
+    gibi ortak dizinler hariç) ya da bize aitken grup/diğerlerine yazılabilirse reddeder.
+    """
+    dizin = os.path.dirname(os.path.abspath(yol))
+    os.makedirs(dizin, mode=0o700, exist_ok=True)
+    if _UID is None:
+        return
+    st = os.stat(dizin)
+    if st.st_uid == _UID:
+        if st.st_mode & 0o022:
+            raise RuntimeError(f"Soket dizini başkalarınca yazılabilir: {dizin}")
+    elif not st.st_mode & stat.S_ISVTX:
+        raise RuntimeError(f"Soket dizini başka bir kullanıcıya ait: {dizin}")
+
+
+def _es_bizim_mi(sock):
+    """Linux'ta karşı uç sürecin kullanıcısı (SO_PEERCRED) bizimle aynı mı; desteklenmiyorsa True."""
+    if _UID is None or not hasattr(socket, "SO_PEERCRED"):
+        return True
+    _pid, uid, _gid = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")))
+    return uid == _UID
+
+
+class PiyasaSunucusu:
+    """
+      s = PiyasaSunucusu({"fiyatlar": f, "ticker": t, "klines": k, "tv": tv}, VARSAYILAN_SOKET, semboller=[...])
+      s.calistir()          # ya da s.baslat() ... s.durdur()
+    kaynaklar: fiyatlar(semboller) -> {sembol: fiyat} | None, ticker(sembol) -> dict | None,
+               klines(sembol, aralik, limit, baslangic_ms) -> satırlar | None, tv(sembol, fiyat) -> dict | None
+    """
+
+    def __init__(self, kaynaklar, soket_yolu=VARSAYILAN_SOKET, semboller=(), fiyat_aralik_sn=2.0, ttl=None, log=None):
+        self.kaynaklar = kaynaklar
+        self.soket_yolu = soket_yolu
+        self.fiyat_aralik_sn = fiyat_aralik_sn
+        self.ttl = dict(VARSAYILAN_TTL, **(ttl or {}))
+        self.log = log or (lambda m: None)
+        self._izlenen = set(semboller)  # arka planda tazelenen semboller (yalnızca geçerli oldukları görülenler eklenir)
+        self._fiyat = {}                # sembol -> (zaman, fiyat)
+        self._lock = threading.Lock()
+        self._tek = _TekUcus()
+        self._dur = threading.Event()
+        self._server = None
+        self.tablo = None
+        self.istatistik = {"baglanti": 0, "acik_baglanti": 0, "hata": 0, "istek": {}}
+
+    # ---------- yaşam döngüsü ----------
+    def baslat(self):
+        _dizin_hazirla(self.soket_yolu)
+        if os.path.lexists(self.soket_yolu):
+            if not _bizim_mi(self.soket_yolu):
+                raise RuntimeError(f"Soket yolu başka bir kullanıcıya ait: {self.soket_yolu}")
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                s.connect(self.soket_yolu)
+                raise RuntimeError(f"Piyasa servisi zaten çalışıyor: {self.soket_yolu}")
+            except OSError:
+                os.unlink(self.soket_yolu)  # çökmüş servisten kalan soket dosyası
+            finally:
+                s.close()
+        sunucu = self
+
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sunucu._baglanti(self.request)
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.soket_yolu, _Handler)
+        self._server.daemon_threads = True
+        os.chmod(self.soket_yolu, 0o600)
+        if HAS_SHM:
+            try:
+                self.tablo = FiyatTablosu(f"borsa_fiyat_{os.getpid()}", olustur=True)
+            except OSError as e:
+                self.log(f"Paylaşımlı fiyat tablosu açılamadı ({e}) — yalnızca soket")
+        self._dur.clear()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._tazele, daemon=True).start()
+        self.log(f"Piyasa servisi dinliyor: {self.soket_yolu}")
+        return self
+
+    def calistir(self):
+        """Ön planda çalış; Ctrl+C / SIGTERM ile soket ve paylaşımlı tablo temizlenerek kapanır."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self._dur.set())
+        self.baslat()
+        try:
+            while not self._dur.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.durdur()
+
+    def durdur(self):
+        self._dur.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.soket_yolu)
+            except FileNotFoundError:
+                pass
+        if self.tablo is not None:
+            self.tablo.kapat()
+            self.tablo = None
+
+    def __enter__(self):
+        return self.baslat()
+
+    def __exit__(self, *exc):
+        self.durdur()
+
+    # ---------- veri ----------
+    def _fiyat_cek(self, semboller):
+        def cek():
+            fiyatlar = self.kaynaklar["fiyatlar"](semboller)
+            if fiyatlar:
+                simdi = time.time()
+                with self._lock:
+                    for s, f in fiyatlar.items():
+                        self._fiyat[s] = (simdi, f)
+                    self._izlenen.update(fiyatlar)
+                    if self.tablo is not None:
+                        self.tablo.yaz(fiyatlar, simdi)
+            return fiyatlar
+        return self._tek.al(("fiyat", tuple(semboller)), 0, cek)
+
+    def _tazele(self):
+        while not self._dur.wait(self.fiyat_aralik_sn):
+            with self._lock:
+                semboller = sorted(self._izlenen)
+            if semboller:
+                try:
+                    self._fiyat_cek(semboller)
+                except Exception as e:
+                    self.log(f"Fiyat tazeleme hatası: {e}")
+
+    def fiyatlar(self, semboller):
+        """{sembol: fiyat} — TTL'den eski olanlar tek istekte tazelenir; hiçbiri alınamazsa None."""
+        simdi = time.time()
+        with self._lock:
+            eksik = sorted(s for s in semboller if simdi - self._fiyat.get(s, (0.0, None))[0] > self.ttl["fiyat"])
+        if eksik:
+            self._fiyat_cek(eksik)
+        simdi = time.time()
+        with self._lock:
+            out = {s: self._fiyat[s][1] for s in semboller if s in self._fiyat and simdi - self._fiyat[s][0] <= self.ttl["fiyat"]}
+        return out or None
+
+    def _isle(self, islem, govde):
+        """(durum, gövde)"""
+        if islem == FIYATLAR:
+            semboller = govde.decode("ascii").split(",") if govde else []
+            fiyatlar = self.fiyatlar(semboller)
+            if fiyatlar is None:
+                return YOK, b""
+            return TAMAM, array("d", [fiyatlar.get(s, math.nan) for s in semboller]).tobytes()
+        if islem == TICKER:
+            sembol = govde.decode("ascii")
+            t = self._tek.al(("ticker", sembol), self.ttl["ticker"], lambda: self.kaynaklar["ticker"](sembol))
+            if not t:
+                return YOK, b""
+            return TAMAM, array("d", [float(t.get(a) or 0.0) for a in TICKER_ALANLARI]).tobytes()
+        if islem == KLINES:
+            limit, baslangic = _KLINES_ISTEK.unpack_from(govde)
+            sembol, aralik = govde[_KLINES_ISTEK.size:].decode("ascii").split("|")
+            baslangic = None if baslangic < 0 else baslangic
+
+            def cek():
+                ham = self.kaynaklar["klines"](sembol, aralik, limit, baslangic)
+                if ham is None:
+                    return None
+                # Önbellekte kodlanmış hali tutulur — aynı isteği soran her istemciye tekrar kodlanmaz
+                return np.asarray([k[:KLINE_SUTUN] for k in ham], dtype=np.float64).reshape(-1, KLINE_SUTUN).tobytes()
+            veri = self._tek.al(("klines", sembol, aralik, limit, baslangic), self.ttl["klines"], cek)
+            return (TAMAM, veri) if veri is not None else (YOK, b"")
+        if islem == TV:
+            sembol, fiyat = govde.decode("ascii").split("|")
+            d = self._tek.al(("tv", sembol), self.ttl["tv"], lambda: self.kaynaklar["tv"](sembol, float(fiyat)))
+            return (TAMAM, json.dumps(d).encode("utf-8")) if d else (YOK, b"")
+        if islem == MERHABA:
+            return TAMAM, json.dumps({
+                "tablo": self.tablo.ad if self.tablo is not None else None,
+                "tablo_max_yas_sn": self.fiyat_aralik_sn * 2,
+            }).encode("utf-8")
+        if islem == DURUM:
+            return TAMAM, json.dumps(self.durum()).encode("utf-8")
+        return HATA, f"bilinmeyen işlem {islem}".encode("utf-8")
+
+    def _baglanti(self, sock):
+        with self._lock:
+            self.istatistik["baglanti"] += 1
+            self.istatistik["acik_baglanti"] += 1
+        try:
+            while not self._dur.is_set():
+                try:
+                    islem, _, istek_no, govde = _al(sock)
+                except (ConnectionError, OSError, struct.error):
+                    return
+                try:
+                    durum, cevap = self._isle(islem, govde)
+                except Exception as e:
+                    with self._lock:
+                        self.istatistik["hata"] += 1
+                    durum, cevap = HATA, str(e).encode("utf-8")[:500]
+                with self._lock:
+                    ad = _ISLEM_ADLARI.get(islem, str(islem))
+                    self.istatistik["istek"][ad] = self.istatistik["istek"].get(ad, 0) + 1
+                _gonder(sock, islem, durum, istek_no, cevap)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self.istatistik["acik_baglanti"] -= 1
+
+    def durum(self):
+        with self._lock:
+            d = {k: (dict(v) if isinstance(v, dict) else v) for k, v in self.istatistik.items()}
+            d["izlenen"] = len(self._izlenen)
+        d.update(ust_kaynak=self._tek.cagri, onbellek_isabet=self._tek.isabet, birlesen=self._tek.birlesen)
+        return d
+
+
+# ---------- istemci ----------
+class PiyasaIstemcisi:
+    """
+    Thread başına bir bağlantı. Servis yoksa / koparsa ServisYok fırlatır ve yeniden_dene_sn
+    boyunca hazir() False döner (çağıran o sürede doğrudan çeker). Fiyatlar önce paylaşımlı
+    tablodan okunur; tabloda taze değilse soketten sorulur.
+    """
+
+    def __init__(self, soket_yolu=VARSAYILAN_SOKET, yeniden_dene_sn=5.0, zaman_asimi=10.0, uzun_zaman_asimi=60.0):
+        self.soket_yolu = soket_yolu
+        self.yeniden_dene_sn = yeniden_dene_sn
+        self.zaman_asimi = zaman_asimi
+        self.uzun_zaman_asimi = uzun_zaman_asimi  # kline / TradingView: servis üst kaynağı beklerken
+        self.etkin = True
+        self._yerel = threading.local()
+        self._lock = threading.Lock()
+        self._sonraki_deneme = 0.0
+        self._tablo = None
+        self._tablo_max_yas = 0.0
+        self._soketler = set()  # tüm thread'lerin açık bağlantıları (kapat() hepsini kapatır)
+        self._nesil = 0         # kapat() artırır; eski nesilden kalan thread bağlantısı yeniden kurulur
+        self.sayac = {"tablo": 0, "soket": 0, "kopma": 0}
+
+    def hazir(self):
+        return self.etkin and HAS_UNIX and time.monotonic() >= self._sonraki_deneme and _bizim_mi(self.soket_yolu)
+
+    def _tablo_bagla(self, bilgi):
+        with self._lock:
+            eski, self._tablo = self._tablo, None
+            if eski is not None and eski.ad != bilgi.get("tablo"):
+                eski.kapat()
+            elif eski is not None:
+                self._tablo = eski
+                return
+            if bilgi.get("tablo") and HAS_SHM:
+                try:
+                    self._tablo = FiyatTablosu(bilgi["tablo"])
+                    self._tablo_max_yas = float(bilgi.get("tablo_max_yas_sn") or 0)
+                except (OSError, ValueError):
+                    self._tablo = None
+
+    def _istek(self, islem, govde=b"", zaman_asimi=None):
+        y = self._yerel
+        sock = getattr(y, "sock", None)
+        if sock is not None and y.nesil != self._nesil:
+            sock = y.sock = None  # kapat() başka thread'den kapattı
+        try:
+            if sock is None:
+                if not _bizim_mi(self.soket_yolu):
+                    raise ConnectionRefusedError(f"soket bu kullanıcıya ait değil: {self.soket_yolu}")
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.zaman_asimi)
+                sock.connect(self.soket_yolu)
+                if not _es_bizim_mi(sock):
+                    raise ConnectionRefusedError("servis başka bir kullanıcı olarak çalışıyor")
+                with self._lock:
+                    self._soketler.add(sock)
+                    y.sock, y.no, y.nesil = sock, 0, self._nesil
+                # Her yeni bağlantıda tablo adı sorulur (servis yeniden başladıysa yeni tabloya geçilir)
+                self._tablo_bagla(json.loads(self._gonder_al(sock, MERHABA, b"")[1] or b"{}"))
+            sock.settimeout(zaman_asimi or self.zaman_asimi)
+            self.sayac["soket"] += 1
+            return self._gonder_al(sock, islem, govde)
+        except (OSError, struct.error, ValueError) as e:
+            if sock is not None:
+                with self._lock:
+                    self._soketler.discard(sock)
+                sock.close()
+            y.sock = None
+            self.sayac["kopma"] += 1
+            self._sonraki_deneme = time.monotonic() + self.yeniden_dene_sn
+            raise ServisYok(str(e)) from e
+
+    def _gonder_al(self, sock, islem, govde):
+        y = self._yerel
+        y.no = (y.no + 1) & 0xFFFFFFFF
+        _gonder(sock, islem, 0, y.no, govde)
+        c_islem, durum, no, cevap = _al(sock)
+        if no != y.no or c_islem != islem:
+            raise ConnectionError("çerçeve sırası bozuldu")
+        return durum, cevap
+
+    def fiyatlar(self, semboller):
+        semboller = list(dict.fromkeys(semboller))
+        tablo = self._tablo
+        if tablo is not None:
+            out = tablo.oku(semboller, self._tablo_max_yas)
+            if len(out) == len(semboller):
+                self.sayac["tablo"] += 1
+                return out
+        durum, govde = self._istek(FIYATLAR, ",".join(semboller).encode("ascii"))
+        if durum != TAMAM:
+            return None
+        degerler = array("d")
+        degerler.frombytes(govde)
+        return {s: f for s, f in zip(semboller, degerler) if not math.isnan(f)}
+
+    def ticker(self, sembol):
+        durum, govde = self._istek(TICKER, sembol.encode("ascii"))
+        if durum != TAMAM:
+            return None
+        degerler = array("d")
+        degerler.frombytes(govde)
+        return dict(zip(TICKER_ALANLARI, degerler))
+
+    def klines(self, sembol, aralik, limit=500, baslangic_ms=None):
+        """(n, 7) float64 dizi (MumDeposu satırları gibi dilimlenebilir) ya da None."""
+        govde = _KLINES_ISTEK.pack(int(limit), -1 if baslangic_ms is None else int(baslangic_ms)) + f"{sembol}|{aralik}".encode("ascii")
+        durum, cevap = self._istek(KLINES, govde, self.uzun_zaman_asimi)
+        if durum != TAMAM:
+            return None
+        return np.frombuffer(cevap, dtype=np.float64).reshape(-1, KLINE_SUTUN)
+
+    def tv_gostergeleri(self, sembol, fiyat):
+        durum, cevap = self._istek(TV, f"{sembol}|{fiyat or 0.0!r}".encode("ascii"), self.uzun_zaman_asimi)
+        return json.loads(cevap) if durum == TAMAM else None
+
+    def durum(self):
+        durum, cevap = self._istek(DURUM)
+        return json.loads(cevap) if durum == TAMAM else None
+
+    def kapat(self):
+        with self._lock:
+            soketler, self._soketler = self._soketler, set()
+            self._nesil += 1
+            for sock in soketler:
+                sock.close()
+            self._yerel.sock = None
+            if self._tablo is not None:
+                self._tablo.kapat()
+                self._tablo = None
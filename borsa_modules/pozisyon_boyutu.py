@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Pozisyon boyutlandırma — alım tutarı (USDT) için üç yöntem:
+  sabit_oran : özkaynağın risk_pct'si kadar notional (eski davranış)
+  atr        : risk bütçesi (özkaynak × risk_pct) / stop mesafesi (ATR × çarpan)
+  kelly      : geçmiş işlem getirilerinde E[log(1 + f·r)]'yi en büyükleyen f × kelly_kesri
+Her yöntem max_pozisyon_pct ve kullanılabilir nakit ile sınırlanır. Aynı oran hesapları
+Monte Carlo simülatöründe (monte_carlo.py) de kullanılır.
+"""
+
+import sqlite3
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+YONTEMLER = ("sabit_oran", "atr", "kelly")
+# Kelly için gereken en az kapanmış işlem; altında sabit_oran'a düşülür
+MIN_KELLY_ISLEM = 20
+
+
+def islem_istatistikleri(getiriler):
+    """Kapanmış işlem getirilerinin (oran, ör. 0.03) özeti."""
+    r = np.asarray(getiriler, dtype=float)
+    if not len(r):
+        return {"islem": 0}
+    kazanc, kayip = r[r > 0], r[r <= 0]
+    ort_kazanc = float(kazanc.mean()) if len(kazanc) else 0.0
+    ort_kayip = float(-kayip.mean()) if len(kayip) else 0.0
+    return {
+        "islem": len(r),
+        "kazanma_orani": len(kazanc) / len(r),
+        "ort_kazanc": ort_kazanc,
+        "ort_kayip": ort_kayip,
+        "odul_risk": ort_kazanc / ort_kayip if ort_kayip else None,
+        "beklenti": float(r.mean()),
+        "std": float(r.std()),
+    }
+
+
+def kelly_orani(getiriler, ust=1.0, adim=0.005):
+    """Büyüme-optimal notional oranı: max_f mean(log(1 + f·r)), f ∈ [0, ust]. Beklenti ≤ 0 → 0."""
+    r = np.asarray(getiriler, dtype=float)
+    if not len(r) or r.mean() <= 0:
+        return 0.0
+    f = np.arange(0.0, ust + adim / 2, adim)
+    # f·r ≤ -1 iflas demek; o f'ler elenir
+    buyume = 1.0 + np.outer(f, r)
+    log_buyume = np.where(buyume > 0, np.log(np.maximum(buyume, 1e-300)), -np.inf).mean(axis=1)
+    return float(f[int(np.argmax(log_buyume))])
+
+
+def atr_orani(risk_pct, stop_mesafe_pct):
+    """Risk bütçesini stop mesafesine bölerek notional oranı (ör. %2 risk / %4 stop → 0.5)."""
+    if not stop_mesafe_pct or stop_mesafe_pct <= 0:
+        return None
+    return risk_pct / stop_mesafe_pct
+
+
+def pozisyon_orani(yontem, risk_pct, stop_mesafe_pct=None, kelly=None, kelly_kesri=0.5, max_pozisyon_pct=25.0):
+    """
+    Özkaynağa göre notional oranı ve kullanılan yöntem: (oran, yöntem).
+    risk_pct / stop_mesafe_pct / max_pozisyon_pct oran olarak değil yüzde olarak verilir.
+    Gerekli girdi yoksa (ATR yok, Kelly için yetersiz işlem) sabit_oran'a düşer.
+    """
+    oran, kullanilan = None, yontem
+    if yontem == "atr":
+        oran = atr_orani(risk_pct, stop_mesafe_pct)
+    elif yontem == "kelly" and kelly is not None:
+        oran = kelly * kelly_kesri
+    if oran is None:
+        oran, kullanilan = risk_pct / 100.0, "sabit_oran"
+    return max(0.0, min(oran, max_pozisyon_pct / 100.0)), kullanilan
+
+
+def pozisyon_tutari(yontem, ozkaynak, nakit, fiyat, risk_pct, atr=None, atr_carpani=2.0,
+                    getiriler=None, kelly_kesri=0.5, max_pozisyon_pct=25.0, stop=None):
+    """
+    Alım tutarı (USDT) ve açıklama: (tutar, "atr 0.42×").
+      ozkaynak : nakit + açık pozisyonların değeri
+      atr      : fiyat biriminde ATR (analizdeki 1h ATR)
+      getiriler: kapanmış işlem getirileri (Kelly için)
+      stop     : pozisyona konacak stop fiyatı — verilirse risk mesafesi bundan, yoksa atr × atr_carpani
+    """
+    if not ozkaynak or not fiyat or fiyat <= 0:
+        return 0.0, "—"
+    if stop and 0 < stop < fiyat:
+        stop_mesafe_pct = (fiyat - stop) / fiyat * 100
+    else:
+        stop_mesafe_pct = atr * atr_carpani / fiyat * 100 if atr else None
+    kelly = None
+    if yontem == "kelly" and getiriler is not None and len(getiriler) >= MIN_KELLY_ISLEM:
+        kelly = kelly_orani(getiriler)
+    oran, kullanilan = pozisyon_orani(yontem, risk_pct, stop_mesafe_pct, kelly, kelly_kesri, max_pozisyon_pct)
+    tutar = min(ozkaynak * oran, nakit or 0.0)
+    return tutar, f"{kullanilan} {oran:.3f}×"
+
+
+def islemleri_oku(db_yolu, limit=None):
+    """
+    `islemler` tablosundaki kapanmış işlemler → (getiriler, stop mesafeleri %) dizileri.
+    Stop kaydı olmayan işlemin mesafesi NaN'dır. Tablo yoksa boş diziler.
+    """
+    sorgu = ("SELECT giris_fiyat, cikis_fiyat, stop_loss FROM islemler "
+             "WHERE cikis_fiyat IS NOT NULL AND giris_fiyat > 0 ORDER BY id DESC")
+    if limit:
+        sorgu += f" LIMIT {int(limit)}"
+    try:
+        conn = sqlite3.connect(db_yolu)
+        try:
+            satirlar = conn.execute(sorgu).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        satirlar = []
+    if not satirlar:
+        return np.empty(0), np.empty(0)
+    m = np.array([[g, c, s if s else np.nan] for g, c, s in satirlar[::-1]], dtype=float)
+    getiriler = m[:, 1] / m[:, 0] - 1.0
+    stop = (m[:, 0] - m[:, 2]) / m[:, 0] * 100
+    return getiriler, np.where(stop > 0, stop, np.nan)
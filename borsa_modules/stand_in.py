@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""
+Yerel stand-in sunucular — Binance REST, TradingView scanner, OpenRouter ve webhook.
+Canlı anahtar/piyasa olmadan botu uçtan uca çalıştırmak (benchmark, replay) için.
+Cevaplar tohuma (seed) göre deterministiktir; her uç için gecikme ayarlanabilir.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from borsa_modules.agirlik import istek_agirligi
+
+TABAN_FIYATLAR = {
+    "BTCUSDT": 65000.0, "ETHUSDT": 3200.0, "BNBUSDT": 580.0, "XRPUSDT": 0.52, "SOLUSDT": 145.0,
+    "ADAUSDT": 0.45, "DOGEUSDT": 0.12, "AVAXUSDT": 28.0, "LINKUSDT": 14.0, "DOTUSDT": 6.5,
+}
+
+KLINE_ARALIK_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000}
+
+# Uç grubu -> saniye cinsinden yapay gecikme
+VARSAYILAN_GECIKMELER = {
+    "binance": 0.0,
+    "tradingview": 0.0,
+    "openrouter": 0.0,
+    "webhook": 0.0,
+}
+
+AI_ALIM_CEVAP = """KARAR: AL
+GÜVEN: 8
+STOP_LOSS: {sl}
+TAKE_PROFIT: {tp}
+RISK_REWARD: 1:2
+GİRİŞ_STRATEJİSİ: Hemen gir
+GEREKÇE: Stand-in cevabı.
+ALTERNATİF_SENARYO: Stop ile çık."""
+
+AI_SATIM_CEVAP = """KARAR: BEKLE
+GÜVEN: 5
+GEREKÇE: Stand-in cevabı.
+RİSK_ANALİZİ: Düşük.
+ALTERNATİF_PLAN: SL korunur."""
+
+
+def _kararli_rastgele(*parcalar):
+    """Parçalardan türetilmiş tohumla deterministik Random nesnesi."""
+    return random.Random(zlib.crc32("|".join(str(p) for p in parcalar).encode("utf-8")))
+
+
+class StandInSunucu:
+    """
+    Tek portta tüm stand-in uçları:
+      GET  /api/v3/account, /api/v3/ticker/price, /api/v3/ticker/24hr, /api/v3/exchangeInfo, /api/v3/klines, /api/v3/depth
+      POST /api/v3/order, GET /api/v3/order (origClientOrderId sorgusu)
+      POST|PUT|DELETE /api/v3/userDataStream
+      POST /tradingview/<screener>/scan
+      POST /openrouter/chat/completions
+      POST /webhook
+    """
+
+    def __init__(self, gecikmeler=None, tohum=42, host="127.0.0.1", port=0, sifir_bakiye_sayisi=300, usdt_bakiye=10000.0,
+                 agirlik_limiti=None, derinlik_usdt=20000.0):
+        self.gecikmeler = dict(VARSAYILAN_GECIKMELER)
+        self.gecikmeler.update(gecikmeler or {})
+        self.tohum = tohum
+        self.host = host
+        self.port = port
+        self.sifir_bakiye_sayisi = sifir_bakiye_sayisi
+        self.usdt_bakiye = usdt_bakiye
+        self.ai_alim_karar = "AL"
+        # Binance gibi dakikalık REQUEST_WEIGHT sayımı; limit verilirse aşımda 429 + Retry-After
+        self.agirlik_limiti = agirlik_limiti
+        self.agirlik_pencere = None
+        self.kullanilan_agirlik = 0
+        self.toplam_agirlik = 0  # dakika penceresinden bağımsız birikimli (benchmark karşılaştırmaları için)
+        self.reddedilen = 0
+        self.derinlik_usdt = derinlik_usdt  # seviye başına ortalama USDT likidite (kayma testleri için düşürülebilir)
+        self.istek_sayilari = {}
+        self._sayaclar = {}
+        self._order_id = 0
+        self.emirler = {}
+        self.bakiyeler = {"USDT": usdt_bakiye}  # emirlerle güncellenir (mutabakat temiz kalsın)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # ---------- yaşam döngüsü ----------
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def baslat(self):
+        sunucu = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                sunucu._isle(self, "GET")
+
+            def do_POST(self):
+                sunucu._isle(self, "POST")
+
+            def do_PUT(self):
+                sunucu._isle(self, "PUT")
+
+            def do_DELETE(self):
+                sunucu._isle(self, "DELETE")
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def durdur(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.baslat()
+        return self
+
+    def __exit__(self, *exc):
+        self.durdur()
+
+    # ---------- deterministik piyasa ----------
+    def _sayac(self, anahtar):
+        with self._lock:
+            n = self._sayaclar.get(anahtar, 0)
+            self._sayaclar[anahtar] = n + 1
+            return n
+
+    def fiyat(self, sembol, n=None):
+        """Sembol için n. gözlemdeki fiyat (sinüs + tohumlu gürültü)."""
+        taban = TABAN_FIYATLAR.get(sembol) or 1.0 + (zlib.crc32(sembol.encode()) % 1000) / 10.0
+        if n is None:
+            n = self._sayac(("fiyat", sembol))
+        r = _kararli_rastgele(self.tohum, sembol, n)
+        return round(taban * (1 + 0.01 * math.sin(n / 7.0) + r.uniform(-0.002, 0.002)), 8)
+
+    def _derinlik(self, params):
+        """Fiyat çevresinde tohumlu sentetik defter; seviye likiditesi uzaklaştıkça artar."""
+        sembol = params.get("symbol", "BTCUSDT")
+        limit = min(int(params.get("limit", 100)), 5000)
+        fiyat = self.fiyat(sembol)
+        tick = 0.01 if fiyat >= 10 else 0.0001 if fiyat >= 0.1 else 0.00001
+        adim = max(tick, round(fiyat * 0.0002 / tick) * tick)  # ~2 bps seviye aralığı
+        n = self._sayac(("depth", sembol))
+        r = _kararli_rastgele(self.tohum, "depth", sembol, n)
+        bids, asks = [], []
+        for i in range(limit):
+            usdt = self.derinlik_usdt * r.uniform(0.3, 1.7) * (1 + i / 10)
+            bp, ap = fiyat - adim * (i + 0.5), fiyat + adim * (i + 0.5)
+            bids.append([f"{bp:.8f}", f"{usdt / bp:.8f}"])
+            asks.append([f"{ap:.8f}", f"{usdt / ap:.8f}"])
+        return {"lastUpdateId": 1000 + n, "bids": bids, "asks": asks}
+
+    def _ticker_24h(self, sembol):
+        fiyat = self.fiyat(sembol)
+        r = _kararli_rastgele(self.tohum, "24h", sembol)
+        hacim = r.uniform(1e4, 1e6)
+        return {
+            "symbol": sembol,
+            "priceChangePercent": f"{r.uniform(-5, 5):.3f}",
+            "lastPrice": f"{fiyat:.8f}",
+            "highPrice": f"{fiyat * 1.03:.8f}",
+            "lowPrice": f"{fiyat * 0.97:.8f}",
+            "volume": f"{hacim:.4f}",
+            "quoteVolume": f"{hacim * fiyat:.4f}",
+        }
+
+    def _mum_fiyati(self, sembol, t_ms):
+        """Zamanın deterministik fonksiyonu: günlük/haftalık dalga + dakikalık gürültü."""
+        taban = TABAN_FIYATLAR.get(sembol, 10.0)
+        saat = t_ms / 3_600_000.0
+        r = _kararli_rastgele(self.tohum, "mum", sembol, t_ms // 60_000)
+        return taban * (1 + 0.05 * math.sin(saat / 27.0) + 0.015 * math.sin(saat / 3.1) + r.uniform(-0.002, 0.002))
+
+    def _klines(self, params):
+        sembol = params.get("symbol", "BTCUSDT")
+        adim = KLINE_ARALIK_MS.get(params.get("interval", "1h"), 3_600_000)
+        limit = min(int(params.get("limit") or 500), 1000)
+        simdi = int(time.time() * 1000)
+        son = simdi // adim * adim  # oluşmakta olan mum
+        if params.get("startTime"):
+            ilk = -(-int(params["startTime"]) // adim) * adim
+        else:
+            ilk = son - (limit - 1) * adim
+        mumlar = []
+        t = ilk
+        while t <= son and len(mumlar) < limit:
+            o, c = self._mum_fiyati(sembol, t), self._mum_fiyati(sembol, min(t + adim, simdi))
+            r = _kararli_rastgele(self.tohum, "hl", sembol, adim, t)
+            h, lo = max(o, c) * (1 + r.uniform(0, 0.004)), min(o, c) * (1 - r.uniform(0, 0.004))
+            hacim = r.uniform(1e3, 1e5) * adim / 3_600_000
+            mumlar.append([t, f"{o:.8f}", f"{h:.8f}", f"{lo:.8f}", f"{c:.8f}", f"{hacim:.4f}", t + adim - 1,
+                           f"{hacim * c:.4f}", int(hacim), "0", "0", "0"])
+            t += adim
+        return mumlar
+
+    def _tv_deger(self, sembol, kolon, n):
+        ad = kolon.split("|")[0]
+        r = _kararli_rastgele(self.tohum, "tv", sembol, kolon, n)
+        fiyat = self.fiyat(sembol, n)
+        if ad.startswith("Recommend"):
+            return r.uniform(-1, 1)
+        if ad.startswith("Rec."):
+            return r.choice([-1, 0, 1])
+        if ad.startswith("RSI"):
+            return r.uniform(25, 75)
+        if ad.startswith("Stoch"):
+            return r.uniform(10, 90)
+        if ad.startswith("ADX"):
+            return r.uniform(10, 40)
+        if ad.startswith("MACD"):
+            return r.uniform(-0.002, 0.002) * fiyat
+        if ad == "BB.upper":
+            return fiyat * 1.03
+        if ad == "BB.lower":
+            return fiyat * 0.97
+        if ad == "ATR":
+            return fiyat * r.uniform(0.005, 0.04)
+        if ad.startswith(("close", "open", "high", "low", "EMA", "SMA", "Pivot", "Ichimoku", "VWMA", "HullMA", "P.SAR")):
+            return fiyat * r.uniform(0.97, 1.03)
+        if ad == "volume":
+            return r.uniform(1e4, 1e6)
+        return r.uniform(-1, 1)
+
+    # ---------- HTTP ----------
+    def _isle(self, h, method):
+        url = urlparse(h.path)
+        yol = url.path
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        uzunluk = int(h.headers.get("Content-Length") or 0)
+        govde = h.rfile.read(uzunluk) if uzunluk else b""
+        if govde and h.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            params.update({k: v[-1] for k, v in parse_qs(govde.decode("utf-8")).items()})
+
+        if yol.startswith("/api/"):
+            grup = "binance"
+        elif yol.startswith("/tradingview/"):
+            grup = "tradingview"
+        elif yol.startswith("/openrouter/"):
+            grup = "openrouter"
+        else:
+            grup = "webhook"
+        with self._lock:
+            self.istek_sayilari[yol] = self.istek_sayilari.get(yol, 0) + 1
+        gecikme = self.gecikmeler.get(grup, 0)
+        if gecikme:
+            time.sleep(gecikme)
+
+        basliklar = {}
+        if grup == "binance":
+            simdi = time.time()
+            with self._lock:
+                if int(simdi // 60) != self.agirlik_pencere:
+                    self.agirlik_pencere, self.kullanilan_agirlik = int(simdi // 60), 0
+                agirlik = istek_agirligi(method, yol, params)
+                self.kullanilan_agirlik += agirlik
+                self.toplam_agirlik += agirlik
+                kullanilan = self.kullanilan_agirlik
+            basliklar["X-MBX-USED-WEIGHT-1M"] = str(kullanilan)
+        if grup == "binance" and self.agirlik_limiti and kullanilan > self.agirlik_limiti:
+            with self._lock:
+                self.reddedilen += 1
+            basliklar["Retry-After"] = str(int(60 - simdi % 60) + 1)
+            durum, cevap = 429, {"code": -1003, "msg": "Too much request weight used; current limit is %d request weight per 1 MINUTE." % self.agirlik_limiti}
+        else:
+            try:
+                durum, cevap = self._yonlendir(method, yol, params, govde)
+            except Exception as e:
+                durum, cevap = 500, {"code": -1, "msg": str(e)}
+        veri = json.dumps(cevap).encode("utf-8")
+        h.send_response(durum)
+        h.send_header("Content-Type", "application/json")
+        for ad, deger in basliklar.items():
+            h.send_header(ad, deger)
+        h.send_header("Content-Length", str(len(veri)))
+        h.end_headers()
+        h.wfile.write(veri)
+
+    def _yonlendir(self, method, yol, params, govde):
+        if yol == "/api/v3/account":
+            return 200, self._account()
+        if yol == "/api/v3/ticker/price":
+            if "symbol" in params:
+                return 200, {"symbol": params["symbol"], "price": f"{self.fiyat(params['symbol']):.8f}"}
+            semboller = json.loads(params["symbols"]) if "symbols" in params else list(TABAN_FIYATLAR)
+            return 200, [{"symbol": s, "price": f"{self.fiyat(s):.8f}"} for s in semboller if s in TABAN_FIYATLAR]
+        if yol == "/api/v3/ticker/24hr":
+            return 200, self._ticker_24h(params.get("symbol", "BTCUSDT"))
+        if yol == "/api/v3/klines":
+            return 200, self._klines(params)
+        if yol == "/api/v3/depth":
+            return 200, self._derinlik(params)
+        if yol == "/api/v3/exchangeInfo":
+            return 200, {"timezone": "UTC", "symbols": [self._sembol_bilgisi(s) for s in TABAN_FIYATLAR]}
+        if yol == "/api/v3/order" and method == "POST":
+            return self._order(params)
+        if yol == "/api/v3/order" and method == "GET":
+            emir = self.emirler.get(params.get("origClientOrderId"))
+            if emir is None:
+                return 400, {"code": -2013, "msg": "Order does not exist."}
+            return 200, emir
+        if yol == "/api/v3/userDataStream":
+            return 200, {} if method == "DELETE" else {"listenKey": params.get("listenKey") or "standinlistenkey"}
+        if yol.startswith("/tradingview/") and yol.endswith("/scan"):
+            return 200, self._tv_scan(json.loads(govde or b"{}"))
+        if yol == "/openrouter/chat/completions":
+            return 200, self._openrouter(json.loads(govde or b"{}"))
+        if yol == "/webhook":
+            return 200, {}
+        return 404, {"code": -1121, "msg": f"Bilinmeyen uç: {yol}"}
+
+    def _account(self):
+        with self._lock:
+            balances = [{"asset": a, "free": f"{v:.8f}", "locked": "0.00000000"} for a, v in self.bakiyeler.items()]
+        for i in range(self.sifir_bakiye_sayisi):
+            balances.append({"asset": f"Z{i:03d}", "free": "0.00000000", "locked": "0.00000000"})
+        return {"makerCommission": 10, "takerCommission": 10, "canTrade": True, "balances": balances}
+
+    @staticmethod
+    def _adim(sembol):
+        """Fiyata göre gerçekçi LOT_SIZE adımı (BTC 0.00001, ETH 0.0001, ... ucuzlar 1)."""
+        fiyat = TABAN_FIYATLAR.get(sembol, 10.0)
+        for sinir, adim in ((10000, "0.00001"), (1000, "0.0001"), (100, "0.001"), (10, "0.01"), (1, "0.1")):
+            if fiyat >= sinir:
+                return adim
+        return "1"
+
+    def _sembol_bilgisi(self, sembol):
+        fiyat = TABAN_FIYATLAR[sembol]
+        tick = "0.01" if fiyat >= 10 else "0.0001" if fiyat >= 0.1 else "0.00001"
+        return {
+            "symbol": sembol, "status": "TRADING", "baseAsset": sembol[:-4], "quoteAsset": "USDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": tick, "maxPrice": "1000000.00", "tickSize": tick},
+                {"filterType": "LOT_SIZE", "minQty": self._adim(sembol), "maxQty": "9000000", "stepSize": self._adim(sembol)},
+                {"filterType": "MARKET_LOT_SIZE", "minQty": "0", "maxQty": "9000000", "stepSize": "0"},
+                {"filterType": "NOTIONAL", "minNotional": "5.00", "applyMinToMarket": True, "maxNotional": "9000000", "applyMaxToMarket": False},
+            ],
+        }
+
+    def _order(self, params):
+        sembol = params.get("symbol", "")
+        miktar = float(params.get("quantity") or 0)
+        fiyat = self.fiyat(sembol)
+        adim = float(self._adim(sembol))
+        if sembol not in TABAN_FIYATLAR:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+        if miktar <= 0 or abs(round(miktar / adim) * adim - miktar) > adim * 1e-6:
+            return 400, {"code": -1013, "msg": "Filter failure: LOT_SIZE"}
+        if miktar * fiyat < 5:
+            return 400, {"code": -1013, "msg": "Filter failure: NOTIONAL"}
+        with self._lock:
+            self._order_id += 1
+            order_id = self._order_id
+        cevap = {
+            "symbol": sembol,
+            "orderId": order_id,
+            "clientOrderId": params.get("newClientOrderId") or f"standin{order_id}",
+            "transactTime": int(time.time() * 1000),
+            "price": "0.00000000",
+            "origQty": f"{miktar:.8f}",
+            "executedQty": f"{miktar:.8f}",
+            "cummulativeQuoteQty": f"{miktar * fiyat:.8f}",
+            "status": "FILLED",
+            "type": params.get("type", "MARKET"),
+            "side": params.get("side", "BUY"),
+            "fills": [{"price": f"{fiyat:.8f}", "qty": f"{miktar:.8f}", "commission": "0", "commissionAsset": "BNB"}],
+        }
+        isaret = 1 if cevap["side"] == "BUY" else -1
+        with self._lock:
+            self.emirler[cevap["clientOrderId"]] = cevap
+            base = sembol[:-4]
+            self.bakiyeler[base] = max(0.0, self.bakiyeler.get(base, 0.0) + isaret * miktar)
+            self.bakiyeler["USDT"] = self.bakiyeler.get("USDT", 0.0) - isaret * miktar * fiyat
+        return 200, cevap
+
+    def _tv_scan(self, veri):
+        tickers = (veri.get("symbols") or {}).get("tickers") or []
+        kolonlar = veri.get("columns") or []
+        out = []
+        for t in tickers:
+            sembol = t.split(":")[-1]
+            n = self._sayac(("tv", t, kolonlar[0] if kolonlar else ""))
+            out.append({"s": t, "d": [self._tv_deger(sembol, k, n) for k in kolonlar]})
+        return {"totalCount": len(out), "data": out}
+
+    def _openrouter(self, veri):
+        icerik = ""
+        for m in veri.get("messages") or []:
+            icerik = m.get("content") or icerik
+        if "SATIM stratejisi" in icerik:
+            cevap = AI_SATIM_CEVAP
+        else:
+            fiyat = 0.0
+            for sembol in TABAN_FIYATLAR:
+                if f"Sembol: {sembol}" in icerik:
+                    fiyat = TABAN_FIYATLAR[sembol]
+                    break
+            cevap = AI_ALIM_CEVAP.format(sl=round(fiyat * 0.97, 4), tp=round(fiyat * 1.05, 4))
+            if self.ai_alim_karar != "AL":
+                cevap = cevap.replace("KARAR: AL", f"KARAR: {self.ai_alim_karar}", 1)
+        return {
+            "id": f"standin-{zlib.crc32(icerik.encode('utf-8'))}",
+            "model": veri.get("model", ""),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": cevap}, "finish_reason": "stop"}],
+        }
+
+
+def tradingview_yonlendir(base_url):
+    """tradingview_ta kütüphanesinin scanner adresini stand-in'e çevir (kurulu değilse False)."""
+    try:
+        from tradingview_ta import main as tv_main
+    except ImportError:
+        return False
+    tv_main.TradingView.scan_url = f"{base_url}/tradingview/"
+    return True
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Tek taban aralıktan (15m) çoklu zaman dilimi türetme.
+Her sembol için üst dilimler (1h/4h/1d) yalnızca ilk açılışta kendi geçmişleriyle tohumlanır;
+sonrasında sadece taban mumlar artımlı çekilir ve üst dilimler Binance mum sınırlarına
+(UTC, epoch'un katları) hizalanarak yerelde OHLCV toplamasıyla güncellenir. Oluşmakta olan
+(kısmi) mum her dilim için ayrıca tutulur; böylece _15m/_1h/_4h/_1d alanları aynı mumlardan
+hesaplanır ve birbiriyle tutarlı kalır.
+"""
+
+import threading
+import time
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+ARALIK_MS = {"15m": 15 * 60_000, "1h": 3_600_000, "4h": 4 * 3_600_000, "1d": 24 * 3_600_000}
+
+# Dilim -> tutulacak kapanmış mum sayısı (taban dilim en büyük üst dilimin bir mumunu kapsamalı)
+VARSAYILAN_DERINLIK = {"15m": 500, "1h": 500, "4h": 500, "1d": 365}
+
+# Kline sütunları (Binance sırası): açılış zamanı, open, high, low, close, volume, kapanış zamanı
+ACILIS, ACIK, YUKSEK, DUSUK, KAPANIS, HACIM, KAPANIS_ZAMANI = range(7)
+
+
+def yeniden_ornekle(mumlar, hedef_ms):
+    """
+    Sıralı taban mumları hedef aralığa topla. Kovalar açılış zamanının hedef_ms katına
+    hizalanır (Binance 1h/4h/1d sınırları). (mumlar, kova başına taban mum sayısı) döndür.
+    """
+    if len(mumlar) == 0:
+        return mumlar[:0], np.empty(0, dtype=np.intp)
+    anahtar = (mumlar[:, ACILIS].astype(np.int64) // hedef_ms) * hedef_ms
+    bas = np.flatnonzero(np.r_[True, anahtar[1:] != anahtar[:-1]])
+    son = np.r_[bas[1:] - 1, len(mumlar) - 1]
+    out = np.empty((len(bas), 7))
+    out[:, ACILIS] = anahtar[bas]
+    out[:, ACIK] = mumlar[bas, ACIK]
+    out[:, YUKSEK] = np.maximum.reduceat(mumlar[:, YUKSEK], bas)
+    out[:, DUSUK] = np.minimum.reduceat(mumlar[:, DUSUK], bas)
+    out[:, KAPANIS] = mumlar[son, KAPANIS]
+    out[:, HACIM] = np.add.reduceat(mumlar[:, HACIM], bas)
+    out[:, KAPANIS_ZAMANI] = anahtar[bas] + hedef_ms - 1
+    return out, son - bas + 1
+
+
+def _birlestir(a, b, hedef_ms):
+    """Aynı kovadaki iki kısmi mumu (a önce) tek mumda birleştir."""
+    if a is None:
+        a = b.copy()
+        a[ACILIS] = int(b[ACILIS]) // hedef_ms * hedef_ms
+        a[KAPANIS_ZAMANI] = a[ACILIS] + hedef_ms - 1
+        return a
+    if b is None:
+        return a
+    out = a.copy()
+    out[YUKSEK] = max(a[YUKSEK], b[YUKSEK])
+    out[DUSUK] = min(a[DUSUK], b[DUSUK])
+    out[KAPANIS] = b[KAPANIS]
+    out[HACIM] = a[HACIM] + b[HACIM]
+    return out
+
+
+class MumDeposu:
+    """
+    klines_fonk(sembol, aralik, limit, baslangic_ms) -> Binance kline listesi | None
+      depo.guncelle("BTCUSDT")                 # gerekirse taban mumları çek, üst dilimleri türet
+      depo.mumlar("BTCUSDT", "4h", kismi=True)  # kapanmış mumlar (+ oluşmakta olan)
+    """
+
+    def __init__(self, klines_fonk, taban="15m", derinlik=None, kismi_yenile_sn=60, saat=time.time):
+        self.klines_fonk = klines_fonk
+        self.taban = taban
+        self.derinlik = dict(derinlik or VARSAYILAN_DERINLIK)
+        self.ust_dilimler = [a for a in self.derinlik if a != taban]
+        self.kismi_yenile_sn = kismi_yenile_sn
+        self.saat = saat
+        self._kapali = {}       # (sembol, aralik) -> ndarray
+        self._kismi = {}        # (sembol, aralik) -> satır | None
+        self._son_cekim = {}    # sembol -> taban dilimin son çekildiği an (sn)
+        self._kilitler = {}
+        self._lock = threading.Lock()
+        self.cekim_sayisi = 0
+
+    def _kilit(self, sembol):
+        with self._lock:
+            k = self._kilitler.get(sembol)
+            if k is None:
+                k = self._kilitler[sembol] = threading.Lock()
+            return k
+
+    def _cek(self, sembol, aralik, limit, baslangic_ms, simdi_ms):
+        """Kline çek → (kapanmış mumlar, kısmi mum | None). Hata → (None, None)."""
+        ham = self.klines_fonk(sembol, aralik, int(limit), baslangic_ms)
+        self.cekim_sayisi += 1
+        if ham is None:
+            return None, None
+        satirlar = np.asarray([k[:7] for k in ham], dtype=float).reshape(-1, 7)
+        kapali = satirlar[:, KAPANIS_ZAMANI] < simdi_ms
+        kismi = satirlar[~kapali]
+        return satirlar[kapali], (kismi[-1] if len(kismi) else None)
+
+    # ---------- güncelleme ----------
+    def guncelle(self, sembol):
+        """Sembolün mumlarını güncel tut. Veri varsa True."""
+        if not HAS_NUMPY:
+            return False
+        with self._kilit(sembol):
+            simdi = self.saat()
+            simdi_ms = int(simdi * 1000)
+            taban = self._kapali.get((sembol, self.taban))
+            if taban is None or not len(taban):
+                return self._tohumla(sembol, simdi, simdi_ms)
+            adim = ARALIK_MS[self.taban]
+            son_kapanis = int(taban[-1, KAPANIS_ZAMANI])
+            yeni_mum = simdi_ms > son_kapanis + adim
+            if not yeni_mum and simdi - self._son_cekim.get(sembol, 0) < self.kismi_yenile_sn:
+                return True
+            eksik = (simdi_ms - son_kapanis) // adim + 1
+            if eksik > self.derinlik[self.taban]:
+                return self._tohumla(sembol, simdi, simdi_ms)  # uzun kesinti: baştan
+            kapali, kismi = self._cek(sembol, self.taban, min(1000, eksik + 1), int(taban[-1, ACILIS]) + 1, simdi_ms)
+            if kapali is None:
+                return True
+            self._son_cekim[sembol] = simdi
+            if len(kapali):
+                kapali = kapali[kapali[:, ACILIS] > taban[-1, ACILIS]]
+                self._kapali[(sembol, self.taban)] = np.concatenate([taban, kapali])[-self.derinlik[self.taban]:]
+            self._kismi[(sembol, self.taban)] = kismi
+            for aralik in self.ust_dilimler:
+                if not self._turet(sembol, aralik):
+                    self._tohumla_dilim(sembol, aralik, simdi_ms)
+            return True
+
+    def _tohumla(self, sembol, simdi, simdi_ms):
+        if not self._tohumla_dilim(sembol, self.taban, simdi_ms):
+            return False
+        self._son_cekim[sembol] = simdi
+        for aralik in self.ust_dilimler:
+            if self._tohumla_dilim(sembol, aralik, simdi_ms):
+                self._turet(sembol, aralik)  # kısmi mum da tabandan, tutarlı
+        return True
+
+    def _tohumla_dilim(self, sembol, aralik, simdi_ms):
+        kapali, kismi = self._cek(sembol, aralik, self.derinlik[aralik], None, simdi_ms)
+        if kapali is None:
+            return False
+        self._kapali[(sembol, aralik)] = kapali
+        self._kismi[(sembol, aralik)] = kismi
+        return True
+
+    def _turet(self, sembol, aralik):
+        """Üst dilimi taban mumlardan ilerlet. Taban son kapanmış üst mumdan sonrasını kapsamıyorsa False."""
+        hedef = ARALIK_MS[aralik]
+        taban = self._kapali.get((sembol, self.taban))
+        ust = self._kapali.get((sembol, aralik))
+        if taban is None or ust is None:
+            return False
+        bas = int(ust[-1, KAPANIS_ZAMANI]) + 1 if len(ust) else int(taban[0, ACILIS]) // hedef * hedef
+        parca = taban[taban[:, ACILIS] >= bas]
+        if len(parca) and int(parca[0, ACILIS]) > bas:
+            return False
+        kalan = None
+        if len(parca):
+            gruplar, _ = yeniden_ornekle(parca, hedef)
+            tam = gruplar[:, KAPANIS_ZAMANI] <= taban[-1, KAPANIS_ZAMANI]
+            if tam.any():
+                self._kapali[(sembol, aralik)] = np.concatenate([ust, gruplar[tam]])[-self.derinlik[aralik]:]
+            if (~tam).any():
+                kalan = gruplar[~tam][-1]
+        kismi_taban = self._kismi.get((sembol, self.taban))
+        if kismi_taban is not None and kalan is not None and int(kismi_taban[ACILIS]) // hedef * hedef != int(kalan[ACILIS]):
+            kalan = None  # taban yeni kovaya geçti, önceki kova artık kapanmış olmalı
+        self._kismi[(sembol, aralik)] = _birlestir(kalan, kismi_taban, hedef) if kismi_taban is not None else kalan
+        return True
+
+    # ---------- okuma ----------
+    def mumlar(self, sembol, aralik, kismi=True, fiyat=None):
+        """Kapanmış mumlar; kismi=True ise oluşmakta olan mum da eklenir (fiyat verilirse kapanışı güncellenir)."""
+        kapali = self._kapali.get((sembol, aralik))
+        if kapali is None:
+            return None
+        if not kismi:
+            return kapali
+        k = self._kismi.get((sembol, aralik))
+        if k is None:
+            return kapali
+        k = k.copy()
+        if fiyat:
+            k[KAPANIS] = fiyat
+            k[YUKSEK] = max(k[YUKSEK], fiyat)
+            k[DUSUK] = min(k[DUSUK], fiyat)
+        return np.vstack([kapali, k])
+
+    def kismi_mu(self, sembol, aralik):
+        return self._kismi.get((sembol, aralik)) is not None
+
+    def unut(self, sembol):
+        with self._kilit(sembol):
+            for d in (self._kapali, self._kismi):
+                for anahtar in [a for a in d if a[0] == sembol]:
+                    del d[anahtar]
+            self._son_cekim.pop(sembol, None)
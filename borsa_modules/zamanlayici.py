@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Son tarih (deadline) tabanlı görev zamanlayıcı.
+Her görev tipinin kendi periyodu, önceliği ve son tarihi vardır. Uzun görevler generator
+olarak yazılır ve her iş biriminden sonra `yield` eder; zamanlayıcı bu noktalarda daha
+öncelikli (ör. emir kritik) görevleri araya alır. Bloklayan iş (ağ, AI) işçi thread'ine
+verilip Future'ı `yield` edilir: görev Future bitene kadar askıda kalır, bu sırada diğer
+görevler takvimlerinde çalışır. Kaçırılan son tarihler sayılır.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+# Düşük sayı = yüksek öncelik
+ONCELIK_EMIR = 0
+ONCELIK_DEGERLEME = 1
+ONCELIK_ANALIZ = 2
+ONCELIK_UI = 3
+
+
+def uyku(sn):
+    """`yield uyku(sn)`: görev sn saniye askıda kalır, thread bekletilmez; bu sürede diğer görevler çalışır."""
+    fut = Future()
+    t = threading.Timer(sn, fut.set_result, (None,))
+    t.daemon = True
+    t.start()
+    return fut
+
+
+@dataclass
+class Gorev:
+    ad: str
+    fn: object
+    aralik: float
+    oncelik: int = ONCELIK_ANALIZ
+    son_tarih: float = None  # vade + son_tarih saniye içinde bitmeli (None = aralik)
+    sonraki: float = 0.0
+    vade: float = 0.0
+    aktif: object = None  # askıdaki generator
+    bekledigi: object = None  # askıdaki generator'un beklediği Future (bitene kadar seçilmez)
+    calisma: int = 0
+    kacirilan: int = 0
+    son_sure: float = 0.0
+    _bu_tur_kacti: bool = field(default=False, repr=False)
+
+    @property
+    def tolerans(self):
+        return self.aralik if self.son_tarih is None else self.son_tarih
+
+
+class Zamanlayici:
+    """
+    Tek thread'de kooperatif çalışan zamanlayıcı.
+      z.ekle("degerleme", fn, aralik=5, oncelik=ONCELIK_EMIR)
+      z.calistir(lambda: bot_aktif)
+    """
+
+    def __init__(self, saat=time.monotonic, kacirma_bildir=None, metrikler=None):
+        self.saat = saat
+        self.kacirma_bildir = kacirma_bildir
+        self.metrikler = metrikler
+        self.gorevler = {}
+        self._uyandir = threading.Event()
+        self._kilit = threading.Lock()
+        self._tetiklenen = set()  # başka thread'lerden gelen tetikler; zamanlayıcı thread'i uygular
+
+    def ekle(self, ad, fn, aralik, oncelik=ONCELIK_ANALIZ, son_tarih=None, hemen=True):
+        simdi = self.saat()
+        g = Gorev(ad=ad, fn=fn, aralik=float(aralik), oncelik=oncelik, son_tarih=son_tarih)
+        g.sonraki = simdi if hemen else simdi + g.aralik
+        self.gorevler[ad] = g
+        return g
+
+    def aralik_guncelle(self, ad, aralik):
+        g = self.gorevler.get(ad)
+        if g:
+            g.aralik = float(aralik)
+
+    def tetikle(self, ad):
+        """Görevi periyodunu beklemeden sıraya al (ör. emir sonrası dashboard). Her thread'den çağrılabilir."""
+        with self._kilit:
+            self._tetiklenen.add(ad)
+        self._uyandir.set()
+
+    def _tetikleri_uygula(self, simdi):
+        with self._kilit:
+            if not self._tetiklenen:
+                return
+            adlar, self._tetiklenen = self._tetiklenen, set()
+        for ad in adlar:
+            g = self.gorevler.get(ad)
+            if g and g.aktif is None:
+                g.sonraki = min(g.sonraki, simdi)
+
+    # ---------- seçim ----------
+    def _hazir(self, simdi):
+        self._tetikleri_uygula(simdi)
+        return [
+            g for g in self.gorevler.values()
+            if ((g.bekledigi is None or g.bekledigi.done()) if g.aktif is not None else g.sonraki <= simdi)
+        ]
+
+    def oncelikli_bekliyor(self, oncelik):
+        """`oncelik`ten daha öncelikli hazır görev var mı?"""
+        simdi = self.saat()
+        return any(g.oncelik < oncelik for g in self._hazir(simdi))
+
+    def _sec(self, simdi):
+        hazir = self._hazir(simdi)
+        if not hazir:
+            return None
+        # Öncelik, sonra en erken vade
+        return min(hazir, key=lambda g: (g.oncelik, g.vade if g.aktif is not None else g.sonraki))
+
+    # ---------- çalıştırma ----------
+    def adim(self):
+        """Hazır en öncelikli görevden bir dilim çalıştır. İş yapıldıysa True."""
+        simdi = self.saat()
+        g = self._sec(simdi)
+        if g is None:
+            return False
+        t0 = self.saat()
+        try:
+            if g.aktif is None:
+                g.vade = g.sonraki
+                g.son_sure = 0.0
+                g._bu_tur_kacti = False
+                if simdi > g.vade + g.tolerans:
+                    self._kacirdi(g, simdi - g.vade)
+                sonuc = g.fn()
+                if not hasattr(sonuc, "__next__"):
+                    self._bitir(g, self.saat() - t0)
+                    return True
+                g.aktif = sonuc
+            g.bekledigi = None
+            beklenen = next(g.aktif)
+            if hasattr(beklenen, "add_done_callback"):
+                g.bekledigi = beklenen
+                beklenen.add_done_callback(lambda _: self._uyandir.set())
+        except StopIteration:
+            g.aktif = None
+            self._bitir(g, self.saat() - t0)
+            return True
+        except Exception:
+            g.aktif = None
+            g.bekledigi = None
+            self._bitir(g, self.saat() - t0)
+            raise
+        g.son_sure += self.saat() - t0
+        return True
+
+    def _bitir(self, g, sure):
+        simdi = self.saat()
+        g.calisma += 1
+        g.son_sure += sure
+        if not g._bu_tur_kacti and simdi > g.vade + g.tolerans:
+            self._kacirdi(g, simdi - g.vade)
+        if self.metrikler is not None:
+            self.metrikler.gozlem(f"gorev_{g.ad}", g.son_sure)
+        # Sabit oranlı: geride kalındıysa kaçırılan periyotlar biriktirilmez, atlanır
+        g.sonraki = g.vade + g.aralik
+        while g.sonraki <= simdi:
+            g.sonraki += g.aralik
+
+    def _kacirdi(self, g, gecikme):
+        g._bu_tur_kacti = True
+        g.kacirilan += 1
+        if self.metrikler is not None:
+            self.metrikler.say("gorev_kacirilan", gorev=g.ad)
+        if self.kacirma_bildir:
+            self.kacirma_bildir(g, gecikme)
+
+    def sonraki_bekleme(self):
+        simdi = self.saat()
+        if self._hazir(simdi):
+            return 0.0
+        # Future bekleyen görevler bitince _uyandir ile uyandırır; takvimi yalnızca boştakiler belirler
+        bos = [g.sonraki for g in self.gorevler.values() if g.aktif is None]
+        if not bos:
+            return 1.0
+        return max(0.0, min(bos) - simdi)
+
+    def calistir(self, devam, hata=None, max_uyku=0.5):
+        """devam() False olana kadar görevleri çalıştır. hata(exc) görev istisnalarını alır."""
+        while devam():
+            try:
+                if self.adim():
+                    continue
+            except Exception as e:
+                if hata is None:
+                    raise
+                hata(e)
+            bekle = min(self.sonraki_bekleme(), max_uyku)
+            if bekle > 0:
+                self._uyandir.wait(bekle)
+                self._uyandir.clear()
+
+    def istatistik(self):
+        return {
+            ad: {"aralik": g.aralik, "oncelik": g.oncelik, "calisma": g.calisma, "kacirilan": g.kacirilan}
+            for ad, g in self.gorevler.items()
+        }